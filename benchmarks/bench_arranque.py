@@ -0,0 +1,96 @@
+"""
+Benchmark del arranque: tiempo desde importar la capa de datos hasta la primera consulta.
+
+Prepara una base de datos temporal con el esquema completo y lanza ``--repeticiones``
+procesos nuevos por escenario, cada uno con la base de datos ya creada (arranque
+habitual, no el primero):
+    - antes: al importar se crea el motor y se ejecutan ``create_all`` e
+      ``instalar_busqueda``, como hacía ``src.modelo.database`` antes;
+    - ahora: el motor se crea al abrir la primera sesión y solo se lee
+      ``PRAGMA user_version``.
+Cada proceso mide dentro de sí mismo el tiempo entre el inicio de los imports y el
+final de la primera consulta, sin contar el arranque del intérprete, y por separado
+el paso de creación del motor y comprobación del esquema.
+
+Uso:
+    python -m benchmarks.bench_arranque --repeticiones 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from src.modelo.database import crear_motor, preparar_esquema
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ANTES = """
+import time
+inicio = time.perf_counter()
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+from src.modelo.busqueda import instalar_busqueda
+from src.modelo.database import Base, crear_motor
+from src.modelo.modelo import Usuario
+inicio_esquema = time.perf_counter()
+motor = crear_motor()
+Session = sessionmaker(bind=motor)
+Base.metadata.create_all(motor)
+with motor.begin() as conexion:
+    instalar_busqueda(conexion)
+esquema = time.perf_counter() - inicio_esquema
+with Session() as sesion:
+    sesion.execute(select(Usuario).limit(1)).all()
+print((time.perf_counter() - inicio) * 1000, esquema * 1000)
+"""
+
+AHORA = """
+import time
+inicio = time.perf_counter()
+from sqlalchemy import select
+from src.modelo.database import Session, obtener_motor
+from src.modelo.modelo import Usuario
+inicio_esquema = time.perf_counter()
+obtener_motor()
+esquema = time.perf_counter() - inicio_esquema
+with Session() as sesion:
+    sesion.execute(select(Usuario).limit(1)).all()
+print((time.perf_counter() - inicio) * 1000, esquema * 1000)
+"""
+
+
+def medir(codigo, url, repeticiones):
+    """Ejecuta el código en procesos nuevos y devuelve (total, esquema) en ms de cada uno."""
+    entorno = {**os.environ, "TODOLIST_DB_URL": url}
+    return [
+        tuple(map(float, subprocess.run(
+            [sys.executable, "-c", codigo], env=entorno, cwd=RAIZ,
+            capture_output=True, text=True, check=True
+        ).stdout.split()))
+        for _ in range(repeticiones)
+    ]
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        url = f"sqlite:///{os.path.join(directorio, 'arranque.db')}"
+        motor = crear_motor(url=url)
+        preparar_esquema(motor)
+        motor.dispose()
+
+        print(f"{'escenario':<10}{'hasta 1.ª consulta (ms)':>25}{'motor y esquema (ms)':>22}")
+        for escenario, codigo in (("antes", ANTES), ("ahora", AHORA)):
+            totales, esquemas = zip(*medir(codigo, url, args.repeticiones))
+            print(f"{escenario:<10}{statistics.median(totales):>25.1f}"
+                  f"{statistics.median(esquemas):>22.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark de la fachada asyncio (``src.logica.asincrono``) con 1, 10 y 100 corrutinas.
+
+Crea una base de datos temporal con ``--tareas`` tareas (50k por defecto) y reparte
+``--operaciones`` llamadas entre N corrutinas concurrentes, con dos cargas:
+    - lectura: ``obtener_tarea_por_id`` sobre IDs aleatorios;
+    - mixta: 90 % de lecturas y 10 % de ``actualizar_tarea`` (escrituras serializadas).
+Para cada combinación se muestra el rendimiento en operaciones por segundo.
+
+Uso:
+    python -m benchmarks.bench_asincrono --tareas 50000 --operaciones 5000 --lectores 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from src.logica.asincrono import EjecutorBD, TareaManagerAsync
+from src.modelo.database import crear_motor
+from benchmarks.bench_motor import poblar
+
+CORRUTINAS = (1, 10, 100)
+
+
+async def _trabajador(manager, operaciones, total_tareas, proporcion_escrituras, semilla):
+    generador = random.Random(semilla)
+    for _ in range(operaciones):
+        id_tarea = generador.randint(1, total_tareas)
+        if generador.random() < proporcion_escrituras:
+            await manager.actualizar_tarea(id_tarea, titulo=f"Tarea {id_tarea} editada")
+        else:
+            await manager.obtener_tarea_por_id(id_tarea)
+
+
+async def medir(manager, corrutinas, operaciones, total_tareas, proporcion_escrituras):
+    """Reparte las operaciones entre las corrutinas y devuelve operaciones/segundo."""
+    por_corrutina = max(1, operaciones // corrutinas)
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        _trabajador(manager, por_corrutina, total_tareas, proporcion_escrituras, semilla)
+        for semilla in range(corrutinas)
+    ))
+    return por_corrutina * corrutinas / (time.perf_counter() - inicio)
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=50_000)
+    parser.add_argument("--operaciones", type=int, default=5_000)
+    parser.add_argument("--lectores", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        motor = crear_motor(
+            url=f"sqlite:///{os.path.join(directorio, 'asincrono.db')}",
+            pool={"pool_size": args.lectores + 1}
+        )
+        poblar(motor, args.tareas)
+        ejecutor = EjecutorBD(motor, lectores=args.lectores)
+        manager = TareaManagerAsync(ejecutor)
+
+        print(f"{'corrutinas':<12}{'lectura (op/s)':>16}{'mixta (op/s)':>16}")
+        for corrutinas in CORRUTINAS:
+            lectura = asyncio.run(
+                medir(manager, corrutinas, args.operaciones, args.tareas, 0.0)
+            )
+            mixta = asyncio.run(
+                medir(manager, corrutinas, args.operaciones, args.tareas, 0.1)
+            )
+            print(f"{corrutinas:<12}{lectura:>16.0f}{mixta:>16.0f}")
+
+        ejecutor.cerrar()
+        motor.dispose()
+
+
+if __name__ == "__main__":
+    main()
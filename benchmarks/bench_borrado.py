@@ -0,0 +1,103 @@
+"""
+Benchmark del borrado de un usuario con muchas tareas etiquetadas.
+
+Crea una base de datos temporal por escenario con un usuario dueño de ``--tareas``
+tareas (100k por defecto), cada una con dos etiquetas, y mide el tiempo y el pico de
+memoria de Python (tracemalloc) al eliminar al usuario:
+    - antes: la sesión carga las tareas con sus etiquetas (``selectinload``) y las borra
+      una a una, como hacía el ORM sin claves ``ON DELETE CASCADE``;
+    - ahora: ``UsuarioManager.eliminar_usuario``, que emite un único DELETE y deja que
+      SQLite borre en cascada las tareas y sus asociaciones.
+
+Uso:
+    python -m benchmarks.bench_borrado --tareas 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import selectinload, sessionmaker
+
+from src.logica.usuario_manager import UsuarioManager
+from src.modelo.database import crear_motor
+from src.modelo.declarative_base import Base
+from src.modelo.modelo import Estado, Etiqueta, Tarea, Usuario, tarea_etiqueta
+
+BLOQUE = 50_000
+
+
+def poblar(motor, total_tareas):
+    """Crea el esquema y un usuario con ``total_tareas`` tareas de dos etiquetas cada una."""
+    Base.metadata.create_all(motor)
+    ahora = datetime(2025, 1, 1)
+    with motor.begin() as conexion:
+        conexion.execute(insert(Estado), [{"id_estado": 1, "nombre_estado": "Pendiente"}])
+        conexion.execute(insert(Usuario), [
+            {"nombre_usuario": "usuario", "correo_electronico": "u@correo.com", "contrasena": "x"}
+        ])
+        conexion.execute(insert(Etiqueta), [
+            {"nombre_etiqueta": f"Etiqueta {i}", "color": "Azul"} for i in range(1, 5)
+        ])
+        for inicio in range(0, total_tareas, BLOQUE):
+            ids = range(inicio + 1, min(inicio + BLOQUE, total_tareas) + 1)
+            conexion.execute(insert(Tarea), [
+                {"id_tarea": i, "titulo": f"Tarea {i}", "fecha_creacion": ahora,
+                 "fecha_vencimiento": ahora, "id_estado": 1, "id_usuario": 1}
+                for i in ids
+            ])
+            conexion.execute(insert(tarea_etiqueta), [
+                {"id_tarea": i, "id_etiqueta": 1 + (i + desplazamiento) % 4}
+                for i in ids for desplazamiento in (0, 1)
+            ])
+
+
+def borrar_antes(session):
+    """Borrado tal como lo hacía el ORM: cargar todo y eliminar fila a fila."""
+    tareas = session.scalars(
+        select(Tarea).options(selectinload(Tarea.etiquetas)).where(Tarea.id_usuario == 1)
+    ).all()
+    for tarea in tareas:
+        session.delete(tarea)
+    session.delete(session.get(Usuario, 1))
+    session.commit()
+
+
+def borrar_ahora(session):
+    """Borrado actual: un DELETE del usuario y cascada en la base de datos."""
+    UsuarioManager(session).eliminar_usuario(1)
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'escenario':<10}{'tiempo (s)':>12}{'pico memoria (MB)':>20}{'filas restantes':>18}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for escenario, borrar in (("antes", borrar_antes), ("ahora", borrar_ahora)):
+            motor = crear_motor(url=f"sqlite:///{os.path.join(directorio, f'{escenario}.db')}")
+            poblar(motor, args.tareas)
+            session = sessionmaker(bind=motor)()
+
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            borrar(session)
+            segundos = time.perf_counter() - inicio
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            restantes = session.scalar(select(func.count()).select_from(Tarea)) + session.scalar(
+                select(func.count()).select_from(tarea_etiqueta)
+            )
+            print(f"{escenario:<10}{segundos:>12.2f}{pico / 1024 / 1024:>20.1f}{restantes:>18}")
+            session.close()
+            motor.dispose()
+
+
+if __name__ == "__main__":
+    main()
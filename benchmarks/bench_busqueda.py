@@ -0,0 +1,109 @@
+"""
+Benchmark de la búsqueda de texto completo (FTS5) frente a ``LIKE '%x%'``.
+
+Crea una base de datos temporal con ``--tareas`` tareas (500k por defecto) cuyos
+títulos y descripciones se generan a partir de un vocabulario sintético, y mide la
+latencia media de ``TareaManager.buscar`` y de una consulta equivalente con LIKE
+para términos de distinta frecuencia.
+
+Uso:
+    python -m benchmarks.bench_busqueda --tareas 500000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import sessionmaker
+
+from src.logica.tarea_manager import TareaManager
+from src.modelo.database import crear_motor
+from src.modelo.declarative_base import Base
+from src.modelo.modelo import Estado, Tarea, Usuario
+
+USUARIOS = 10
+VOCABULARIO = [f"palabra{i}" for i in range(5000)]
+BLOQUE = 20_000
+REPETICIONES = 20
+
+_SQL_LIKE = text("""
+    SELECT id_tarea, titulo FROM tarea
+    WHERE id_usuario = :id_usuario AND (titulo LIKE :patron OR descripcion LIKE :patron)
+    LIMIT :limite
+""")
+
+
+def _texto(generador, palabras):
+    # Distribución sesgada: las primeras palabras del vocabulario son mucho más frecuentes.
+    return " ".join(
+        VOCABULARIO[min(int(generador.paretovariate(1.2)) - 1, len(VOCABULARIO) - 1)]
+        for _ in range(palabras)
+    )
+
+
+def poblar(motor, total_tareas):
+    """Crea el esquema (con el índice FTS5) y carga las tareas por bloques."""
+    Base.metadata.create_all(motor)
+    generador = random.Random(42)
+    ahora = datetime(2025, 1, 1)
+    with motor.begin() as conexion:
+        conexion.execute(insert(Estado), [{"id_estado": 1, "nombre_estado": "Pendiente"}])
+        conexion.execute(insert(Usuario), [
+            {"nombre_usuario": f"usuario{i}", "correo_electronico": f"u{i}@correo.com",
+             "contrasena": "x"}
+            for i in range(1, USUARIOS + 1)
+        ])
+        for inicio in range(0, total_tareas, BLOQUE):
+            conexion.execute(insert(Tarea), [
+                {
+                    "titulo": _texto(generador, 4),
+                    "descripcion": _texto(generador, 25),
+                    "fecha_creacion": ahora, "fecha_vencimiento": ahora,
+                    "id_estado": 1, "id_usuario": 1 + i % USUARIOS,
+                }
+                for i in range(inicio, min(inicio + BLOQUE, total_tareas))
+            ])
+
+
+def _latencia_ms(funcion):
+    muestras = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        funcion()
+        muestras.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(muestras)
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=500_000)
+    parser.add_argument("--limite", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        motor = crear_motor(url=f"sqlite:///{os.path.join(directorio, 'busqueda.db')}")
+        inicio = time.perf_counter()
+        poblar(motor, args.tareas)
+        print(f"Carga de {args.tareas} tareas: {time.perf_counter() - inicio:.1f} s")
+
+        session = sessionmaker(bind=motor)()
+        manager = TareaManager(session)
+        print(f"{'término':<14}{'FTS5 (ms)':>12}{'LIKE (ms)':>12}{'resultados':>12}")
+        for termino in ("palabra4999", "palabra300", "palabra7", "palabra1", "palabra12"):
+            resultados = manager.buscar(1, termino, args.limite)
+            fts = _latencia_ms(lambda t=termino: manager.buscar(1, t, args.limite))
+            like = _latencia_ms(lambda t=termino: session.execute(
+                _SQL_LIKE, {"id_usuario": 1, "patron": f"%{t}%", "limite": args.limite}
+            ).all())
+            print(f"{termino:<14}{fts:>12.2f}{like:>12.2f}{len(resultados):>12}")
+        session.close()
+        motor.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark de la detección de cambios hechos por otra conexión.
+
+Crea una base de datos temporal con un usuario dueño de ``--tareas`` tareas (100k por
+defecto) y otro con una sola tarea, y mide, repitiendo ``--repeticiones`` veces:
+    - recargar: leer de nuevo todas las filas del primer usuario
+      (``obtener_filas_por_usuario``), lo que haría una ventana que se refrescara sin
+      saber si algo cambió;
+    - sin cambios: ``DetectorCambios.comprobar`` cuando nadie escribió (solo
+      ``PRAGMA data_version``);
+    - con cambio: otra conexión modifica una tarea del segundo usuario y se mide la
+      comprobación que lo descubre (lee los contadores y los compara).
+
+Después mide lo que añaden los triggers de los contadores a las escrituras masivas:
+un UPDATE y un DELETE de todas las tareas del primer usuario, con y sin triggers.
+
+Uso:
+    python -m benchmarks.bench_cambios --tareas 100000 --repeticiones 200
+"""
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import sessionmaker
+
+from src.logica.detector_cambios import DetectorCambios
+from src.logica.tarea_manager import TareaManager
+from src.modelo.contadores import desinstalar_contadores
+from src.modelo.database import crear_motor, preparar_esquema
+from src.modelo.modelo import Estado, Tarea, Usuario
+
+BLOQUE = 50_000
+
+
+def poblar(motor, total_tareas):
+    """Crea el esquema, ``total_tareas`` tareas del usuario 1 y una del usuario 2."""
+    preparar_esquema(motor)
+    ahora = datetime(2025, 1, 1)
+    with motor.begin() as conexion:
+        conexion.execute(insert(Estado), [{"id_estado": 1, "nombre_estado": "Pendiente"}])
+        conexion.execute(insert(Usuario), [
+            {"nombre_usuario": f"usuario{i}", "correo_electronico": f"u{i}@correo.com",
+             "contrasena": "x"}
+            for i in (1, 2)
+        ])
+        for inicio in range(0, total_tareas + 1, BLOQUE):
+            ids = range(inicio + 1, min(inicio + BLOQUE, total_tareas + 1) + 1)
+            conexion.execute(insert(Tarea), [
+                {"id_tarea": i, "titulo": f"Tarea {i}", "fecha_creacion": ahora,
+                 "id_estado": 1, "id_usuario": 1 if i <= total_tareas else 2}
+                for i in ids
+            ])
+
+
+def cronometrar(funcion, repeticiones, preparar=None):
+    """Devuelve los milisegundos medios de ``funcion`` (sin contar ``preparar``)."""
+    total = 0.0
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        funcion()
+        total += time.perf_counter() - inicio
+    return total / repeticiones * 1000
+
+
+def medir_comprobaciones(motor, repeticiones):
+    """Compara recargar siempre con comprobar antes de recargar."""
+    session = sessionmaker(bind=motor)()
+    manager = TareaManager(session)
+    detector = DetectorCambios(motor)
+    titulos = itertools.count()
+
+    def _escribir_otra_conexion():
+        with motor.begin() as conexion:
+            conexion.execute(text("UPDATE tarea SET titulo = :t WHERE id_usuario = 2"),
+                             {"t": f"Cambio {next(titulos)}"})
+
+    def _recargar():
+        manager.obtener_filas_por_usuario(1)
+        session.rollback()
+
+    print(f"{'operación':<14}{'ms por llamada':>16}")
+    print(f"{'recargar':<14}{cronometrar(_recargar, max(1, repeticiones // 20)):>16.3f}")
+    print(f"{'sin cambios':<14}{cronometrar(detector.comprobar, repeticiones):>16.4f}")
+    con_cambio = cronometrar(detector.comprobar, repeticiones, _escribir_otra_conexion)
+    print(f"{'con cambio':<14}{con_cambio:>16.4f}")
+    _escribir_otra_conexion()
+    cambios = detector.comprobar()
+    print(f"usuario 1 afectado: {cambios.afecta('tarea', 1)}, "
+          f"usuario 2 afectado: {cambios.afecta('tarea', 2)}")
+    detector.cerrar()
+    session.close()
+
+
+def medir_triggers(directorio, total_tareas):
+    """Mide un UPDATE y un DELETE masivos con y sin los triggers de los contadores."""
+    print(f"\n{'triggers':<10}{'UPDATE (s)':>12}{'DELETE (s)':>12}")
+    for con_triggers in (False, True):
+        motor = crear_motor(
+            url=f"sqlite:///{os.path.join(directorio, f'triggers{int(con_triggers)}.db')}"
+        )
+        poblar(motor, total_tareas)
+        if not con_triggers:
+            with motor.begin() as conexion:
+                desinstalar_contadores(conexion)
+        tiempos = []
+        for sql in ("UPDATE tarea SET titulo = titulo || '!' WHERE id_usuario = 1",
+                    "DELETE FROM tarea WHERE id_usuario = 1"):
+            inicio = time.perf_counter()
+            with motor.begin() as conexion:
+                conexion.execute(text(sql))
+            tiempos.append(time.perf_counter() - inicio)
+        print(f"{'sí' if con_triggers else 'no':<10}{tiempos[0]:>12.2f}{tiempos[1]:>12.2f}")
+        motor.dispose()
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        motor = crear_motor(url=f"sqlite:///{os.path.join(directorio, 'cambios.db')}")
+        poblar(motor, args.tareas)
+        medir_comprobaciones(motor, args.repeticiones)
+        motor.dispose()
+        medir_triggers(directorio, args.tareas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark de contención: varios procesos incrementan a la vez el mismo contador.
+
+Para 1, 2, 4 y 8 procesos (``--procesos``) crea una base de datos temporal con una
+tarea cuyo título es un contador y lanza los procesos a la vez; cada uno suma 1 al
+contador ``--incrementos`` veces leyendo la tarea y guardándola de nuevo:
+    - antes: se lee el título y se guarda con un UPDATE sin comprobar la versión ni
+      reintentar, como hacían los managers; un ``database is locked`` se cuenta como
+      error (el manager lo imprimía y devolvía None) y los incrementos de otro
+      proceso que llegan entre la lectura y la escritura se pierden;
+    - ahora: ``TareaManager.actualizar_tarea`` con la versión leída; si devuelve un
+      ``Conflicto`` se vuelve a leer y se reintenta.
+Se mide el tiempo hasta que termina el último proceso, los incrementos confirmados
+por segundo, el porcentaje de intentos que acabaron en conflicto o en error y los
+incrementos perdidos (los confirmados menos el valor final del contador).
+
+Uso:
+    python -m benchmarks.bench_concurrencia --procesos 1 2 4 8 --incrementos 200
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from src.logica.tarea_manager import TareaManager
+from src.modelo.database import crear_motor
+from src.modelo.declarative_base import Base
+from src.modelo.modelo import Estado, Tarea, Usuario
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROCESO = """
+import sys, time
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from src.logica.concurrencia import Conflicto
+from src.logica.tarea_manager import TareaManager
+from src.modelo.database import crear_motor
+url, escenario, veces, inicio = sys.argv[1], sys.argv[2], int(sys.argv[3]), float(sys.argv[4])
+session = sessionmaker(bind=crear_motor(url=url))()
+manager = TareaManager(session)
+exitos = conflictos = errores = 0
+time.sleep(max(0.0, inicio - time.time()))
+while exitos < veces:
+    if escenario == "antes":
+        try:
+            titulo = session.execute(text("SELECT titulo FROM tarea WHERE id_tarea = 1")).scalar()
+            session.commit()
+            session.execute(text("UPDATE tarea SET titulo = :t WHERE id_tarea = 1"),
+                            {"t": str(int(titulo) + 1)})
+            session.commit()
+            exitos += 1
+        except OperationalError:
+            session.rollback()
+            errores += 1
+        continue
+    tarea = manager.obtener_tarea_por_id(1)
+    resultado = manager.actualizar_tarea(1, version=tarea.version,
+                                         titulo=str(int(tarea.titulo) + 1))
+    if isinstance(resultado, Conflicto):
+        conflictos += 1
+    elif resultado is None:
+        sys.exit("Error al actualizar la tarea.")
+    else:
+        exitos += 1
+print(exitos, conflictos, errores)
+"""
+
+
+def preparar(url):
+    """Crea el esquema y la tarea del contador."""
+    motor = crear_motor(url=url)
+    Base.metadata.create_all(motor)
+    with sessionmaker(bind=motor)() as session:
+        session.add_all([
+            Estado(id_estado=1, nombre_estado="Pendiente"),
+            Usuario(id_usuario=1, nombre_usuario="u", correo_electronico="u@correo.com",
+                    contrasena="x"),
+        ])
+        session.commit()
+        TareaManager(session).crear_tarea("0", None, datetime(2025, 1, 1), None,
+                                          id_estado=1, id_usuario=1)
+    return motor
+
+
+def medir(url, escenario, procesos, incrementos):
+    """Lanza los procesos y devuelve (segundos, confirmados, conflictos, errores)."""
+    inicio = time.time() + 2
+    lanzados = [
+        subprocess.Popen(
+            [sys.executable, "-c", PROCESO, url, escenario, str(incrementos), str(inicio)],
+            cwd=RAIZ, stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(procesos)
+    ]
+    totales = [0, 0, 0]
+    for proceso in lanzados:
+        salida, _ = proceso.communicate()
+        if proceso.returncode:
+            raise RuntimeError(f"Un proceso del escenario '{escenario}' falló.")
+        for i, valor in enumerate(salida.strip().splitlines()[-1].split()):
+            totales[i] += int(valor)
+    return (time.time() - inicio, *totales)
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--procesos", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--incrementos", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'procesos':<10}{'escenario':<11}{'tiempo (s)':>11}{'incr./s':>10}"
+          f"{'conflictos':>12}{'errores':>10}{'perdidos':>10}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for procesos in args.procesos:
+            for escenario in ("antes", "ahora"):
+                url = f"sqlite:///{os.path.join(directorio, f'{escenario}{procesos}.db')}"
+                motor = preparar(url)
+                segundos, confirmados, conflictos, errores = medir(
+                    url, escenario, procesos, args.incrementos
+                )
+                with motor.connect() as conexion:
+                    final = int(conexion.scalar(select(Tarea.titulo)))
+                motor.dispose()
+                intentos = confirmados + conflictos + errores
+                print(f"{procesos:<10}{escenario:<11}{segundos:>11.2f}"
+                      f"{confirmados / segundos:>10.0f}{conflictos / intentos:>12.1%}"
+                      f"{errores / intentos:>10.1%}{confirmados - final:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark del coste por llamada de las búsquedas por ID y por nombre.
+
+Compara la forma antigua de los managers (``session.query(...).filter_by(...).first()``,
+que construye y compila la consulta en cada llamada) con las sentencias ``select()``
+construidas una sola vez que usan ahora. Como referencia se mide la misma consulta
+con el cursor de sqlite3 sin SQLAlchemy; la diferencia con esa referencia es el coste
+del lado de Python.
+
+Uso:
+    python -m benchmarks.bench_consultas --llamadas 20000
+"""
+import argparse
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from src.logica.tarea_manager import TareaManager
+from src.logica.usuario_manager import UsuarioManager
+from src.modelo.database import crear_motor
+from src.modelo.modelo import Tarea, Usuario
+from benchmarks.bench_motor import poblar
+
+TAREAS = 1_000
+USUARIOS = 10
+
+
+def _microsegundos(funcion, llamadas):
+    for i in range(min(llamadas, 500)):
+        funcion(i)
+    inicio = time.perf_counter()
+    for i in range(llamadas):
+        funcion(i)
+    return (time.perf_counter() - inicio) / llamadas * 1_000_000
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--llamadas", type=int, default=20_000)
+    args = parser.parse_args()
+
+    motor = crear_motor(url="sqlite://")
+    poblar(motor, TAREAS)
+    session = sessionmaker(bind=motor)()
+    tareas = TareaManager(session)
+    usuarios = UsuarioManager(session)
+    cursor = session.connection().connection.cursor()
+
+    casos = {
+        "tarea por ID": (
+            lambda i: session.query(Tarea).filter_by(id_tarea=1 + i % TAREAS).first(),
+            lambda i: tareas.obtener_tarea_por_id(1 + i % TAREAS),
+            lambda i: cursor.execute(
+                "SELECT * FROM tarea WHERE id_tarea = ?", (1 + i % TAREAS,)
+            ).fetchone(),
+        ),
+        "usuario por ID": (
+            lambda i: session.query(Usuario).filter_by(id_usuario=1 + i % USUARIOS).first(),
+            lambda i: usuarios.obtener_usuario_por_id(1 + i % USUARIOS),
+            lambda i: cursor.execute(
+                "SELECT * FROM usuario WHERE id_usuario = ?", (1 + i % USUARIOS,)
+            ).fetchone(),
+        ),
+        "usuario por nombre": (
+            lambda i: session.query(Usuario).filter_by(
+                nombre_usuario=f"usuario{1 + i % USUARIOS}").first(),
+            lambda i: usuarios.obtener_por_nombre(f"usuario{1 + i % USUARIOS}"),
+            lambda i: cursor.execute(
+                "SELECT * FROM usuario WHERE nombre_usuario = ? LIMIT 1",
+                (f"usuario{1 + i % USUARIOS}",)
+            ).fetchone(),
+        ),
+    }
+
+    print(f"{'consulta':<20}{'antes (µs)':>12}{'ahora (µs)':>12}{'sqlite3 (µs)':>14}"
+          f"{'reducción':>12}")
+    for nombre, (antes, ahora, referencia) in casos.items():
+        t_antes = _microsegundos(antes, args.llamadas)
+        t_ahora = _microsegundos(ahora, args.llamadas)
+        t_ref = _microsegundos(referencia, args.llamadas)
+        reduccion = (t_antes - t_ref) / (t_ahora - t_ref)
+        print(f"{nombre:<20}{t_antes:>12.1f}{t_ahora:>12.1f}{t_ref:>14.1f}{reduccion:>11.1f}x")
+
+    session.close()
+    motor.dispose()
+
+
+if __name__ == "__main__":
+    main()
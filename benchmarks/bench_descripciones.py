@@ -0,0 +1,149 @@
+"""
+Benchmark de los listados con descripciones largas (5 KB de media).
+
+Crea dos bases de datos temporales con ``--tareas`` tareas de un mismo usuario:
+    - antes: descripciones guardadas como texto y cargadas en cada fila del listado
+      (``undefer``), como hacía el modelo antes de diferir la columna;
+    - ahora: descripciones comprimidas (TextoComprimido) y diferidas.
+Para ``obtener_tareas_por_usuario`` y ``obtener_filas_por_usuario`` mide la mediana de
+latencia y los bytes que devuelve SQLite por consulta, además del tamaño del archivo.
+
+Uso:
+    python -m benchmarks.bench_descripciones --tareas 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import event, insert, select, text
+from sqlalchemy.orm import joinedload, sessionmaker, undefer
+
+from src.logica.tarea_manager import TareaManager
+from src.modelo.database import crear_motor
+from src.modelo.declarative_base import Base
+from src.modelo.modelo import Estado, Tarea, Usuario
+
+REPETICIONES = 5
+PALABRAS = [
+    "reunión", "cliente", "entrega", "revisar", "presupuesto", "documento", "equipo",
+    "plazo", "informe", "pendiente", "correo", "llamada", "proveedor", "factura",
+]
+
+
+def _descripcion(generador):
+    # Entre 2,5 y 7,5 KB de texto: 5 KB de media.
+    objetivo = generador.randint(2_500, 7_500)
+    palabras = []
+    largo = 0
+    while largo < objetivo:
+        palabra = generador.choice(PALABRAS)
+        palabras.append(palabra)
+        largo += len(palabra) + 1
+    return " ".join(palabras)
+
+
+def poblar(motor, total_tareas, comprimir):
+    """Crea el esquema y carga las tareas, con la descripción comprimida o como texto."""
+    Base.metadata.create_all(motor)
+    generador = random.Random(7)
+    ahora = datetime(2025, 1, 1)
+    with motor.begin() as conexion:
+        conexion.execute(insert(Estado), [{"id_estado": 1, "nombre_estado": "Pendiente"}])
+        conexion.execute(insert(Usuario), [
+            {"nombre_usuario": "usuario", "correo_electronico": "u@correo.com", "contrasena": "x"}
+        ])
+        filas = [
+            {"titulo": f"Tarea {i}", "descripcion": _descripcion(generador),
+             "fecha_creacion": ahora, "fecha_vencimiento": ahora,
+             "id_estado": 1, "id_usuario": 1}
+            for i in range(total_tareas)
+        ]
+        if comprimir:
+            conexion.execute(insert(Tarea), filas)
+        else:
+            # Sin pasar por el tipo de la columna: texto plano, como en la versión anterior.
+            conexion.execute(text(
+                "INSERT INTO tarea (titulo, descripcion, fecha_creacion, fecha_vencimiento, "
+                "id_estado, id_usuario) VALUES (:titulo, :descripcion, :fecha_creacion, "
+                ":fecha_vencimiento, :id_estado, :id_usuario)"
+            ), filas)
+
+
+def _bytes_leidos(motor, funcion):
+    """Ejecuta la función, repite sus SELECT con sqlite3 y suma el tamaño de lo devuelto."""
+    sentencias = []
+
+    def registrar(_conn, _cursor, sentencia, parametros, _contexto, _varios):
+        if sentencia.lstrip().upper().startswith("SELECT"):
+            sentencias.append((sentencia, parametros))
+
+    event.listen(motor, "before_cursor_execute", registrar)
+    try:
+        funcion()
+    finally:
+        event.remove(motor, "before_cursor_execute", registrar)
+
+    total = 0
+    with motor.connect() as conexion:
+        for sentencia, parametros in sentencias:
+            for fila in conexion.exec_driver_sql(sentencia, parametros):
+                total += sum(
+                    len(valor) if isinstance(valor, (str, bytes)) else 8 for valor in fila
+                )
+    return total
+
+
+def _latencia_ms(session, funcion):
+    latencias = []
+    for _ in range(REPETICIONES):
+        session.expunge_all()
+        inicio = time.perf_counter()
+        funcion()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(latencias)
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'escenario':<10}{'consulta':<28}{'latencia (ms)':>15}{'KB leídos':>12}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for escenario, comprimir in (("antes", False), ("ahora", True)):
+            ruta = os.path.join(directorio, f"{escenario}.db")
+            motor = crear_motor(url=f"sqlite:///{ruta}")
+            poblar(motor, args.tareas, comprimir)
+            session = sessionmaker(bind=motor)()
+            manager = TareaManager(session)
+
+            # Antes, la descripción completa viajaba en cada fila del listado.
+            listado_antes = (
+                select(Tarea)
+                .options(joinedload(Tarea.etiquetas), undefer(Tarea.descripcion))
+                .where(Tarea.id_usuario == 1)
+            )
+            casos = (
+                ("obtener_tareas_por_usuario",
+                 (lambda: manager.obtener_tareas_por_usuario(1)) if comprimir
+                 else (lambda: session.scalars(listado_antes).unique().all())),
+                ("obtener_filas_por_usuario", lambda: manager.obtener_filas_por_usuario(1)),
+            )
+            for nombre, funcion in casos:
+                latencia = _latencia_ms(session, funcion)
+                session.expunge_all()
+                leidos = _bytes_leidos(motor, funcion)
+                print(f"{escenario:<10}{nombre:<28}{latencia:>15.1f}{leidos / 1024:>12.0f}")
+            session.close()
+            motor.dispose()
+            print(f"{escenario:<10}{'tamaño del archivo':<28}"
+                  f"{os.path.getsize(ruta) / 1024 / 1024:>14.1f}M")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark del refresco incremental con el diario de cambios.
+
+Crea una base de datos temporal con un usuario dueño de ``--tareas`` tareas (100k por
+defecto). Para cada número de tareas cambiadas (``--cambios``), otra conexión cambia
+el título de esas tareas y se mide lo que cuesta dejar al día la lista del usuario:
+    - recargar: leer de nuevo todas sus filas (``obtener_filas_por_usuario``), lo
+      único posible sin un registro de lo que cambió;
+    - incremental: ``DiarioManager.cambios_desde`` y ``obtener_filas_por_usuario``
+      solo con los IDs cambiados.
+
+Después mide lo que añaden los triggers del diario a un UPDATE de todas las tareas y
+lo que tarda ``compactar`` en dejar en ``MAXIMO_ENTRADAS`` el diario resultante.
+
+Uso:
+    python -m benchmarks.bench_diario --tareas 100000 --cambios 1 10 100 1000 10000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import bindparam, text, update
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.bench_cambios import poblar
+from src.logica.diario_manager import MAXIMO_ENTRADAS, DiarioManager
+from src.logica.tarea_manager import TareaManager
+from src.modelo.diario import desinstalar_diario
+from src.modelo.database import crear_motor
+from src.modelo.modelo import Tarea
+
+
+def cambiar(motor, ids, texto):
+    """Cambia el título de las tareas ``ids`` desde otra conexión."""
+    with motor.begin() as conexion:
+        conexion.execute(
+            update(Tarea).where(Tarea.id_tarea == bindparam("id")).values(titulo=texto)
+            .execution_options(synchronize_session=False),
+            [{"id": id_tarea} for id_tarea in ids]
+        )
+
+
+def medir_refresco(motor, total_tareas, cambios):
+    """Compara recargar todo con aplicar solo los cambios del diario."""
+    session = sessionmaker(bind=motor)()
+    manager = TareaManager(session)
+    diario = DiarioManager(session)
+    aleatorio = random.Random(1)
+
+    print(f"{'cambiadas':>10}{'recargar (ms)':>15}{'incremental (ms)':>18}{'filas leídas':>14}")
+    for cantidad in cambios:
+        secuencia = diario.ultima_secuencia()
+        session.rollback()
+        cambiar(motor, aleatorio.sample(range(1, total_tareas + 1), cantidad), f"C{cantidad}")
+
+        inicio = time.perf_counter()
+        manager.obtener_filas_por_usuario(1)
+        recargar = time.perf_counter() - inicio
+        session.rollback()
+
+        inicio = time.perf_counter()
+        entradas = diario.cambios_desde(secuencia, 1)
+        filas = manager.obtener_filas_por_usuario(
+            1, ids={e.id_entidad for e in entradas if e.entidad == "tarea"}
+        )
+        incremental = time.perf_counter() - inicio
+        session.rollback()
+        print(f"{cantidad:>10}{recargar * 1000:>15.1f}{incremental * 1000:>18.1f}"
+              f"{len(filas):>14}")
+    session.close()
+
+
+def medir_escritura(directorio, total_tareas):
+    """Mide un UPDATE de todas las tareas con y sin diario, y la compactación."""
+    print(f"\n{'diario':<8}{'UPDATE (s)':>12}{'compactar (s)':>15}{'entradas borradas':>19}")
+    for con_diario in (False, True):
+        motor = crear_motor(
+            url=f"sqlite:///{os.path.join(directorio, f'diario{int(con_diario)}.db')}"
+        )
+        poblar(motor, total_tareas)
+        if not con_diario:
+            with motor.begin() as conexion:
+                desinstalar_diario(conexion)
+        inicio = time.perf_counter()
+        with motor.begin() as conexion:
+            conexion.execute(text("UPDATE tarea SET titulo = titulo || '!'"))
+        escritura = time.perf_counter() - inicio
+        if not con_diario:
+            print(f"{'no':<8}{escritura:>12.2f}{'—':>15}{'—':>19}")
+        else:
+            with sessionmaker(bind=motor)() as session:
+                inicio = time.perf_counter()
+                borradas = DiarioManager(session).compactar()
+                compactar = time.perf_counter() - inicio
+            print(f"{'sí':<8}{escritura:>12.2f}{compactar:>15.2f}{borradas:>19}")
+        motor.dispose()
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=100_000)
+    parser.add_argument("--cambios", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        motor = crear_motor(url=f"sqlite:///{os.path.join(directorio, 'refresco.db')}")
+        poblar(motor, args.tareas)
+        medir_refresco(motor, args.tareas, args.cambios)
+        motor.dispose()
+        medir_escritura(directorio, max(args.tareas, 2 * MAXIMO_ENTRADAS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark de las combinaciones booleanas de etiquetas.
+
+Crea una base de datos temporal con ``--etiquetas`` etiquetas (200 por defecto) y
+``--asociaciones`` filas en ``tarea_etiqueta`` (1M por defecto), repartidas entre
+tareas de 1 a 9 etiquetas con una distribución sesgada (unas pocas etiquetas muy
+usadas y muchas raras), y compara para varias expresiones:
+    - antes: cargar todas las tareas del usuario con sus etiquetas (``selectinload``)
+      y evaluar la expresión en Python sobre cada colección;
+    - ahora: ``TareaManager.obtener_tareas_por_etiquetas``, resuelto en SQL.
+
+Uso:
+    python -m benchmarks.bench_etiquetas --etiquetas 200 --asociaciones 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import selectinload, sessionmaker
+
+from src.logica.tarea_manager import TareaManager
+from src.modelo.database import crear_motor
+from src.modelo.declarative_base import Base
+from src.modelo.modelo import Estado, Etiqueta, Tarea, Usuario, tarea_etiqueta
+
+BLOQUE = 50_000
+REPETICIONES = 3
+
+# Expresión en texto y su equivalente en Python sobre el conjunto de nombres.
+EXPRESIONES = {
+    "E1 AND E2": lambda n: "E1" in n and "E2" in n,
+    "E1 AND E2 AND NOT E3": lambda n: "E1" in n and "E2" in n and "E3" not in n,
+    "E5 OR E150": lambda n: "E5" in n or "E150" in n,
+    "(E1 OR E2) AND NOT (E3 OR E4)":
+        lambda n: ("E1" in n or "E2" in n) and not ("E3" in n or "E4" in n),
+    "E100 AND E150": lambda n: "E100" in n and "E150" in n,
+}
+
+
+def poblar(motor, total_etiquetas, total_asociaciones):
+    """Crea el esquema y reparte las asociaciones entre tareas de un único usuario."""
+    Base.metadata.create_all(motor)
+    generador = random.Random(5)
+    pesos = [1 / rango for rango in range(1, total_etiquetas + 1)]
+    ahora = datetime(2025, 1, 1)
+    with motor.begin() as conexion:
+        conexion.execute(insert(Estado), [{"id_estado": 1, "nombre_estado": "Pendiente"}])
+        conexion.execute(insert(Usuario), [
+            {"nombre_usuario": "usuario", "correo_electronico": "u@correo.com", "contrasena": "x"}
+        ])
+        conexion.execute(insert(Etiqueta), [
+            {"id_etiqueta": i, "nombre_etiqueta": f"E{i}", "color": "Azul"}
+            for i in range(1, total_etiquetas + 1)
+        ])
+
+    id_tarea = 0
+    creadas = 0
+    while creadas < total_asociaciones:
+        tareas, asociaciones = [], []
+        while creadas < total_asociaciones and len(asociaciones) < BLOQUE:
+            id_tarea += 1
+            tareas.append({"id_tarea": id_tarea, "titulo": f"Tarea {id_tarea}",
+                           "fecha_creacion": ahora, "id_estado": 1, "id_usuario": 1})
+            elegidas = set(generador.choices(range(1, total_etiquetas + 1), pesos,
+                                             k=generador.randint(1, 9)))
+            asociaciones.extend({"id_tarea": id_tarea, "id_etiqueta": e} for e in elegidas)
+            creadas += len(elegidas)
+        with motor.begin() as conexion:
+            conexion.execute(insert(Tarea), tareas)
+            conexion.execute(insert(tarea_etiqueta), asociaciones)
+    return id_tarea
+
+
+def filtrar_antes(session, condicion):
+    """Filtrado en Python, como se hacía antes: cargar todo y recorrer las colecciones."""
+    tareas = session.scalars(
+        select(Tarea).options(selectinload(Tarea.etiquetas)).where(Tarea.id_usuario == 1)
+    ).all()
+    return [t for t in tareas if condicion({e.nombre_etiqueta for e in t.etiquetas})]
+
+
+def _medir(session, funcion):
+    muestras = []
+    for _ in range(REPETICIONES):
+        session.expunge_all()
+        inicio = time.perf_counter()
+        resultado = funcion()
+        muestras.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(muestras), resultado
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--etiquetas", type=int, default=200)
+    parser.add_argument("--asociaciones", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        motor = crear_motor(url=f"sqlite:///{os.path.join(directorio, 'etiquetas.db')}")
+        inicio = time.perf_counter()
+        total_tareas = poblar(motor, args.etiquetas, args.asociaciones)
+        print(f"Carga de {total_tareas} tareas y {args.asociaciones} asociaciones: "
+              f"{time.perf_counter() - inicio:.1f} s")
+        session = sessionmaker(bind=motor)()
+        manager = TareaManager(session)
+
+        print(f"{'expresión':<32}{'tareas':>8}{'Python (ms)':>13}{'SQL (ms)':>11}{'mejora':>9}")
+        for texto, condicion in EXPRESIONES.items():
+            ms_antes, antes = _medir(session, lambda c=condicion: filtrar_antes(session, c))
+            ms_ahora, ahora = _medir(
+                session, lambda t=texto: manager.obtener_tareas_por_etiquetas(t, 1)
+            )
+            assert sorted(t.id_tarea for t in antes) == [t.id_tarea for t in ahora]
+            print(f"{texto:<32}{len(ahora):>8}{ms_antes:>13.0f}{ms_ahora:>11.1f}"
+                  f"{ms_antes / ms_ahora:>8.0f}x")
+        session.close()
+        motor.dispose()
+
+
+if __name__ == "__main__":
+    main()
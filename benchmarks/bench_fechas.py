@@ -0,0 +1,138 @@
+"""
+Benchmark de las fechas de las tareas: texto ISO (``DateTime``) frente a enteros (FechaEpoch).
+
+Crea dos tablas equivalentes con ``--tareas`` tareas (1M por defecto) repartidas entre
+varios usuarios, con los mismos índices que ``tarea``: una guarda las fechas como
+``DateTime`` (texto) y la otra como FechaEpoch (entero). Mide:
+    - consultas de rango: tareas vencidas de un usuario, vencimientos de la semana y
+      recuento global de vencidas;
+    - hidratación: lectura y conversión a ``datetime`` de ``--filas`` filas;
+    - espacio en disco de cada tabla con sus índices (tabla virtual ``dbstat``).
+
+Uso:
+    python -m benchmarks.bench_fechas --tareas 1000000 --filas 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, MetaData, String, Table, func, insert, select, text
+)
+
+from src.modelo.database import crear_motor
+from src.modelo.tipos import FechaEpoch
+
+USUARIOS = 100
+BLOQUE = 50_000
+REPETICIONES = 5
+HOY = datetime(2025, 6, 15, 12, 0)
+
+
+def _tabla(metadatos, nombre, tipo_fecha):
+    return Table(
+        nombre, metadatos,
+        Column("id_tarea", Integer, primary_key=True),
+        Column("titulo", String(150)),
+        Column("fecha_creacion", tipo_fecha),
+        Column("fecha_vencimiento", tipo_fecha),
+        Column("id_estado", Integer),
+        Column("id_usuario", Integer),
+        Index(f"ix_{nombre}_usuario_vencimiento", "id_usuario", "fecha_vencimiento"),
+        Index(f"ix_{nombre}_usuario_estado_vencimiento",
+              "id_usuario", "id_estado", "fecha_vencimiento"),
+        Index(f"ix_{nombre}_vencimiento", "fecha_vencimiento"),
+    )
+
+
+def poblar(motor, tablas, total_tareas):
+    """Carga las mismas tareas en cada una de las tablas."""
+    generador = random.Random(3)
+    for inicio in range(0, total_tareas, BLOQUE):
+        filas = []
+        for i in range(inicio, min(inicio + BLOQUE, total_tareas)):
+            creacion = HOY - timedelta(seconds=generador.randint(0, 365 * 86_400))
+            filas.append({
+                "titulo": f"Tarea {i}",
+                "fecha_creacion": creacion,
+                "fecha_vencimiento": creacion + timedelta(
+                    seconds=generador.randint(0, 60 * 86_400), microseconds=i % 1_000_000
+                ),
+                "id_estado": 1 + i % 2,
+                "id_usuario": 1 + i % USUARIOS,
+            })
+        with motor.begin() as conexion:
+            for tabla in tablas:
+                conexion.execute(insert(tabla), filas)
+
+
+def _latencia_ms(motor, consulta):
+    muestras = []
+    with motor.connect() as conexion:
+        for _ in range(REPETICIONES):
+            inicio = time.perf_counter()
+            conexion.execute(consulta).all()
+            muestras.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(muestras)
+
+
+def _espacio_mb(motor, nombre_tabla):
+    """Páginas ocupadas por la tabla y sus índices, en MB."""
+    with motor.connect() as conexion:
+        return conexion.execute(text(
+            "SELECT SUM(pgsize) FROM dbstat WHERE name = :tabla OR name IN "
+            "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :tabla)"
+        ), {"tabla": nombre_tabla}).scalar() / 1024 / 1024
+
+
+def consultas(tabla, filas):
+    """Consultas medidas sobre una tabla, con su nombre."""
+    c = tabla.c
+    return {
+        "vencidas de un usuario": select(c.id_tarea, c.fecha_vencimiento).where(
+            c.id_usuario == 7, c.id_estado == 1, c.fecha_vencimiento < HOY
+        ).order_by(c.fecha_vencimiento),
+        "vencen esta semana": select(c.id_tarea, c.fecha_vencimiento).where(
+            c.fecha_vencimiento >= HOY, c.fecha_vencimiento < HOY + timedelta(days=7)
+        ),
+        "recuento de vencidas": select(func.count()).where(c.fecha_vencimiento < HOY),
+        f"hidratar {filas} filas": select(c.fecha_creacion, c.fecha_vencimiento).limit(filas),
+    }
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=1_000_000)
+    parser.add_argument("--filas", type=int, default=100_000)
+    args = parser.parse_args()
+
+    metadatos = MetaData()
+    texto = _tabla(metadatos, "tarea_texto", DateTime)
+    epoch = _tabla(metadatos, "tarea_epoch", FechaEpoch)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        motor = crear_motor(url=f"sqlite:///{os.path.join(directorio, 'fechas.db')}")
+        metadatos.create_all(motor)
+        inicio = time.perf_counter()
+        poblar(motor, (texto, epoch), args.tareas)
+        print(f"Carga de {args.tareas} tareas: {time.perf_counter() - inicio:.1f} s")
+
+        print(f"{'consulta':<28}{'texto (ms)':>12}{'entero (ms)':>13}{'mejora':>9}")
+        for (nombre, consulta_texto), consulta_epoch in zip(
+                consultas(texto, args.filas).items(), consultas(epoch, args.filas).values()):
+            ms_texto = _latencia_ms(motor, consulta_texto)
+            ms_epoch = _latencia_ms(motor, consulta_epoch)
+            print(f"{nombre:<28}{ms_texto:>12.1f}{ms_epoch:>13.1f}{ms_texto / ms_epoch:>8.1f}x")
+        mb_texto, mb_epoch = (_espacio_mb(motor, tabla.name) for tabla in (texto, epoch))
+        print(f"{'espacio en disco (MB)':<28}{mb_texto:>12.1f}{mb_epoch:>13.1f}"
+              f"{mb_texto / mb_epoch:>8.1f}x")
+        motor.dispose()
+
+
+if __name__ == "__main__":
+    main()
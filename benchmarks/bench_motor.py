@@ -0,0 +1,122 @@
+"""
+Benchmark del motor SQLite: perfil 'basico' (valores por defecto) frente a 'optimizado'.
+
+Crea una base de datos temporal por perfil con ``--tareas`` tareas (100k por defecto)
+y mide:
+    - inserciones con un commit por tarea, como hace ``TareaManager.crear_tarea``;
+    - lecturas por ID aleatorio y listados completos por usuario.
+
+Uso:
+    python -m benchmarks.bench_motor --tareas 100000 --inserciones 2000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import sessionmaker
+
+from src.modelo.database import crear_motor
+from src.modelo.declarative_base import Base
+from src.modelo.modelo import Estado, Tarea, Usuario
+
+USUARIOS = 10
+
+
+def poblar(motor, total_tareas):
+    """Crea el esquema y carga usuarios, estados y tareas en una sola transacción."""
+    Base.metadata.create_all(motor)
+    inicio = datetime(2025, 1, 1)
+    with motor.begin() as conexion:
+        conexion.execute(insert(Estado), [
+            {"id_estado": 1, "nombre_estado": "Pendiente"},
+            {"id_estado": 2, "nombre_estado": "Completado"},
+        ])
+        conexion.execute(insert(Usuario), [
+            {"nombre_usuario": f"usuario{i}", "correo_electronico": f"u{i}@correo.com",
+             "contrasena": "x"}
+            for i in range(1, USUARIOS + 1)
+        ])
+        conexion.execute(insert(Tarea), [
+            {
+                "titulo": f"Tarea {i}",
+                "descripcion": f"Descripción de la tarea {i}",
+                "fecha_creacion": inicio + timedelta(minutes=i),
+                "fecha_vencimiento": inicio + timedelta(days=i % 365),
+                "id_estado": 1 + i % 2,
+                "id_usuario": 1 + i % USUARIOS,
+            }
+            for i in range(total_tareas)
+        ])
+
+
+def medir_inserciones(fabrica, cantidad):
+    """Inserta ``cantidad`` tareas con un commit cada una y devuelve tareas/segundo."""
+    session = fabrica()
+    inicio = time.perf_counter()
+    for i in range(cantidad):
+        session.add(Tarea(
+            titulo=f"Nueva {i}", descripcion="Insertada en el benchmark",
+            fecha_creacion=datetime.now(), fecha_vencimiento=datetime.now(),
+            id_estado=1, id_usuario=1 + i % USUARIOS,
+        ))
+        session.commit()
+    duracion = time.perf_counter() - inicio
+    session.close()
+    return cantidad / duracion
+
+
+def medir_lecturas(fabrica, total_tareas, cantidad):
+    """Mide lecturas por ID aleatorio y listados por usuario; devuelve operaciones/segundo."""
+    session = fabrica()
+    ids = [random.randint(1, total_tareas) for _ in range(cantidad)]
+    inicio = time.perf_counter()
+    for id_tarea in ids:
+        session.execute(select(Tarea).where(Tarea.id_tarea == id_tarea)).scalar_one_or_none()
+        session.expunge_all()
+    por_id = cantidad / (time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    for id_usuario in range(1, USUARIOS + 1):
+        session.execute(select(Tarea).where(Tarea.id_usuario == id_usuario)).scalars().all()
+        session.expunge_all()
+    listados = USUARIOS / (time.perf_counter() - inicio)
+    session.close()
+    return por_id, listados
+
+
+def ejecutar(perfil, total_tareas, inserciones, lecturas):
+    """Ejecuta el benchmark completo para un perfil e imprime los resultados."""
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, f"bench_{perfil}.db")
+        motor = crear_motor(url=f"sqlite:///{ruta}", perfil=perfil, echo=False)
+        poblar(motor, total_tareas)
+        fabrica = sessionmaker(bind=motor)
+
+        tasa_insercion = medir_inserciones(fabrica, inserciones)
+        tasa_por_id, tasa_listado = medir_lecturas(fabrica, total_tareas, lecturas)
+        motor.dispose()
+
+    print(
+        f"{perfil:<11} inserciones/s={tasa_insercion:10.1f}  "
+        f"lecturas por id/s={tasa_por_id:10.1f}  listados por usuario/s={tasa_listado:8.2f}"
+    )
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=100_000)
+    parser.add_argument("--inserciones", type=int, default=2_000)
+    parser.add_argument("--lecturas", type=int, default=5_000)
+    args = parser.parse_args()
+
+    for perfil in ("basico", "optimizado"):
+        ejecutar(perfil, args.tareas, args.inserciones, args.lecturas)
+
+
+if __name__ == "__main__":
+    main()
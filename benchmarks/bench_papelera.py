@@ -0,0 +1,126 @@
+"""
+Benchmark de la papelera: consultas con muchas tareas eliminadas y purga.
+
+Crea una base de datos temporal con un usuario dueño de ``--tareas`` tareas (100k por
+defecto) y mueve a la papelera, hace 40 días, la proporción ``--papelera`` de ellas que
+vence antes.
+Después mide:
+    - las consultas de la tabla principal (primera página por vencimiento y todas las
+      filas del usuario) con los índices parciales, que solo contienen las tareas
+      activas, y con los mismos índices completos, que obligan a leer y descartar las
+      filas de la papelera;
+    - ``purgar_papelera``: tareas borradas, páginas devueltas al sistema y tamaño del
+      archivo antes y después.
+
+Uso:
+    python -m benchmarks.bench_papelera --tareas 100000 --papelera 0.9
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.bench_cambios import cronometrar, poblar
+from src.logica.tarea_manager import TareaManager
+from src.modelo.database import crear_motor
+from src.modelo.tipos import epoch_actual, intervalo_a_epoch
+
+# Índices de la tabla principal que solo contienen las tareas activas.
+_INDICES_PARCIALES = ("ix_tarea_usuario_vencimiento", "ix_tarea_usuario_estado_vencimiento")
+
+
+def llenar_papelera(motor, total_tareas, proporcion):
+    """
+    Da a las tareas vencimientos consecutivos y mueve a la papelera, hace 40 días, la
+    proporción ``proporcion`` que vence antes, como ocurre al eliminar las antiguas.
+    """
+    hace_40_dias = epoch_actual() - intervalo_a_epoch(timedelta(days=40))
+    with motor.begin() as conexion:
+        conexion.execute(
+            text("UPDATE tarea SET fecha_vencimiento = fecha_creacion + id_tarea * 60000000, "
+                 "borrado_en = CASE WHEN id_tarea <= :eliminadas THEN :momento END "
+                 "WHERE id_usuario = 1"),
+            {"momento": hace_40_dias, "eliminadas": int(total_tareas * proporcion)}
+        )
+        return conexion.execute(text("SELECT count(*) FROM tarea WHERE borrado_en IS NOT NULL")
+                                ).scalar()
+
+
+def cambiar_indices(motor, parciales):
+    """Vuelve a crear los índices de la tabla principal, parciales o completos."""
+    with motor.begin() as conexion:
+        for nombre in _INDICES_PARCIALES:
+            ddl = conexion.execute(
+                text("SELECT sql FROM sqlite_master WHERE name = :nombre"), {"nombre": nombre}
+            ).scalar().split(" WHERE ")[0]
+            conexion.exec_driver_sql(f"DROP INDEX {nombre}")
+            conexion.exec_driver_sql(f"{ddl} WHERE borrado_en IS NULL" if parciales else ddl)
+        conexion.exec_driver_sql("ANALYZE")
+
+
+def medir_consultas(motor, repeticiones):
+    """Compara las consultas de tareas activas con índices parciales y completos."""
+    session = sessionmaker(bind=motor)()
+    manager = TareaManager(session)
+    print(f"{'índices':<10}{'página (ms)':>13}{'todas las filas (ms)':>22}{'filas':>8}")
+    for parciales in (False, True):
+        cambiar_indices(motor, parciales)
+        pagina = cronometrar(
+            lambda: manager.obtener_pagina_tareas(1, 50, "vencimiento"), repeticiones,
+            session.rollback
+        )
+        filas = cronometrar(lambda: manager.obtener_filas_por_usuario(1), repeticiones,
+                            session.rollback)
+        activas = len(manager.obtener_filas_por_usuario(1))
+        session.rollback()
+        print(f"{'parciales' if parciales else 'completos':<10}{pagina:>13.2f}{filas:>22.1f}"
+              f"{activas:>8}")
+    session.close()
+
+
+def tamano_archivo(motor, ruta):
+    """Tamaño del archivo en MB tras llevar a él el contenido del WAL."""
+    with motor.connect() as conexion:
+        conexion.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    return os.path.getsize(ruta) / 2 ** 20
+
+
+def medir_purga(motor, ruta):
+    """Mide la purga de las tareas caducadas y lo que encoge el archivo."""
+    antes = tamano_archivo(motor, ruta)
+    with sessionmaker(bind=motor)() as session:
+        inicio = time.perf_counter()
+        resultado = TareaManager(session).purgar_papelera()
+        segundos = time.perf_counter() - inicio
+    despues = tamano_archivo(motor, ruta)
+    print(f"\n{'borradas':>10}{'páginas liberadas':>19}{'segundos':>10}"
+          f"{'MB antes':>10}{'MB después':>12}")
+    print(f"{resultado.tareas:>10}{resultado.paginas:>19}{segundos:>10.2f}"
+          f"{antes:>10.1f}{despues:>12.1f}")
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=100_000)
+    parser.add_argument("--papelera", type=float, default=0.9)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "papelera.db")
+        motor = crear_motor(url=f"sqlite:///{ruta}")
+        poblar(motor, args.tareas)
+        eliminadas = llenar_papelera(motor, args.tareas, args.papelera)
+        print(f"{eliminadas} de {args.tareas} tareas en la papelera\n")
+        medir_consultas(motor, args.repeticiones)
+        medir_purga(motor, ruta)
+        motor.dispose()
+
+
+if __name__ == "__main__":
+    main()
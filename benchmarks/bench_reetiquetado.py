@@ -0,0 +1,96 @@
+"""
+Benchmark del reetiquetado masivo: añadir y quitar etiquetas en ``--tareas`` tareas.
+
+Crea una base de datos temporal por escenario con ``--tareas`` tareas (10k por
+defecto) que ya tienen una etiqueta, y mide cuánto tarda en añadirles dos etiquetas
+más y quitarles la original:
+    - antes: la colección ``etiquetas`` de cada tarea se carga, se modifica en Python
+      y se confirma tarea a tarea, como al editar desde la interfaz;
+    - ahora: ``TareaManager.asignar_etiquetas`` y ``quitar_etiquetas``, una sentencia
+      cada una.
+
+Uso:
+    python -m benchmarks.bench_reetiquetado --tareas 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from src.logica.tarea_manager import TareaManager
+from src.modelo.database import crear_motor
+from src.modelo.declarative_base import Base
+from src.modelo.modelo import Estado, Etiqueta, Tarea, Usuario, tarea_etiqueta
+
+ORIGINAL, NUEVAS = 1, (2, 3)
+
+
+def poblar(motor, total_tareas):
+    """Crea el esquema y ``total_tareas`` tareas con la etiqueta original."""
+    Base.metadata.create_all(motor)
+    ahora = datetime(2025, 1, 1)
+    with motor.begin() as conexion:
+        conexion.execute(insert(Estado), [{"id_estado": 1, "nombre_estado": "Pendiente"}])
+        conexion.execute(insert(Usuario), [
+            {"nombre_usuario": "usuario", "correo_electronico": "u@correo.com", "contrasena": "x"}
+        ])
+        conexion.execute(insert(Etiqueta), [
+            {"id_etiqueta": i, "nombre_etiqueta": f"Etiqueta {i}"} for i in (ORIGINAL, *NUEVAS)
+        ])
+        conexion.execute(insert(Tarea), [
+            {"id_tarea": i, "titulo": f"Tarea {i}", "fecha_creacion": ahora,
+             "id_estado": 1, "id_usuario": 1}
+            for i in range(1, total_tareas + 1)
+        ])
+        conexion.execute(insert(tarea_etiqueta), [
+            {"id_tarea": i, "id_etiqueta": ORIGINAL} for i in range(1, total_tareas + 1)
+        ])
+
+
+def reetiquetar_antes(session, ids):
+    """Edición tarea a tarea a través de la colección del ORM."""
+    nuevas = session.scalars(select(Etiqueta).where(Etiqueta.id_etiqueta.in_(NUEVAS))).all()
+    for id_tarea in ids:
+        tarea = session.get(Tarea, id_tarea)
+        tarea.etiquetas = [
+            e for e in tarea.etiquetas if e.id_etiqueta != ORIGINAL
+        ] + nuevas
+        session.commit()
+
+
+def reetiquetar_ahora(session, ids):
+    """Dos sentencias para toda la selección."""
+    manager = TareaManager(session)
+    manager.asignar_etiquetas(ids, NUEVAS)
+    manager.quitar_etiquetas(ids, [ORIGINAL])
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=10_000)
+    args = parser.parse_args()
+
+    ids = list(range(1, args.tareas + 1))
+    print(f"{'escenario':<10}{'tiempo (ms)':>14}{'asociaciones':>15}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for escenario, reetiquetar in (("antes", reetiquetar_antes),
+                                       ("ahora", reetiquetar_ahora)):
+            motor = crear_motor(url=f"sqlite:///{os.path.join(directorio, f'{escenario}.db')}")
+            poblar(motor, args.tareas)
+            session = sessionmaker(bind=motor)()
+            inicio = time.perf_counter()
+            reetiquetar(session, ids)
+            milisegundos = (time.perf_counter() - inicio) * 1000
+            asociaciones = session.scalar(select(func.count()).select_from(tarea_etiqueta))
+            print(f"{escenario:<10}{milisegundos:>14.0f}{asociaciones:>15}")
+            session.close()
+            motor.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark de la sincronización de dos copias grandes de la base de datos.
+
+Crea una base de datos temporal con ``--tareas`` tareas (1M por defecto), la copia a
+otro archivo y, en cada ronda, cambia ``--cambios`` tareas en cada copia (ediciones,
+una tarea nueva y un borrado) antes de sincronizarlas con ``Sincronizador``:
+    - primera: las copias no tienen aún los hashes de sus cubos y se calculan todos;
+      es lo que costaría comparar siempre las dos bases de datos enteras;
+    - siguientes: solo se recalculan los cubos de las tareas que aparecen en el diario
+      de cambios desde la sincronización anterior.
+Al final sincroniza de nuevo sin cambios y comprueba que las copias son iguales.
+
+Uso:
+    python -m benchmarks.bench_sincronizacion --tareas 1000000 --cambios 5 --rondas 3
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.bench_cambios import poblar
+from src.logica.sincronizador import Sincronizador
+from src.logica.tarea_manager import TareaManager
+from src.modelo.database import crear_motor
+
+_SQL_HUELLA = text("SELECT count(*), sum(length(titulo)), count(DISTINCT clave) FROM tarea")
+
+
+def cambiar(session, ids, cantidad, aleatorio, etiqueta):
+    """Edita ``cantidad`` tareas, crea una y borra otra."""
+    manager = TareaManager(session)
+    for id_tarea in aleatorio.sample(ids, cantidad):
+        manager.actualizar_tarea(id_tarea, titulo=f"{etiqueta} {id_tarea}")
+    manager.crear_tarea(f"Nueva en {etiqueta}", None, datetime(2025, 1, 1), None,
+                        id_estado=1, id_usuario=1)
+    borrada = manager.obtener_tarea_por_id(aleatorio.choice(ids))
+    if borrada is not None:
+        manager.eliminar_tarea(borrada)
+
+
+def medir(sincronizador):
+    """Sincroniza y devuelve el resultado y los segundos que tardó."""
+    inicio = time.perf_counter()
+    resultado = sincronizador.sincronizar()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=1_000_000)
+    parser.add_argument("--cambios", type=int, default=5)
+    parser.add_argument("--rondas", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = [os.path.join(directorio, nombre) for nombre in ("a.db", "b.db")]
+        motor = crear_motor(url=f"sqlite:///{rutas[0]}")
+        poblar(motor, args.tareas)
+        motor.dispose()
+        shutil.copy(*rutas)
+
+        motores = [crear_motor(url=f"sqlite:///{ruta}") for ruta in rutas]
+        sesiones = [sessionmaker(bind=motor)() for motor in motores]
+        sincronizador = Sincronizador(*sesiones)
+        aleatorio = random.Random(1)
+        ids = list(range(1, args.tareas + 1))
+
+        print(f"{'ronda':<8}{'cubos distintos':>16}{'hacia A':>9}{'hacia B':>9}"
+              f"{'conflictos':>12}{'segundos':>10}")
+        for ronda in range(args.rondas):
+            for session, etiqueta in zip(sesiones, ("A", "B")):
+                cambiar(session, ids, args.cambios, aleatorio, f"{etiqueta}{ronda}")
+            resultado, segundos = medir(sincronizador)
+            nombre = "primera" if ronda == 0 else str(ronda + 1)
+            print(f"{nombre:<8}{resultado.cubos_distintos:>16}{resultado.hacia_a:>9}"
+                  f"{resultado.hacia_b:>9}{len(resultado.conflictos):>12}{segundos:>10.2f}")
+        resultado, segundos = medir(sincronizador)
+        print(f"{'igual':<8}{resultado.cubos_distintos:>16}{resultado.hacia_a:>9}"
+              f"{resultado.hacia_b:>9}{len(resultado.conflictos):>12}{segundos:>10.2f}")
+
+        huellas = [session.execute(_SQL_HUELLA).one() for session in sesiones]
+        print(f"\ncopias iguales: {huellas[0] == huellas[1]} ({huellas[0][0]} tareas)")
+        for session in sesiones:
+            session.close()
+        for motor in motores:
+            motor.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,10 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, QDate
 
+from src.logica.estado_manager import EstadoManager
+from src.logica.etiqueta_manager import EtiquetaManager
 from src.logica.tarea_manager import TareaManager
 from src.modelo.database import Session
-from src.modelo.modelo import Estado, Etiqueta
 from src.interfaz.estilos import mostrar_mensaje
 
 
@@ -35,6 +36,9 @@ class VentanaAnadirTarea(QDialog):
         self.tarea_manager = TareaManager(self.session)
 
         self._configurar_ui()
+        # Termina la lectura de las etiquetas para no retener el bloqueo
+        # compartido de SQLite mientras el diálogo sigue abierto.
+        self.session.rollback()
 
     def _configurar_ui(self):
         """Configura la interfaz gráfica de la ventana."""
@@ -155,8 +159,8 @@ class VentanaAnadirTarea(QDialog):
             )
             return
 
-        estado_pendiente = self.session.query(Estado).filter_by(nombre_estado="Pendiente").first()
-        if not estado_pendiente:
+        id_pendiente = EstadoManager(self.session).obtener_id_por_nombre("Pendiente")
+        if id_pendiente is None:
             mostrar_mensaje(
                 self,
                 "Error",
@@ -178,7 +182,7 @@ class VentanaAnadirTarea(QDialog):
             fecha_creacion=fecha_creacion,
             fecha_vencimiento=fecha_vencimiento,
             id_usuario=id_usuario,
-            id_estado=estado_pendiente.id_estado,
+            id_estado=id_pendiente,
             etiquetas=etiquetas_seleccionadas
         )
 
@@ -199,9 +203,10 @@ class VentanaAnadirTarea(QDialog):
             )
 
     def cargar_etiquetas(self):
-        """Carga las etiquetas disponibles desde la base de datos."""
-        etiquetas = self.session.query(Etiqueta).all()
-        for etiqueta in etiquetas:
-            item = QListWidgetItem(etiqueta.nombre_etiqueta)
-            item.setData(Qt.UserRole, etiqueta)
+        """Carga las etiquetas disponibles desde el catálogo compartido."""
+        catalogo = EtiquetaManager(self.session).obtener_catalogo()
+        for id_etiqueta, (nombre, _color) in sorted(
+                catalogo.por_id.items(), key=lambda par: par[1][0]):
+            item = QListWidgetItem(nombre)
+            item.setData(Qt.UserRole, id_etiqueta)
             self.lista_etiquetas.addItem(item)
@@ -8,8 +8,9 @@ from PySide6.QtWidgets import (
     QPushButton, QListWidget, QListWidgetItem
 )
 
+from src.logica.concurrencia import Conflicto
+from src.logica.etiqueta_manager import EtiquetaManager
 from src.logica.tarea_manager import TareaManager
-from src.modelo.modelo import Etiqueta
 from src.interfaz.estilos import mostrar_mensaje
 
 
@@ -24,8 +25,14 @@ class VentanaEditarTarea(QDialog): # pylint: disable=too-many-instance-attribute
         self.session = session
         self.tarea_manager = TareaManager(self.session)
         self.tarea = tarea
+        self.id_tarea = tarea.id_tarea
+        # Versión que ve el usuario: si otra instancia guarda antes, no se sobrescribe.
+        self.version = tarea.version
 
         self._configurar_ui()
+        # Con el formulario relleno se termina la lectura, para no retener el bloqueo
+        # compartido de SQLite mientras el diálogo sigue abierto.
+        self.session.rollback()
 
     def _configurar_ui(self):
         """Configura todos los widgets de la interfaz para editar tarea."""
@@ -76,16 +83,17 @@ class VentanaEditarTarea(QDialog): # pylint: disable=too-many-instance-attribute
             }
         """)
 
-        # Cargar etiquetas
-        todas_las_etiquetas = self.session.query(Etiqueta).all()
+        # Cargar etiquetas desde el catálogo compartido
+        catalogo = EtiquetaManager(self.session).obtener_catalogo()
         etiquetas_asignadas = {et.id_etiqueta for et in self.tarea.etiquetas}
 
-        for etiqueta in todas_las_etiquetas:
-            item = QListWidgetItem(etiqueta.nombre_etiqueta)
-            item.setData(Qt.UserRole, etiqueta)
-            if etiqueta.id_etiqueta in etiquetas_asignadas:
-                item.setSelected(True)
+        for id_etiqueta, (nombre, _color) in sorted(
+                catalogo.por_id.items(), key=lambda par: par[1][0]):
+            item = QListWidgetItem(nombre)
+            item.setData(Qt.UserRole, id_etiqueta)
             self.etiquetas_lista.addItem(item)
+            if id_etiqueta in etiquetas_asignadas:
+                item.setSelected(True)
 
         layout.addWidget(label_titulo)
         layout.addWidget(self.titulo_input)
@@ -169,7 +177,8 @@ class VentanaEditarTarea(QDialog): # pylint: disable=too-many-instance-attribute
                 etiquetas_seleccionadas.append(item.data(Qt.UserRole))
 
         tarea_actualizada = self.tarea_manager.actualizar_tarea(
-            id_tarea=self.tarea.id_tarea,
+            id_tarea=self.id_tarea,
+            version=self.version,
             titulo=nuevo_titulo,
             descripcion=nueva_descripcion,
             fecha_vencimiento=nueva_fecha,
@@ -182,6 +191,14 @@ class VentanaEditarTarea(QDialog): # pylint: disable=too-many-instance-attribute
                 tipo="info"
             )
             self.accept()
+        elif isinstance(tarea_actualizada, Conflicto):
+            mostrar_mensaje(
+                self, "Tarea modificada",
+                "La tarea se modificó o eliminó desde otra ventana mientras la editabas. "
+                "Vuelve a abrirla para ver los cambios.",
+                tipo="advertencia"
+            )
+            self.reject()
         else:
             mostrar_mensaje(
                 self, "Error", "Ocurrió un error al actualizar la tarea.",
@@ -107,6 +107,9 @@ class VentanaLogin(QDialog):
             return
 
         usuario = self.usuario_manager.obtener_por_nombre(nombre_usuario)
+        # Cierra la lectura: el usuario conserva sus datos cargados y la sesión no
+        # retiene el bloqueo compartido de SQLite mientras la aplicación sigue abierta.
+        self.session.close()
 
         if usuario and usuario.contrasena == contrasena:
             mostrar_mensaje(
@@ -1,20 +1,36 @@
 """Ventana principal de la aplicación ToDoList."""
 # pylint: disable=duplicate-code
+from bisect import bisect_left
 from functools import partial
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton,
     QMenu, QMessageBox, QHBoxLayout, QTableWidget, QTableWidgetItem
 )
 from PySide6.QtGui import QAction
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 
 from src.interfaz.ventana_crear_cuenta import VentanaCrearCuenta
 from src.interfaz.ventana_anadir_tarea import VentanaAnadirTarea
 from src.interfaz.ventana_editar_tarea import VentanaEditarTarea
 from src.interfaz.ventana_cambiar_contrasena import VentanaCambiarContrasena
 from src.interfaz.estilos import mostrar_mensaje
-from src.modelo.database import Session
-from src.logica.tarea_manager import TareaManager
+from src.modelo.database import Session, obtener_motor
+from src.logica.concurrencia import Conflicto
+from src.logica.detector_cambios import DetectorCambios
+from src.logica.diario_manager import DiarioManager
+from src.logica.estado_manager import EstadoManager
+from src.logica.etiqueta_manager import EtiquetaManager
+from src.logica.purga import PurgaPeriodica
+from src.logica.tarea_manager import ANTIGUEDAD_PAPELERA, TareaManager
+
+# Cada cuánto se comprueba si otra instancia cambió la base de datos.
+INTERVALO_CAMBIOS_MS = 1000
+
+# Tablas cuyos cambios alteran lo que muestra la tabla de tareas.
+_TABLAS_MOSTRADAS = ("tarea", "tarea_etiqueta", "etiqueta", "estado")
+
+# Con más tareas cambiadas que esta proporción de las mostradas se recarga todo.
+PROPORCION_RECARGA = 0.5
 
 
 class VentanaPrincipal(QMainWindow):
@@ -29,11 +45,22 @@ class VentanaPrincipal(QMainWindow):
 
         self.session = Session()
         self.tarea_manager = TareaManager(self.session)
+        self.diario = DiarioManager(self.session)
+        self.diario.compactar()
+        self.detector = DetectorCambios(obtener_motor())
+        self.purga = PurgaPeriodica(obtener_motor())
+        self.purga.start()
+        self.secuencia = 0
+        self.ids_filas = []
 
         self._configurar_ui()
         self._crear_menu()
         self.cargar_tareas()
 
+        self.temporizador_cambios = QTimer(self)
+        self.temporizador_cambios.timeout.connect(self._comprobar_cambios)
+        self.temporizador_cambios.start(INTERVALO_CAMBIOS_MS)
+
     def _configurar_ui(self):
         """Configura la interfaz de usuario principal."""
         contenedor = QWidget()
@@ -125,66 +152,88 @@ class VentanaPrincipal(QMainWindow):
 
     def cargar_tareas(self):
         """Carga las tareas del usuario en la tabla."""
+        self.detector.sincronizar()
         self.tabla_tareas.setRowCount(0)
-        tareas = self.tarea_manager.obtener_tareas_por_usuario(self.usuario.id_usuario)
+        # La secuencia y las filas se leen en la misma transacción.
+        self.secuencia = self.diario.ultima_secuencia()
+        tareas = self.tarea_manager.obtener_filas_por_usuario(self.usuario.id_usuario)
+        self.ids_filas = [tarea.id_tarea for tarea in tareas]
+
+        self._terminar_lectura()
 
         for fila, tarea in enumerate(tareas):
             self.tabla_tareas.insertRow(fila)
-            completado = "✅" if tarea.estado.nombre_estado == "Completado" else "🕒"
-
-            self.tabla_tareas.setItem(fila, 0, QTableWidgetItem(completado))
-            self.tabla_tareas.setItem(fila, 1, QTableWidgetItem(tarea.titulo))
-            self.tabla_tareas.setItem(fila, 2, QTableWidgetItem(tarea.descripcion))
-            fecha = tarea.fecha_vencimiento.strftime("%d/%m/%Y")
-            self.tabla_tareas.setItem(fila, 3, QTableWidgetItem(fecha))
-
-            etiquetas_texto = ", ".join(
-                [et.nombre_etiqueta for et in tarea.etiquetas]
-            ) if tarea.etiquetas else "—"
-            item_etiquetas = QTableWidgetItem(etiquetas_texto)
-            item_etiquetas.setToolTip(etiquetas_texto)
-            self.tabla_tareas.setItem(fila, 4, item_etiquetas)
-
-            contenedor_botones = QWidget()
-            layout_botones = QHBoxLayout(contenedor_botones)
-            layout_botones.setContentsMargins(0, 0, 0, 0)
-            contenedor_botones.setStyleSheet("""
-                background-color: transparent;
-                border: none;
-                outline: none;
-                margin: 0px;
-                padding: 0px;
+            self._pintar_fila(fila, tarea)
+
+    def _terminar_lectura(self):
+        """
+        Termina la transacción de lectura de la sesión tras cargar datos en la tabla.
+
+        La sesión vive tanto como la ventana y, mientras una lectura sigue abierta,
+        SQLite retiene el bloqueo compartido: con el perfil básico las escrituras de
+        otros procesos fallan con "database is locked" y con WAL no se completan los
+        checkpoints. La tabla solo guarda filas ya leídas, así que se puede terminar.
+        """
+        self.session.rollback()
+
+    def _pintar_fila(self, fila, tarea):
+        """Rellena las celdas y los botones de una fila de la tabla."""
+        completado = "✅" if tarea.nombre_estado == "Completado" else "🕒"
+
+        self.tabla_tareas.setItem(fila, 0, QTableWidgetItem(completado))
+        self.tabla_tareas.setItem(fila, 1, QTableWidgetItem(tarea.titulo))
+        self.tabla_tareas.setItem(fila, 2, QTableWidgetItem(tarea.descripcion))
+        fecha = (
+            tarea.fecha_vencimiento.strftime("%d/%m/%Y")
+            if tarea.fecha_vencimiento else "—"
+        )
+        self.tabla_tareas.setItem(fila, 3, QTableWidgetItem(fecha))
+
+        etiquetas_texto = tarea.etiquetas or "—"
+        item_etiquetas = QTableWidgetItem(etiquetas_texto)
+        item_etiquetas.setToolTip(etiquetas_texto)
+        self.tabla_tareas.setItem(fila, 4, item_etiquetas)
+
+        contenedor_botones = QWidget()
+        layout_botones = QHBoxLayout(contenedor_botones)
+        layout_botones.setContentsMargins(0, 0, 0, 0)
+        contenedor_botones.setStyleSheet("""
+            background-color: transparent;
+            border: none;
+            outline: none;
+            margin: 0px;
+            padding: 0px;
+        """)
+
+        btn_editar = QPushButton("✏️")
+        btn_eliminar = QPushButton("🗑️")
+        btn_completar = QPushButton("✔️")
+
+        for btn in [btn_editar, btn_eliminar, btn_completar]:
+            btn.setFixedSize(28, 28)
+            btn.setStyleSheet("""
+                QPushButton {
+                    background-color: #76a9ed;
+                    border-radius: 6px;
+                    color: white;
+                    font-size: 12px;
+                }
             """)
 
-            btn_editar = QPushButton("✏️")
-            btn_eliminar = QPushButton("🗑️")
-            btn_completar = QPushButton("✔️")
-
-            for btn in [btn_editar, btn_eliminar, btn_completar]:
-                btn.setFixedSize(28, 28)
-                btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #76a9ed;
-                        border-radius: 6px;
-                        color: white;
-                        font-size: 12px;
-                    }
-                """)
-
-            btn_editar.clicked.connect(partial(self.editar_tarea, tarea))
-            btn_eliminar.clicked.connect(partial(self.eliminar_tarea, tarea))
-            btn_completar.clicked.connect(partial(self.marcar_completada, tarea))
-
-            layout_botones.addWidget(btn_editar)
-            layout_botones.addWidget(btn_eliminar)
-            layout_botones.addWidget(btn_completar)
-            self.tabla_tareas.setCellWidget(fila, 5, contenedor_botones)
+        btn_editar.clicked.connect(partial(self.editar_tarea, tarea))
+        btn_eliminar.clicked.connect(partial(self.eliminar_tarea, tarea))
+        btn_completar.clicked.connect(partial(self.marcar_completada, tarea))
+
+        layout_botones.addWidget(btn_editar)
+        layout_botones.addWidget(btn_eliminar)
+        layout_botones.addWidget(btn_completar)
+        self.tabla_tareas.setCellWidget(fila, 5, contenedor_botones)
 
     def abrir_ventana_anadir_tarea(self):
         """Abre la ventana para añadir una nueva tarea."""
         ventana = VentanaAnadirTarea(self)
         if ventana.exec():
-            self.cargar_tareas()
+            self.actualizar_tareas_cambiadas()
 
     def abrir_ventana_crear_cuenta(self):
         """Abre la ventana para crear una nueva cuenta."""
@@ -202,22 +251,30 @@ class VentanaPrincipal(QMainWindow):
         if respuesta == QMessageBox.Yes:
             self.close()
 
-    def editar_tarea(self, tarea=None):
+    def editar_tarea(self, fila=None):
         """Abre la ventana de edición de la tarea seleccionada."""
+        tarea = self.tarea_manager.obtener_tarea_por_id(fila.id_tarea, con_descripcion=True)
+        if tarea is None:
+            self._avisar_conflicto()
+            return
         ventana = VentanaEditarTarea(tarea, self.session, self)
         if ventana.exec():
-            self.cargar_tareas()
+            self.actualizar_tareas_cambiadas()
 
-    def marcar_completada(self, tarea=None):
+    def marcar_completada(self, fila=None):
         """Marca una tarea como completada si no lo está ya."""
-        if tarea and tarea.estado.nombre_estado != "Completado":
+        if fila and fila.nombre_estado != "Completado":
             try:
-                self.tarea_manager.marcar_completado(tarea)
+                tarea = self.tarea_manager.obtener_tarea_por_id(fila.id_tarea)
+                if tarea is None or isinstance(
+                        self.tarea_manager.marcar_completado(tarea), Conflicto):
+                    self._avisar_conflicto()
+                    return
                 mostrar_mensaje(
                     self, "¡Tarea completada!",
                     "La tarea ha sido marcada como completada.", tipo="info"
                 )
-                self.cargar_tareas()
+                self.actualizar_tareas_cambiadas()
             # pylint: disable=broad-exception-caught, line-too-long
             except Exception as e:
                 mostrar_mensaje(
@@ -230,8 +287,8 @@ class VentanaPrincipal(QMainWindow):
                 "La tarea ya estaba marcada como completada.", tipo="info"
             )
 
-    def eliminar_tarea(self, tarea):
-        """Elimina la tarea seleccionada tras confirmación del usuario."""
+    def eliminar_tarea(self, fila):
+        """Mueve la tarea seleccionada a la papelera tras confirmación del usuario."""
         respuesta = mostrar_mensaje(
             self, "Eliminar tarea",
             "¿Estás seguro de que deseas eliminar esta tarea?",
@@ -240,12 +297,25 @@ class VentanaPrincipal(QMainWindow):
         )
         if respuesta == QMessageBox.Yes:
             try:
-                self.tarea_manager.eliminar_tarea(tarea)
-                mostrar_mensaje(
+                tarea = self.tarea_manager.obtener_tarea_por_id(fila.id_tarea)
+                if tarea is None or isinstance(
+                        self.tarea_manager.eliminar_tarea(tarea), Conflicto):
+                    self._avisar_conflicto()
+                    return
+                self.actualizar_tareas_cambiadas()
+                deshacer = mostrar_mensaje(
                     self, "Tarea eliminada",
-                    "La tarea ha sido eliminada correctamente.", tipo="info"
+                    "La tarea se movió a la papelera y se borrará definitivamente dentro de "
+                    f"{ANTIGUEDAD_PAPELERA.days} días. ¿Deshacer?",
+                    tipo="pregunta",
+                    botones=QMessageBox.Yes | QMessageBox.No
                 )
-                self.cargar_tareas()
+                if deshacer == QMessageBox.Yes:
+                    # None si ya no está en la papelera; Conflicto si cambió después.
+                    if not self.tarea_manager.restaurar_tarea(fila.id_tarea):
+                        self._avisar_conflicto()
+                        return
+                    self.actualizar_tareas_cambiadas()
             # pylint: disable=broad-exception-caught, line-too-long
             except Exception as e:
                 mostrar_mensaje(
@@ -253,6 +323,81 @@ class VentanaPrincipal(QMainWindow):
                     f"No se pudo eliminar la tarea: {e}", tipo="error"
                 )
 
+    def _avisar_conflicto(self):
+        """Avisa de que otra instancia cambió la tarea y recarga la tabla."""
+        mostrar_mensaje(
+            self, "Tarea modificada",
+            "La tarea se modificó o eliminó desde otra ventana. Se muestran los datos actuales.",
+            tipo="advertencia"
+        )
+        self.actualizar_tareas_cambiadas()
+
+    def _comprobar_cambios(self):
+        """Actualiza la tabla si otra instancia cambió algo que se muestra en ella."""
+        cambios = self.detector.comprobar()
+        if not cambios:
+            return
+        if cambios.afecta("etiqueta"):
+            EtiquetaManager.invalidar_catalogo()
+        if cambios.afecta("estado"):
+            EstadoManager.invalidar_cache()
+        if any(cambios.afecta(tabla, self.usuario.id_usuario) for tabla in _TABLAS_MOSTRADAS):
+            # Termina la lectura en curso de la sesión para ver los datos confirmados.
+            self.session.rollback()
+            self.actualizar_tareas_cambiadas()
+
+    def actualizar_tareas_cambiadas(self):
+        """
+        Actualiza solo las filas de las tareas que cambiaron según el diario de cambios.
+
+        Recarga la tabla entera si el diario ya no cubre la última lectura, si cambió
+        el nombre de un estado o de una etiqueta (aparecen en muchas filas) o si
+        cambiaron tantas tareas que es más rápido leerlas todas.
+        """
+        self.detector.sincronizar()
+        secuencia = self.diario.ultima_secuencia()
+        entradas = self.diario.cambios_desde(self.secuencia, self.usuario.id_usuario)
+        if entradas is None or any(
+            entrada.entidad in ("estado", "etiqueta") and entrada.operacion != "I"
+            for entrada in entradas
+        ):
+            self.cargar_tareas()
+            return
+        ids = {entrada.id_entidad for entrada in entradas if entrada.entidad == "tarea"}
+        if len(ids) > PROPORCION_RECARGA * max(len(self.ids_filas), 1):
+            self.cargar_tareas()
+            return
+
+        filas = {
+            tarea.id_tarea: tarea
+            for tarea in self.tarea_manager.obtener_filas_por_usuario(
+                self.usuario.id_usuario, ids=ids
+            )
+        }
+        self._terminar_lectura()
+        self.secuencia = secuencia
+        for id_tarea in sorted(ids):
+            posicion = bisect_left(self.ids_filas, id_tarea)
+            mostrada = (posicion < len(self.ids_filas)
+                        and self.ids_filas[posicion] == id_tarea)
+            tarea = filas.get(id_tarea)
+            if tarea is None:
+                if mostrada:
+                    self.tabla_tareas.removeRow(posicion)
+                    del self.ids_filas[posicion]
+                continue
+            if not mostrada:
+                self.tabla_tareas.insertRow(posicion)
+                self.ids_filas.insert(posicion, id_tarea)
+            self._pintar_fila(posicion, tarea)
+
+    def closeEvent(self, event):  # pylint: disable=invalid-name
+        """Detiene la comprobación de cambios y la purga al cerrar la ventana."""
+        self.temporizador_cambios.stop()
+        self.detector.cerrar()
+        self.purga.detener()
+        super().closeEvent(event)
+
     def abrir_ventana_cambiar_contrasena(self):
         """Abre la ventana para cambiar la contraseña del usuario."""
         ventana = VentanaCambiarContrasena(usuario=self.usuario, parent=self)
@@ -0,0 +1,178 @@
+"""
+Fachada asyncio sobre los managers de lógica del sistema ToDoList.
+
+Los managers son síncronos y trabajan con una única sesión. Este módulo permite
+usarlos desde un bucle de eventos sin bloquearlo: cada llamada se ejecuta en un hilo
+dedicado a la base de datos con su propia sesión, que se abre y se cierra en esa
+misma llamada. Las lecturas se reparten entre varios hilos lectores y se ejecutan
+en paralelo, mientras que las escrituras pasan por un único hilo escritor y quedan
+serializadas, que es lo que SQLite admite.
+
+Los objetos devueltos quedan desvinculados de la sesión: sus columnas y las
+relaciones cargadas por el manager se pueden leer, pero no se cargan relaciones
+perezosas nuevas. Por eso las sesiones de la fachada cargan la descripción de las
+tareas, que los managers síncronos difieren, en la misma consulta que el resto de la
+tarea. Cuando uno de esos objetos se pasa de nuevo como argumento (por
+ejemplo a ``eliminar_tarea``), se vincula a la sesión de esa llamada; por eso un
+mismo objeto no debe usarse en dos llamadas simultáneas.
+
+Clases:
+    EjecutorBD: Hilos lectores y escritor con una sesión por llamada.
+    TareaManagerAsync, UsuarioManagerAsync, EtiquetaManagerAsync, EstadoManagerAsync:
+        Versiones asíncronas de los managers, con los mismos métodos.
+"""
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event, inspect as inspeccionar
+from sqlalchemy.orm import sessionmaker, undefer
+
+from src.logica.estado_manager import EstadoManager
+from src.logica.etiqueta_manager import EtiquetaManager
+from src.logica.tarea_manager import TareaManager
+from src.logica.usuario_manager import UsuarioManager
+from src.modelo.database import obtener_motor
+from src.modelo.modelo import Tarea
+
+# Métodos que solo leen y pueden ejecutarse en paralelo; el resto se serializa.
+PREFIJOS_LECTURA = ("obtener", "buscar")
+
+
+def _cargar_descripcion(estado):
+    """Carga la descripción diferida de las tareas que devuelve una consulta."""
+    if estado.is_select and not estado.is_column_load and any(
+            columna["expr"] is Tarea for columna in estado.statement.column_descriptions
+    ):
+        estado.statement = estado.statement.options(undefer(Tarea.descripcion))
+
+
+class EjecutorBD:
+    """
+    Ejecuta funciones de base de datos en hilos dedicados, con una sesión por llamada.
+
+    Args:
+        motor (Engine, optional): Motor de base de datos; por defecto el de la aplicación.
+        lectores (int): Número de hilos que atienden lecturas en paralelo.
+    """
+
+    def __init__(self, motor=None, lectores=4):
+        self._fabrica = sessionmaker(bind=motor or obtener_motor(), expire_on_commit=False)
+        event.listen(self._fabrica, "do_orm_execute", _cargar_descripcion)
+        self._lectura = ThreadPoolExecutor(lectores, thread_name_prefix="todolist-lectura")
+        self._escritura = ThreadPoolExecutor(1, thread_name_prefix="todolist-escritura")
+
+    async def ejecutar(self, funcion, escritura=False):
+        """
+        Ejecuta ``funcion(session)`` en un hilo de base de datos y espera su resultado.
+
+        Args:
+            funcion (Callable[[Session], Any]): Trabajo a realizar con la sesión.
+            escritura (bool): Si el trabajo modifica datos y debe serializarse.
+
+        Returns:
+            Any: Valor devuelto por la función.
+        """
+        bucle = asyncio.get_running_loop()
+        hilos = self._escritura if escritura else self._lectura
+        return await bucle.run_in_executor(hilos, self._en_sesion, funcion)
+
+    def _en_sesion(self, funcion):
+        with self._fabrica() as session:
+            return funcion(session)
+
+    def cerrar(self):
+        """Espera a que terminen las llamadas en curso y libera los hilos."""
+        self._lectura.shutdown(wait=True)
+        self._escritura.shutdown(wait=True)
+
+
+def _vincular(session, *grupos):
+    """Vincula a la sesión los objetos desvinculados recibidos como argumento."""
+    for grupo in grupos:
+        for valor in grupo:
+            estado = inspeccionar(valor, raiseerr=False)
+            if estado is not None and getattr(estado, "detached", False):
+                session.add(valor)
+
+
+class _FachadaAsincrona:
+    """
+    Base de las fachadas: genera una corrutina por cada método público del manager.
+
+    Las subclases indican el manager síncrono en ``_clase``. Los métodos de clase del
+    manager (cachés en memoria) se exponen tal cual, porque no usan la sesión.
+    """
+
+    _clase = None
+
+    def __init__(self, ejecutor):
+        self._ejecutor = ejecutor
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for nombre, miembro in inspect.getmembers(cls._clase):
+            if nombre.startswith("_") or nombre in cls.__dict__:
+                continue
+            if inspect.ismethod(miembro):
+                setattr(cls, nombre, staticmethod(miembro))
+            elif inspect.isfunction(miembro):
+                setattr(cls, nombre, cls._envolver(nombre, miembro))
+
+    @classmethod
+    def _envolver(cls, nombre, funcion):
+        escritura = not nombre.startswith(PREFIJOS_LECTURA)
+
+        async def metodo(self, *args, **kwargs):
+            def llamar(session):
+                _vincular(session, args, kwargs.values())
+                return getattr(self._clase(session), nombre)(*args, **kwargs)
+
+            return await self._ejecutor.ejecutar(llamar, escritura=escritura)
+
+        metodo.__name__ = nombre
+        metodo.__qualname__ = f"{cls.__name__}.{nombre}"
+        metodo.__doc__ = funcion.__doc__
+        return metodo
+
+
+class TareaManagerAsync(_FachadaAsincrona):
+    """Versión asíncrona de TareaManager."""
+
+    _clase = TareaManager
+
+    async def iterar_tareas(self, id_usuario=None, tamano=500, orden="id", filtro=None):
+        """
+        Recorre todas las tareas página a página sin bloquear el bucle de eventos.
+
+        Cada página se lee en una llamada independiente, con su propia sesión.
+
+        Yields:
+            Tarea: Cada tarea en el orden solicitado.
+        """
+        token = None
+        while True:
+            pagina = await self.obtener_pagina_tareas(id_usuario, tamano, orden, token, filtro)
+            for tarea in pagina.tareas:
+                yield tarea
+            token = pagina.token_siguiente
+            if token is None:
+                return
+
+
+class UsuarioManagerAsync(_FachadaAsincrona):
+    """Versión asíncrona de UsuarioManager."""
+
+    _clase = UsuarioManager
+
+
+class EtiquetaManagerAsync(_FachadaAsincrona):
+    """Versión asíncrona de EtiquetaManager."""
+
+    _clase = EtiquetaManager
+
+
+class EstadoManagerAsync(_FachadaAsincrona):
+    """Versión asíncrona de EstadoManager."""
+
+    _clase = EstadoManager
@@ -0,0 +1,185 @@
+"""
+Concurrencia entre varias instancias de la aplicación que comparten la base de datos.
+
+Dos copias de la aplicación, o la aplicación y un script de inicialización, pueden
+abrir el mismo archivo SQLite. Los managers se protegen de dos problemas:
+
+- Bloqueos: ``busy_timeout`` hace esperar a SQLite mientras otro proceso escribe, pero
+  hay casos en que devuelve ``database is locked`` al momento (por ejemplo, una
+  transacción que leyó una instantánea ya superada y ahora quiere escribir). Entonces
+  toda la operación se deshace y se repite con esperas exponenciales acotadas.
+- Actualizaciones perdidas: Usuario, Etiqueta y Tarea tienen una columna ``version``
+  y el ORM solo actualiza o borra la fila si conserva la versión leída. Si otra
+  instancia la cambió antes, el manager devuelve un ``Conflicto`` en lugar de
+  sobrescribirla.
+
+Clases:
+    Conflicto: Resultado de una escritura rechazada porque la fila cambió.
+
+Funciones:
+    es_bloqueo(error): Indica si un error se debe a que la base de datos está ocupada.
+    confirmar(session, operacion, intentos, espera_inicial, espera_maxima): Ejecuta una
+        operación y la confirma, repitiéndola si la base de datos está bloqueada.
+    escribir(session, cargar, cambiar, version): Modifica o elimina una fila si
+        conserva la versión esperada.
+    conflicto(session, clase, identificador, version_esperada): Construye el Conflicto
+        de una fila con su versión actual.
+"""
+import random
+import time
+from collections import namedtuple
+
+from sqlalchemy import inspect, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm.exc import ObjectDeletedError, StaleDataError
+
+INTENTOS = 6
+ESPERA_INICIAL = 0.02
+ESPERA_MAXIMA = 0.5
+
+_MENSAJES_BLOQUEO = ("database is locked", "database is busy", "database table is locked")
+
+
+class Conflicto(namedtuple(
+        "Conflicto", ["entidad", "id", "version_esperada", "version_actual"])):
+    """
+    Escritura rechazada porque otra instancia modificó o eliminó la fila antes.
+
+    Es falso en contextos booleanos, como el None que devuelven los managers ante
+    otros errores, así que el código que solo comprueba ``if resultado:`` lo trata
+    como un fallo.
+
+    Atributos:
+        entidad (str): Nombre de la clase del modelo ('Tarea', 'Usuario' o 'Etiqueta').
+        id (int): Identificador de la fila.
+        version_esperada (int): Versión con la que se intentó escribir, o None si la
+            fila se eliminó antes de leerla.
+        version_actual (int): Versión guardada ahora, o None si la fila ya no existe.
+    """
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+
+def es_bloqueo(error):
+    """
+    Indica si un error de SQLAlchemy se debe a que otra conexión tiene la base ocupada.
+
+    Args:
+        error (Exception): Error capturado.
+
+    Returns:
+        bool: True para ``database is locked`` y equivalentes.
+    """
+    return isinstance(error, OperationalError) and any(
+        mensaje in str(error.orig) for mensaje in _MENSAJES_BLOQUEO
+    )
+
+
+def confirmar(session, operacion, intentos=INTENTOS, espera_inicial=ESPERA_INICIAL,
+              espera_maxima=ESPERA_MAXIMA):
+    """
+    Ejecuta ``operacion`` y confirma la sesión, repitiendo ambas ante bloqueos.
+
+    Tras un bloqueo la sesión se revierte y la operación se vuelve a ejecutar entera,
+    así que debe leer de nuevo lo que necesite y aplicar sus cambios desde cero. Entre
+    intentos se espera ``espera_inicial * 2**n`` segundos como mucho ``espera_maxima``,
+    con una fracción aleatoria para que los procesos no vuelvan a coincidir.
+
+    Args:
+        session (Session): Sesión en la que trabaja la operación.
+        operacion (Callable[[], Any]): Aplica los cambios y devuelve el resultado.
+        intentos (int): Número máximo de ejecuciones.
+        espera_inicial (float): Espera en segundos tras el primer bloqueo.
+        espera_maxima (float): Tope de cada espera en segundos.
+
+    Returns:
+        Any: Lo que devuelva ``operacion`` en el intento que se confirma.
+
+    Raises:
+        OperationalError: Si la base de datos sigue bloqueada tras el último intento.
+    """
+    for intento in range(intentos):
+        try:
+            resultado = operacion()
+            session.commit()
+            return resultado
+        except OperationalError as e:
+            if not es_bloqueo(e) or intento == intentos - 1:
+                raise
+            session.rollback()
+            espera = min(espera_maxima, espera_inicial * 2 ** intento)
+            time.sleep(espera * random.uniform(0.5, 1.0))
+    raise ValueError("El número de intentos debe ser positivo.")
+
+
+def escribir(session, cargar, cambiar, version=None):
+    """
+    Carga una fila, aplica ``cambiar`` si conserva la versión esperada y confirma.
+
+    La versión esperada es ``version`` si se indica (la que vio el usuario antes de
+    editar) o, si no, la que tenga el objeto cargado en la sesión. El ORM vuelve a
+    comprobarla en el propio UPDATE o DELETE, así que tampoco se pierde una escritura
+    de otra instancia que llegue entre la lectura y la confirmación. Los bloqueos se
+    reintentan con ``confirmar``.
+
+    Args:
+        session (Session): Sesión en la que se trabaja.
+        cargar (Callable[[], Base | None]): Devuelve el objeto que se va a escribir.
+        cambiar (Callable[[Base], None]): Modifica el objeto o lo marca para borrarlo.
+        version (int, optional): Versión que debe tener la fila.
+
+    Returns:
+        Base: El objeto escrito.
+        Conflicto: Si la fila tenía otra versión, cambió antes de confirmar u otra
+            conexión la eliminó; en este último caso ``version_actual`` es None.
+        None: Si ``cargar`` no encuentra la fila.
+    """
+    leida = {}
+
+    def _operacion():
+        objeto = cargar()
+        if objeto is None:
+            return None
+        # Si se repite por un bloqueo, se sigue esperando la versión del primer intento.
+        # La clase y el ID se anotan antes de leer la versión, que falla con
+        # ObjectDeletedError si el objeto estaba expirado y otra conexión borró la fila.
+        if not leida:
+            leida.update(clase=type(objeto), id=inspect(objeto).identity[0], version=version)
+            if version is None:
+                leida["version"] = objeto.version
+        if objeto.version != leida["version"]:
+            raise StaleDataError(
+                f"{leida['clase'].__name__} {leida['id']} tiene la versión {objeto.version}, "
+                f"no la {leida['version']}."
+            )
+        cambiar(objeto)
+        return objeto
+
+    try:
+        return confirmar(session, _operacion)
+    except (StaleDataError, ObjectDeletedError):
+        if not leida:
+            raise
+        return conflicto(session, leida["clase"], leida["id"], leida["version"])
+
+
+def conflicto(session, clase, identificador, version_esperada):
+    """
+    Revierte la sesión y describe el conflicto con la versión guardada ahora.
+
+    Args:
+        session (Session): Sesión cuya escritura fue rechazada.
+        clase (type): Clase del modelo de la fila.
+        identificador (int): Clave primaria de la fila.
+        version_esperada (int): Versión con la que se intentó escribir.
+
+    Returns:
+        Conflicto: Conflicto con la versión actual, o None en ella si la fila se eliminó.
+    """
+    session.rollback()
+    clave = inspect(clase).primary_key[0]
+    actual = session.scalar(select(clase.version).where(clave == identificador))
+    session.commit()
+    return Conflicto(clase.__name__, identificador, version_esperada, actual)
@@ -0,0 +1,125 @@
+"""
+Detección barata de los cambios que hacen otras conexiones en la base de datos.
+
+``DetectorCambios`` mantiene una conexión propia y, en cada comprobación, lee
+``PRAGMA data_version``: SQLite solo cambia ese valor cuando otra conexión (de otra
+instancia de la aplicación, de un script o de otra sesión de este mismo proceso)
+confirma una escritura, y leerlo no toca ninguna tabla. Únicamente si cambió se leen
+los contadores de ``contador_cambios`` (véase ``src.modelo.contadores``), una fila
+por tabla y usuario, y se comparan con los anteriores para saber exactamente qué
+tablas y qué usuarios tienen datos nuevos.
+
+Una ventana puede así comprobar cada segundo sin coste apreciable y recargar solo
+cuando cambió algo que muestra. Con una base de datos en memoria todas las sesiones
+comparten la conexión del detector y no se detecta nada.
+
+Clases:
+    DetectorCambios: Compara el estado de la base de datos con el de la última
+        comprobación o sincronización.
+    Cambios: Tablas y usuarios con cambios desde la última comprobación.
+"""
+from collections import namedtuple
+
+from src.modelo.contadores import TABLA_CONTADORES, TODOS
+
+_SQL_CONTADORES = f"SELECT tabla, id_usuario, contador FROM {TABLA_CONTADORES}"
+
+
+class Cambios(namedtuple("Cambios", ["por_tabla"])):
+    """
+    Cambios detectados desde la última comprobación.
+
+    Es falso en contextos booleanos cuando no hay ninguno.
+
+    Atributos:
+        por_tabla (dict[str, frozenset[int]]): Usuarios afectados en cada tabla con
+            cambios; ``TODOS`` para las tablas comunes a todos los usuarios.
+    """
+    __slots__ = ()
+
+    def __bool__(self):
+        return bool(self.por_tabla)
+
+    @property
+    def tablas(self):
+        """frozenset[str]: Tablas con algún cambio."""
+        return frozenset(self.por_tabla)
+
+    def afecta(self, tabla, id_usuario=None):
+        """
+        Indica si cambió una tabla, opcionalmente para un usuario concreto.
+
+        Args:
+            tabla (str): Nombre de la tabla.
+            id_usuario (int, optional): Usuario que interesa; los cambios comunes a
+                todos los usuarios también le afectan.
+
+        Returns:
+            bool: True si hay cambios en la tabla que afectan al usuario.
+        """
+        usuarios = self.por_tabla.get(tabla, frozenset())
+        if id_usuario is None:
+            return bool(usuarios)
+        return id_usuario in usuarios or TODOS in usuarios
+
+
+class DetectorCambios:
+    """Detecta qué tablas y usuarios cambiaron desde la última comprobación."""
+
+    def __init__(self, motor):
+        """
+        Abre la conexión del detector y toma como referencia el estado actual.
+
+        Args:
+            motor (Engine): Motor de la base de datos que se vigila.
+        """
+        # Conexión DBAPI en modo autocommit: cada lectura es una transacción propia y
+        # no se retiene ninguna instantánea entre comprobaciones.
+        self._conexion = motor.raw_connection()
+        self._data_version = None
+        self._contadores = {}
+        self.comprobar()
+
+    def comprobar(self):
+        """
+        Devuelve los cambios confirmados por otras conexiones desde la última llamada.
+
+        Si ``PRAGMA data_version`` no cambió no se consulta ninguna tabla.
+
+        Returns:
+            Cambios: Tablas y usuarios afectados (vacío si no hubo cambios).
+        """
+        cursor = self._conexion.cursor()
+        try:
+            # Primero data_version: un cambio que llegue entre las dos lecturas
+            # volverá a cambiarlo y se verá en la siguiente comprobación.
+            data_version = cursor.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return Cambios({})
+            self._data_version = data_version
+            contadores = {
+                (tabla, id_usuario): contador
+                for tabla, id_usuario, contador in cursor.execute(_SQL_CONTADORES)
+            }
+        finally:
+            cursor.close()
+
+        por_tabla = {}
+        for (tabla, id_usuario), contador in contadores.items():
+            if self._contadores.get((tabla, id_usuario)) != contador:
+                por_tabla.setdefault(tabla, set()).add(id_usuario)
+        self._contadores = contadores
+        return Cambios({tabla: frozenset(usuarios) for tabla, usuarios in por_tabla.items()})
+
+    def sincronizar(self):
+        """
+        Da por vistos los cambios confirmados hasta ahora.
+
+        Se llama justo antes de recargar los datos, para que la siguiente comprobación
+        no informe de lo que ya se va a leer (incluidas las escrituras propias).
+        """
+        self.comprobar()
+
+    def cerrar(self):
+        """Devuelve la conexión del detector al pool."""
+        self._conexion.close()
@@ -0,0 +1,155 @@
+"""
+Módulo para leer y compactar el diario de cambios del sistema ToDoList.
+
+Contiene la clase DiarioManager. Un consumidor (la ventana principal, una
+exportación, una sincronización) carga los datos completos una vez junto con
+``ultima_secuencia()`` y, a partir de ahí, pide ``cambios_desde(secuencia)``: recibe
+solo las entidades que cambiaron y vuelve a leer esas filas, así que el coste de
+ponerse al día depende de los cambios y no del tamaño de las tablas.
+
+El diario solo crece; ``compactar`` borra las entradas más antiguas por lotes para
+acotar su tamaño. Si un consumidor se quedó tan atrás que el diario ya no conserva lo
+que necesita, ``cambios_desde`` devuelve None y debe volver a cargarlo todo.
+
+Clases:
+    DiarioManager: Lectura incremental y compactación del diario de cambios.
+    EntradaDiario: Último cambio de una entidad para un usuario.
+"""
+from collections import namedtuple
+from functools import partial
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.logica.concurrencia import confirmar
+from src.modelo.contadores import TODOS
+from src.modelo.diario import TABLA_DIARIO
+
+# Entradas que se conservan como máximo tras compactar.
+MAXIMO_ENTRADAS = 100_000
+TAMANO_LOTE_COMPACTACION = 5000
+
+EntradaDiario = namedtuple(
+    "EntradaDiario", ["secuencia", "entidad", "id_entidad", "operacion", "id_usuario"]
+)
+
+# Dos subconsultas: con min() y max() en la misma SQLite recorrería todo el diario.
+_SQL_LIMITES = text(
+    f"SELECT (SELECT min(secuencia) FROM {TABLA_DIARIO}), "
+    f"(SELECT max(secuencia) FROM {TABLA_DIARIO})"
+)
+# Con max() como único agregado, SQLite toma las demás columnas de la fila del máximo:
+# queda la última entrada de cada entidad y usuario.
+_SQL_CAMBIOS = (
+    "SELECT max(secuencia), entidad, id_entidad, operacion, id_usuario "
+    f"FROM {TABLA_DIARIO} WHERE secuencia > :secuencia {{usuario}}"
+    "GROUP BY entidad, id_entidad, id_usuario ORDER BY 1"
+)
+_SQL_CAMBIOS_TODOS = text(_SQL_CAMBIOS.format(usuario=""))
+_SQL_CAMBIOS_USUARIO = text(
+    _SQL_CAMBIOS.format(usuario="AND id_usuario IN (:id_usuario, :todos) ")
+).bindparams(todos=TODOS)
+_SQL_BORRAR_HASTA = text(f"DELETE FROM {TABLA_DIARIO} WHERE secuencia <= :hasta")
+
+
+class DiarioManager:
+    """Lee el diario de cambios de forma incremental y acota su tamaño."""
+
+    def __init__(self, session):
+        """
+        Inicializa el gestor con una sesión de base de datos.
+
+        Args:
+            session (Session): Sesión activa de SQLAlchemy.
+        """
+        self.session = session
+
+    def ultima_secuencia(self):
+        """
+        Devuelve la secuencia de la última entrada del diario.
+
+        Se lee en la misma transacción que los datos completos para que los cambios
+        posteriores a esa lectura sean exactamente los de ``cambios_desde``.
+
+        Returns:
+            int: Última secuencia, o 0 si el diario está vacío.
+        """
+        return self.session.execute(_SQL_LIMITES).one()[1] or 0
+
+    def cambios_desde(self, secuencia, id_usuario=None):
+        """
+        Obtiene lo que cambió después de ``secuencia``.
+
+        Devuelve una entrada por entidad y usuario con su última operación, en orden de
+        secuencia: basta con volver a leer las entidades con 'I' o 'U' y quitar las que
+        tienen 'D' para dejar al día una copia que estaba en ``secuencia``.
+
+        Args:
+            secuencia (int): Última secuencia que conoce el consumidor.
+            id_usuario (int, optional): Solo los cambios de ese usuario y los comunes a
+                todos (estados y etiquetas).
+
+        Returns:
+            list[EntradaDiario]: Cambios posteriores, del más antiguo al más reciente.
+            None: Si el diario ya no conserva todos los cambios posteriores a
+                ``secuencia`` (se compactó o la base de datos es otra) o si ocurre un
+                error; el consumidor debe cargar de nuevo los datos completos.
+        """
+        try:
+            primera, ultima = self.session.execute(_SQL_LIMITES).one()
+            if primera is None:
+                return [] if secuencia == 0 else None
+            if not primera - 1 <= secuencia <= ultima:
+                return None
+            if id_usuario is None:
+                filas = self.session.execute(_SQL_CAMBIOS_TODOS, {"secuencia": secuencia})
+            else:
+                filas = self.session.execute(
+                    _SQL_CAMBIOS_USUARIO, {"secuencia": secuencia, "id_usuario": id_usuario}
+                )
+            return [EntradaDiario._make(fila) for fila in filas]
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            print(f"Error inesperado al leer el diario de cambios: {e}")
+            return None
+
+    def compactar(self, maximo=MAXIMO_ENTRADAS, tamano_lote=TAMANO_LOTE_COMPACTACION):
+        """
+        Borra las entradas más antiguas hasta dejar como mucho ``maximo``.
+
+        Cada lote de ``tamano_lote`` entradas se borra en su propia transacción (un
+        DELETE por rango de la clave primaria), así que compactar un diario grande no
+        bloquea a los demás escritores; un lote que encuentra la base bloqueada se
+        repite.
+
+        Args:
+            maximo (int): Número de entradas recientes que se conservan.
+            tamano_lote (int): Número máximo de entradas borradas por transacción.
+
+        Returns:
+            int: Número de entradas borradas.
+            None: Si ocurre un error en la base de datos.
+
+        Raises:
+            ValueError: Si ``maximo`` o el tamaño de lote no son positivos.
+        """
+        if maximo < 1 or tamano_lote < 1:
+            raise ValueError("El máximo de entradas y el tamaño de lote deben ser positivos.")
+
+        def _borrar_lote(hasta):
+            return self.session.execute(_SQL_BORRAR_HASTA, {"hasta": hasta}).rowcount
+
+        borradas = 0
+        try:
+            primera, ultima = self.session.execute(_SQL_LIMITES).one()
+            self.session.commit()
+            if primera is None:
+                return 0
+            corte = ultima - maximo
+            for hasta in range(primera + tamano_lote - 1, corte + tamano_lote, tamano_lote):
+                borradas += confirmar(self.session, partial(_borrar_lote, min(hasta, corte)))
+            return borradas
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            print(f"Error inesperado al compactar el diario de cambios: {e}")
+            return None
@@ -5,16 +5,24 @@ Contiene la clase EstadoManager, que proporciona métodos para crear, obtener,
 actualizar y eliminar estados de las tareas. Los estados permiten identificar
 en qué etapa se encuentra una tarea (por ejemplo, Pendiente o Completado).
 
+Los estados forman un conjunto pequeño y casi inmutable, por lo que EstadoManager
+mantiene en memoria una caché nombre↔ID por base de datos, compartida por todas las
+instancias del proceso. Se carga una vez y se invalida en cada alta, cambio o baja.
+
 Clases:
     EstadoManager: Proporciona métodos CRUD para la entidad Estado.
 """
 # src/logica/estado_manager.py
 
+from sqlalchemy import bindparam, event, select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from src.modelo.modelo import Estado
 
 ESTADOS_VALIDOS = {"Pendiente", "Completado"}
 
+_SQL_ESTADOS = select(Estado)
+_SQL_POR_ID = select(Estado).where(Estado.id_estado == bindparam("id_estado"))
+
 class EstadoManager:
     """Clase para gestionar operaciones CRUD sobre los estados de las tareas.
 
@@ -22,6 +30,9 @@ class EstadoManager:
         session (Session): Sesión activa de SQLAlchemy para acceder a la base de datos.
     """
 
+    # Caché compartida: motor -> (dict nombre -> id, dict id -> nombre)
+    _cache = {}
+
     def __init__(self, session):
         """Inicializa el gestor con una sesión de base de datos.
 
@@ -53,6 +64,7 @@ class EstadoManager:
         try:
             self.session.add(estado)
             self.session.commit()
+            self.invalidar_cache()
             return estado
         except IntegrityError:
             self.session.rollback()
@@ -69,7 +81,7 @@ class EstadoManager:
         Returns:
             list[Estado]: Lista de objetos Estado.
         """
-        return self.session.query(Estado).all()
+        return self.session.scalars(_SQL_ESTADOS).all()
 
     def obtener_estado_por_id(self, id_estado):
         """Obtiene un estado específico por su ID.
@@ -80,7 +92,7 @@ class EstadoManager:
         Returns:
             Estado: Objeto Estado si se encuentra, None en caso contrario.
         """
-        return self.session.query(Estado).filter_by(id_estado=id_estado).first()
+        return self.session.scalars(_SQL_POR_ID, {"id_estado": id_estado}).first()
 
     def actualizar_estado(self, id_estado, nombre_estado=None, descripcion=None):
         """Actualiza los campos nombre y/o descripción de un estado existente.
@@ -107,6 +119,7 @@ class EstadoManager:
             estado.descripcion = descripcion
         try:
             self.session.commit()
+            self.invalidar_cache()
             return estado
         except IntegrityError:
             self.session.rollback()
@@ -134,8 +147,70 @@ class EstadoManager:
         try:
             self.session.delete(estado)
             self.session.commit()
+            self.invalidar_cache()
             return estado
         except SQLAlchemyError as e:
             self.session.rollback()
             print(f"Error inesperado al eliminar estado: {e}")
             return None
+
+    @classmethod
+    def invalidar_cache(cls):
+        """Descarta la caché nombre↔ID para que se recargue en el próximo uso."""
+        cls._cache.clear()
+
+    def _cargar_cache(self, recargar=False):
+        """Devuelve la caché de la base de datos de la sesión, cargándola si hace falta."""
+        motor = self.session.get_bind()
+        cache = EstadoManager._cache.get(motor)
+        if cache is None or recargar:
+            por_nombre, por_id = {}, {}
+            filas = self.session.execute(
+                select(Estado.id_estado, Estado.nombre_estado).order_by(Estado.id_estado)
+            )
+            for id_estado, nombre_estado in filas:
+                por_nombre.setdefault(nombre_estado, id_estado)
+                por_id[id_estado] = nombre_estado
+            cache = (por_nombre, por_id)
+            EstadoManager._cache[motor] = cache
+        return cache
+
+    def obtener_id_por_nombre(self, nombre_estado):
+        """Resuelve el ID de un estado por su nombre usando la caché.
+
+        Si el nombre no está en la caché se recarga una vez, por si el estado se
+        creó desde otra sesión o proceso.
+
+        Args:
+            nombre_estado (str): Nombre del estado, por ejemplo 'Pendiente'.
+
+        Returns:
+            int: ID del estado, o None si no existe.
+        """
+        por_nombre, _ = self._cargar_cache()
+        if nombre_estado not in por_nombre:
+            por_nombre, _ = self._cargar_cache(recargar=True)
+        return por_nombre.get(nombre_estado)
+
+    def obtener_nombre_por_id(self, id_estado):
+        """Resuelve el nombre de un estado por su ID usando la caché.
+
+        Args:
+            id_estado (int): Identificador del estado.
+
+        Returns:
+            str: Nombre del estado, o None si no existe.
+        """
+        _, por_id = self._cargar_cache()
+        if id_estado not in por_id:
+            _, por_id = self._cargar_cache(recargar=True)
+        return por_id.get(id_estado)
+
+
+def _invalidar_cache_por_ddl(*_args, **_kwargs):
+    """Descarta la caché cuando la tabla estado se crea o se elimina."""
+    EstadoManager.invalidar_cache()
+
+
+event.listen(Estado.__table__, "after_create", _invalidar_cache_por_ddl)
+event.listen(Estado.__table__, "after_drop", _invalidar_cache_por_ddl)
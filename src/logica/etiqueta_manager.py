@@ -5,16 +5,65 @@ Contiene la clase EtiquetaManager, que ofrece métodos para crear, obtener,
 actualizar y eliminar etiquetas. Las etiquetas permiten categorizar y organizar
 las tareas de forma personalizada.
 
+El catálogo de etiquetas (ID -> nombre y color, más la lista de nombres ordenada)
+se comparte entre todas las instancias del proceso como una instantánea versionada:
+crear, actualizar o eliminar una etiqueta incrementa la versión y los consumidores
+reutilizan su instantánea mientras la versión no cambie.
+
+Para importaciones, ``guardar_etiquetas`` crea o actualiza muchas etiquetas con una
+única sentencia ``INSERT ... ON CONFLICT`` y ``fusionar_etiquetas`` traslada las
+tareas de una etiqueta a otra sin duplicar asociaciones.
+
+Las escrituras se repiten si otra instancia de la aplicación tiene la base de datos
+bloqueada; actualizar o eliminar una etiqueta que otra instancia cambió antes
+devuelve un ``Conflicto``.
+
 Clases:
     EtiquetaManager: Proporciona métodos CRUD para la entidad Etiqueta.
+    CatalogoEtiquetas: Instantánea inmutable del catálogo de etiquetas.
 """
+import json
+from collections import namedtuple
 
+from sqlalchemy import bindparam, event, select, text
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from src.modelo.modelo import Etiqueta
+from src.logica.concurrencia import Conflicto, confirmar, escribir
+from src.modelo.modelo import Etiqueta, Tarea
+
+CatalogoEtiquetas = namedtuple("CatalogoEtiquetas", ["version", "por_id", "nombres"])
+
+_SQL_ETIQUETAS = select(Etiqueta)
+_SQL_POR_ID = select(Etiqueta).where(Etiqueta.id_etiqueta == bindparam("id_etiqueta"))
+
+# Las etiquetas llegan como un único parámetro JSON [[nombre, color], ...]. DO UPDATE
+# (en lugar de DO NOTHING) hace que RETURNING devuelva también las que ya existían;
+# el color (y con él la versión) solo cambia si se indicó uno distinto. El "WHERE
+# true" evita la ambigüedad de SQLite entre ON CONFLICT y una cláusula JOIN ... ON
+# del SELECT.
+_SQL_GUARDAR_ETIQUETAS = text("""
+    INSERT INTO etiqueta (nombre_etiqueta, color)
+    SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]')
+    FROM json_each(:etiquetas) WHERE true
+    ON CONFLICT (nombre_etiqueta) DO UPDATE
+    SET color = coalesce(excluded.color, etiqueta.color),
+        version = etiqueta.version
+                  + (coalesce(excluded.color, etiqueta.color) IS NOT etiqueta.color)
+    RETURNING nombre_etiqueta, id_etiqueta
+""")
+# OR IGNORE deja en su sitio los pares que ya existen con el destino; el borrado en
+# cascada de la etiqueta de origen los elimina después.
+_SQL_TRASLADAR_TAREAS = text("""
+    UPDATE OR IGNORE tarea_etiqueta SET id_etiqueta = :destino WHERE id_etiqueta = :origen
+""")
+_SQL_BORRAR_ETIQUETA = text("DELETE FROM etiqueta WHERE id_etiqueta = :origen")
 
 class EtiquetaManager:
     """Maneja las operaciones CRUD para la entidad Etiqueta."""
 
+    # Versión del catálogo y última instantánea por motor de base de datos.
+    _version_catalogo = 0
+    _catalogos = {}
+
     def __init__(self, session):
         """
         Inicializa el administrador de etiquetas con una sesión de base de datos.
@@ -41,8 +90,8 @@ class EtiquetaManager:
             color=color
         )
         try:
-            self.session.add(etiqueta)
-            self.session.commit()
+            confirmar(self.session, lambda: self.session.add(etiqueta))
+            self.invalidar_catalogo()
             return etiqueta
         except IntegrityError:
             self.session.rollback()
@@ -60,7 +109,7 @@ class EtiquetaManager:
         Returns:
             list[Etiqueta]: Lista con todas las instancias de Etiqueta.
         """
-        return self.session.query(Etiqueta).all()
+        return self.session.scalars(_SQL_ETIQUETAS).all()
 
     def obtener_etiqueta_por_id(self, id_etiqueta):
         """
@@ -72,9 +121,9 @@ class EtiquetaManager:
         Returns:
             Etiqueta: Instancia de Etiqueta si se encuentra, de lo contrario None.
         """
-        return self.session.query(Etiqueta).filter_by(id_etiqueta=id_etiqueta).first()
+        return self.session.scalars(_SQL_POR_ID, {"id_etiqueta": id_etiqueta}).first()
 
-    def actualizar_etiqueta(self, id_etiqueta, nombre_etiqueta=None, color=None):
+    def actualizar_etiqueta(self, id_etiqueta, nombre_etiqueta=None, color=None, version=None):
         """
         Actualiza los atributos de una etiqueta dada.
 
@@ -82,22 +131,23 @@ class EtiquetaManager:
             id_etiqueta (int): ID de la etiqueta a actualizar.
             nombre_etiqueta (str, optional): Nuevo nombre para la etiqueta.
             color (str, optional): Nuevo color para la etiqueta.
+            version (int, optional): Versión de la etiqueta que se leyó antes de editarla.
 
         Returns:
             Etiqueta: Instancia actualizada si la operación fue exitosa.
+            Conflicto: Si otra instancia modificó o eliminó la etiqueta antes.
             None: Si la etiqueta no se encuentra o ocurre un error.
         """
-        etiqueta = self.obtener_etiqueta_por_id(id_etiqueta)
-        if not etiqueta:
-            print("Etiqueta no encontrada para actualizar.")
-            return None
-        if nombre_etiqueta:
-            etiqueta.nombre_etiqueta = nombre_etiqueta
-        if color:
-            etiqueta.color = color
+        def _cambiar(etiqueta):
+            if nombre_etiqueta:
+                etiqueta.nombre_etiqueta = nombre_etiqueta
+            if color:
+                etiqueta.color = color
+
         try:
-            self.session.commit()
-            return etiqueta
+            etiqueta = escribir(
+                self.session, lambda: self.obtener_etiqueta_por_id(id_etiqueta), _cambiar, version
+            )
         except IntegrityError:
             self.session.rollback()
             print("Error: Datos duplicados o inválidos al actualizar etiqueta.")
@@ -106,27 +156,172 @@ class EtiquetaManager:
             self.session.rollback()
             print(f"Error inesperado al actualizar etiqueta: {e}")
             return None
+        return self._resultado(etiqueta, "actualizar")
 
-    def eliminar_etiqueta(self, id_etiqueta):
+    def eliminar_etiqueta(self, id_etiqueta, version=None):
         """
         Elimina una etiqueta por su ID.
 
         Args:
             id_etiqueta (int): ID de la etiqueta a eliminar.
+            version (int, optional): Versión de la etiqueta que se leyó antes de eliminarla.
 
         Returns:
             Etiqueta: Instancia eliminada si la operación fue exitosa.
+            Conflicto: Si otra instancia modificó o eliminó la etiqueta antes.
             None: Si la etiqueta no existe o ocurre un error.
         """
-        etiqueta = self.obtener_etiqueta_por_id(id_etiqueta)
-        if not etiqueta:
-            print("Etiqueta no encontrada para eliminar.")
-            return None
         try:
-            self.session.delete(etiqueta)
-            self.session.commit()
-            return etiqueta
+            etiqueta = escribir(
+                self.session, lambda: self.obtener_etiqueta_por_id(id_etiqueta),
+                self.session.delete, version
+            )
         except SQLAlchemyError as e:
             self.session.rollback()
             print(f"Error inesperado al eliminar etiqueta: {e}")
             return None
+        return self._resultado(etiqueta, "eliminar")
+
+    def _resultado(self, etiqueta, accion):
+        """Informa del resultado de una escritura e invalida el catálogo si cambió algo."""
+        if etiqueta is None:
+            print(f"Etiqueta no encontrada para {accion}.")
+        elif isinstance(etiqueta, Conflicto):
+            print("Conflicto: la etiqueta fue modificada o eliminada desde otra instancia.")
+        else:
+            self.invalidar_catalogo()
+        return etiqueta
+
+    def guardar_etiquetas(self, etiquetas):
+        """
+        Crea o actualiza muchas etiquetas con una única sentencia y devuelve sus IDs.
+
+        Las etiquetas cuyo nombre ya existe conservan su ID; su color solo se
+        actualiza si se indica uno nuevo.
+
+        Args:
+            etiquetas (dict[str, str | None] | Iterable[str]): Nombre -> color, o solo
+                los nombres.
+
+        Returns:
+            dict[str, int]: ID de cada nombre indicado.
+            None: Si ocurre un error en la base de datos.
+        """
+        if not isinstance(etiquetas, dict):
+            etiquetas = dict.fromkeys(etiquetas)
+        if not etiquetas:
+            return {}
+        parametros = {"etiquetas": json.dumps(list(etiquetas.items()))}
+        try:
+            filas = confirmar(
+                self.session, lambda: self.session.execute(_SQL_GUARDAR_ETIQUETAS, parametros).all()
+            )
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            print(f"Error inesperado al guardar etiquetas: {e}")
+            return None
+        self.invalidar_catalogo()
+        # Los objetos ya cargados podrían tener un color anterior.
+        for _, id_etiqueta in filas:
+            self._expirar(Etiqueta, id_etiqueta)
+        return dict(filas)
+
+    def fusionar_etiquetas(self, id_origen, id_destino):
+        """
+        Fusiona una etiqueta en otra: sus tareas pasan al destino y el origen se elimina.
+
+        Las asociaciones se reescriben con un único UPDATE; las tareas que ya tenían
+        las dos etiquetas quedan con una sola asociación.
+
+        Args:
+            id_origen (int): Etiqueta que desaparece.
+            id_destino (int): Etiqueta que recibe sus tareas.
+
+        Returns:
+            int: Número de tareas que pasaron a tener la etiqueta de destino.
+            None: Si alguna etiqueta no existe, son la misma u ocurre un error.
+        """
+        if id_origen == id_destino:
+            print("Error: No se puede fusionar una etiqueta consigo misma.")
+            return None
+        etiquetas = (self.obtener_etiqueta_por_id(id_origen),
+                     self.obtener_etiqueta_por_id(id_destino))
+        if None in etiquetas:
+            print("Etiqueta no encontrada para fusionar.")
+            return None
+        parametros = {"origen": id_origen, "destino": id_destino}
+        def _fusionar():
+            trasladadas = self.session.execute(_SQL_TRASLADAR_TAREAS, parametros).rowcount
+            self.session.execute(_SQL_BORRAR_ETIQUETA, parametros)
+            return trasladadas
+
+        try:
+            trasladadas = confirmar(self.session, _fusionar)
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            print(f"Error inesperado al fusionar etiquetas: {e}")
+            return None
+        self.invalidar_catalogo()
+        origen = self.session.identity_map.get(self.session.identity_key(Etiqueta, id_origen))
+        if origen is not None:
+            self.session.expunge(origen)
+        self._expirar(Etiqueta, id_destino, "tareas")
+        for objeto in list(self.session.identity_map.values()):
+            if isinstance(objeto, Tarea):
+                self.session.expire(objeto, ["etiquetas"])
+        return trasladadas
+
+    def _expirar(self, clase, identificador, *atributos):
+        """Expira un objeto de la sesión, si está cargado, para que se relea de la base."""
+        objeto = self.session.identity_map.get(self.session.identity_key(clase, identificador))
+        if objeto is not None:
+            self.session.expire(objeto, list(atributos) or None)
+
+    @classmethod
+    def invalidar_catalogo(cls):
+        """Incrementa la versión del catálogo y descarta las instantáneas cargadas."""
+        cls._version_catalogo += 1
+        cls._catalogos.clear()
+
+    @classmethod
+    def version_catalogo(cls):
+        """
+        Devuelve la versión actual del catálogo de etiquetas.
+
+        Returns:
+            int: Versión que cambia cada vez que se modifica alguna etiqueta.
+        """
+        return cls._version_catalogo
+
+    def obtener_catalogo(self):
+        """
+        Obtiene la instantánea del catálogo de etiquetas.
+
+        Solo consulta la base de datos la primera vez o cuando la versión ha
+        cambiado; en el resto de los casos devuelve la instantánea en memoria.
+
+        Returns:
+            CatalogoEtiquetas: Versión, diccionario ID -> (nombre, color) y lista
+            de nombres ordenada alfabéticamente.
+        """
+        motor = self.session.get_bind()
+        version = EtiquetaManager._version_catalogo
+        catalogo = EtiquetaManager._catalogos.get(motor)
+        if catalogo is None or catalogo.version != version:
+            filas = self.session.execute(
+                select(Etiqueta.id_etiqueta, Etiqueta.nombre_etiqueta, Etiqueta.color)
+            )
+            por_id = {id_etiqueta: (nombre, color) for id_etiqueta, nombre, color in filas}
+            nombres = sorted(nombre for nombre, _ in por_id.values())
+            catalogo = CatalogoEtiquetas(version, por_id, nombres)
+            EtiquetaManager._catalogos[motor] = catalogo
+        return catalogo
+
+
+def _invalidar_catalogo_por_ddl(*_args, **_kwargs):
+    """Invalida el catálogo cuando la tabla etiqueta se crea o se elimina."""
+    EtiquetaManager.invalidar_catalogo()
+
+
+event.listen(Etiqueta.__table__, "after_create", _invalidar_catalogo_por_ddl)
+event.listen(Etiqueta.__table__, "after_drop", _invalidar_catalogo_por_ddl)
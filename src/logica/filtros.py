@@ -0,0 +1,349 @@
+"""
+Módulo con los criterios de selección de tareas del sistema ToDoList.
+
+Contiene la clase FiltroTareas, que describe un conjunto de tareas (por IDs,
+usuario, estado, etiquetas o rangos de fechas) y lo traduce a condiciones SQL.
+El mismo filtro se usa en los listados y en las operaciones masivas de
+TareaManager, de modo que todas comparten el mismo vocabulario.
+
+Las combinaciones de etiquetas se escriben como expresiones booleanas, con objetos
+(``ConEtiqueta("Urgente") & ~ConEtiqueta("Casa")``) o con texto
+(``"Urgente AND Universidad AND NOT Casa"``), y se compilan a una única subconsulta
+sobre ``tarea_etiqueta``: las conjunciones de etiquetas se resuelven con GROUP BY y
+HAVING, las disyunciones con IN, y el resto con INTERSECT, UNION y EXCEPT. Todas
+recorren el índice ``(id_etiqueta, id_tarea)``.
+
+Clases:
+    FiltroTareas: Criterios combinables para seleccionar tareas.
+    ExpresionEtiquetas: Base de las expresiones booleanas sobre etiquetas.
+    ConEtiqueta: Tareas que tienen una etiqueta, indicada por ID o por nombre.
+
+Funciones:
+    interpretar_etiquetas(texto): Convierte un texto con AND, OR, NOT y paréntesis en
+        una expresión de etiquetas.
+"""
+import re
+
+from sqlalchemy import distinct, except_, func, intersect, select, union
+from sqlalchemy.sql.selectable import CompoundSelect
+
+from src.modelo.modelo import Etiqueta, Tarea, tarea_etiqueta
+
+
+class ExpresionEtiquetas:
+    """
+    Expresión booleana sobre las etiquetas de una tarea.
+
+    Se combina con ``&`` (AND), ``|`` (OR) y ``~`` (NOT). Las subclases implementan
+    ``consulta``, que devuelve una consulta SQL con los ``id_tarea`` seleccionados.
+    """
+
+    def __and__(self, otra):
+        return _Conjuncion(_partes(self, _Conjuncion) + _partes(otra, _Conjuncion))
+
+    def __or__(self, otra):
+        return _Disyuncion(_partes(self, _Disyuncion) + _partes(otra, _Disyuncion))
+
+    def __invert__(self):
+        return _Negacion(self)
+
+    def consulta(self):
+        """
+        Compila la expresión a una consulta con una única columna ``id_tarea``.
+
+        Returns:
+            Select | CompoundSelect: Consulta con los IDs de las tareas que cumplen
+            la expresión.
+        """
+        raise NotImplementedError
+
+    def condicion(self):
+        """
+        Traduce la expresión a una condición sobre ``tarea.id_tarea``.
+
+        Returns:
+            ColumnElement: Condición para usar en un ``where``.
+        """
+        return Tarea.id_tarea.in_(self.consulta())
+
+
+class ConEtiqueta(ExpresionEtiquetas):
+    """
+    Tareas que tienen una etiqueta.
+
+    Args:
+        etiqueta (int | str): ID de la etiqueta o su nombre.
+    """
+
+    def __init__(self, etiqueta):
+        self.etiqueta = etiqueta
+
+    def __eq__(self, otra):
+        return isinstance(otra, ConEtiqueta) and self.etiqueta == otra.etiqueta
+
+    def __hash__(self):
+        return hash(self.etiqueta)
+
+    def __repr__(self):
+        return f"ConEtiqueta({self.etiqueta!r})"
+
+    def referencia(self):
+        """Expresión SQL con el ID de la etiqueta (subconsulta si se indicó el nombre)."""
+        if isinstance(self.etiqueta, str):
+            return (
+                select(Etiqueta.id_etiqueta)
+                .where(Etiqueta.nombre_etiqueta == self.etiqueta)
+                .scalar_subquery()
+            )
+        return self.etiqueta
+
+    def consulta(self):
+        return select(tarea_etiqueta.c.id_tarea).where(
+            tarea_etiqueta.c.id_etiqueta == self.referencia()
+        )
+
+
+class _Conjuncion(ExpresionEtiquetas):
+    def __init__(self, partes):
+        self.partes = partes
+
+    def __repr__(self):
+        return "(" + " & ".join(map(repr, self.partes)) + ")"
+
+    def consulta(self):
+        etiquetas = list(dict.fromkeys(p for p in self.partes if isinstance(p, ConEtiqueta)))
+        negadas = [p.expresion for p in self.partes if isinstance(p, _Negacion)]
+        otras = [p for p in self.partes if not isinstance(p, (ConEtiqueta, _Negacion))]
+
+        positivas = [parte.consulta() for parte in otras]
+        if len(etiquetas) == 1:
+            positivas.insert(0, etiquetas[0].consulta())
+        elif etiquetas:
+            # Una fila por asociación: la tarea tiene todas si aparecen todas.
+            positivas.insert(0, (
+                select(tarea_etiqueta.c.id_tarea)
+                .where(tarea_etiqueta.c.id_etiqueta.in_([e.referencia() for e in etiquetas]))
+                .group_by(tarea_etiqueta.c.id_tarea)
+                .having(func.count(distinct(tarea_etiqueta.c.id_etiqueta)) == len(etiquetas))
+            ))
+        if not positivas:
+            positivas = [select(Tarea.id_tarea)]
+        consulta = _combinar(intersect, positivas)
+        if negadas:
+            consulta = except_(_simple(consulta), _simple(_Disyuncion(negadas).consulta()))
+        return consulta
+
+    def condicion(self):
+        if all(isinstance(parte, _Negacion) for parte in self.partes):
+            # Solo negaciones: NOT IN evita recorrer toda la tabla tarea con EXCEPT.
+            negadas = _Disyuncion([parte.expresion for parte in self.partes])
+            return Tarea.id_tarea.not_in(negadas.consulta())
+        return super().condicion()
+
+
+class _Disyuncion(ExpresionEtiquetas):
+    def __init__(self, partes):
+        self.partes = partes
+
+    def __repr__(self):
+        return "(" + " | ".join(map(repr, self.partes)) + ")"
+
+    def consulta(self):
+        etiquetas = list(dict.fromkeys(p for p in self.partes if isinstance(p, ConEtiqueta)))
+        consultas = [p.consulta() for p in self.partes if not isinstance(p, ConEtiqueta)]
+        if len(etiquetas) == 1:
+            consultas.insert(0, etiquetas[0].consulta())
+        elif etiquetas:
+            consultas.insert(0, select(tarea_etiqueta.c.id_tarea).where(
+                tarea_etiqueta.c.id_etiqueta.in_([e.referencia() for e in etiquetas])
+            ))
+        return _combinar(union, consultas)
+
+
+class _Negacion(ExpresionEtiquetas):
+    def __init__(self, expresion):
+        self.expresion = expresion
+
+    def __invert__(self):
+        return self.expresion
+
+    def __repr__(self):
+        return f"~{self.expresion!r}"
+
+    def consulta(self):
+        return _Conjuncion([self]).consulta()
+
+    def condicion(self):
+        return Tarea.id_tarea.not_in(self.expresion.consulta())
+
+
+def _partes(expresion, tipo):
+    """Aplana expresiones anidadas del mismo tipo: (a & b) & c -> [a, b, c]."""
+    return list(expresion.partes) if isinstance(expresion, tipo) else [expresion]
+
+
+def _simple(consulta):
+    """SQLite no admite consultas compuestas entre paréntesis: se envuelven en un FROM."""
+    if isinstance(consulta, CompoundSelect):
+        subconsulta = consulta.subquery()
+        return select(subconsulta.c.id_tarea)
+    return consulta
+
+
+def _combinar(operacion, consultas):
+    if len(consultas) == 1:
+        return consultas[0]
+    return operacion(*(_simple(consulta) for consulta in consultas))
+
+
+_TOKEN = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+_OPERADORES = {"AND", "OR", "NOT"}
+
+
+def interpretar_etiquetas(texto):
+    """
+    Convierte un texto en una expresión de etiquetas.
+
+    Admite nombres de etiqueta, ``AND``, ``OR``, ``NOT`` (en cualquier combinación de
+    mayúsculas) y paréntesis; NOT tiene más prioridad que AND, y AND más que OR. Los
+    nombres con espacios se escriben entre comillas dobles.
+
+    Args:
+        texto (str): Por ejemplo ``'Urgente AND (Universidad OR "Casa nueva") AND NOT Casa'``.
+
+    Returns:
+        ExpresionEtiquetas: Expresión equivalente, con las etiquetas indicadas por nombre.
+
+    Raises:
+        ValueError: Si el texto está vacío o mal formado.
+    """
+    tokens = []
+    posicion = 0
+    texto = texto.rstrip()
+    while posicion < len(texto):
+        encontrado = _TOKEN.match(texto, posicion)
+        if not encontrado:
+            raise ValueError(f"Expresión de etiquetas mal formada cerca de: {texto[posicion:]}")
+        abre, cierra, entre_comillas, palabra = encontrado.groups()
+        if abre or cierra:
+            tokens.append(abre or cierra)
+        elif entre_comillas is not None:
+            tokens.append(("nombre", entre_comillas))
+        elif palabra.upper() in _OPERADORES:
+            tokens.append(palabra.upper())
+        else:
+            tokens.append(("nombre", palabra))
+        posicion = encontrado.end()
+
+    expresion, resto = _disyuncion(tokens)
+    if resto:
+        raise ValueError(f"Expresión de etiquetas mal formada: sobra {resto[0]!r}.")
+    return expresion
+
+
+def _disyuncion(tokens):
+    expresion, tokens = _conjuncion(tokens)
+    while tokens and tokens[0] == "OR":
+        otra, tokens = _conjuncion(tokens[1:])
+        expresion = expresion | otra
+    return expresion, tokens
+
+
+def _conjuncion(tokens):
+    expresion, tokens = _factor(tokens)
+    while tokens and tokens[0] == "AND":
+        otra, tokens = _factor(tokens[1:])
+        expresion = expresion & otra
+    return expresion, tokens
+
+
+def _factor(tokens):
+    if not tokens:
+        raise ValueError("Expresión de etiquetas incompleta.")
+    token, resto = tokens[0], tokens[1:]
+    if token == "NOT":
+        expresion, resto = _factor(resto)
+        return ~expresion, resto
+    if token == "(":
+        expresion, resto = _disyuncion(resto)
+        if not resto or resto[0] != ")":
+            raise ValueError("Falta cerrar un paréntesis en la expresión de etiquetas.")
+        return expresion, resto[1:]
+    if isinstance(token, tuple):
+        return ConEtiqueta(token[1]), resto
+    raise ValueError(f"Expresión de etiquetas mal formada: {token!r} inesperado.")
+
+
+class FiltroTareas:  # pylint: disable=too-many-instance-attributes, too-few-public-methods
+    """
+    Criterios para seleccionar tareas. Todos los criterios indicados se combinan con AND.
+
+    Los rangos de fechas son semiabiertos: incluyen ``desde`` y excluyen ``hasta``.
+
+    Args:
+        ids (Iterable[int], optional): IDs concretos de tareas.
+        id_usuario (int, optional): Usuario propietario.
+        id_estado (int, optional): Estado de la tarea.
+        id_etiqueta (int, optional): Etiqueta que debe tener la tarea.
+        etiquetas (ExpresionEtiquetas | str, optional): Combinación booleana de
+            etiquetas; un texto se interpreta con ``interpretar_etiquetas``.
+        vencimiento_desde (datetime, optional): Vencimiento mínimo (incluido).
+        vencimiento_hasta (datetime, optional): Vencimiento máximo (excluido).
+        creacion_desde (datetime, optional): Fecha de creación mínima (incluida).
+        creacion_hasta (datetime, optional): Fecha de creación máxima (excluida).
+        todas (bool): Permite un filtro sin criterios que seleccione todas las tareas.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, ids=None, id_usuario=None, id_estado=None, id_etiqueta=None,
+                 vencimiento_desde=None, vencimiento_hasta=None,
+                 creacion_desde=None, creacion_hasta=None, todas=False, etiquetas=None):
+        self.ids = list(ids) if ids is not None else None
+        self.id_usuario = id_usuario
+        self.id_estado = id_estado
+        self.id_etiqueta = id_etiqueta
+        self.vencimiento_desde = vencimiento_desde
+        self.vencimiento_hasta = vencimiento_hasta
+        self.creacion_desde = creacion_desde
+        self.creacion_hasta = creacion_hasta
+        self.todas = todas
+        if isinstance(etiquetas, str):
+            etiquetas = interpretar_etiquetas(etiquetas)
+        self.etiquetas = etiquetas
+
+    def condiciones(self):
+        """
+        Traduce el filtro a condiciones sobre la tabla tarea.
+
+        Returns:
+            list: Expresiones de SQLAlchemy para usar en ``where(*condiciones)``.
+
+        Raises:
+            ValueError: Si el filtro no tiene criterios y no se indicó ``todas=True``.
+        """
+        condiciones = []
+        if self.ids is not None:
+            condiciones.append(Tarea.id_tarea.in_(self.ids))
+        if self.id_usuario is not None:
+            condiciones.append(Tarea.id_usuario == self.id_usuario)
+        if self.id_estado is not None:
+            condiciones.append(Tarea.id_estado == self.id_estado)
+        if self.id_etiqueta is not None:
+            condiciones.append(Tarea.id_tarea.in_(
+                select(tarea_etiqueta.c.id_tarea)
+                .where(tarea_etiqueta.c.id_etiqueta == self.id_etiqueta)
+            ))
+        if self.etiquetas is not None:
+            condiciones.append(self.etiquetas.condicion())
+        if self.vencimiento_desde is not None:
+            condiciones.append(Tarea.fecha_vencimiento >= self.vencimiento_desde)
+        if self.vencimiento_hasta is not None:
+            condiciones.append(Tarea.fecha_vencimiento < self.vencimiento_hasta)
+        if self.creacion_desde is not None:
+            condiciones.append(Tarea.fecha_creacion >= self.creacion_desde)
+        if self.creacion_hasta is not None:
+            condiciones.append(Tarea.fecha_creacion < self.creacion_hasta)
+
+        if not condiciones and not self.todas:
+            raise ValueError("El filtro no tiene criterios; use todas=True para todas las tareas.")
+        return condiciones
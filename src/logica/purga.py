@@ -0,0 +1,79 @@
+"""
+Purga periódica de la papelera de tareas en un hilo de fondo.
+
+Eliminar una tarea solo la mueve a la papelera (véase ``TareaManager.eliminar_tarea``);
+este módulo se encarga de borrarlas definitivamente cuando caducan sin ocupar el hilo
+de la interfaz. El hilo abre su propia sesión en cada pasada, llama a
+``TareaManager.purgar_papelera`` y espera ``intervalo`` segundos hasta la siguiente.
+Como la purga trabaja por lotes, cada uno en su transacción, detener el hilo (o
+cerrar la aplicación) a mitad de una pasada no deja nada a medias.
+
+Clases:
+    PurgaPeriodica: Hilo que purga la papelera al arrancar y después periódicamente.
+"""
+import threading
+
+from sqlalchemy.orm import sessionmaker
+
+from src.logica.tarea_manager import TareaManager
+from src.modelo.database import obtener_motor
+
+# Segundos entre dos pasadas de la purga.
+INTERVALO_PURGA = 3600
+
+
+class PurgaPeriodica(threading.Thread):
+    """
+    Hilo de fondo que purga la papelera al arrancar y cada ``intervalo`` segundos.
+
+    Args:
+        motor (Engine, optional): Motor de base de datos; por defecto el de la aplicación.
+        intervalo (float): Segundos entre el final de una pasada y el comienzo de la
+            siguiente.
+        **opciones: Argumentos de ``TareaManager.purgar_papelera`` (antiguedad,
+            tamano_lote, paginas_por_lote).
+
+    Attributes:
+        ultimo_resultado (ResultadoPurga | None): Resultado de la última pasada.
+    """
+
+    def __init__(self, motor=None, intervalo=INTERVALO_PURGA, **opciones):
+        super().__init__(name="todolist-purga", daemon=True)
+        self._fabrica = sessionmaker(bind=motor or obtener_motor())
+        self._intervalo = intervalo
+        self._opciones = opciones
+        self._detenido = threading.Event()
+        self._pasada = threading.Event()
+        self.ultimo_resultado = None
+
+    def run(self):
+        while not self._detenido.is_set():
+            with self._fabrica() as session:
+                self.ultimo_resultado = TareaManager(session).purgar_papelera(
+                    continuar=lambda: not self._detenido.is_set(), **self._opciones
+                )
+            self._pasada.set()
+            self._detenido.wait(self._intervalo)
+
+    def esperar_pasada(self, espera=None):
+        """
+        Espera a que termine la primera pasada de la purga.
+
+        Args:
+            espera (float, optional): Segundos máximos de espera; sin límite por defecto.
+
+        Returns:
+            bool: True si la pasada terminó.
+        """
+        return self._pasada.wait(espera)
+
+    def detener(self, espera=None):
+        """
+        Pide al hilo que termine después del lote en curso y espera a que lo haga.
+
+        Args:
+            espera (float, optional): Segundos máximos de espera; sin límite por defecto.
+        """
+        self._detenido.set()
+        if self.is_alive():
+            self.join(espera)
@@ -0,0 +1,545 @@
+"""
+Módulo para sincronizar las tareas de dos copias de la base de datos.
+
+Cada tarea se identifica en las dos copias por su ``clave`` global y se resume en un
+hash de su contenido (título, descripción, fechas, estado, usuario y etiquetas, estos
+tres por nombre, ya que los IDs de cada copia son independientes). Las tareas se
+reparten en ``CUBOS`` cubos según las primeras cifras de la clave; el hash de un cubo
+combina los hashes de sus tareas y las lápidas de las borradas, y los cubos forman las
+hojas de un árbol de Merkle de ``RAMAS`` ramas por nodo. Al sincronizar se comparan
+los árboles desde la raíz y solo se baja por los nodos distintos, así que solo se
+leen las tareas de los cubos que difieren.
+
+Los hashes de los cubos se guardan en cada base de datos junto con la secuencia del
+diario de cambios hasta la que están al día: la siguiente sincronización solo vuelve a
+calcular los cubos de las tareas que aparecen después en el diario. La primera vez, o
+si el diario ya no cubre esa secuencia o cambió un estado, una etiqueta o un usuario
+(su nombre forma parte del hash de muchas tareas), se calculan todos.
+
+Una tarea en la papelera cuenta como borrada: la representa su lápida, y si la
+lápida gana, la tarea pasa también a la papelera de la otra copia, de donde se puede
+restaurar hasta que la purga la borre.
+
+Los usuarios de las dos copias se emparejan por su correo electrónico, que no cambia
+al renombrarlos. Antes de comparar las tareas, un usuario con el mismo correo y
+distinto nombre en cada copia queda con un solo nombre: el de la fila con la versión
+más alta (cada cambio del usuario la aumenta) y, ante un empate, el mayor. En la otra
+copia se renombra conservando la hora de modificación de sus tareas, para que el
+cambio de nombre no haga ganar a versiones antiguas de ellas.
+
+Cuando una tarea difiere gana la versión más reciente (la última modificación de la
+fila, de sus etiquetas o de los nombres que incluye su hash; la fecha de creación en
+las tareas sin ``modificado_en``; o la hora del borrado de la lápida); ante un empate
+gana la de mayor hash, para que las dos copias decidan lo mismo. Si las dos copias la
+cambiaron después de la última sincronización entre ellas, además se anota un
+conflicto; si nunca se sincronizaron no hay con qué comparar y no se anota ninguno.
+La hora es la del reloj de cada equipo.
+
+Clases:
+    Sincronizador: Reconcilia las tareas de dos bases de datos.
+    ConflictoSincronizacion: Tarea modificada en las dos copias desde la última
+        sincronización.
+    ResultadoSincronizacion: Resumen de una sincronización.
+"""
+from collections import namedtuple
+from hashlib import blake2b
+
+from sqlalchemy import bindparam, column, delete, insert, select, table, text, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.logica.concurrencia import confirmar
+from src.logica.diario_manager import DiarioManager
+from src.modelo.busqueda import indexar_pendientes
+from src.modelo.modelo import Estado, Etiqueta, Usuario, tarea_etiqueta
+from src.modelo.sincronizacion import (
+    TABLA_CUBOS, TABLA_ESTADO, TABLA_MODIFICADAS, TABLA_LAPIDAS
+)
+from src.modelo.tipos import TextoComprimido, descomprimir_texto, epoch_actual
+
+# Cifras hexadecimales de la clave que eligen el cubo: 16**3 = 4096 hojas.
+CIFRAS_CUBO = 3
+CUBOS = 16 ** CIFRAS_CUBO
+RAMAS = 16
+TAMANO_LOTE_IDS = 500
+
+_DIGESTO = 16
+_MODULO = 2 ** (8 * _DIGESTO)
+
+ConflictoSincronizacion = namedtuple(
+    "ConflictoSincronizacion",
+    ["clave", "titulo_a", "titulo_b", "momento_a", "momento_b", "ganadora"]
+)
+ConflictoSincronizacion.__doc__ = """
+    Tarea que las dos copias cambiaron después de su última sincronización.
+
+    Atributos:
+        clave (str): Clave global de la tarea.
+        titulo_a (str | None): Título en la copia A, o None si allí está borrada.
+        titulo_b (str | None): Título en la copia B, o None si allí está borrada.
+        momento_a (int): Última modificación en A, en microsegundos UTC.
+        momento_b (int): Última modificación en B, en microsegundos UTC.
+        ganadora (str): 'a' o 'b', la copia cuya versión se conserva.
+"""
+
+ResultadoSincronizacion = namedtuple(
+    "ResultadoSincronizacion", ["cubos_distintos", "hacia_a", "hacia_b", "conflictos"]
+)
+ResultadoSincronizacion.__doc__ = """
+    Resumen de una sincronización.
+
+    Atributos:
+        cubos_distintos (int): Cubos cuyo hash difería entre las copias.
+        hacia_a (int): Tareas escritas o movidas a la papelera en la copia A.
+        hacia_b (int): Tareas escritas o movidas a la papelera en la copia B.
+        conflictos (list[ConflictoSincronizacion]): Tareas cambiadas en las dos copias.
+"""
+
+# Versión de una tarea en una copia. ``contenido`` es None en las lápidas.
+_Version = namedtuple("_Version", ["hash", "momento", "contenido"])
+# Columna con el nombre que identifica cada fila común a las dos copias.
+_NOMBRES = {Estado: "nombre_estado", Usuario: "nombre_usuario", Etiqueta: "nombre_etiqueta"}
+_Contenido = namedtuple("_Contenido", [
+    "titulo", "descripcion", "fecha_creacion", "fecha_vencimiento", "estado", "usuario",
+    "etiquetas"
+])
+
+# Sin rango, las tablas se recorren en el orden en que están guardadas: la suma de un
+# cubo no depende del orden de sus tareas. Las tareas de la papelera ya tienen su lápida.
+_RANGO = "t.clave >= :desde AND t.clave < :hasta"
+_SQL_TAREAS = (
+    "SELECT t.clave, t.titulo, t.descripcion, t.fecha_creacion, t.fecha_vencimiento, "
+    "t.id_estado, t.id_usuario, "
+    "(SELECT group_concat(te.id_etiqueta) FROM tarea_etiqueta te "
+    "WHERE te.id_tarea = t.id_tarea), "
+    "max(coalesce(t.modificado_en, t.fecha_creacion, 0), coalesce(m.modificado_en, 0)) "
+    f"FROM tarea t LEFT JOIN {TABLA_MODIFICADAS} m ON m.id_tarea = t.id_tarea "
+    "WHERE t.borrado_en IS NULL"
+)
+_SQL_LAPIDAS = f"SELECT t.clave, t.borrado_en FROM {TABLA_LAPIDAS} t"
+_SQL_TODAS = (text(_SQL_TAREAS), text(_SQL_LAPIDAS))
+_SQL_RANGO = (text(f"{_SQL_TAREAS} AND {_RANGO}"), text(f"{_SQL_LAPIDAS} WHERE {_RANGO}"))
+_SQL_CLAVES = tuple(
+    text(sql).bindparams(bindparam("ids", expanding=True)) for sql in (
+        "SELECT clave FROM tarea WHERE id_tarea IN :ids",
+        f"SELECT clave FROM {TABLA_LAPIDAS} WHERE id_tarea IN :ids",
+    )
+)
+_SQL_CUBOS = text(f"SELECT cubo, hash FROM {TABLA_CUBOS}")
+_SQL_GUARDAR_CUBO = text(
+    f"INSERT OR REPLACE INTO {TABLA_CUBOS} (cubo, hash) VALUES (:cubo, :hash)"
+)
+_SQL_LEER_ESTADO = text(f"SELECT valor FROM {TABLA_ESTADO} WHERE clave = :clave")
+_SQL_GUARDAR_ESTADO = text(
+    f"INSERT OR REPLACE INTO {TABLA_ESTADO} (clave, valor) VALUES (:clave, :valor)"
+)
+_SQL_ID_POR_CLAVE = text("SELECT id_tarea FROM tarea WHERE clave = :clave")
+_SQL_OLVIDAR_MODIFICADA = text(f"DELETE FROM {TABLA_MODIFICADAS} WHERE id_tarea = :id_tarea")
+_SQL_USUARIOS = text("SELECT correo_electronico, nombre_usuario, version FROM usuario")
+# El trigger de renombrado fecharía ahora todas las tareas del usuario: se guardan las
+# horas anteriores y se restauran después de renombrarlo.
+_TAREAS_DEL_CORREO = (
+    "SELECT t.id_tarea FROM tarea t JOIN usuario u USING (id_usuario) "
+    "WHERE u.correo_electronico = :correo"
+)
+_SQL_MODIFICADAS_DEL_CORREO = text(
+    f"SELECT id_tarea, modificado_en FROM {TABLA_MODIFICADAS} "
+    f"WHERE id_tarea IN ({_TAREAS_DEL_CORREO})"
+)
+_SQL_OLVIDAR_MODIFICADAS_DEL_CORREO = text(
+    f"DELETE FROM {TABLA_MODIFICADAS} WHERE id_tarea IN ({_TAREAS_DEL_CORREO})"
+)
+_SQL_RESTAURAR_MODIFICADA = text(
+    f"INSERT INTO {TABLA_MODIFICADAS} (id_tarea, modificado_en) "
+    "VALUES (:id_tarea, :modificado_en)"
+)
+_SQL_RENOMBRAR_USUARIO = text(
+    "UPDATE usuario SET nombre_usuario = :nombre, version = :version "
+    "WHERE correo_electronico = :correo"
+)
+# La tarea pasa a la papelera de esta copia con la hora del borrado en la otra; el
+# trigger anota su lápida. Si la tarea no existe aquí, la lápida se anota aparte.
+_SQL_A_PAPELERA = text(
+    "UPDATE tarea SET borrado_en = :momento WHERE clave = :clave AND borrado_en IS NULL"
+)
+_SQL_LAPIDA = text(
+    f"INSERT INTO {TABLA_LAPIDAS} (clave, borrado_en) VALUES (:clave, :momento) "
+    "ON CONFLICT (clave) DO UPDATE SET borrado_en = excluded.borrado_en"
+)
+
+# Vista de ``tarea`` sin los valores por defecto del modelo: la sincronización copia
+# el uid y la hora de modificación de la otra copia en lugar de generarlos.
+_TAREA = table(
+    "tarea", column("id_tarea"), column("uid"), column("titulo"),
+    column("descripcion", TextoComprimido), column("fecha_creacion"),
+    column("fecha_vencimiento"), column("id_estado"), column("id_usuario"),
+    column("version"), column("modificado_en"), column("borrado_en")
+)
+
+
+def _cubo(clave):
+    return int(clave[:CIFRAS_CUBO], 16)
+
+
+def _limites(desde, hasta):
+    """Rango de claves de los cubos ``desde`` a ``hasta - 1``."""
+    return {"desde": f"{desde:0{CIFRAS_CUBO}x}",
+            "hasta": f"{hasta:0{CIFRAS_CUBO}x}" if hasta < CUBOS else "g"}
+
+
+def _hash(datos):
+    return blake2b(repr(datos).encode(), digest_size=_DIGESTO).digest()
+
+
+def _niveles(hojas):
+    """Niveles del árbol de Merkle, de la raíz a las hojas."""
+    niveles = [hojas]
+    while len(niveles[-1]) > 1:
+        nivel = niveles[-1]
+        niveles.append([
+            blake2b(b"".join(nivel[i:i + RAMAS]), digest_size=_DIGESTO).digest()
+            for i in range(0, len(nivel), RAMAS)
+        ])
+    return niveles[::-1]
+
+
+def _cubos_distintos(niveles_a, niveles_b):
+    """Baja por los dos árboles solo a través de los nodos que difieren."""
+    if niveles_a[0] == niveles_b[0]:
+        return []
+    distintos = [0]
+    for nivel_a, nivel_b in zip(niveles_a[1:], niveles_b[1:]):
+        distintos = [
+            hijo for nodo in distintos for hijo in range(nodo * RAMAS, (nodo + 1) * RAMAS)
+            if nivel_a[hijo] != nivel_b[hijo]
+        ]
+    return distintos
+
+
+class _Copia:
+    """Una de las dos bases de datos: lee sus versiones y aplica las de la otra."""
+
+    def __init__(self, session):
+        self.session = session
+        self.diario = DiarioManager(session)
+        self.nombres = {}
+        self.ids = {}
+
+    def _cargar_nombres(self):
+        """Lee el nombre de cada estado, usuario y etiqueta de esta copia."""
+        for modelo, campo in _NOMBRES.items():
+            tabla = modelo.__table__
+            self.nombres[modelo] = dict(self.session.execute(
+                select(*tabla.primary_key.columns, tabla.c[campo])
+            ).all())
+            self.ids[modelo] = {nombre: id_ for id_, nombre in self.nombres[modelo].items()}
+
+    def _leer(self, cubo=None):
+        """
+        Genera clave, hash, momento y contenido de las tareas y lápidas de un cubo.
+
+        Sin ``cubo`` recorre todas. El hash cubre la clave y el contenido (None en las
+        lápidas), con los nombres de estado, usuario y etiquetas en lugar de sus IDs.
+        """
+        estados, usuarios, etiquetas = (self.nombres[m] for m in (Estado, Usuario, Etiqueta))
+        tareas, lapidas = _SQL_TODAS if cubo is None else _SQL_RANGO
+        limites = {} if cubo is None else _limites(cubo, cubo + 1)
+        for (clave, titulo, descripcion, creacion, vencimiento, id_estado, id_usuario,
+             ids_etiquetas, momento) in self.session.execute(tareas, limites):
+            contenido = (
+                titulo, descomprimir_texto(descripcion), creacion, vencimiento,
+                estados[id_estado], usuarios[id_usuario],
+                tuple(sorted(etiquetas[int(i)] for i in ids_etiquetas.split(",")))
+                if ids_etiquetas else ()
+            )
+            yield clave, _hash((clave, contenido)), momento, contenido
+        for clave, momento in self.session.execute(lapidas, limites):
+            yield clave, _hash((clave, None)), momento, None
+
+    def versiones(self, cubo):
+        """
+        Versiones de las tareas y lápidas de un cubo.
+
+        Returns:
+            dict[str, _Version]: Versión de cada clave.
+        """
+        return {
+            clave: _Version(hash_, momento, contenido and _Contenido._make(contenido))
+            for clave, hash_, momento, contenido in self._leer(cubo)
+        }
+
+    def _calcular_hojas(self, cubo=None):
+        """
+        Hash de un cubo, o de todos si no se indica ninguno, en una sola lectura.
+
+        Es la suma de los hashes de sus tareas y lápidas módulo 2**128: no depende del
+        orden, así que todos los cubos se calculan recorriendo las tablas una vez.
+        """
+        sumas = [0] * (CUBOS if cubo is None else 1)
+        desplazamiento = cubo or 0
+        for clave, hash_, _, _ in self._leer(cubo):
+            sumas[_cubo(clave) - desplazamiento] += int.from_bytes(hash_, "big")
+        return [(suma % _MODULO).to_bytes(_DIGESTO, "big") for suma in sumas]
+
+    def _cubos_sucios(self, entradas):
+        ids = sorted({e.id_entidad for e in entradas if e.entidad == "tarea"})
+        sucios = set()
+        for inicio in range(0, len(ids), TAMANO_LOTE_IDS):
+            lote = ids[inicio:inicio + TAMANO_LOTE_IDS]
+            for sentencia in _SQL_CLAVES:
+                sucios.update(_cubo(clave) for clave in
+                              self.session.execute(sentencia, {"ids": lote}).scalars())
+        return sucios
+
+    def hojas(self, sucios=()):
+        """
+        Pone al día los hashes guardados de los cubos y los devuelve.
+
+        Trabaja en la transacción de la sesión; quien llama la confirma o la revierte.
+
+        Args:
+            sucios (Iterable[int]): Cubos que hay que recalcular aunque el diario no
+                los mencione (por ejemplo, porque solo cambiaron sus lápidas).
+
+        Returns:
+            list[bytes]: Hash de cada cubo.
+        """
+        self._cargar_nombres()
+        secuencia = self.session.execute(_SQL_LEER_ESTADO, {"clave": "secuencia"}).scalar()
+        ultima = self.diario.ultima_secuencia()
+        guardados = dict(self.session.execute(_SQL_CUBOS).all())
+        entradas = None
+        if secuencia is not None and len(guardados) == CUBOS:
+            entradas = self.diario.cambios_desde(secuencia)
+        if entradas is None or any(e.entidad != "tarea" and e.operacion != "I"
+                                   for e in entradas):
+            guardados = dict(enumerate(self._calcular_hojas()))
+            recalculados = range(CUBOS)
+        else:
+            recalculados = sorted(self._cubos_sucios(entradas).union(sucios))
+            for cubo in recalculados:
+                guardados[cubo] = self._calcular_hojas(cubo)[0]
+        if recalculados:
+            self.session.execute(_SQL_GUARDAR_CUBO, [
+                {"cubo": cubo, "hash": guardados[cubo]} for cubo in recalculados
+            ])
+        self.session.execute(_SQL_GUARDAR_ESTADO, {"clave": "secuencia", "valor": ultima})
+        return [guardados[cubo] for cubo in range(CUBOS)]
+
+    def usuarios(self):
+        """Nombre y versión de cada usuario de esta copia, por correo electrónico."""
+        return {correo: (nombre, version) for correo, nombre, version
+                in self.session.execute(_SQL_USUARIOS)}
+
+    def renombrar_usuarios(self, renombrados):
+        """
+        Da a los usuarios el nombre y la versión que ganaron en la otra copia.
+
+        Args:
+            renombrados (dict[str, tuple[str, int]]): Nombre y versión por correo.
+        """
+        for correo, (nombre, version) in renombrados.items():
+            parametros = {"correo": correo}
+            horas = self.session.execute(_SQL_MODIFICADAS_DEL_CORREO, parametros).all()
+            self.session.execute(
+                _SQL_RENOMBRAR_USUARIO, {**parametros, "nombre": nombre, "version": version}
+            )
+            self.session.execute(_SQL_OLVIDAR_MODIFICADAS_DEL_CORREO, parametros)
+            if horas:
+                self.session.execute(_SQL_RESTAURAR_MODIFICADA, [
+                    {"id_tarea": id_tarea, "modificado_en": hora} for id_tarea, hora in horas
+                ])
+
+    def ultima_sincronizacion(self):
+        """Momento guardado de la última sincronización, o 0 si nunca se sincronizó."""
+        return self.session.execute(_SQL_LEER_ESTADO, {"clave": "ultima"}).scalar() or 0
+
+    def _id(self, modelo, nombre, origen):
+        """ID de la fila de ``modelo`` con ese nombre; la copia de ``origen`` si falta."""
+        if nombre in self.ids[modelo]:
+            return self.ids[modelo][nombre]
+        tabla = modelo.__table__
+        columnas = [c for c in tabla.columns if not c.primary_key and c.name != "version"]
+        fila = origen.session.execute(
+            select(*columnas).where(tabla.c[_NOMBRES[modelo]] == nombre)
+        ).one()
+        nuevo = self.session.execute(
+            insert(tabla).values(dict(fila._mapping)).returning(*tabla.primary_key.columns)
+        ).scalar_one()
+        self.nombres[modelo][nuevo] = nombre
+        self.ids[modelo][nombre] = nuevo
+        return nuevo
+
+    def aplicar(self, cambios, origen):
+        """
+        Escribe en esta copia las versiones ganadoras de la otra.
+
+        Args:
+            cambios (list[tuple[str, _Version]]): Clave y versión que debe quedar.
+            origen (_Copia): Copia de la que vienen las versiones, para copiar los
+                estados, usuarios y etiquetas que falten aquí.
+        """
+        for clave, version in cambios:
+            if version.contenido is None:
+                parametros = {"clave": clave, "momento": version.momento}
+                self.session.execute(_SQL_A_PAPELERA, parametros)
+                self.session.execute(_SQL_LAPIDA, parametros)
+                continue
+            contenido = version.contenido
+            valores = {
+                "titulo": contenido.titulo, "descripcion": contenido.descripcion,
+                "fecha_creacion": contenido.fecha_creacion,
+                "fecha_vencimiento": contenido.fecha_vencimiento,
+                "id_estado": self._id(Estado, contenido.estado, origen),
+                "id_usuario": self._id(Usuario, contenido.usuario, origen),
+            }
+            id_tarea = self.session.execute(_SQL_ID_POR_CLAVE, {"clave": clave}).scalar()
+            if id_tarea is None:
+                id_tarea = self.session.execute(
+                    insert(_TAREA).values(uid=clave, **valores).returning(_TAREA.c.id_tarea)
+                ).scalar_one()
+            else:
+                # Si estaba en la papelera de esta copia, sale de ella.
+                self.session.execute(
+                    update(_TAREA).where(_TAREA.c.id_tarea == id_tarea)
+                    .values(version=_TAREA.c.version + 1, borrado_en=None, **valores)
+                )
+                self.session.execute(
+                    delete(tarea_etiqueta).where(tarea_etiqueta.c.id_tarea == id_tarea)
+                )
+            etiquetas = [self._id(Etiqueta, nombre, origen) for nombre in contenido.etiquetas]
+            if etiquetas:
+                self.session.execute(insert(tarea_etiqueta), [
+                    {"id_tarea": id_tarea, "id_etiqueta": id_etiqueta} for id_etiqueta in etiquetas
+                ])
+            # La tarea queda con la hora de la versión ganadora, no con la de ahora.
+            self.session.execute(
+                update(_TAREA).where(_TAREA.c.id_tarea == id_tarea)
+                .values(modificado_en=version.momento)
+            )
+            self.session.execute(_SQL_OLVIDAR_MODIFICADA, {"id_tarea": id_tarea})
+
+    def terminar(self, cambios, origen, momento):
+        """Aplica los cambios, pone al día los cubos y anota la sincronización."""
+        # Si confirmar repite la operación, los IDs creados en el intento anterior ya no existen.
+        self._cargar_nombres()
+        self.aplicar(cambios, origen)
+        hojas = self.hojas({_cubo(clave) for clave, _ in cambios})
+        self.session.execute(_SQL_GUARDAR_ESTADO, {"clave": "ultima", "valor": momento})
+        indexar_pendientes(self.session.connection())
+        return hojas
+
+
+class Sincronizador:
+    """Reconcilia las tareas de dos copias de la base de datos."""
+
+    def __init__(self, session_a, session_b):
+        """
+        Inicializa el sincronizador con una sesión de cada base de datos.
+
+        Args:
+            session_a (Session): Sesión activa de SQLAlchemy sobre la copia A.
+            session_b (Session): Sesión activa de SQLAlchemy sobre la copia B.
+        """
+        self.a = _Copia(session_a)
+        self.b = _Copia(session_b)
+
+    def _usuarios_renombrados(self):
+        """
+        Usuarios con el mismo correo y distinto nombre, con el nombre que gana.
+
+        Returns:
+            tuple[dict, dict]: Nombre y versión por correo que hay que aplicar en la
+            copia A y en la copia B.
+        """
+        usuarios_a, usuarios_b = self.a.usuarios(), self.b.usuarios()
+        hacia_a, hacia_b = {}, {}
+        for correo in usuarios_a.keys() & usuarios_b.keys():
+            (nombre_a, version_a), (nombre_b, version_b) = usuarios_a[correo], usuarios_b[correo]
+            if nombre_a == nombre_b:
+                continue
+            if (version_a, nombre_a) > (version_b, nombre_b):
+                hacia_b[correo] = (nombre_a, version_a)
+            else:
+                hacia_a[correo] = (nombre_b, version_b)
+        return hacia_a, hacia_b
+
+    def _comparar(self, cubos, ultima):
+        """Decide la versión ganadora de cada tarea distinta de los cubos indicados."""
+        hacia_a, hacia_b, conflictos = [], [], []
+        for cubo in cubos:
+            versiones_a = self.a.versiones(cubo)
+            versiones_b = self.b.versiones(cubo)
+            for clave in sorted(versiones_a.keys() | versiones_b.keys()):
+                version_a, version_b = versiones_a.get(clave), versiones_b.get(clave)
+                if version_b is None:
+                    hacia_b.append((clave, version_a))
+                    continue
+                if version_a is None:
+                    hacia_a.append((clave, version_b))
+                    continue
+                if version_a.hash == version_b.hash:
+                    continue
+                gana_a = (version_a.momento, version_a.hash) > (version_b.momento, version_b.hash)
+                if gana_a:
+                    hacia_b.append((clave, version_a))
+                else:
+                    hacia_a.append((clave, version_b))
+                if ultima and min(version_a.momento, version_b.momento) > ultima:
+                    conflictos.append(ConflictoSincronizacion(
+                        clave,
+                        version_a.contenido and version_a.contenido.titulo,
+                        version_b.contenido and version_b.contenido.titulo,
+                        version_a.momento, version_b.momento, "a" if gana_a else "b"
+                    ))
+        return hacia_a, hacia_b, conflictos
+
+    def sincronizar(self, simular=False):
+        """
+        Deja las dos copias con las mismas tareas.
+
+        Primero iguala los nombres de los usuarios que comparten correo y pone al día
+        los hashes de los cubos de cada copia, después compara los
+        árboles y decide la versión ganadora de cada tarea de los cubos distintos, y
+        por último escribe en cada copia lo que le falta, en una transacción por copia
+        que también guarda sus cubos al día.
+
+        Args:
+            simular (bool): Si es True solo calcula lo que haría; no escribe nada en
+                ninguna de las dos bases de datos.
+
+        Returns:
+            ResultadoSincronizacion: Cubos distintos, tareas escritas en cada copia y
+            conflictos.
+            None: Si ocurre un error en alguna de las bases de datos; ninguna de las
+            dos copias queda a medias, aunque una puede haberse escrito y la otra no.
+        """
+        momento = epoch_actual()
+        copias = (self.a, self.b)
+        try:
+            for copia, renombrados in zip(copias, self._usuarios_renombrados()):
+                if not renombrados:
+                    continue
+                if simular:
+                    copia.renombrar_usuarios(renombrados)
+                else:
+                    confirmar(copia.session, lambda c=copia, r=renombrados:
+                              c.renombrar_usuarios(r))
+            if simular:
+                arboles = [_niveles(copia.hojas()) for copia in copias]
+            else:
+                arboles = [_niveles(confirmar(copia.session, copia.hojas)) for copia in copias]
+            ultima = min(copia.ultima_sincronizacion() for copia in copias)
+            cubos = _cubos_distintos(*arboles)
+            hacia_a, hacia_b, conflictos = self._comparar(cubos, ultima)
+            if simular:
+                for copia in copias:
+                    copia.session.rollback()
+            else:
+                confirmar(self.a.session, lambda: self.a.terminar(hacia_a, self.b, momento))
+                confirmar(self.b.session, lambda: self.b.terminar(hacia_b, self.a, momento))
+            return ResultadoSincronizacion(len(cubos), len(hacia_a), len(hacia_b), conflictos)
+        except SQLAlchemyError as e:
+            for copia in copias:
+                copia.session.rollback()
+            print(f"Error inesperado al sincronizar las bases de datos: {e}")
+            return None
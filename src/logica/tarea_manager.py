@@ -5,14 +5,211 @@ Contiene la clase TareaManager, que ofrece métodos para crear, obtener,
 actualizar y eliminar tareas. Además, permite relacionar tareas con usuarios,
 estados y etiquetas.
 
+Las escrituras se confirman con ``src.logica.concurrencia``: se repiten si otra
+instancia de la aplicación tiene la base de datos bloqueada, y las de una sola tarea
+devuelven un ``Conflicto`` si la tarea cambió desde que se leyó.
+
+Eliminar una tarea la mueve a la papelera, de donde se puede restaurar; ninguna
+consulta la devuelve salvo ``obtener_papelera``. ``purgar_papelera`` borra
+definitivamente, por lotes, las que llevan en ella más de ``ANTIGUEDAD_PAPELERA`` y
+devuelve al sistema las páginas que quedan libres en el archivo.
+
 Clases:
     TareaManager: Proporciona métodos CRUD para la entidad Tarea.
+    PaginaTareas: Página de tareas con el token para continuar el recorrido.
+    FilaTarea: Fila compacta de solo lectura para la tabla principal.
+    ResultadoLote: IDs generados y errores por fila de una creación en lote.
+    ResultadoBusqueda: Coincidencia de la búsqueda de texto completo.
+    ResultadoBorrado: Tareas y asociaciones eliminadas por un borrado masivo.
+    ResultadoPurga: Tareas borradas definitivamente y páginas devueltas por una purga.
 """
+import base64
+import binascii
+import json
+from collections import namedtuple
+from datetime import datetime, timedelta
+from functools import partial
 
+from sqlalchemy import (
+    Integer, Text, and_, bindparam, delete, func, insert, literal, or_, select, text, update
+)
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload, undefer
+
+from src.logica.concurrencia import Conflicto, confirmar, escribir
+from src.logica.estado_manager import EstadoManager
+from src.logica.filtros import FiltroTareas
+from src.modelo.busqueda import (
+    TABLA_FTS, TABLA_FTS_COMPRIMIDA, indexar_pendientes, preparar_consulta
+)
+from src.modelo.modelo import (
+    OPCION_CON_BORRADAS, Tarea, Estado, Etiqueta, solo_activas, tarea_etiqueta
+)
+from src.modelo.tipos import epoch_actual, intervalo_a_epoch
+
+PaginaTareas = namedtuple("PaginaTareas", ["tareas", "token_siguiente"])
+
+# Proyección de solo lectura: no pasa por el mapa de identidad del ORM.
+FilaTarea = namedtuple(
+    "FilaTarea",
+    ["id_tarea", "titulo", "descripcion", "fecha_vencimiento", "nombre_estado", "etiquetas"]
+)
+
+LARGO_DESCRIPCION_FILA = 80
+
+ResultadoLote = namedtuple("ResultadoLote", ["ids", "errores"])
+ErrorFila = namedtuple("ErrorFila", ["indice", "mensaje"])
+
+ResultadoBusqueda = namedtuple(
+    "ResultadoBusqueda", ["id_tarea", "titulo", "fragmento", "puntuacion"]
+)
+
+ResultadoBorrado = namedtuple("ResultadoBorrado", ["tareas", "asociaciones"])
+
+ResultadoPurga = namedtuple("ResultadoPurga", ["tareas", "paginas"])
+
+# bm25 da más peso a las coincidencias en el título que en la descripción. Las tareas
+# con la descripción comprimida tienen su propio índice; cada uno puntúa con sus propias
+# estadísticas y los resultados de ambos se mezclan por puntuación.
+_SQL_BUSQUEDA = text(" UNION ALL ".join(f"""
+    SELECT tarea.id_tarea, tarea.titulo,
+           snippet({indice}, 1, '[', ']', '…', 12) AS fragmento,
+           bm25({indice}, 4.0, 1.0, 0.0) AS puntuacion
+    FROM {indice}
+    JOIN tarea ON tarea.id_tarea = {indice}.rowid
+    WHERE {indice} MATCH :consulta AND tarea.borrado_en IS NULL
+""" for indice in (TABLA_FTS, TABLA_FTS_COMPRIMIDA)) + """
+    ORDER BY puntuacion
+    LIMIT :limite
+""")
+
+# Las listas de IDs viajan como un único parámetro JSON: una sola sentencia sea cual sea
+# su tamaño. Solo se asocian tareas y etiquetas que existen.
+_SQL_ASIGNAR_ETIQUETAS = text("""
+    INSERT OR IGNORE INTO tarea_etiqueta (id_tarea, id_etiqueta)
+    SELECT tarea.id_tarea, etiqueta.id_etiqueta
+    FROM json_each(:tareas) AS t
+    JOIN tarea ON tarea.id_tarea = t.value AND tarea.borrado_en IS NULL
+    CROSS JOIN json_each(:etiquetas) AS e
+    JOIN etiqueta ON etiqueta.id_etiqueta = e.value
+""")
+_SQL_QUITAR_ETIQUETAS = text("""
+    DELETE FROM tarea_etiqueta
+    WHERE id_tarea IN (SELECT tarea.id_tarea FROM json_each(:tareas) AS t
+                       JOIN tarea ON tarea.id_tarea = t.value AND tarea.borrado_en IS NULL)
+      AND id_etiqueta IN (SELECT value FROM json_each(:etiquetas))
+""")
+
+_SQL_TAREAS = solo_activas(select(Tarea))
+_SQL_POR_ID = solo_activas(select(Tarea).where(Tarea.id_tarea == bindparam("id_tarea")))
+_SQL_POR_ID_CON_DESCRIPCION = _SQL_POR_ID.options(undefer(Tarea.descripcion))
+_SQL_POR_USUARIO = solo_activas(
+    select(Tarea)
+    .options(joinedload(Tarea.etiquetas))
+    .where(Tarea.id_usuario == bindparam("id_usuario"))
+)
+_SQL_EN_PAPELERA = (
+    select(Tarea)
+    .where(Tarea.borrado_en.is_not(None))
+    .execution_options(**{OPCION_CON_BORRADAS: True})
+)
+_SQL_EN_PAPELERA_POR_ID = _SQL_EN_PAPELERA.where(Tarea.id_tarea == bindparam("id_tarea"))
+_SQL_PAPELERA_USUARIO = (
+    _SQL_EN_PAPELERA
+    .where(Tarea.id_usuario == bindparam("id_usuario"))
+    .order_by(Tarea.borrado_en.desc())
+)
+# La condición sobre borrado_en implica IS NOT NULL: recorre el índice parcial de la purga.
+_SQL_CADUCADAS = (
+    select(Tarea.id_tarea)
+    .where(Tarea.borrado_en < bindparam("corte"))
+    .order_by(Tarea.borrado_en)
+    .limit(bindparam("limite"))
+    .execution_options(**{OPCION_CON_BORRADAS: True})
+)
+_SQL_PURGAR = delete(Tarea.__table__).where(
+    Tarea.__table__.c.id_tarea.in_(bindparam("ids", expanding=True))
+)
+_SQL_PAGINAS_LIBRES = text("PRAGMA freelist_count")
+# El módulo sqlite3 ejecuta un solo paso de la sentencia, que libera una única página
+# aunque se pidan más: se repite una vez por página.
+_SQL_LIBERAR_PAGINA = text("PRAGMA incremental_vacuum(1)")
+
+CAMPOS_TAREA = (
+    "id_tarea", "titulo", "descripcion", "fecha_creacion", "fecha_vencimiento",
+    "id_estado", "id_usuario"
+)
+CAMPOS_OBLIGATORIOS = ("titulo", "id_estado", "id_usuario")
+CAMPOS_ACTUALIZABLES = (
+    "titulo", "descripcion", "fecha_vencimiento", "id_estado", "id_usuario"
+)
+# Columnas que vigilan los triggers de la búsqueda de texto completo.
+CAMPOS_INDEXADOS = frozenset({"titulo", "descripcion", "id_usuario"})
+TAMANO_LOTE = 500
+TAMANO_LOTE_BORRADO = 5000
+ANTIGUEDAD_PAPELERA = timedelta(days=30)
+TAMANO_LOTE_PURGA = 1000
+PAGINAS_POR_LOTE = 1000
+
+# Claves de orden admitidas por la paginación; el ID siempre desempata.
+CLAVES_ORDEN = {
+    "vencimiento": Tarea.fecha_vencimiento,
+    "creacion": Tarea.fecha_creacion,
+    "id": Tarea.id_tarea,
+}
+
 
-from src.modelo.modelo import Tarea, Estado
+def _codificar_token(orden, valor, id_tarea):
+    """Serializa la posición de la última tarea entregada en un token opaco."""
+    if isinstance(valor, datetime):
+        valor = valor.isoformat()
+    datos = json.dumps({"o": orden, "v": valor, "id": id_tarea}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(datos.encode("utf-8")).decode("ascii")
+
+
+def _preparar_fila(datos):
+    """
+    Separa los valores de columna y las etiquetas de una tarea del lote.
+
+    Returns:
+        tuple: (valores, ids_etiquetas, mensaje_error). Si hay error, los dos
+        primeros elementos son None.
+    """
+    desconocidos = set(datos) - set(CAMPOS_TAREA) - {"etiquetas"}
+    if desconocidos:
+        return None, None, f"Campos desconocidos: {', '.join(sorted(desconocidos))}."
+    faltantes = [campo for campo in CAMPOS_OBLIGATORIOS if datos.get(campo) is None]
+    if faltantes:
+        return None, None, f"Faltan campos obligatorios: {', '.join(faltantes)}."
+
+    valores = {campo: datos.get(campo) for campo in CAMPOS_TAREA}
+    etiquetas = {
+        getattr(etiqueta, "id_etiqueta", etiqueta) for etiqueta in datos.get("etiquetas") or ()
+    }
+    return valores, etiquetas, None
+
+
+def _desplazar_fecha(columna, intervalo):
+    """
+    Expresión SQL que suma un intervalo a una columna FechaEpoch.
+
+    Es una suma entera de microsegundos; los valores NULL siguen siendo NULL.
+    """
+    return columna + literal(intervalo_a_epoch(intervalo), Integer)
+
+
+def _decodificar_token(token, orden):
+    """Recupera (valor, id_tarea) de un token generado con el mismo orden."""
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        if datos["o"] != orden:
+            raise ValueError("El token pertenece a otro orden.")
+        valor = datos["v"]
+        if valor is not None and orden != "id":
+            valor = datetime.fromisoformat(valor)
+        return valor, int(datos["id"])
+    except (binascii.Error, KeyError, TypeError, UnicodeError, json.JSONDecodeError) as e:
+        raise ValueError("Token de paginación inválido.") from e
 
 class TareaManager:
     """Gestiona las operaciones CRUD para la entidad Tarea."""
@@ -35,12 +232,15 @@ class TareaManager:
             descripcion (str): Descripción detallada de la tarea.
             fecha_creacion (datetime): Fecha y hora de creación de la tarea.
             fecha_vencimiento (datetime): Fecha y hora límite para completar la tarea.
-            **kwargs: Otros atributos como id_usuario, id_estado, etc.
+            **kwargs: Otros atributos como id_usuario, id_estado, etc. Las
+                etiquetas pueden indicarse como objetos Etiqueta o como IDs.
 
         Returns:
             Tarea: Instancia creada de Tarea si se guarda correctamente.
             None: Si ocurre un error de duplicidad o excepción en la base de datos.
         """
+        if "etiquetas" in kwargs:
+            kwargs["etiquetas"] = self._resolver_etiquetas(kwargs["etiquetas"])
         tarea = Tarea(
             titulo=titulo,
             descripcion=descripcion,
@@ -48,10 +248,13 @@ class TareaManager:
             fecha_vencimiento=fecha_vencimiento,
             **kwargs
         )
-        try:
+        def _crear():
             self.session.add(tarea)
-            self.session.commit()
+            self._indexar_busqueda()
             return tarea
+
+        try:
+            return confirmar(self.session, _crear)
         except IntegrityError:
             self.session.rollback()
             print(
@@ -66,6 +269,100 @@ class TareaManager:
             )
             return None
 
+    def _resolver_etiquetas(self, etiquetas):
+        """Convierte los IDs de etiqueta en objetos Etiqueta con una sola consulta."""
+        etiquetas = list(etiquetas or [])
+        ids = [e for e in etiquetas if isinstance(e, int)]
+        if not ids:
+            return etiquetas
+        cargadas = {
+            e.id_etiqueta: e
+            for e in self.session.scalars(select(Etiqueta).where(Etiqueta.id_etiqueta.in_(ids)))
+        }
+        return [
+            cargadas[e] if isinstance(e, int) else e
+            for e in etiquetas
+            if not isinstance(e, int) or e in cargadas
+        ]
+
+    def crear_tareas_lote(self, tareas, tamano_lote=TAMANO_LOTE):
+        """
+        Crea muchas tareas en una sola transacción con inserciones por bloques.
+
+        Las tareas se insertan con sentencias INSERT de varias filas en bloques de
+        ``tamano_lote`` y las asociaciones con etiquetas se escriben al final en una
+        única inserción por lotes. Si un bloque falla por integridad, sus filas se
+        reintentan una a una para informar exactamente cuáles no se pudieron crear,
+        sin descartar las demás.
+
+        Args:
+            tareas (Iterable[dict]): Datos de cada tarea (titulo, descripcion,
+                fecha_creacion, fecha_vencimiento, id_estado, id_usuario y, si se
+                quiere conservar, id_tarea) y, opcionalmente, 'etiquetas' como IDs
+                u objetos Etiqueta.
+            tamano_lote (int): Número de tareas por sentencia INSERT.
+
+        Returns:
+            ResultadoLote: Lista de IDs alineada con la entrada (None en las filas
+            fallidas) y lista de ErrorFila con el índice y el motivo de cada fallo.
+        """
+        ids = []
+        errores = []
+        asociaciones = []
+        bloque = []
+
+        try:
+            for indice, datos in enumerate(tareas):
+                ids.append(None)
+                valores, etiquetas, error = _preparar_fila(datos)
+                if error:
+                    errores.append(ErrorFila(indice, error))
+                    continue
+                bloque.append((indice, valores, etiquetas))
+                if len(bloque) >= tamano_lote:
+                    self._insertar_bloque(bloque, ids, errores, asociaciones)
+                    bloque = []
+            if bloque:
+                self._insertar_bloque(bloque, ids, errores, asociaciones)
+
+            if asociaciones:
+                self.session.execute(insert(tarea_etiqueta), asociaciones)
+            self._indexar_busqueda()
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            print(f"Error inesperado al crear tareas en lote: {e}")
+            errores = [ErrorFila(None, f"Lote revertido: {e}")]
+            ids = [None] * len(ids)
+        return ResultadoLote(ids, errores)
+
+    def _insertar_bloque(self, bloque, ids, errores, asociaciones):
+        """Inserta un bloque de filas y acumula sus asociaciones con etiquetas."""
+        sentencia = insert(Tarea.__table__).returning(
+            Tarea.__table__.c.id_tarea, sort_by_parameter_order=True
+        )
+        try:
+            with self.session.begin_nested():
+                generados = self.session.execute(
+                    sentencia, [valores for _, valores, _ in bloque]
+                ).scalars().all()
+            insertadas = list(zip(bloque, generados))
+        except IntegrityError:
+            insertadas = []
+            for fila in bloque:
+                try:
+                    with self.session.begin_nested():
+                        generado = self.session.execute(sentencia, [fila[1]]).scalar_one()
+                    insertadas.append((fila, generado))
+                except IntegrityError as e:
+                    errores.append(ErrorFila(fila[0], f"Datos duplicados o inválidos: {e.orig}"))
+
+        for (indice, _, etiquetas), id_tarea in insertadas:
+            ids[indice] = id_tarea
+            asociaciones.extend(
+                {"id_tarea": id_tarea, "id_etiqueta": id_etiqueta} for id_etiqueta in etiquetas
+            )
+
     def obtener_tareas(self):
         """
         Obtiene todas las tareas almacenadas en la base de datos.
@@ -73,36 +370,39 @@ class TareaManager:
         Returns:
             list[Tarea]: Lista con todas las instancias de Tarea.
         """
-        return self.session.query(Tarea).all()
+        return self.session.scalars(_SQL_TAREAS).all()
 
 
-    def actualizar_tarea(self, id_tarea, **kwargs):
+    def actualizar_tarea(self, id_tarea, version=None, **kwargs):
         """
         Actualiza los atributos de una tarea dada.
 
         Args:
             id_tarea (int): ID de la tarea a actualizar.
+            version (int, optional): Versión de la tarea que se leyó antes de editarla;
+                por defecto, la de la tarea cargada en la sesión.
             **kwargs: Campos y valores a actualizar (
-            titulo, descripcion, fecha_vencimiento, id_estado
-            ).
+            titulo, descripcion, fecha_vencimiento, id_estado, etiquetas
+            ). Las etiquetas pueden indicarse como objetos Etiqueta o como IDs.
 
         Returns:
             Tarea: Instancia actualizada si la operación fue exitosa.
+            Conflicto: Si otra instancia modificó o eliminó la tarea antes.
             None: Si la tarea no se encuentra o ocurre un error.
         """
-        tarea = self.obtener_tarea_por_id(id_tarea)
-        if not tarea:
-            print(
-                "Tarea no encontrada para actualizar."
-            )
-            return None
+        if "etiquetas" in kwargs:
+            kwargs["etiquetas"] = self._resolver_etiquetas(kwargs["etiquetas"])
 
-        for attr, value in kwargs.items():
-            setattr(tarea, attr, value)
+        def _cambiar(tarea):
+            for attr, value in kwargs.items():
+                setattr(tarea, attr, value)
+            if CAMPOS_INDEXADOS & kwargs.keys():
+                self._indexar_busqueda()
 
         try:
-            self.session.commit()
-            return tarea
+            tarea = escribir(
+                self.session, lambda: self.obtener_tarea_por_id(id_tarea), _cambiar, version
+            )
         except IntegrityError:
             self.session.rollback()
             print(
@@ -116,41 +416,601 @@ class TareaManager:
                 f"Error inesperado al actualizar tarea: {e}"
             )
             return None
+        if tarea is None:
+            print(
+                "Tarea no encontrada para actualizar."
+            )
+        elif isinstance(tarea, Conflicto):
+            print(
+                "Conflicto: la tarea fue modificada o eliminada desde otra instancia."
+            )
+        return tarea
 
     def eliminar_tarea(self, tarea):
-        """Elimina una tarea existente de la base de datos."""
-        self.session.delete(tarea)
-        self.session.commit()
+        """
+        Mueve una tarea a la papelera.
+
+        Es un único UPDATE que anota la hora en ``borrado_en``; la tarea deja de
+        aparecer en las consultas y se puede recuperar con ``restaurar_tarea`` hasta
+        que ``purgar_papelera`` la borre definitivamente.
+
+        Returns:
+            Tarea: La tarea eliminada.
+            Conflicto: Si otra instancia la modificó o eliminó desde que se cargó.
+        """
+        def _a_papelera(cargada):
+            cargada.borrado_en = epoch_actual()
+
+        return escribir(self.session, lambda: tarea, _a_papelera)
+
+    def restaurar_tarea(self, id_tarea):
+        """
+        Saca una tarea de la papelera.
+
+        Args:
+            id_tarea (int): ID de la tarea eliminada.
 
-    def obtener_tarea_por_id(self, id_tarea):
+        Returns:
+            Tarea: La tarea restaurada.
+            Conflicto: Si otra instancia la modificó desde que se eliminó.
+            None: Si la tarea no está en la papelera u ocurre un error.
+        """
+        def _restaurar(cargada):
+            cargada.borrado_en = None
+
+        try:
+            tarea = escribir(self.session, lambda: self.session.scalars(
+                _SQL_EN_PAPELERA_POR_ID, {"id_tarea": id_tarea}
+            ).first(), _restaurar)
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            print(f"Error inesperado al restaurar tarea: {e}")
+            return None
+        if tarea is None:
+            print("Tarea no encontrada en la papelera.")
+        return tarea
+
+    def obtener_papelera(self, id_usuario):
+        """
+        Obtiene las tareas de un usuario que están en la papelera.
+
+        Args:
+            id_usuario (int): ID del usuario propietario de las tareas.
+
+        Returns:
+            list[Tarea]: Tareas eliminadas, de la más reciente a la más antigua.
+        """
+        return self.session.scalars(_SQL_PAPELERA_USUARIO, {"id_usuario": id_usuario}).all()
+
+    def purgar_papelera(self, antiguedad=ANTIGUEDAD_PAPELERA, tamano_lote=TAMANO_LOTE_PURGA,
+                        paginas_por_lote=PAGINAS_POR_LOTE, continuar=None):
+        """
+        Borra definitivamente las tareas que llevan en la papelera más de ``antiguedad``.
+
+        Las tareas se borran por lotes de ``tamano_lote``, de la más antigua a la más
+        reciente, cada uno en su propia transacción: una purga grande no bloquea a los
+        demás escritores y, si se interrumpe, los lotes confirmados se mantienen. Sus
+        asociaciones con etiquetas se borran en cascada. Después, si la base de datos
+        tiene ``auto_vacuum=INCREMENTAL``, ``PRAGMA incremental_vacuum`` devuelve al
+        sistema las páginas libres del archivo, también por lotes de
+        ``paginas_por_lote``.
+
+        Args:
+            antiguedad (timedelta): Tiempo mínimo en la papelera.
+            tamano_lote (int): Número máximo de tareas borradas por transacción.
+            paginas_por_lote (int): Número máximo de páginas liberadas por transacción.
+            continuar (Callable[[], bool], optional): Se consulta antes de cada lote;
+                si devuelve False la purga termina (por ejemplo, al cerrar la aplicación).
+
+        Returns:
+            ResultadoPurga: Tareas borradas y páginas devueltas al sistema.
+            None: Si ocurre un error en la base de datos.
+
+        Raises:
+            ValueError: Si la antigüedad es negativa o algún tamaño de lote no es positivo.
+        """
+        if antiguedad < timedelta(0):
+            raise ValueError("La antigüedad no puede ser negativa.")
+        if tamano_lote < 1 or paginas_por_lote < 1:
+            raise ValueError("Los tamaños de lote deben ser positivos.")
+        continuar = continuar or (lambda: True)
+        corte = epoch_actual() - intervalo_a_epoch(antiguedad)
+
+        def _purgar_lote():
+            ids = self.session.scalars(
+                _SQL_CADUCADAS, {"corte": corte, "limite": tamano_lote}
+            ).all()
+            if ids:
+                self.session.execute(_SQL_PURGAR, {"ids": ids})
+                self._indexar_busqueda()
+            return ids
+
+        tareas = 0
+        try:
+            while continuar():
+                ids = confirmar(self.session, _purgar_lote)
+                if not ids:
+                    break
+                tareas += len(ids)
+                self._retirar_de_sesion(ids)
+            return ResultadoPurga(tareas, self._liberar_paginas(paginas_por_lote, continuar))
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            print(f"Error inesperado al purgar la papelera: {e}")
+            return None
+
+    def _liberar_paginas(self, paginas_por_lote, continuar):
+        """Trunca el archivo con incremental_vacuum y devuelve las páginas liberadas."""
+        def _liberar_lote():
+            antes = self.session.execute(_SQL_PAGINAS_LIBRES).scalar()
+            for _ in range(min(antes, paginas_por_lote)):
+                self.session.execute(_SQL_LIBERAR_PAGINA)
+            return antes - self.session.execute(_SQL_PAGINAS_LIBRES).scalar()
+
+        liberadas = 0
+        # Sin auto_vacuum=INCREMENTAL no se libera ninguna y el bucle termina.
+        while continuar():
+            lote = confirmar(self.session, _liberar_lote)
+            if lote <= 0:
+                break
+            liberadas += lote
+        return liberadas
+
+    def obtener_tarea_por_id(self, id_tarea, con_descripcion=False):
         """
         Obtiene una tarea específica por su ID.
 
+        La descripción es una columna diferida: sin ``con_descripcion`` se carga
+        con una consulta aparte la primera vez que se lee.
+
         Args:
             id_tarea (int): Identificador único de la tarea.
+            con_descripcion (bool): Si la descripción se carga en la misma consulta.
 
         Returns:
             Tarea: Instancia de Tarea si se encuentra, de lo contrario None.
         """
-        return self.session.query(Tarea).filter_by(id_tarea=id_tarea).first()
+        consulta = _SQL_POR_ID_CON_DESCRIPCION if con_descripcion else _SQL_POR_ID
+        return self.session.scalars(consulta, {"id_tarea": id_tarea}).first()
 
     def obtener_tareas_por_usuario(self, id_usuario: int):
         """Obtiene todas las tareas asociadas a un usuario."""
-        return (
-            self.session.query(Tarea)
-            .options(joinedload(Tarea.etiquetas))
-            .filter_by(id_usuario=id_usuario)
-            .all()
-        )
+        return self.session.scalars(
+            _SQL_POR_USUARIO, {"id_usuario": id_usuario}
+        ).unique().all()
+
+    def obtener_tareas_por_etiquetas(self, expresion, id_usuario=None):
+        """
+        Obtiene las tareas que cumplen una combinación booleana de etiquetas.
+
+        La expresión se resuelve entera en SQL sobre ``tarea_etiqueta``; no se cargan
+        las etiquetas de cada tarea para filtrarlas en Python.
+
+        Args:
+            expresion (ExpresionEtiquetas | str): Por ejemplo
+                ``"Urgente AND Universidad AND NOT Casa"``.
+            id_usuario (int, optional): Limita el resultado a las tareas de un usuario.
+
+        Returns:
+            list[Tarea]: Tareas que cumplen la expresión, ordenadas por ID.
+
+        Raises:
+            ValueError: Si el texto de la expresión está mal formado.
+        """
+        filtro = FiltroTareas(id_usuario=id_usuario, etiquetas=expresion)
+        return self.session.scalars(
+            select(Tarea).where(*filtro.condiciones()).order_by(Tarea.id_tarea)
+        ).all()
 
     def marcar_completado(self, tarea):
-        """Marca una tarea como completada actualizando su estado."""
-        estado_completado = self.session.query(Estado).filter_by(nombre_estado="Completado").first()
-        if not estado_completado:
-            estado_completado = Estado(nombre_estado="Completado")
-            self.session.add(estado_completado)
-            self.session.commit()
+        """Marca una tarea como completada actualizando su estado.
 
-        if tarea.id_estado != estado_completado.id_estado:
-            tarea.id_estado = estado_completado.id_estado
-            self.session.commit()
+        El ID del estado 'Completado' se resuelve desde la caché de EstadoManager,
+        de modo que completar una tarea es un único UPDATE en un único commit.
+
+        Returns:
+            Tarea: La tarea completada.
+            Conflicto: Si otra instancia la modificó o eliminó desde que se cargó.
+            None: Si no se pudo crear el estado 'Completado'.
+        """
+        estados = EstadoManager(self.session)
+        id_completado = estados.obtener_id_por_nombre("Completado")
+        if id_completado is None:
+            estado_completado = estados.crear_estado("Completado")
+            if not estado_completado:
+                return None
+            id_completado = estado_completado.id_estado
+
+        def _completar(cargada):
+            cargada.id_estado = id_completado
+
+        return escribir(self.session, lambda: tarea, _completar)
+
+    def obtener_pagina_tareas(self, id_usuario=None, tamano=50, orden="id", token=None,
+                              filtro=None):
+        """
+        Obtiene una página de tareas usando paginación por clave (keyset).
+
+        En lugar de OFFSET, cada página continúa a partir de la última tarea
+        entregada, por lo que las páginas profundas cuestan lo mismo que la primera.
+        Las tareas sin fecha se entregan al final cuando se ordena por fecha.
+
+        Args:
+            id_usuario (int, optional): Limita la consulta a las tareas del usuario.
+            tamano (int): Número máximo de tareas por página.
+            orden (str): Clave de orden: 'vencimiento', 'creacion' o 'id'.
+            token (str, optional): Token de continuación devuelto por la página anterior.
+            filtro (FiltroTareas, optional): Criterios adicionales de selección.
+
+        Returns:
+            PaginaTareas: Tareas de la página y token para la siguiente,
+            o None como token si no quedan más tareas.
+
+        Raises:
+            ValueError: Si el orden, el tamaño o el token no son válidos.
+        """
+        if orden not in CLAVES_ORDEN:
+            raise ValueError(f"Orden de paginación no válido: '{orden}'.")
+        if tamano < 1:
+            raise ValueError("El tamaño de página debe ser mayor que cero.")
+
+        columna = CLAVES_ORDEN[orden]
+        consulta = select(Tarea).options(selectinload(Tarea.etiquetas))
+        if id_usuario is not None:
+            consulta = consulta.where(Tarea.id_usuario == id_usuario)
+        if filtro is not None:
+            consulta = consulta.where(*filtro.condiciones())
+
+        if orden == "id":
+            consulta = consulta.order_by(Tarea.id_tarea)
+        else:
+            consulta = consulta.order_by(columna.asc().nulls_last(), Tarea.id_tarea)
+
+        if token:
+            valor, ultimo_id = _decodificar_token(token, orden)
+            if orden == "id":
+                consulta = consulta.where(Tarea.id_tarea > ultimo_id)
+            elif valor is None:
+                consulta = consulta.where(and_(columna.is_(None), Tarea.id_tarea > ultimo_id))
+            else:
+                consulta = consulta.where(or_(
+                    columna > valor,
+                    and_(columna == valor, Tarea.id_tarea > ultimo_id),
+                    columna.is_(None)
+                ))
+
+        tareas = self.session.scalars(consulta.limit(tamano + 1)).all()
+        if len(tareas) <= tamano:
+            return PaginaTareas(tareas, None)
+
+        tareas = tareas[:tamano]
+        ultima = tareas[-1]
+        siguiente = _codificar_token(orden, getattr(ultima, columna.key), ultima.id_tarea)
+        return PaginaTareas(tareas, siguiente)
+
+    def iterar_tareas(self, id_usuario=None, tamano=500, orden="id", filtro=None):
+        """
+        Recorre todas las tareas página a página de forma perezosa.
+
+        Args:
+            id_usuario (int, optional): Limita el recorrido a las tareas del usuario.
+            tamano (int): Número de tareas leídas por consulta.
+            orden (str): Clave de orden: 'vencimiento', 'creacion' o 'id'.
+            filtro (FiltroTareas, optional): Criterios adicionales de selección.
+
+        Yields:
+            Tarea: Cada tarea en el orden solicitado.
+        """
+        token = None
+        while True:
+            pagina = self.obtener_pagina_tareas(id_usuario, tamano, orden, token, filtro)
+            yield from pagina.tareas
+            token = pagina.token_siguiente
+            if token is None:
+                return
+
+    def obtener_filas_por_usuario(self, id_usuario, largo_descripcion=LARGO_DESCRIPCION_FILA,
+                                  ids=None):
+        """
+        Obtiene las filas compactas que muestra la tabla principal en una sola consulta.
+
+        El nombre del estado se resuelve con un JOIN y los nombres de las etiquetas
+        llegan ya unidos por una subconsulta correlacionada, de modo que el número
+        de consultas no depende del número de tareas ni de etiquetas.
+
+        Args:
+            id_usuario (int): ID del usuario propietario de las tareas.
+            largo_descripcion (int): Número máximo de caracteres de la descripción.
+            ids (Iterable[int], optional): Solo estas tareas (las que cambiaron según
+                el diario de cambios); se leen en lotes de ``TAMANO_LOTE``.
+
+        Returns:
+            list[FilaTarea]: Filas ordenadas por ID de tarea.
+        """
+        nombres_etiquetas = (
+            select(func.group_concat(Etiqueta.nombre_etiqueta, ", "))
+            .select_from(tarea_etiqueta.join(Etiqueta))
+            .where(tarea_etiqueta.c.id_tarea == Tarea.id_tarea)
+            .scalar_subquery()
+        )
+        # resumir() descomprime solo el comienzo de las descripciones comprimidas.
+        descripcion = func.resumir(Tarea.descripcion, largo_descripcion, type_=Text)
+        consulta = (
+            select(
+                Tarea.id_tarea, Tarea.titulo, descripcion, Tarea.fecha_vencimiento,
+                Estado.nombre_estado, nombres_etiquetas
+            )
+            .join(Estado, Tarea.id_estado == Estado.id_estado)
+            .order_by(Tarea.id_tarea)
+        )
+        if ids is None:
+            consulta = consulta.where(Tarea.id_usuario == id_usuario)
+            return [FilaTarea._make(fila) for fila in self.session.execute(consulta)]
+        ids = sorted(ids)
+        # "+ 0" impide usar los índices por usuario: SQLite recorrería todas las tareas
+        # del usuario en cada lote en lugar de buscar cada ID por la clave primaria.
+        consulta = consulta.where(
+            Tarea.id_usuario + literal(0, Integer) == id_usuario,
+            Tarea.id_tarea.in_(bindparam("ids", expanding=True))
+        )
+        return [
+            FilaTarea._make(fila)
+            for inicio in range(0, len(ids), TAMANO_LOTE)
+            for fila in self.session.execute(consulta, {"ids": ids[inicio:inicio + TAMANO_LOTE]})
+        ]
+
+    def buscar(self, id_usuario, consulta, limite=20, prefijo=False):
+        """
+        Busca tareas del usuario por texto en el título y la descripción.
+
+        Usa los índices FTS5 ``tarea_fts`` y ``tarea_fts_comprimida``, este último al
+        día porque las escrituras indexan en su propia transacción las descripciones
+        comprimidas. Los resultados se ordenan por relevancia (bm25) e incluyen un
+        fragmento de la descripción con los términos encontrados entre corchetes.
+
+        Args:
+            id_usuario (int): ID del usuario propietario de las tareas.
+            consulta (str): Texto de búsqueda; todas las palabras deben aparecer.
+            limite (int): Número máximo de resultados.
+            prefijo (bool): Si la última palabra admite prefijos (búsqueda al escribir).
+
+        Returns:
+            list[ResultadoBusqueda]: Coincidencias de mayor a menor relevancia.
+        """
+        expresion = preparar_consulta(consulta, id_usuario, prefijo)
+        if not expresion:
+            return []
+        filas = self.session.execute(_SQL_BUSQUEDA, {"consulta": expresion, "limite": limite})
+        return [ResultadoBusqueda._make(fila) for fila in filas]
+
+    def actualizar_tareas(self, filtro, desplazar_vencimiento=None, **valores):
+        """
+        Actualiza todas las tareas que cumplen el filtro con una única sentencia UPDATE.
+
+        Las tareas afectadas que ya estén cargadas en la sesión se sincronizan con
+        los nuevos valores, de modo que no quedan objetos con datos obsoletos. La
+        versión de cada tarea se incrementa, así que una edición de la misma tarea
+        que se hubiera leído antes termina en conflicto.
+
+        Args:
+            filtro (FiltroTareas): Criterios que seleccionan las tareas.
+            desplazar_vencimiento (timedelta, optional): Intervalo que se suma a la
+                fecha de vencimiento de cada tarea (puede ser negativo).
+            **valores: Nuevos valores de columna (titulo, descripcion,
+                fecha_vencimiento, id_estado, id_usuario).
+
+        Returns:
+            int: Número de tareas actualizadas.
+            None: Si ocurre un error en la base de datos.
+
+        Raises:
+            ValueError: Si no hay nada que actualizar, se indica una columna no
+                permitida o el filtro no tiene criterios.
+        """
+        desconocidos = set(valores) - set(CAMPOS_ACTUALIZABLES)
+        if desconocidos:
+            raise ValueError(f"Campos no actualizables: {', '.join(sorted(desconocidos))}.")
+        if desplazar_vencimiento is not None:
+            if "fecha_vencimiento" in valores:
+                raise ValueError("No se puede fijar y desplazar el vencimiento a la vez.")
+            valores["fecha_vencimiento"] = _desplazar_fecha(
+                Tarea.fecha_vencimiento, desplazar_vencimiento
+            )
+        if not valores:
+            raise ValueError("No se indicó ningún valor para actualizar.")
+
+        sentencia = (
+            update(Tarea)
+            .where(*filtro.condiciones())
+            .values(version=Tarea.version + 1, **valores)
+            .execution_options(synchronize_session="fetch")
+        )
+        def _actualizar():
+            actualizadas = self.session.execute(sentencia).rowcount
+            if CAMPOS_INDEXADOS & valores.keys():
+                self._indexar_busqueda()
+            return actualizadas
+
+        try:
+            return confirmar(self.session, _actualizar)
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            print(f"Error inesperado al actualizar tareas en bloque: {e}")
+            return None
+
+    def marcar_completadas(self, filtro):
+        """
+        Marca como completadas todas las tareas del filtro con un único UPDATE.
+
+        Args:
+            filtro (FiltroTareas): Criterios que seleccionan las tareas.
+
+        Returns:
+            int: Número de tareas actualizadas, o None si ocurre un error.
+        """
+        estados = EstadoManager(self.session)
+        id_completado = estados.obtener_id_por_nombre("Completado")
+        if id_completado is None:
+            estado_completado = estados.crear_estado("Completado")
+            if not estado_completado:
+                return None
+            id_completado = estado_completado.id_estado
+        return self.actualizar_tareas(filtro, id_estado=id_completado)
+
+    def eliminar_tareas(self, filtro, tamano_lote=TAMANO_LOTE_BORRADO):
+        """
+        Elimina todas las tareas que cumplen el filtro, junto con sus asociaciones.
+
+        Las tareas se seleccionan por orden de ID en lotes de ``tamano_lote``; cada lote
+        se borra con un DELETE sobre ``tarea_etiqueta`` y otro sobre ``tarea`` en su
+        propia transacción, de modo que un borrado muy grande no bloquea la base de
+        datos mucho tiempo; un lote que encuentra la base bloqueada se repite. Si ocurre
+        un error, los lotes ya confirmados se mantienen.
+        Las tareas borradas que estén cargadas en la sesión se retiran de ella.
+
+        Args:
+            filtro (FiltroTareas): Criterios que seleccionan las tareas.
+            tamano_lote (int): Número máximo de tareas borradas por transacción.
+
+        Returns:
+            ResultadoBorrado: Número de tareas y de asociaciones con etiquetas eliminadas.
+            None: Si ocurre un error en la base de datos.
+
+        Raises:
+            ValueError: Si el filtro no tiene criterios o el tamaño de lote no es positivo.
+        """
+        if tamano_lote < 1:
+            raise ValueError("El tamaño de lote debe ser positivo.")
+        seleccion = (
+            select(Tarea.id_tarea)
+            .where(*filtro.condiciones(), Tarea.id_tarea > bindparam("ultimo"))
+            .order_by(Tarea.id_tarea)
+            .limit(tamano_lote)
+        )
+        borrar_asociaciones = delete(tarea_etiqueta).where(
+            tarea_etiqueta.c.id_tarea.in_(bindparam("ids", expanding=True))
+        )
+        borrar_tareas = (
+            delete(Tarea)
+            .where(Tarea.id_tarea.in_(bindparam("ids", expanding=True)))
+            .execution_options(synchronize_session=False)
+        )
+
+        def _borrar_lote(ultimo):
+            ids = self.session.scalars(seleccion, {"ultimo": ultimo}).all()
+            if not ids:
+                return ids, 0, 0
+            borradas = (ids, self.session.execute(borrar_asociaciones, {"ids": ids}).rowcount,
+                        self.session.execute(borrar_tareas, {"ids": ids}).rowcount)
+            self._indexar_busqueda()
+            return borradas
+
+        tareas = asociaciones = ultimo = 0
+        try:
+            while True:
+                ids, borradas_asociaciones, borradas_tareas = confirmar(
+                    self.session, partial(_borrar_lote, ultimo)
+                )
+                if not ids:
+                    return ResultadoBorrado(tareas, asociaciones)
+                asociaciones += borradas_asociaciones
+                tareas += borradas_tareas
+                self._retirar_de_sesion(ids)
+                ultimo = ids[-1]
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            print(f"Error inesperado al eliminar tareas en bloque: {e}")
+            return None
+
+    def indexar_busqueda(self):
+        """
+        Indexa las descripciones comprimidas que quedaron pendientes.
+
+        Las escrituras de la aplicación ya las indexan en su propia transacción; esto
+        solo hace falta tras cambios hechos en ``tarea`` con otros clientes de SQLite.
+
+        Returns:
+            int: Número de cambios aplicados al índice, o None si ocurre un error.
+        """
+        try:
+            return confirmar(self.session, lambda: indexar_pendientes(self.session.connection()))
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            print(f"Error inesperado al indexar la búsqueda: {e}")
+            return None
+
+    def _indexar_busqueda(self):
+        """
+        Indexa, en la transacción en curso, las descripciones comprimidas pendientes.
+
+        Los triggers de ``tarea`` solo anotan en una cola las descripciones
+        comprimidas que cambian; indexarlas al escribir deja la búsqueda al día sin
+        que ``buscar`` tenga que escribir.
+        """
+        self.session.flush()
+        indexar_pendientes(self.session.connection())
+
+    def _retirar_de_sesion(self, ids):
+        """Quita de la sesión las tareas con esos IDs que estuvieran cargadas."""
+        for id_tarea in ids:
+            tarea = self.session.identity_map.get(self.session.identity_key(Tarea, id_tarea))
+            if tarea is not None:
+                self.session.expunge(tarea)
+
+    def asignar_etiquetas(self, ids_tareas, ids_etiquetas):
+        """
+        Añade etiquetas a muchas tareas con una única sentencia INSERT OR IGNORE.
+
+        Las asociaciones que ya existen se conservan y los IDs de tareas o etiquetas
+        inexistentes, igual que las tareas de la papelera, se ignoran.
+
+        Args:
+            ids_tareas (Iterable[int]): Tareas que reciben las etiquetas.
+            ids_etiquetas (Iterable[int]): Etiquetas que se añaden a cada tarea.
+
+        Returns:
+            int: Número de asociaciones nuevas, o None si ocurre un error.
+        """
+        return self._cambiar_etiquetas(
+            _SQL_ASIGNAR_ETIQUETAS, ids_tareas, ids_etiquetas, "asignar"
+        )
+
+    def quitar_etiquetas(self, ids_tareas, ids_etiquetas):
+        """
+        Quita etiquetas de muchas tareas con una única sentencia DELETE.
+
+        Las tareas de la papelera conservan sus etiquetas para cuando se restauren.
+
+        Args:
+            ids_tareas (Iterable[int]): Tareas de las que se quitan las etiquetas.
+            ids_etiquetas (Iterable[int]): Etiquetas que se quitan de cada tarea.
+
+        Returns:
+            int: Número de asociaciones eliminadas, o None si ocurre un error.
+        """
+        return self._cambiar_etiquetas(
+            _SQL_QUITAR_ETIQUETAS, ids_tareas, ids_etiquetas, "quitar"
+        )
+
+    def _cambiar_etiquetas(self, sentencia, ids_tareas, ids_etiquetas, accion):
+        ids_tareas = [int(i) for i in ids_tareas]
+        ids_etiquetas = [int(i) for i in ids_etiquetas]
+        if not ids_tareas or not ids_etiquetas:
+            return 0
+        parametros = {"tareas": json.dumps(ids_tareas), "etiquetas": json.dumps(ids_etiquetas)}
+        try:
+            cambiadas = confirmar(
+                self.session, lambda: self.session.execute(sentencia, parametros).rowcount
+            )
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            print(f"Error inesperado al {accion} etiquetas: {e}")
+            return None
+        # Las colecciones ya cargadas dejarían de coincidir con la base de datos.
+        for clase, ids, relacion in ((Tarea, ids_tareas, "etiquetas"),
+                                     (Etiqueta, ids_etiquetas, "tareas")):
+            for id_objeto in ids:
+                objeto = self.session.identity_map.get(self.session.identity_key(clase, id_objeto))
+                if objeto is not None:
+                    self.session.expire(objeto, [relacion])
+        return cambiadas
@@ -3,14 +3,24 @@ Módulo para la gestión de usuarios en el sistema ToDoList.
 
 Contiene la clase UsuarioManager, que ofrece métodos para crear, obtener,
 actualizar y eliminar usuarios. Permite gestionar los datos de los usuarios
-que acceden al sistema.
+que acceden al sistema. Las actualizaciones y los borrados devuelven un
+``Conflicto`` si otra instancia de la aplicación cambió el usuario antes.
 
 Clases:
     UsuarioManager: Proporciona métodos CRUD para la entidad Usuario.
 """
+from sqlalchemy import bindparam, select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from src.logica.concurrencia import Conflicto, confirmar, escribir
+from src.modelo.busqueda import indexar_pendientes
 from src.modelo.modelo import Usuario
 
+_SQL_USUARIOS = select(Usuario)
+_SQL_POR_ID = select(Usuario).where(Usuario.id_usuario == bindparam("id_usuario"))
+_SQL_POR_NOMBRE = (
+    select(Usuario).where(Usuario.nombre_usuario == bindparam("nombre_usuario")).limit(1)
+)
+
 
 class UsuarioManager:
     """Gestiona las operaciones CRUD para la entidad Usuario."""
@@ -43,9 +53,7 @@ class UsuarioManager:
             contrasena=contrasena
         )
         try:
-            self.session.add(usuario)
-            self.session.commit()
-            return usuario
+            return confirmar(self.session, lambda: self.session.add(usuario) or usuario)
         except IntegrityError:
             self.session.rollback()
             print("Error: Usuario con ese nombre o correo ya existe.")
@@ -62,7 +70,7 @@ class UsuarioManager:
         Returns:
             list[Usuario]: Lista con todas las instancias de Usuario.
         """
-        return self.session.query(Usuario).all()
+        return self.session.scalars(_SQL_USUARIOS).all()
 
     def obtener_usuario_por_id(self, id_usuario):
         """
@@ -74,11 +82,11 @@ class UsuarioManager:
         Returns:
             Usuario: Instancia de Usuario si se encuentra, de lo contrario None.
         """
-        return self.session.query(Usuario).filter_by(id_usuario=id_usuario).first()
+        return self.session.scalars(_SQL_POR_ID, {"id_usuario": id_usuario}).first()
 
     def actualizar_usuario(
             self, id_usuario, nombre_usuario=None,
-            correo_electronico=None, contrasena=None
+            correo_electronico=None, contrasena=None, version=None
     ):
         """
         Actualiza los datos de un usuario dado.
@@ -88,24 +96,25 @@ class UsuarioManager:
             nombre_usuario (str, optional): Nuevo nombre de usuario.
             correo_electronico (str, optional): Nuevo correo electrónico.
             contrasena (str, optional): Nueva contraseña.
+            version (int, optional): Versión del usuario que se leyó antes de editarlo.
 
         Returns:
             Usuario: Instancia actualizada si la operación fue exitosa.
+            Conflicto: Si otra instancia modificó o eliminó el usuario antes.
             None: Si el usuario no se encuentra o ocurre un error.
         """
-        usuario = self.obtener_usuario_por_id(id_usuario)
-        if not usuario:
-            print("Usuario no encontrado.")
-            return None
-        if nombre_usuario:
-            usuario.nombre_usuario = nombre_usuario
-        if correo_electronico:
-            usuario.correo_electronico = correo_electronico
-        if contrasena:
-            usuario.contrasena = contrasena
+        def _cambiar(usuario):
+            if nombre_usuario:
+                usuario.nombre_usuario = nombre_usuario
+            if correo_electronico:
+                usuario.correo_electronico = correo_electronico
+            if contrasena:
+                usuario.contrasena = contrasena
+
         try:
-            self.session.commit()
-            return usuario
+            usuario = escribir(
+                self.session, lambda: self.obtener_usuario_por_id(id_usuario), _cambiar, version
+            )
         except IntegrityError:
             self.session.rollback()
             print("Error: Datos duplicados o inválidos al actualizar.")
@@ -114,30 +123,44 @@ class UsuarioManager:
             self.session.rollback()
             print(f"Error inesperado al actualizar: {e}")
             return None
+        if usuario is None:
+            print("Usuario no encontrado.")
+        elif isinstance(usuario, Conflicto):
+            print("Conflicto: el usuario fue modificado o eliminado desde otra instancia.")
+        return usuario
 
-    def eliminar_usuario(self, id_usuario):
+    def eliminar_usuario(self, id_usuario, version=None):
         """
         Elimina un usuario por su ID.
 
         Args:
             id_usuario (int): ID del usuario a eliminar.
+            version (int, optional): Versión del usuario que se leyó antes de eliminarlo.
 
         Returns:
             Usuario: Instancia eliminada si la operación fue exitosa.
+            Conflicto: Si otra instancia modificó o eliminó el usuario antes.
             None: Si el usuario no existe o ocurre un error.
         """
-        usuario = self.obtener_usuario_por_id(id_usuario)
-        if not usuario:
-            print("Usuario no encontrado para eliminar.")
-            return None
-        try:
+        def _borrar(usuario):
+            # Sus tareas se borran en cascada: se retiran también del índice de búsqueda.
             self.session.delete(usuario)
-            self.session.commit()
-            return usuario
+            self.session.flush()
+            indexar_pendientes(self.session.connection())
+
+        try:
+            usuario = escribir(
+                self.session, lambda: self.obtener_usuario_por_id(id_usuario), _borrar, version
+            )
         except SQLAlchemyError as e:
             self.session.rollback()
             print(f"Error inesperado al eliminar: {e}")
             return None
+        if usuario is None:
+            print("Usuario no encontrado para eliminar.")
+        elif isinstance(usuario, Conflicto):
+            print("Conflicto: el usuario fue modificado o eliminado desde otra instancia.")
+        return usuario
 
     def obtener_por_nombre(self, nombre_usuario):
         """
@@ -149,4 +172,6 @@ class UsuarioManager:
         Returns:
             Usuario: Instancia de Usuario si se encuentra, de lo contrario None.
         """
-        return self.session.query(Usuario).filter_by(nombre_usuario=nombre_usuario).first()
+        return self.session.scalars(
+            _SQL_POR_NOMBRE, {"nombre_usuario": nombre_usuario}
+        ).first()
@@ -0,0 +1,263 @@
+"""
+Módulo del índice de búsqueda de texto completo sobre las tareas.
+
+Define dos tablas virtuales FTS5 de contenido externo sobre los campos ``titulo`` y
+``descripcion`` de la tabla ``tarea``:
+
+- ``tarea_fts`` indexa las tareas cuya descripción se guarda como texto (o no
+  tiene). Lee su contenido de la vista ``tarea_fts_contenido`` y unos triggers la
+  mantienen sincronizada con cada INSERT, UPDATE y DELETE.
+- ``tarea_fts_comprimida`` indexa las tareas con la descripción comprimida. Su
+  vista, ``tarea_fts_comprimida_contenido``, la descomprime con la función SQL
+  ``descomprimir``, que solo registra la aplicación.
+
+Los triggers de ``tarea`` no llaman a ninguna función de la aplicación, así que
+cualquier cliente de SQLite (la consola ``sqlite3``, DB Browser, otro programa)
+puede insertar, cambiar y borrar tareas. Para las descripciones comprimidas los
+triggers solo anotan en la cola ``tarea_fts_pendiente`` los valores guardados que
+hay que añadir o quitar del índice; ``indexar_pendientes`` los aplica en orden,
+descomprimiéndolos, dentro de la misma transacción que las escrituras de la
+aplicación (``TareaManager``, el sincronizador y la compresión de descripciones),
+así que las búsquedas solo leen.
+
+El ``id_usuario`` también se indexa como término para que el filtro por usuario se
+resuelva dentro del propio índice. El índice se instala automáticamente al crear la
+tabla ``tarea`` y se elimina antes de borrarla.
+
+Funciones:
+    instalar_busqueda(conexion): Crea los índices, la cola y los triggers si no
+        existen y rellena los índices con las tareas existentes.
+    desinstalar_busqueda(conexion, conservar_indice): Elimina los índices y sus triggers.
+    indexar_pendientes(conexion): Aplica al índice de las descripciones comprimidas
+        los cambios anotados en la cola.
+    preparar_consulta(texto, id_usuario, prefijo): Convierte el texto del usuario en
+        una expresión FTS5 segura.
+"""
+import re
+
+from sqlalchemy import event, text
+
+from src.modelo.modelo import Tarea
+
+TABLA_FTS = "tarea_fts"
+VISTA_CONTENIDO = f"{TABLA_FTS}_contenido"
+TABLA_FTS_COMPRIMIDA = f"{TABLA_FTS}_comprimida"
+VISTA_CONTENIDO_COMPRIMIDA = f"{TABLA_FTS_COMPRIMIDA}_contenido"
+COLA_PENDIENTES = f"{TABLA_FTS}_pendiente"
+
+_TOKENIZADOR = "tokenize='unicode61 remove_diacritics 2'"
+
+_DDL_VISTAS = (
+    f"""
+    CREATE VIEW IF NOT EXISTS {VISTA_CONTENIDO} AS
+    SELECT id_tarea, titulo, descripcion, id_usuario FROM tarea
+    WHERE typeof(descripcion) <> 'blob'
+    """,
+    f"""
+    CREATE VIEW IF NOT EXISTS {VISTA_CONTENIDO_COMPRIMIDA} AS
+    SELECT id_tarea, titulo, descomprimir(descripcion) AS descripcion, id_usuario FROM tarea
+    WHERE typeof(descripcion) = 'blob'
+    """,
+)
+
+_DDL_TABLAS = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_FTS} USING fts5(
+        titulo, descripcion, id_usuario,
+        content='{VISTA_CONTENIDO}', content_rowid='id_tarea', {_TOKENIZADOR}
+    )
+    """,
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_FTS_COMPRIMIDA} USING fts5(
+        titulo, descripcion, id_usuario,
+        content='{VISTA_CONTENIDO_COMPRIMIDA}', content_rowid='id_tarea', {_TOKENIZADOR}
+    )
+    """,
+    # ``orden`` es NULL para añadir la fila al índice y 'delete' para quitarla.
+    f"""
+    CREATE TABLE IF NOT EXISTS {COLA_PENDIENTES} (
+        secuencia INTEGER PRIMARY KEY,
+        orden TEXT,
+        id_tarea INTEGER NOT NULL,
+        titulo TEXT,
+        descripcion BLOB,
+        id_usuario INTEGER
+    )
+    """,
+    f"CREATE INDEX IF NOT EXISTS ix_{COLA_PENDIENTES}_tarea ON {COLA_PENDIENTES}(id_tarea)",
+)
+
+
+def _anadir(fila):
+    """Sentencias que añaden a los índices la fila ``fila`` (``new`` u ``old``)."""
+    return f"""
+        INSERT INTO {TABLA_FTS}(rowid, titulo, descripcion, id_usuario)
+        SELECT {fila}.id_tarea, {fila}.titulo, {fila}.descripcion, {fila}.id_usuario
+        WHERE typeof({fila}.descripcion) <> 'blob';
+        INSERT INTO {COLA_PENDIENTES}(orden, id_tarea, titulo, descripcion, id_usuario)
+        SELECT NULL, {fila}.id_tarea, {fila}.titulo, {fila}.descripcion, {fila}.id_usuario
+        WHERE typeof({fila}.descripcion) = 'blob';
+    """
+
+
+def _quitar(fila):
+    """
+    Sentencias que quitan de los índices la fila ``fila`` con los valores indexados.
+
+    Si la fila comprimida todavía espera en la cola para entrar en el índice, se
+    cancela su alta en lugar de anotar el borrado, así la cola no acumula altas y
+    bajas de filas que nunca llegaron a indexarse.
+    """
+    ultima_alta = f"""
+        SELECT 1 FROM {COLA_PENDIENTES}
+        WHERE secuencia = (SELECT max(secuencia) FROM {COLA_PENDIENTES}
+                           WHERE id_tarea = {fila}.id_tarea)
+          AND orden IS NULL
+    """
+    return f"""
+        INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, titulo, descripcion, id_usuario)
+        SELECT 'delete', {fila}.id_tarea, {fila}.titulo, {fila}.descripcion, {fila}.id_usuario
+        WHERE typeof({fila}.descripcion) <> 'blob';
+        INSERT INTO {COLA_PENDIENTES}(orden, id_tarea, titulo, descripcion, id_usuario)
+        SELECT 'delete', {fila}.id_tarea, {fila}.titulo, {fila}.descripcion, {fila}.id_usuario
+        WHERE typeof({fila}.descripcion) = 'blob' AND NOT EXISTS ({ultima_alta});
+        DELETE FROM {COLA_PENDIENTES}
+        WHERE secuencia = (SELECT max(secuencia) FROM {COLA_PENDIENTES}
+                           WHERE id_tarea = {fila}.id_tarea)
+          AND orden IS NULL AND typeof({fila}.descripcion) = 'blob';
+    """
+
+
+_DDL_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABLA_FTS}_ai AFTER INSERT ON tarea BEGIN
+        {_anadir("new")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABLA_FTS}_ad AFTER DELETE ON tarea BEGIN
+        {_quitar("old")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABLA_FTS}_au
+    AFTER UPDATE OF titulo, descripcion, id_usuario ON tarea BEGIN
+        {_quitar("old")}
+        {_anadir("new")}
+    END
+    """,
+)
+
+
+def instalar_busqueda(conexion):
+    """
+    Crea los índices FTS5, la cola de pendientes y los triggers si todavía no existen.
+
+    Cuando los índices se crean por primera vez sobre una tabla con datos, se
+    reconstruyen a partir de las tareas existentes. Los índices creados por una
+    versión anterior (que leían directamente de ``tarea`` o descomprimían la
+    descripción dentro de los triggers) se eliminan y se vuelven a crear.
+
+    Args:
+        conexion (Connection): Conexión de SQLAlchemy dentro de una transacción.
+    """
+    definiciones = dict(conexion.execute(
+        text("SELECT name, sql FROM sqlite_master WHERE type = 'table' "
+             "AND name IN (:indice, :comprimida)"),
+        {"indice": TABLA_FTS, "comprimida": TABLA_FTS_COMPRIMIDA}
+    ).all())
+    existia = (TABLA_FTS_COMPRIMIDA in definiciones
+               and VISTA_CONTENIDO in definiciones.get(TABLA_FTS, ""))
+    if definiciones and not existia:
+        desinstalar_busqueda(conexion)
+    for ddl in _DDL_VISTAS + _DDL_TABLAS + _DDL_TRIGGERS:
+        conexion.exec_driver_sql(ddl)
+    if not existia:
+        for tabla in (TABLA_FTS, TABLA_FTS_COMPRIMIDA):
+            conexion.exec_driver_sql(f"INSERT INTO {tabla}({tabla}) VALUES ('rebuild')")
+        conexion.exec_driver_sql(f"DELETE FROM {COLA_PENDIENTES}")
+
+
+def desinstalar_busqueda(conexion, conservar_indice=False):
+    """
+    Elimina los índices FTS5, sus triggers, sus vistas de contenido y la cola.
+
+    Args:
+        conexion (Connection): Conexión de SQLAlchemy dentro de una transacción.
+        conservar_indice (bool): Si es True solo se eliminan los triggers y las
+            vistas, de modo que ``instalar_busqueda`` los vuelva a crear sin
+            reconstruir los índices. Sirve para reconstruir ``tarea`` conservando sus
+            filas e IDs.
+    """
+    for sufijo in ("ai", "ad", "au"):
+        conexion.exec_driver_sql(f"DROP TRIGGER IF EXISTS {TABLA_FTS}_{sufijo}")
+    if not conservar_indice:
+        for tabla in (TABLA_FTS, TABLA_FTS_COMPRIMIDA, COLA_PENDIENTES):
+            conexion.exec_driver_sql(f"DROP TABLE IF EXISTS {tabla}")
+    for vista in (VISTA_CONTENIDO, VISTA_CONTENIDO_COMPRIMIDA):
+        conexion.exec_driver_sql(f"DROP VIEW IF EXISTS {vista}")
+
+
+def indexar_pendientes(conexion):
+    """
+    Aplica a ``tarea_fts_comprimida`` los cambios anotados en la cola y la vacía.
+
+    Los cambios se aplican en el orden en que ocurrieron y con los valores que
+    tenía la fila en cada momento, de modo que cada borrado quita del índice
+    exactamente lo que se añadió. Necesita la función ``descomprimir``.
+
+    Args:
+        conexion (Connection): Conexión de SQLAlchemy dentro de una transacción.
+
+    Returns:
+        int: Número de cambios aplicados.
+    """
+    pendientes, ultima = conexion.exec_driver_sql(
+        f"SELECT count(*), max(secuencia) FROM {COLA_PENDIENTES}"
+    ).one()
+    if not pendientes:
+        return 0
+    conexion.exec_driver_sql(
+        f"INSERT INTO {TABLA_FTS_COMPRIMIDA}"
+        f"({TABLA_FTS_COMPRIMIDA}, rowid, titulo, descripcion, id_usuario) "
+        f"SELECT orden, id_tarea, titulo, descomprimir(descripcion), id_usuario "
+        f"FROM {COLA_PENDIENTES} WHERE secuencia <= ? ORDER BY secuencia", (ultima,)
+    )
+    conexion.exec_driver_sql(f"DELETE FROM {COLA_PENDIENTES} WHERE secuencia <= ?", (ultima,))
+    return pendientes
+
+
+def preparar_consulta(texto, id_usuario, prefijo=False):
+    """
+    Convierte el texto escrito por el usuario en una expresión FTS5.
+
+    Cada palabra se entrecomilla para que la sintaxis de FTS5 no se interprete y
+    se busca solo en título y descripción; el usuario se filtra con su propio término.
+
+    Args:
+        texto (str): Texto de búsqueda libre.
+        id_usuario (int): ID del usuario cuyas tareas se buscan.
+        prefijo (bool): Si la última palabra admite prefijos (búsqueda al escribir).
+
+    Returns:
+        str: Expresión MATCH, o cadena vacía si el texto no contiene palabras.
+    """
+    palabras = re.findall(r"\w+", texto or "")
+    if not palabras:
+        return ""
+    terminos = [f'"{palabra}"' for palabra in palabras]
+    if prefijo:
+        terminos[-1] += "*"
+    return f'{{titulo descripcion}}: ({" ".join(terminos)}) AND id_usuario: "{int(id_usuario)}"'
+
+
+def _al_crear_tarea(_tabla, conexion, **_kwargs):
+    instalar_busqueda(conexion)
+
+
+def _antes_de_borrar_tarea(_tabla, conexion, **_kwargs):
+    desinstalar_busqueda(conexion)
+
+
+event.listen(Tarea.__table__, "after_create", _al_crear_tarea)
+event.listen(Tarea.__table__, "before_drop", _antes_de_borrar_tarea)
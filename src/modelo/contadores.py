@@ -0,0 +1,144 @@
+"""
+Contadores de cambios por tabla y usuario, mantenidos por triggers.
+
+La tabla ``contador_cambios`` guarda un contador por cada par (tabla, usuario) que
+los triggers incrementan en cada INSERT, UPDATE y DELETE de ``usuario``,
+``estado``, ``etiqueta``, ``tarea`` y ``tarea_etiqueta``. Los cambios de
+``tarea`` cuentan para su usuario (para los dos si la tarea cambia de dueño), los
+de ``tarea_etiqueta`` para el usuario de la tarea y los de ``usuario`` para el
+propio usuario; ``estado`` y ``etiqueta`` son comunes a todos y cuentan para
+``TODOS`` (0). Comparando los contadores con los leídos antes se sabe qué tablas y
+qué usuarios cambiaron, hayan escrito otra instancia de la aplicación o un script.
+
+La tabla no forma parte de los metadatos del modelo: los triggers de cada tabla se
+instalan al crearla (y con ellos la tabla de contadores si falta) y desaparecen al
+borrarla, mientras que los contadores se conservan.
+
+Attributes:
+    TABLA_CONTADORES (str): Nombre de la tabla de contadores.
+    TODOS (int): Usuario con el que cuentan las tablas comunes a todos.
+    TABLAS_VIGILADAS (tuple[str]): Tablas cuyos cambios se cuentan.
+
+Funciones:
+    instalar_contadores(conexion): Crea la tabla de contadores y los triggers de las
+        tablas vigiladas que existan.
+    desinstalar_contadores(conexion): Elimina los triggers y la tabla de contadores.
+"""
+from sqlalchemy import event
+
+from src.modelo.modelo import Estado, Etiqueta, Tarea, Usuario, tarea_etiqueta
+
+TABLA_CONTADORES = "contador_cambios"
+TODOS = 0
+
+_DDL_TABLA = f"""
+CREATE TABLE IF NOT EXISTS {TABLA_CONTADORES} (
+    tabla TEXT NOT NULL,
+    id_usuario INTEGER NOT NULL,
+    contador INTEGER NOT NULL,
+    PRIMARY KEY (tabla, id_usuario)
+) WITHOUT ROWID
+"""
+
+_INCREMENTAR = f"""
+    INSERT INTO {TABLA_CONTADORES} (tabla, id_usuario, contador) {{origen}}
+    ON CONFLICT (tabla, id_usuario) DO UPDATE SET contador = contador + 1;
+"""
+
+
+def _valores(tabla, usuario):
+    return _INCREMENTAR.format(origen=f"VALUES ('{tabla}', {usuario}, 1)")
+
+
+def _usuario_de_tarea(fila):
+    # Si la tarea ya no existe (borrado en cascada) ya se contó al borrarla.
+    return _INCREMENTAR.format(
+        origen=f"SELECT 'tarea_etiqueta', id_usuario, 1 FROM tarea "
+               f"WHERE id_tarea = {fila}.id_tarea"
+    )
+
+
+# Cuerpo de los triggers AFTER INSERT, AFTER UPDATE y AFTER DELETE de cada tabla.
+_CUERPOS = {
+    "usuario": {
+        "insert": _valores("usuario", "new.id_usuario"),
+        "update": _valores("usuario", "new.id_usuario"),
+        "delete": _valores("usuario", "old.id_usuario"),
+    },
+    "estado": dict.fromkeys(("insert", "update", "delete"), _valores("estado", TODOS)),
+    "etiqueta": dict.fromkeys(("insert", "update", "delete"), _valores("etiqueta", TODOS)),
+    "tarea": {
+        "insert": _valores("tarea", "new.id_usuario"),
+        "update": _valores("tarea", "new.id_usuario") + _INCREMENTAR.format(
+            origen="SELECT 'tarea', old.id_usuario, 1 WHERE old.id_usuario <> new.id_usuario"
+        ),
+        "delete": _valores("tarea", "old.id_usuario"),
+    },
+    "tarea_etiqueta": {
+        "insert": _usuario_de_tarea("new"),
+        "update": _usuario_de_tarea("new"),
+        "delete": _usuario_de_tarea("old"),
+    },
+}
+
+TABLAS_VIGILADAS = tuple(_CUERPOS)
+
+
+def _triggers(tabla):
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {TABLA_CONTADORES}_{tabla}_{operacion} "
+        f"AFTER {operacion.upper()} ON {tabla} BEGIN {cuerpo} END"
+        for operacion, cuerpo in _CUERPOS[tabla].items()
+    ]
+
+
+def _instalar_tabla(conexion, tabla):
+    conexion.exec_driver_sql(_DDL_TABLA)
+    for ddl in _triggers(tabla):
+        conexion.exec_driver_sql(ddl)
+
+
+def instalar_contadores(conexion):
+    """
+    Crea la tabla de contadores y los triggers de las tablas vigiladas que existan.
+
+    Se puede ejecutar varias veces: solo crea lo que falta.
+
+    Args:
+        conexion (Connection): Conexión de SQLAlchemy dentro de una transacción.
+
+    Returns:
+        int: Número de tablas vigiladas que tienen sus triggers.
+    """
+    existentes = set(conexion.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    ).scalars())
+    conexion.exec_driver_sql(_DDL_TABLA)
+    vigiladas = [tabla for tabla in TABLAS_VIGILADAS if tabla in existentes]
+    for tabla in vigiladas:
+        _instalar_tabla(conexion, tabla)
+    return len(vigiladas)
+
+
+def desinstalar_contadores(conexion):
+    """
+    Elimina los triggers de las tablas vigiladas y la tabla de contadores.
+
+    Args:
+        conexion (Connection): Conexión de SQLAlchemy dentro de una transacción.
+    """
+    for tabla in TABLAS_VIGILADAS:
+        for operacion in _CUERPOS[tabla]:
+            conexion.exec_driver_sql(
+                f"DROP TRIGGER IF EXISTS {TABLA_CONTADORES}_{tabla}_{operacion}"
+            )
+    conexion.exec_driver_sql(f"DROP TABLE IF EXISTS {TABLA_CONTADORES}")
+
+
+def _al_crear(tabla, conexion, **_kwargs):
+    _instalar_tabla(conexion, tabla.name)
+
+
+for _tabla in (Usuario.__table__, Estado.__table__, Etiqueta.__table__, Tarea.__table__,
+               tarea_etiqueta):
+    event.listen(_tabla, "after_create", _al_crear)
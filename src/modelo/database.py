@@ -1,24 +1,273 @@
 """
 Módulo para la configuración de la base de datos y la creación de tablas.
 
-Este módulo configura la conexión a la base de datos SQLite, crea las tablas
-definidas en el modelo
+Este módulo construye el motor de conexión a la base de datos SQLite a partir de
+la configuración recibida o de variables de entorno, aplica los PRAGMAs de
+rendimiento en cada conexión nueva y crea las tablas definidas en el modelo.
+
+Importar el módulo no abre la base de datos: el motor de la aplicación se crea la
+primera vez que se usa ``engine`` o se abre una sesión con ``Session``. En ese
+momento se lee ``PRAGMA user_version`` y, solo si no coincide con
+``VERSION_ESQUEMA``, se crea el esquema o se aplican las migraciones pendientes
+(véase ``src.modelo.migraciones``); en el resto de los arranques el esquema se da
+por bueno con esa única lectura.
+
+Variables de entorno reconocidas:
+    TODOLIST_DB_URL: URL de conexión (por defecto ``tasks.db`` en la raíz del proyecto).
+    TODOLIST_DB_PERFIL: Perfil de PRAGMAs a usar ('optimizado' o 'basico').
+    TODOLIST_DB_ECHO: Si es '1' o 'true', registra cada sentencia SQL.
+    TODOLIST_DB_JOURNAL_MODE, TODOLIST_DB_SYNCHRONOUS, TODOLIST_DB_BUSY_TIMEOUT,
+    TODOLIST_DB_MMAP_SIZE, TODOLIST_DB_CACHE_SIZE, TODOLIST_DB_TEMP_STORE:
+        Sobrescriben el PRAGMA correspondiente del perfil.
+    TODOLIST_DB_POOL_SIZE, TODOLIST_DB_MAX_OVERFLOW, TODOLIST_DB_POOL_TIMEOUT:
+        Dimensionan el pool de conexiones para el uso desde varios hilos.
 
 Attributes:
-    engine (Engine): Motor de conexión a la base de datos SQLite.
+    PERFILES (dict): PRAGMAs aplicados por cada perfil de configuración.
+    PRAGMAS_OBLIGATORIOS (dict): PRAGMAs aplicados siempre, además de los del perfil.
+    PRAGMAS_INICIALES (dict): PRAGMAs aplicados siempre, antes que los del perfil.
+    VERSION_ESQUEMA (int): Versión del esquema que se guarda en ``PRAGMA user_version``
+        (la de la última migración).
+    engine (Engine): Motor de conexión a la base de datos SQLite (se crea al usarlo).
     Session (sessionmaker): Fábrica de sesiones para interactuar con la base de datos.
 
 """
-from sqlalchemy import create_engine
+import os
+import threading
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
-from src.modelo.declarative_base import Base
+from src.modelo.declarative_base import Base  # pylint: disable=unused-import
 from src.modelo import modelo  # pylint: disable=unused-import
+from src.modelo.migraciones import VERSION_ESQUEMA, aplicar_migraciones
+from src.modelo.tipos import registrar_funciones
+
+RUTA_BD_POR_DEFECTO = Path(__file__).resolve().parents[2] / "tasks.db"
+
+# PRAGMAs que se aplican siempre, con cualquier perfil: el modelo depende de ellos.
+PRAGMAS_OBLIGATORIOS = {"foreign_keys": "ON"}
+
+# Se aplican antes que los del perfil: auto_vacuum solo tiene efecto en una base de
+# datos vacía, y journal_mode=WAL ya la inicializa. Las que existían antes se
+# convierten en su migración (véase ``src.modelo.migraciones``).
+PRAGMAS_INICIALES = {"auto_vacuum": "INCREMENTAL"}
+
+# PRAGMAs por perfil. El perfil 'basico' conserva el comportamiento por defecto de SQLite.
+PERFILES = {
+    "basico": {},
+    "optimizado": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 268435456,
+        "cache_size": -65536,
+        "temp_store": "MEMORY",
+    },
+}
+
+_PRAGMAS_ENTORNO = {
+    "journal_mode": "TODOLIST_DB_JOURNAL_MODE",
+    "synchronous": "TODOLIST_DB_SYNCHRONOUS",
+    "busy_timeout": "TODOLIST_DB_BUSY_TIMEOUT",
+    "mmap_size": "TODOLIST_DB_MMAP_SIZE",
+    "cache_size": "TODOLIST_DB_CACHE_SIZE",
+    "temp_store": "TODOLIST_DB_TEMP_STORE",
+}
+
+_POOL_ENTORNO = {
+    "pool_size": "TODOLIST_DB_POOL_SIZE",
+    "max_overflow": "TODOLIST_DB_MAX_OVERFLOW",
+    "pool_timeout": "TODOLIST_DB_POOL_TIMEOUT",
+}
+
+
+def _es_verdadero(valor):
+    """Interpreta una cadena de configuración como booleano."""
+    return str(valor).strip().lower() in {"1", "true", "si", "sí", "yes", "on"}
+
+
+def cargar_configuracion(url=None, perfil=None, echo=None, pragmas=None, pool=None):
+    """
+    Combina la configuración explícita con las variables de entorno.
+
+    Los argumentos recibidos tienen prioridad sobre las variables de entorno, y
+    éstas sobre los valores por defecto del perfil.
+
+    Args:
+        url (str, optional): URL de conexión a la base de datos.
+        perfil (str, optional): Nombre del perfil de PRAGMAs ('optimizado' o 'basico').
+        echo (bool, optional): Si se deben registrar las sentencias SQL.
+        pragmas (dict, optional): PRAGMAs que sobrescriben los del perfil.
+        pool (dict, optional): Opciones del pool (pool_size, max_overflow, pool_timeout).
+
+    Returns:
+        dict: Configuración con las claves 'url', 'echo', 'pragmas' y 'pool'.
+
+    Raises:
+        ValueError: Si el perfil indicado no existe.
+    """
+    perfil = perfil or os.environ.get("TODOLIST_DB_PERFIL", "optimizado")
+    if perfil not in PERFILES:
+        raise ValueError(f"Perfil de base de datos desconocido: '{perfil}'.")
+
+    pragmas_finales = dict(PERFILES[perfil])
+    for nombre, variable in _PRAGMAS_ENTORNO.items():
+        if variable in os.environ:
+            pragmas_finales[nombre] = os.environ[variable]
+    pragmas_finales.update(pragmas or {})
+
+    pool_final = {
+        nombre: int(os.environ[variable])
+        for nombre, variable in _POOL_ENTORNO.items()
+        if variable in os.environ
+    }
+    pool_final.update(pool or {})
+
+    if echo is None:
+        echo = _es_verdadero(os.environ.get("TODOLIST_DB_ECHO", "0"))
+
+    return {
+        "url": url or os.environ.get("TODOLIST_DB_URL", f"sqlite:///{RUTA_BD_POR_DEFECTO}"),
+        "echo": echo,
+        "pragmas": pragmas_finales,
+        "pool": pool_final,
+    }
+
+
+def aplicar_pragmas(conexion_dbapi, pragmas):
+    """
+    Ejecuta los PRAGMAs indicados sobre una conexión DBAPI de sqlite3.
+
+    Args:
+        conexion_dbapi (sqlite3.Connection): Conexión recién abierta.
+        pragmas (dict): PRAGMAs a aplicar, en el orden en que se definieron.
+    """
+    cursor = conexion_dbapi.cursor()
+    try:
+        for nombre, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nombre}={valor}")
+    finally:
+        cursor.close()
+
+
+def crear_motor(url=None, perfil=None, echo=None, pragmas=None, pool=None):
+    """
+    Crea un motor de SQLAlchemy configurado para SQLite.
+
+    Cada conexión nueva recibe los PRAGMAs del perfil (WAL, ``synchronous``,
+    ``busy_timeout``, ``mmap_size``, ``cache_size`` y ``temp_store``), las funciones
+    SQL propias del modelo (``descomprimir``, ``resumir``) y, sea cual sea el perfil,
+    ``foreign_keys=ON`` para que se cumplan las claves foráneas y sus borrados en
+    cascada y ``auto_vacuum=INCREMENTAL`` para que la purga de la papelera pueda
+    devolver al sistema las páginas que libera. Para bases de
+    datos en archivo se usa un pool de conexiones dimensionable, apto para varios hilos.
+
+    Args:
+        url (str, optional): URL de conexión a la base de datos.
+        perfil (str, optional): Nombre del perfil de PRAGMAs ('optimizado' o 'basico').
+        echo (bool, optional): Si se deben registrar las sentencias SQL.
+        pragmas (dict, optional): PRAGMAs que sobrescriben los del perfil.
+        pool (dict, optional): Opciones del pool (pool_size, max_overflow, pool_timeout).
+
+    Returns:
+        Engine: Motor de conexión listo para usarse.
+    """
+    configuracion = cargar_configuracion(url, perfil, echo, pragmas, pool)
+    url_bd = make_url(configuracion["url"])
+
+    opciones = {"echo": configuracion["echo"]}
+    en_memoria = url_bd.database in (None, "", ":memory:")
+    if not en_memoria:
+        opciones.update(configuracion["pool"])
+
+    motor = create_engine(url_bd, **opciones)
+
+    pragmas_motor = configuracion["pragmas"]
+
+    @event.listens_for(motor, "connect")
+    def _al_conectar(conexion_dbapi, _registro):
+        # SQLAlchemy controla las transacciones; pysqlite no debe abrirlas por su cuenta
+        # para que los SAVEPOINT (session.begin_nested) funcionen correctamente.
+        conexion_dbapi.isolation_level = None
+        aplicar_pragmas(
+            conexion_dbapi, {**PRAGMAS_INICIALES, **pragmas_motor, **PRAGMAS_OBLIGATORIOS}
+        )
+        registrar_funciones(conexion_dbapi)
+
+    # Una sesión que solo lee debe terminar su transacción (commit, rollback o close):
+    # mientras sigue abierta retiene el bloqueo compartido, que en modo rollback
+    # journal impide confirmar a otros procesos y con WAL detiene los checkpoints.
+    @event.listens_for(motor, "begin")
+    def _al_iniciar(conexion):
+        conexion.exec_driver_sql("BEGIN")
+
+    return motor
+
+
+def _informar_progreso(migracion, procesadas):
+    """Muestra el avance de una migración durante el arranque."""
+    if procesadas:
+        print(f"Migración {migracion.version} ({migracion.descripcion}): {procesadas} filas")
+    else:
+        print(f"Aplicando la migración {migracion.version}: {migracion.descripcion}...")
+
+
+def preparar_esquema(motor):
+    """
+    Crea el esquema o aplica las migraciones pendientes si la marca de versión no está al día.
+
+    Args:
+        motor (Engine): Motor de la base de datos que se va a usar.
+
+    Returns:
+        bool: True si se ejecutó DDL o alguna migración, False si el esquema ya
+        estaba al día.
+    """
+    with motor.connect() as conexion:
+        if conexion.exec_driver_sql("PRAGMA user_version").scalar() == VERSION_ESQUEMA:
+            return False
+    aplicar_migraciones(motor, _informar_progreso)
+    return True
+
+
+_motor_aplicacion = None
+_cerrojo_motor = threading.Lock()
+
+
+def obtener_motor():
+    """
+    Devuelve el motor de la aplicación, creándolo y preparando el esquema la primera vez.
+
+    Returns:
+        Engine: Motor configurado con ``crear_motor()``.
+    """
+    global _motor_aplicacion  # pylint: disable=global-statement
+    if _motor_aplicacion is None:
+        with _cerrojo_motor:
+            if _motor_aplicacion is None:
+                motor = crear_motor()
+                preparar_esquema(motor)
+                _motor_aplicacion = motor
+    return _motor_aplicacion
+
+
+class _FabricaSesiones(sessionmaker):  # pylint: disable=too-few-public-methods
+    """sessionmaker que se vincula al motor de la aplicación al abrir la primera sesión."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None and "bind" not in local_kw:
+            self.configure(bind=obtener_motor())
+        return super().__call__(**local_kw)
 
-# Crea la base de datos SQLite (ruta absoluta o relativa)
-engine = create_engine('sqlite:///D:/TODOLIST/ToDoList/tasks.db', echo=True)
 
 # Sesión
-Session = sessionmaker(bind=engine)
+Session = _FabricaSesiones()
+
 
-# Crea todas las tablas definidas en el modelo
-Base.metadata.create_all(engine)
+def __getattr__(nombre):
+    # ``engine`` se resuelve al primer acceso para que importar el módulo no abra la base.
+    if nombre == "engine":
+        return obtener_motor()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
@@ -0,0 +1,173 @@
+"""
+Diario de cambios de solo inserción, mantenido por triggers.
+
+Cada INSERT, UPDATE y DELETE de ``usuario``, ``estado``, ``etiqueta`` y ``tarea``
+añade una entrada a ``diario_cambios`` con la entidad, su ID, la operación ('I', 'U'
+o 'D') y el usuario al que afecta, numerada con una secuencia que solo crece
+(``AUTOINCREMENT``: los números no se reutilizan aunque se borren entradas). Asignar
+o quitar etiquetas se anota como una 'U' de la tarea, y moverla a la papelera o
+sacarla de ella, como una 'D' o una 'I'. Si una tarea cambia de usuario se anota una
+'D' para el anterior y después la 'U' para el nuevo;
+``estado`` y ``etiqueta`` son comunes y se anotan para ``TODOS`` (0).
+
+Quien guarde la última secuencia que leyó puede pedir solo lo que cambió después
+(véase ``src.logica.diario_manager``) en lugar de volver a leer tablas enteras.
+
+La tabla no forma parte de los metadatos del modelo: los triggers de cada tabla se
+instalan al crearla (y con ellos el diario si falta) y desaparecen al borrarla.
+
+Attributes:
+    TABLA_DIARIO (str): Nombre de la tabla del diario.
+    TABLAS_DIARIO (tuple[str]): Tablas cuyos cambios se anotan.
+
+Funciones:
+    instalar_diario(conexion): Crea el diario y los triggers de las tablas anotadas
+        que existan.
+    nombre_trigger(tabla, operacion): Nombre del trigger de una tabla y operación.
+    desinstalar_diario(conexion): Elimina los triggers y el diario.
+"""
+from sqlalchemy import event
+
+from src.modelo.contadores import TODOS
+from src.modelo.modelo import Estado, Etiqueta, Tarea, Usuario, tarea_etiqueta
+
+TABLA_DIARIO = "diario_cambios"
+
+_DDL_TABLA = f"""
+CREATE TABLE IF NOT EXISTS {TABLA_DIARIO} (
+    secuencia INTEGER PRIMARY KEY AUTOINCREMENT,
+    entidad TEXT NOT NULL,
+    id_entidad INTEGER NOT NULL,
+    operacion TEXT NOT NULL CHECK (operacion IN ('I', 'U', 'D')),
+    id_usuario INTEGER NOT NULL
+)
+"""
+
+_ANOTAR = (
+    f"INSERT INTO {TABLA_DIARIO} (entidad, id_entidad, operacion, id_usuario) {{origen}};"
+)
+
+
+def _anotar(entidad, fila, clave, operacion, usuario):
+    return _ANOTAR.format(
+        origen=f"VALUES ('{entidad}', {fila}.{clave}, '{operacion}', {usuario})"
+    )
+
+
+def _por_operacion(entidad, clave, usuario):
+    """Cuerpos de una tabla cuyas filas afectan siempre al mismo usuario."""
+    return {
+        "insert": _anotar(entidad, "new", clave, "I", usuario("new")),
+        "update": _anotar(entidad, "new", clave, "U", usuario("new")),
+        "delete": _anotar(entidad, "old", clave, "D", usuario("old")),
+    }
+
+
+def _tarea_de(fila):
+    # Si la tarea ya no existe (borrado en cascada) su 'D' ya está anotada.
+    return _ANOTAR.format(
+        origen=f"SELECT 'tarea', id_tarea, 'U', id_usuario FROM tarea "
+               f"WHERE id_tarea = {fila}.id_tarea"
+    )
+
+
+# Cuerpo de los triggers AFTER INSERT, AFTER UPDATE y AFTER DELETE de cada tabla.
+_CUERPOS = {
+    "usuario": _por_operacion("usuario", "id_usuario", lambda fila: f"{fila}.id_usuario"),
+    "estado": _por_operacion("estado", "id_estado", lambda fila: TODOS),
+    "etiqueta": _por_operacion("etiqueta", "id_etiqueta", lambda fila: TODOS),
+    "tarea": {
+        "insert": _anotar("tarea", "new", "id_tarea", "I", "new.id_usuario"),
+        # Para el usuario anterior la tarea desaparece; la 'D' va antes que la 'U'
+        # para que, aplicadas en orden, la tarea quede con su usuario actual. Mover la
+        # tarea a la papelera se anota como una 'D' y sacarla de ella como una 'I'.
+        "update": _ANOTAR.format(
+            origen="SELECT 'tarea', old.id_tarea, 'D', old.id_usuario "
+                   "WHERE old.id_usuario <> new.id_usuario"
+        ) + _ANOTAR.format(
+            origen="SELECT 'tarea', new.id_tarea, CASE WHEN new.borrado_en IS NOT NULL "
+                   "THEN 'D' WHEN old.borrado_en IS NOT NULL THEN 'I' ELSE 'U' END, "
+                   "new.id_usuario"
+        ),
+        "delete": _anotar("tarea", "old", "id_tarea", "D", "old.id_usuario"),
+    },
+    "tarea_etiqueta": {
+        "insert": _tarea_de("new"),
+        "update": _tarea_de("new"),
+        "delete": _tarea_de("old"),
+    },
+}
+
+TABLAS_DIARIO = tuple(_CUERPOS)
+
+
+def nombre_trigger(tabla, operacion):
+    """
+    Nombre del trigger que anota una operación de una tabla.
+
+    Args:
+        tabla (str): Tabla anotada.
+        operacion (str): 'insert', 'update' o 'delete'.
+
+    Returns:
+        str: Nombre del trigger.
+    """
+    return f"{TABLA_DIARIO}_{tabla}_{operacion}"
+
+
+def _triggers(tabla):
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {nombre_trigger(tabla, operacion)} "
+        f"AFTER {operacion.upper()} ON {tabla} BEGIN {cuerpo} END"
+        for operacion, cuerpo in _CUERPOS[tabla].items()
+    ]
+
+
+def _instalar_tabla(conexion, tabla):
+    conexion.exec_driver_sql(_DDL_TABLA)
+    for ddl in _triggers(tabla):
+        conexion.exec_driver_sql(ddl)
+
+
+def instalar_diario(conexion):
+    """
+    Crea el diario de cambios y los triggers de las tablas anotadas que existan.
+
+    Se puede ejecutar varias veces: solo crea lo que falta.
+
+    Args:
+        conexion (Connection): Conexión de SQLAlchemy dentro de una transacción.
+
+    Returns:
+        int: Número de tablas anotadas que tienen sus triggers.
+    """
+    existentes = set(conexion.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    ).scalars())
+    conexion.exec_driver_sql(_DDL_TABLA)
+    anotadas = [tabla for tabla in TABLAS_DIARIO if tabla in existentes]
+    for tabla in anotadas:
+        _instalar_tabla(conexion, tabla)
+    return len(anotadas)
+
+
+def desinstalar_diario(conexion):
+    """
+    Elimina los triggers de las tablas anotadas y el diario de cambios.
+
+    Args:
+        conexion (Connection): Conexión de SQLAlchemy dentro de una transacción.
+    """
+    for tabla in TABLAS_DIARIO:
+        for operacion in _CUERPOS[tabla]:
+            conexion.exec_driver_sql(f"DROP TRIGGER IF EXISTS {nombre_trigger(tabla, operacion)}")
+    conexion.exec_driver_sql(f"DROP TABLE IF EXISTS {TABLA_DIARIO}")
+
+
+def _al_crear(tabla, conexion, **_kwargs):
+    _instalar_tabla(conexion, tabla.name)
+
+
+for _tabla in (Usuario.__table__, Estado.__table__, Etiqueta.__table__, Tarea.__table__,
+               tarea_etiqueta):
+    event.listen(_tabla, "after_create", _al_crear)
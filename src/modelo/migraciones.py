@@ -0,0 +1,605 @@
+"""
+Migraciones versionadas del esquema y de los datos de la base de datos.
+
+Cada migración tiene un número de versión y ``PRAGMA user_version`` guarda la última
+aplicada. Al abrir una base de datos con una versión anterior a ``VERSION_ESQUEMA``
+se aplican en orden las migraciones pendientes, marcando la versión al terminar cada
+una. Una base de datos nueva no pasa por ellas: se crea con el esquema actual y se
+marca directamente con la última versión.
+
+Las migraciones que reescriben datos trabajan por lotes, cada uno en su propia
+transacción, informan del progreso tras cada lote y solo tocan las filas que siguen
+pendientes. Si se interrumpen, la versión no se marca y la siguiente ejecución
+continúa donde se quedaron. Las que cambian la estructura de una tabla la
+reconstruyen en una única transacción. Los índices nuevos y el índice de búsqueda se
+crean en la última migración, después de reescribir los datos, para no mantenerlos
+fila a fila durante las conversiones.
+
+Para añadir una migración se escribe una función ``(motor, progreso)`` y se añade al
+final de ``MIGRACIONES`` con la versión siguiente; ``VERSION_ESQUEMA`` la sigue sola.
+
+Clases:
+    Migracion: Versión, descripción y función de una migración.
+
+Funciones:
+    version_actual(motor): Versión guardada en la base de datos.
+    aplicar_migraciones(motor, progreso): Crea el esquema o aplica las migraciones
+        pendientes.
+    crear_tablas(motor, progreso): Crea las tablas del modelo que falten.
+    comprimir_descripciones(motor, progreso, tamano_lote): Comprime las descripciones
+        largas guardadas como texto.
+    convertir_fechas(motor, progreso, tamano_lote): Convierte a enteros las fechas
+        guardadas como texto.
+    reconstruir_claves_foraneas(motor, progreso): Añade ``ON DELETE CASCADE`` a las
+        claves foráneas de ``tarea`` y ``tarea_etiqueta``.
+    completar_indices(motor, progreso): Crea los índices y el índice de búsqueda que
+        falten.
+    anadir_versiones(motor, progreso): Añade la columna ``version`` de la concurrencia
+        optimista.
+    crear_contadores(motor, progreso): Instala los contadores de cambios por tabla y
+        usuario.
+    crear_diario(motor, progreso): Instala el diario de cambios.
+    preparar_sincronizacion(motor, progreso): Añade la clave global y la hora de
+        modificación de las tareas y las lápidas de las borradas.
+    preparar_papelera(motor, progreso): Añade la papelera de tareas y activa
+        ``auto_vacuum=INCREMENTAL``.
+    separar_busqueda_comprimida(motor, progreso): Reinstala la búsqueda de texto
+        completo con un índice aparte para las descripciones comprimidas.
+"""
+from collections import namedtuple
+
+from sqlalchemy import (
+    Integer, LargeBinary, bindparam, case, cast, column, func, literal, or_, select, table,
+    update
+)
+from sqlalchemy.schema import CreateColumn, CreateTable
+from sqlalchemy.sql.expression import ColumnClause
+from sqlalchemy.sql.visitors import iterate
+
+from src.modelo.busqueda import (
+    COLA_PENDIENTES, TABLA_FTS, desinstalar_busqueda, indexar_pendientes, instalar_busqueda
+)
+from src.modelo.contadores import instalar_contadores
+from src.modelo.diario import instalar_diario, nombre_trigger as trigger_diario
+from src.modelo.sincronizacion import (
+    instalar_sincronizacion, nombre_trigger as trigger_sincronizacion
+)
+from src.modelo.declarative_base import Base
+from src.modelo.modelo import Tarea, tarea_etiqueta
+from src.modelo.tipos import MICROSEGUNDOS, UMBRAL_COMPRESION, TextoComprimido
+
+Migracion = namedtuple("Migracion", ["version", "descripcion", "aplicar"])
+
+LOTE_DESCRIPCIONES = 500
+LOTE_FECHAS = 5000
+
+
+def _sin_progreso(_procesadas):
+    """Progreso por defecto: no informa de nada."""
+
+
+def version_actual(motor):
+    """
+    Lee la versión del esquema guardada en la base de datos.
+
+    Args:
+        motor (Engine): Motor de la base de datos.
+
+    Returns:
+        int: Valor de ``PRAGMA user_version`` (0 en una base sin marcar).
+    """
+    with motor.connect() as conexion:
+        return conexion.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def _marcar_version(motor, version):
+    with motor.begin() as conexion:
+        conexion.exec_driver_sql(f"PRAGMA user_version={int(version)}")
+
+
+def crear_tablas(motor, progreso=_sin_progreso):
+    """
+    Crea las tablas del modelo que todavía no existen, con sus índices.
+
+    Args:
+        motor (Engine): Motor de la base de datos.
+        progreso (Callable[[int], None]): Recibe el número de tablas creadas.
+    """
+    with motor.connect() as conexion:
+        existentes = set(conexion.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        ).scalars())
+    Base.metadata.create_all(motor)
+    progreso(len([t for t in Base.metadata.sorted_tables if t.name not in existentes]))
+
+
+def comprimir_descripciones(motor, progreso=_sin_progreso, tamano_lote=LOTE_DESCRIPCIONES):
+    """
+    Comprime por lotes las descripciones de texto que alcanzan el umbral.
+
+    Las tareas creadas antes de TextoComprimido guardan toda la descripción como
+    texto; se vuelven a escribir a través del tipo de la columna, que las guarda
+    comprimidas. Las ya comprimidas (BLOB) no se tocan. Si el índice de búsqueda ya
+    existe, cada lote indexa también las descripciones que acaba de comprimir.
+
+    Args:
+        motor (Engine): Motor de la base de datos.
+        progreso (Callable[[int], None]): Recibe el total reescrito tras cada lote.
+        tamano_lote (int): Número de tareas reescritas por transacción.
+
+    Returns:
+        int: Número de descripciones reescritas.
+    """
+    tabla = Tarea.__table__
+    pendientes = (
+        select(tabla.c.id_tarea, tabla.c.descripcion)
+        .where(
+            tabla.c.id_tarea > bindparam("ultimo"),
+            func.typeof(tabla.c.descripcion) == "text",
+            func.length(cast(tabla.c.descripcion, LargeBinary)) >= UMBRAL_COMPRESION,
+        )
+        .order_by(Tarea.id_tarea)
+        .limit(tamano_lote)
+    )
+    # Sin los valores por defecto del modelo: ``modificado_en`` aún no existe.
+    descripciones = table("tarea", column("id_tarea"), column("descripcion", TextoComprimido))
+    reescritura = (
+        update(descripciones)
+        .where(descripciones.c.id_tarea == bindparam("id"))
+        .values(descripcion=bindparam("texto"))
+    )
+
+    with motor.connect() as conexion:
+        indexar = conexion.exec_driver_sql(
+            f"SELECT count(*) FROM sqlite_master WHERE name = '{COLA_PENDIENTES}'"
+        ).scalar() > 0
+    total = 0
+    ultimo = 0
+    while True:
+        with motor.begin() as conexion:
+            lote = conexion.execute(pendientes, {"ultimo": ultimo}).all()
+            if not lote:
+                return total
+            conexion.execute(reescritura, [{"id": fila[0], "texto": fila[1]} for fila in lote])
+            if indexar:
+                indexar_pendientes(conexion)
+        total += len(lote)
+        ultimo = lote[-1][0]
+        progreso(total)
+
+
+# Vista sin tipos de la tabla: los valores se leen y escriben tal como están guardados.
+_TAREA = table("tarea", column("id_tarea"), column("fecha_creacion"), column("fecha_vencimiento"))
+_FECHAS = (_TAREA.c.fecha_creacion, _TAREA.c.fecha_vencimiento)
+
+
+def _a_epoch(columna):
+    """Expresión que convierte una fecha guardada como texto en microsegundos UTC."""
+    # La fracción se separa antes: strftime redondea a milisegundos y podría sumar un segundo.
+    segundos = cast(func.strftime("%s", func.substr(columna, 1, 19), "utc"), Integer)
+    microsegundos = cast(func.substr(columna.op("||")(literal(".000000")), 21, 6), Integer)
+    return case(
+        (func.typeof(columna) == "text", segundos * MICROSEGUNDOS + microsegundos),
+        else_=columna
+    )
+
+
+def convertir_fechas(motor, progreso=_sin_progreso, tamano_lote=LOTE_FECHAS):
+    """
+    Convierte por lotes a FechaEpoch las fechas de las tareas guardadas como texto.
+
+    Las versiones anteriores guardan 'AAAA-MM-DD HH:MM:SS.ffffff' en hora local. La
+    conversión se hace en SQL con ``strftime('%s', fecha, 'utc')``, que interpreta el
+    texto en la hora local del sistema igual que FechaEpoch.
+
+    Args:
+        motor (Engine): Motor de la base de datos.
+        progreso (Callable[[int], None]): Recibe el total convertido tras cada lote.
+        tamano_lote (int): Número de tareas convertidas por transacción.
+
+    Returns:
+        int: Número de tareas con alguna fecha convertida.
+    """
+    pendientes = (
+        select(_TAREA.c.id_tarea)
+        .where(
+            _TAREA.c.id_tarea > bindparam("ultimo"),
+            or_(*(func.typeof(columna) == "text" for columna in _FECHAS)),
+        )
+        .order_by(_TAREA.c.id_tarea)
+        .limit(tamano_lote)
+    )
+    conversion = (
+        update(_TAREA)
+        .where(_TAREA.c.id_tarea.between(bindparam("desde"), bindparam("hasta")))
+        .values({columna.name: _a_epoch(columna) for columna in _FECHAS})
+    )
+
+    total = 0
+    ultimo = 0
+    while True:
+        with motor.begin() as conexion:
+            ids = conexion.execute(pendientes, {"ultimo": ultimo}).scalars().all()
+            if not ids:
+                return total
+            conexion.execute(conversion, {"desde": ids[0], "hasta": ids[-1]})
+        total += len(ids)
+        ultimo = ids[-1]
+        progreso(total)
+
+
+_TABLAS_CON_CASCADA = (Tarea.__table__, tarea_etiqueta)
+
+
+def _claves_actuales(conexion, tabla):
+    filas = conexion.exec_driver_sql(f"PRAGMA foreign_key_list({tabla.name})").all()
+    # Columnas de foreign_key_list: id, seq, table, from, to, on_update, on_delete, match
+    return {fila[3]: fila[6].upper() for fila in filas}
+
+
+def _claves_modelo(tabla):
+    return {
+        clave.parent.name: (clave.ondelete or "NO ACTION").upper()
+        for clave in tabla.foreign_keys
+    }
+
+
+def _columnas(conexion, nombre, generadas=False):
+    # Columnas de table_info: cid, name, type, notnull, dflt_value, pk. table_xinfo
+    # incluye además las columnas generadas, que no admiten INSERT.
+    pragma = "table_xinfo" if generadas else "table_info"
+    return {fila[1] for fila in conexion.exec_driver_sql(f"PRAGMA {pragma}({nombre})")}
+
+
+def _columnas_indice(indice):
+    """Columnas de un índice y, si es parcial, las de su condición WHERE."""
+    condicion = indice.dialect_options["sqlite"]["where"]
+    extra = [] if condicion is None else [
+        elemento for elemento in iterate(condicion) if isinstance(elemento, ColumnClause)
+    ]
+    return {c.name for c in (*indice.columns, *extra)}
+
+
+def _reconstruir(conexion, tabla):
+    """Reconstruye una tabla con la definición del modelo conservando sus filas."""
+    nueva = f"{tabla.name}_nueva"
+    ddl = str(CreateTable(tabla).compile(dialect=conexion.dialect))
+    conexion.exec_driver_sql(
+        ddl.replace(f"CREATE TABLE {tabla.name} ", f"CREATE TABLE {nueva} ", 1)
+    )
+    # Las columnas añadidas por migraciones posteriores toman su valor por defecto.
+    existentes = _columnas(conexion, tabla.name)
+    columnas = ", ".join(
+        c.name for c in tabla.columns if c.name in existentes and c.computed is None
+    )
+    filas = conexion.exec_driver_sql(
+        f"INSERT INTO {nueva} ({columnas}) SELECT {columnas} FROM {tabla.name}"
+    ).rowcount
+    conexion.exec_driver_sql(f"DROP TABLE {tabla.name}")
+    conexion.exec_driver_sql(f"ALTER TABLE {nueva} RENAME TO {tabla.name}")
+    for indice in tabla.indexes:
+        indice.create(conexion)
+    return filas
+
+
+def reconstruir_claves_foraneas(motor, progreso=_sin_progreso):
+    """
+    Reconstruye ``tarea`` y ``tarea_etiqueta`` si sus claves foráneas no son las del modelo.
+
+    SQLite no permite modificar las claves foráneas de una tabla, así que se sigue su
+    procedimiento de reconstrucción: con ``foreign_keys=OFF`` y en una única
+    transacción se crea la tabla nueva, se copian las filas, se borra la antigua, se
+    renombra la nueva y se recrean sus índices. Antes de confirmar se comprueba con
+    ``PRAGMA foreign_key_check`` que no haya filas huérfanas. Las filas conservan sus
+    IDs, así que un índice de búsqueda existente se mantiene y solo se recrean sus
+    triggers y su vista; si no existía lo crea ``completar_indices``. Debe ejecutarse
+    después de ``convertir_fechas``, porque la tabla reconstruida declara las fechas
+    como INTEGER.
+
+    Args:
+        motor (Engine): Motor de la base de datos.
+        progreso (Callable[[int], None]): Recibe el total de filas copiadas tras cada tabla.
+
+    Returns:
+        list[str]: Nombres de las tablas reconstruidas.
+
+    Raises:
+        RuntimeError: Si tras la reconstrucción hay filas que incumplen las claves
+            foráneas; en ese caso no se aplica ningún cambio.
+    """
+    with motor.connect() as conexion:
+        pendientes = [
+            tabla for tabla in _TABLAS_CON_CASCADA
+            if _claves_actuales(conexion, tabla) != _claves_modelo(tabla)
+        ]
+        conexion.rollback()
+        if not pendientes:
+            return []
+
+        # foreign_keys solo se puede cambiar fuera de una transacción.
+        conexion_dbapi = conexion.connection.dbapi_connection
+        conexion_dbapi.execute("PRAGMA foreign_keys=OFF")
+        try:
+            with conexion.begin():
+                tenia_busqueda = conexion.exec_driver_sql(
+                    f"SELECT count(*) FROM sqlite_master WHERE name = '{TABLA_FTS}'"
+                ).scalar() > 0
+                desinstalar_busqueda(conexion, conservar_indice=True)
+                copiadas = 0
+                for tabla in pendientes:
+                    copiadas += _reconstruir(conexion, tabla)
+                    progreso(copiadas)
+                huerfanas = conexion.exec_driver_sql("PRAGMA foreign_key_check").all()
+                if huerfanas:
+                    raise RuntimeError(
+                        f"Hay {len(huerfanas)} filas que incumplen las claves foráneas; "
+                        "no se aplicó la migración."
+                    )
+                if tenia_busqueda:
+                    instalar_busqueda(conexion)
+        finally:
+            conexion_dbapi.execute("PRAGMA foreign_keys=ON")
+    return [tabla.name for tabla in pendientes]
+
+
+def completar_indices(motor, progreso=_sin_progreso):
+    """
+    Crea los índices del modelo que falten y el índice de búsqueda de texto completo.
+
+    ``create_all`` no crea los índices nuevos de una tabla que ya existe, así que se
+    comprueban uno a uno; los de columnas que añade una migración posterior se crean
+    en esa migración. El índice de búsqueda solo se reconstruye si no existía.
+
+    Args:
+        motor (Engine): Motor de la base de datos.
+        progreso (Callable[[int], None]): Recibe el número de índices creados.
+    """
+    with motor.begin() as conexion:
+        existentes = set(conexion.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        ).scalars())
+        creados = 0
+        for tabla in Base.metadata.sorted_tables:
+            columnas = _columnas(conexion, tabla.name, generadas=True)
+            for indice in tabla.indexes:
+                if indice.name not in existentes and _columnas_indice(indice) <= columnas:
+                    indice.create(conexion)
+                    creados += 1
+        instalar_busqueda(conexion)
+    progreso(creados)
+
+
+_TABLAS_VERSIONADAS = ("usuario", "etiqueta", "tarea")
+
+
+def anadir_versiones(motor, progreso=_sin_progreso):
+    """
+    Añade la columna ``version`` a ``usuario``, ``etiqueta`` y ``tarea`` si no la tienen.
+
+    ``ALTER TABLE ... ADD COLUMN`` con un valor por defecto constante no reescribe la
+    tabla: las filas existentes leen la versión 1 sin tocarlas.
+
+    Args:
+        motor (Engine): Motor de la base de datos.
+        progreso (Callable[[int], None]): Recibe el número de tablas modificadas.
+    """
+    anadidas = 0
+    with motor.begin() as conexion:
+        for nombre in _TABLAS_VERSIONADAS:
+            if "version" not in _columnas(conexion, nombre):
+                conexion.exec_driver_sql(
+                    f"ALTER TABLE {nombre} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+                )
+                anadidas += 1
+    progreso(anadidas)
+
+
+def crear_contadores(motor, progreso=_sin_progreso):
+    """
+    Crea la tabla ``contador_cambios`` y los triggers que la mantienen.
+
+    Los contadores empiezan a contar desde la migración; no se rellenan con los
+    datos que ya existían.
+
+    Args:
+        motor (Engine): Motor de la base de datos.
+        progreso (Callable[[int], None]): Recibe el número de tablas vigiladas.
+    """
+    with motor.begin() as conexion:
+        progreso(instalar_contadores(conexion))
+
+
+def crear_diario(motor, progreso=_sin_progreso):
+    """
+    Crea la tabla ``diario_cambios`` y los triggers que la alimentan.
+
+    El diario empieza vacío: quien lo lea por primera vez debe cargar los datos
+    completos y continuar desde la última secuencia.
+
+    Args:
+        motor (Engine): Motor de la base de datos.
+        progreso (Callable[[int], None]): Recibe el número de tablas anotadas.
+    """
+    with motor.begin() as conexion:
+        progreso(instalar_diario(conexion))
+
+
+def preparar_sincronizacion(motor, progreso=_sin_progreso):
+    """
+    Añade a ``tarea`` las columnas ``uid``, ``modificado_en`` y ``clave`` y las lápidas.
+
+    Las tres columnas se añaden con ``ALTER TABLE ... ADD COLUMN`` sin reescribir la
+    tabla: las tareas existentes quedan sin ``uid`` (su clave se deriva del ID, igual
+    en todas las copias de la misma base de datos) y sin ``modificado_en`` (la
+    sincronización usa entonces su fecha de creación). ``clave`` es una columna
+    generada virtual; solo ocupa espacio en su índice único.
+
+    Args:
+        motor (Engine): Motor de la base de datos.
+        progreso (Callable[[int], None]): Recibe el número de columnas añadidas.
+    """
+    tabla = Tarea.__table__
+    anadidas = 0
+    with motor.begin() as conexion:
+        existentes = _columnas(conexion, tabla.name, generadas=True)
+        for columna in (tabla.c.uid, tabla.c.modificado_en, tabla.c.clave):
+            if columna.name not in existentes:
+                ddl = CreateColumn(columna).compile(dialect=conexion.dialect)
+                conexion.exec_driver_sql(f"ALTER TABLE {tabla.name} ADD COLUMN {ddl}")
+                anadidas += 1
+        existentes = _columnas(conexion, tabla.name, generadas=True)
+        for indice in tabla.indexes:
+            if _columnas_indice(indice) <= existentes:
+                indice.create(conexion, checkfirst=True)
+        instalar_sincronizacion(conexion)
+    progreso(anadidas)
+
+
+# Triggers cuyo cuerpo cambió con la papelera: los de versiones anteriores se sustituyen.
+_TRIGGERS_PAPELERA = (
+    trigger_diario("tarea", "update"),
+    trigger_sincronizacion("tarea", "delete"),
+)
+# Valor de ``PRAGMA auto_vacuum`` en el modo INCREMENTAL.
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+def _indices_parciales(conexion, nombre):
+    """Índices de una tabla y si son parciales (la quinta columna de index_list)."""
+    filas = conexion.exec_driver_sql(f"PRAGMA index_list({nombre})")
+    return {fila[1]: bool(fila[4]) for fila in filas}
+
+
+def preparar_papelera(motor, progreso=_sin_progreso):
+    """
+    Añade a ``tarea`` la columna ``borrado_en`` de la papelera y sus índices parciales.
+
+    La columna se añade sin reescribir la tabla. Los índices del modelo que ahora son
+    parciales se vuelven a crear (solo con las tareas fuera de la papelera) y se crea
+    el de la purga. Los triggers del diario y de la sincronización que distinguen la
+    papelera sustituyen a los anteriores.
+
+    Si la base de datos no tiene ``auto_vacuum=INCREMENTAL`` se activa con un VACUUM,
+    que reescribe el archivo entero fuera de toda transacción: solo ocurre una vez y
+    sin él la purga no podría devolver al sistema las páginas que libera.
+
+    Args:
+        motor (Engine): Motor de la base de datos.
+        progreso (Callable[[int], None]): Recibe el número de índices creados.
+    """
+    tabla = Tarea.__table__
+    creados = 0
+    with motor.begin() as conexion:
+        if "borrado_en" not in _columnas(conexion, tabla.name):
+            ddl = CreateColumn(tabla.c.borrado_en).compile(dialect=conexion.dialect)
+            conexion.exec_driver_sql(f"ALTER TABLE {tabla.name} ADD COLUMN {ddl}")
+        parciales = _indices_parciales(conexion, tabla.name)
+        for indice in tabla.indexes:
+            parcial = indice.dialect_options["sqlite"]["where"] is not None
+            if parciales.get(indice.name, parcial) != parcial:
+                conexion.exec_driver_sql(f"DROP INDEX {indice.name}")
+                del parciales[indice.name]
+            if indice.name not in parciales:
+                indice.create(conexion)
+                creados += 1
+        for trigger in _TRIGGERS_PAPELERA:
+            conexion.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+        instalar_diario(conexion)
+        instalar_sincronizacion(conexion)
+
+    with motor.connect() as conexion:
+        conexion_dbapi = conexion.connection.dbapi_connection
+        modo = conexion_dbapi.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if modo != _AUTO_VACUUM_INCREMENTAL:
+            conexion_dbapi.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conexion_dbapi.execute("VACUUM")
+    progreso(creados)
+
+
+def separar_busqueda_comprimida(motor, progreso=_sin_progreso):
+    """
+    Reinstala la búsqueda de texto completo sin funciones de la aplicación en sus triggers.
+
+    Los triggers anteriores descomprimían la descripción con ``descomprimir``, que
+    solo existe en las conexiones de la aplicación, así que ningún otro cliente de
+    SQLite podía escribir en ``tarea``. ``instalar_busqueda`` reconoce los índices
+    anteriores, los elimina y los reconstruye con las descripciones comprimidas en
+    su propio índice.
+
+    Args:
+        motor (Engine): Motor de la base de datos.
+        progreso (Callable[[int], None]): Recibe el número de tareas indexadas.
+    """
+    with motor.begin() as conexion:
+        instalar_busqueda(conexion)
+        progreso(conexion.exec_driver_sql("SELECT count(*) FROM tarea").scalar())
+
+
+MIGRACIONES = (
+    Migracion(1, "Tablas nuevas del modelo", crear_tablas),
+    Migracion(2, "Compresión de las descripciones largas", comprimir_descripciones),
+    Migracion(3, "Fechas de las tareas como enteros UTC", convertir_fechas),
+    Migracion(4, "Borrado en cascada en las claves foráneas", reconstruir_claves_foraneas),
+    Migracion(5, "Índices y búsqueda de texto completo", completar_indices),
+    Migracion(6, "Versión de las filas para la concurrencia optimista", anadir_versiones),
+    Migracion(7, "Contadores de cambios por tabla y usuario", crear_contadores),
+    Migracion(8, "Diario de cambios", crear_diario),
+    Migracion(9, "Clave global y lápidas para sincronizar copias", preparar_sincronizacion),
+    Migracion(10, "Papelera de tareas y vaciado incremental", preparar_papelera),
+    Migracion(11, "Índice de búsqueda aparte para las descripciones comprimidas",
+              separar_busqueda_comprimida),
+)
+
+VERSION_ESQUEMA = MIGRACIONES[-1].version
+
+
+def aplicar_migraciones(motor, progreso=None):
+    """
+    Deja la base de datos en ``VERSION_ESQUEMA``.
+
+    Si la base de datos no tiene tablas se crea con el esquema actual; si no, se
+    aplican en orden las migraciones posteriores a su versión.
+
+    Args:
+        motor (Engine): Motor de la base de datos.
+        progreso (Callable[[Migracion, int], None], optional): Recibe la migración en
+            curso y las filas procesadas hasta el momento; se llama con 0 al empezar
+            cada migración.
+
+    Returns:
+        list[Migracion]: Migraciones aplicadas (vacía si ya estaba al día o era nueva).
+
+    Raises:
+        RuntimeError: Si la base de datos es de una versión posterior a esta aplicación.
+    """
+    version = version_actual(motor)
+    if version > VERSION_ESQUEMA:
+        raise RuntimeError(
+            f"La base de datos tiene la versión {version} del esquema y esta aplicación "
+            f"solo conoce hasta la {VERSION_ESQUEMA}."
+        )
+    if version == VERSION_ESQUEMA:
+        return []
+
+    with motor.connect() as conexion:
+        nueva = conexion.exec_driver_sql(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = 'tarea'"
+        ).scalar() == 0
+    if nueva:
+        # Al crear ``tarea`` se instala también el índice de búsqueda.
+        Base.metadata.create_all(motor)
+        _marcar_version(motor, VERSION_ESQUEMA)
+        return []
+
+    aplicadas = []
+    for migracion in MIGRACIONES:
+        if migracion.version <= version:
+            continue
+        if progreso:
+            progreso(migracion, 0)
+        migracion.aplicar(
+            motor, (lambda total, m=migracion: progreso(m, total)) if progreso else _sin_progreso
+        )
+        _marcar_version(motor, migracion.version)
+        aplicadas.append(migracion)
+    return aplicadas
@@ -12,11 +12,35 @@ Completado).
 y Etiquetas.
 
 Las relaciones están definidas mediante SQLAlchemy ORM, facilitando la gestión de
-la base de datos.
+la base de datos. Usuario, Etiqueta y Tarea tienen una columna ``version`` que el
+ORM usa como contador de concurrencia optimista: cada UPDATE o DELETE de una fila
+comprueba la versión leída y la incrementa, y falla con ``StaleDataError`` si otra
+instancia de la aplicación la modificó antes. Los borrados en cascada (usuario → tareas, tarea o etiqueta →
+tarea_etiqueta) los resuelve SQLite con ``ON DELETE CASCADE``: las relaciones usan
+``passive_deletes`` para que el ORM no cargue las colecciones antes de borrar.
+
+Para sincronizar dos copias de la base de datos, cada tarea tiene una ``clave``
+global (``uid``, generado al crearla, o derivada del ID en las tareas anteriores a
+esa columna) y la hora de su última modificación (``modificado_en``).
+
+Eliminar una tarea la mueve a la papelera: ``borrado_en`` guarda la hora del borrado y
+la fila se conserva hasta que la purga la borra definitivamente. Las consultas y
+actualizaciones del ORM cuya entidad principal es Tarea añaden ``borrado_en IS NULL``,
+salvo las que piden ``OPCION_CON_BORRADAS``; las de otras entidades no pasan por ese
+filtro. Las consultas de tareas construidas una sola vez llevan la condición con
+``solo_activas`` y se ahorran añadirla en cada ejecución. Los índices de lectura por
+usuario son parciales sobre esa misma condición, así que las tareas de la papelera no
+ocupan sitio en ellos.
 
 Atributos del módulo:
     tarea_etiqueta (Table): Tabla intermedia para la relación muchos a muchos entre
     Tarea y Etiqueta.
+    OPCION_CON_BORRADAS (str): Opción de ejecución con la que una consulta del ORM
+    incluye las tareas de la papelera.
+
+Funciones:
+    solo_activas(consulta): Filtra una consulta de tareas a las que no están en la
+    papelera.
 
 Clases:
     Usuario: Representa a un usuario del sistema.
@@ -26,20 +50,44 @@ Clases:
     Recordatorio: Representa un recordatorio asociado a una tarea.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, Text
-from sqlalchemy.orm import relationship
+from uuid import uuid4
+
+from sqlalchemy import (
+    Column, Computed, Integer, String, ForeignKey, Index, Table, column, event, text
+)
+from sqlalchemy.orm import Session, deferred, relationship, with_loader_criteria
 from src.modelo.declarative_base import Base
+from src.modelo.tipos import FechaEpoch, TextoComprimido, epoch_actual
+
+# Clave de las tareas sin uid: 8 cifras hexadecimales de un hash multiplicativo del ID,
+# para repartirlas por todos los cubos de la sincronización, seguidas del propio ID.
+# Las cifras 9 a 20 son ceros y la 13 de un uuid4 es un 4, así que no coinciden con
+# ningún uid generado.
+CLAVE_DERIVADA = (
+    "coalesce(uid, printf('%08x%024x', (id_tarea * 2654435761) % 4294967296, id_tarea))"
+)
+
+OPCION_CON_BORRADAS = "con_borradas"
+# Marca de las consultas que ya filtran la papelera por sí mismas.
+_OPCION_FILTRADA = "papelera_filtrada"
+
+# Condición de los índices parciales: solo las tareas fuera de la papelera.
+_ACTIVAS = column("borrado_en").is_(None)
 
 
 # Tabla intermedia para la relación muchos a muchos entre Tarea y Etiqueta
 tarea_etiqueta = Table(
     'tarea_etiqueta', Base.metadata,
     Column(
-        'id_tarea', Integer, ForeignKey('tarea.id_tarea'), primary_key=True
+        'id_tarea', Integer, ForeignKey('tarea.id_tarea', ondelete='CASCADE'),
+        primary_key=True
     ),
     Column(
-        'id_etiqueta', Integer, ForeignKey('etiqueta.id_etiqueta'), primary_key=True
-    )
+        'id_etiqueta', Integer, ForeignKey('etiqueta.id_etiqueta', ondelete='CASCADE'),
+        primary_key=True
+    ),
+    # La clave primaria sirve de tarea a etiquetas; este índice cubre el sentido inverso.
+    Index('ix_tarea_etiqueta_etiqueta_tarea', 'id_etiqueta', 'id_tarea')
 )
 # pylint: disable=too-few-public-methods
 class Usuario(Base):
@@ -51,6 +99,7 @@ class Usuario(Base):
             nombre_usuario (str): Nombre del usuario, único y no nulo.
             correo_electronico (str): Correo electrónico del usuario, único y no nulo.
             contrasena (str): Contraseña encriptada del usuario.
+            version (int): Versión de la fila para la concurrencia optimista.
             tareas (list[Tarea]): Lista de tareas asociadas al usuario.
         """
     __tablename__ = 'usuario'
@@ -59,8 +108,13 @@ class Usuario(Base):
     nombre_usuario = Column(String(100), nullable=False, unique=True)
     correo_electronico = Column(String(150), nullable=False, unique=True, index=True)
     contrasena = Column(String(255), nullable=False)
+    version = Column(Integer, nullable=False, server_default=text("1"))
 
-    tareas = relationship("Tarea", back_populates="usuario")
+    tareas = relationship(
+        "Tarea", back_populates="usuario", cascade="all, delete", passive_deletes=True
+    )
+
+    __mapper_args__ = {"version_id_col": version}
 # pylint: disable=too-few-public-methods
 class Estado(Base):
     """
@@ -89,6 +143,7 @@ class Etiqueta(Base):
            id_etiqueta (int): Identificador único de la etiqueta.
            nombre_etiqueta (str): Nombre de la etiqueta.
            color (str): Color asociado a la etiqueta.
+           version (int): Versión de la fila para la concurrencia optimista.
            tareas (list[Tarea]): Lista de tareas que tienen esta etiqueta.
        """
     __tablename__ = 'etiqueta'
@@ -96,10 +151,13 @@ class Etiqueta(Base):
     id_etiqueta = Column(Integer, primary_key=True, autoincrement=True)
     nombre_etiqueta = Column(String(50), nullable=False, unique=True)
     color = Column(String(20))
+    version = Column(Integer, nullable=False, server_default=text("1"))
 
     tareas = relationship(
-        "Tarea", secondary=tarea_etiqueta, back_populates="etiquetas"
+        "Tarea", secondary=tarea_etiqueta, back_populates="etiquetas", passive_deletes=True
     )
+
+    __mapper_args__ = {"version_id_col": version}
 # pylint: disable=too-few-public-methods
 class Tarea(Base):
     """
@@ -108,28 +166,96 @@ class Tarea(Base):
         Atributos:
             id_tarea (int): Identificador único de la tarea.
             titulo (str): Título de la tarea.
-            descripcion (str): Descripción detallada de la tarea.
+            descripcion (str): Descripción detallada de la tarea. Se carga de forma diferida
+                y se guarda comprimida cuando es larga.
             fecha_creacion (datetime): Fecha en la que se creó la tarea.
-            fecha_vencimiento (datetime): Fecha límite de la tarea.
+            fecha_vencimiento (datetime): Fecha límite de la tarea. Las dos fechas se
+                guardan como enteros UTC (FechaEpoch).
             id_estado (int): Identificador del estado de la tarea.
             id_usuario (int): Identificador del usuario propietario de la tarea.
+            version (int): Versión de la fila para la concurrencia optimista. Cambiar
+                solo las etiquetas no la incrementa.
+            uid (str): Identificador global asignado al crear la tarea; None en las
+                tareas creadas antes de existir la columna.
+            modificado_en (int): Última modificación de la fila, en microsegundos
+                desde la época UTC. Cambiar solo las etiquetas no la modifica.
+            clave (str): Columna generada con ``uid`` o, si falta, un valor derivado
+                del ID; identifica la tarea al sincronizar dos bases de datos.
+            borrado_en (int): Momento en que la tarea pasó a la papelera, en
+                microsegundos desde la época UTC; None si no está borrada.
             usuario (Usuario): Relación con el usuario propietario.
             estado (Estado): Relación con el estado de la tarea.
             etiquetas (list[Etiqueta]): Lista de etiquetas asociadas a la tarea.
         """
     __tablename__ = 'tarea'
+    # Índices compuestos para los accesos habituales: tareas de un usuario por estado
+    # y vencimiento, por vencimiento y por fecha de creación. Los dos primeros solo
+    # incluyen las tareas fuera de la papelera; el de creación las incluye todas porque
+    # es el que usa SQLite para borrar en cascada las tareas de un usuario.
+    __table_args__ = (
+        Index('ix_tarea_usuario_estado_vencimiento', 'id_usuario', 'id_estado',
+              'fecha_vencimiento', sqlite_where=_ACTIVAS),
+        Index('ix_tarea_usuario_vencimiento', 'id_usuario', 'fecha_vencimiento',
+              sqlite_where=_ACTIVAS),
+        Index('ix_tarea_usuario_creacion', 'id_usuario', 'fecha_creacion'),
+        Index('ix_tarea_clave', 'clave', unique=True),
+        # Solo las tareas de la papelera, por antigüedad: las recorre la purga.
+        Index('ix_tarea_papelera', 'borrado_en', sqlite_where=column("borrado_en").is_not(None)),
+    )
 
     id_tarea = Column(Integer, primary_key=True, autoincrement=True)
     titulo = Column(String(150), nullable=False)
-    descripcion = Column(Text)
-    fecha_creacion = Column(DateTime)
-    fecha_vencimiento = Column(DateTime)
+    descripcion = deferred(Column(TextoComprimido))
+    fecha_creacion = Column(FechaEpoch)
+    fecha_vencimiento = Column(FechaEpoch)
 
     id_estado = Column(Integer, ForeignKey('estado.id_estado'), index=True, nullable=False)
-    id_usuario = Column(Integer, ForeignKey('usuario.id_usuario'), index=True, nullable=False)
+    id_usuario = Column(
+        Integer, ForeignKey('usuario.id_usuario', ondelete='CASCADE'), nullable=False
+    )
+    version = Column(Integer, nullable=False, server_default=text("1"))
+    uid = Column(String(32), default=lambda: uuid4().hex)
+    modificado_en = Column(Integer, default=epoch_actual, onupdate=epoch_actual)
+    clave = deferred(Column(String(32), Computed(CLAVE_DERIVADA, persisted=False)))
+    borrado_en = Column(Integer)
 
     usuario = relationship("Usuario", back_populates="tareas")
     estado = relationship("Estado", back_populates="tareas")
     etiquetas = relationship(
-        "Etiqueta", secondary=tarea_etiqueta, back_populates="tareas"
+        "Etiqueta", secondary=tarea_etiqueta, back_populates="tareas", passive_deletes=True
     )
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+def solo_activas(consulta):
+    """
+    Añade ``borrado_en IS NULL`` a una consulta de tareas construida una sola vez.
+
+    La condición forma parte de la sentencia, así que ``_ocultar_papelera`` no tiene
+    que añadirla (ni recompilar la opción) en cada ejecución.
+
+    Args:
+        consulta (Select): Consulta cuya entidad principal es Tarea.
+
+    Returns:
+        Select: La consulta filtrada.
+    """
+    return consulta.where(Tarea.borrado_en.is_(None)).execution_options(
+        **{_OPCION_FILTRADA: True}
+    )
+
+
+_MAPEADOR_TAREA = Tarea.__mapper__
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _ocultar_papelera(estado):
+    """Excluye las tareas de la papelera de las consultas y actualizaciones de Tarea."""
+    if ((estado.is_select or estado.is_update) and not estado.is_column_load
+            and estado.bind_mapper is _MAPEADOR_TAREA
+            and not estado.execution_options.get(OPCION_CON_BORRADAS, False)
+            and not estado.execution_options.get(_OPCION_FILTRADA, False)):
+        estado.statement = estado.statement.options(with_loader_criteria(
+            Tarea, lambda tarea: tarea.borrado_en.is_(None), include_aliases=True
+        ))
@@ -0,0 +1,184 @@
+"""
+Tablas y triggers que permiten sincronizar dos copias de la base de datos.
+
+Para reconciliar dos archivos hace falta saber qué tareas se borraron y cuándo cambió
+cada una. Los triggers mantienen:
+    - ``tarea_borrada``: una lápida por cada tarea borrada, con su clave global, su
+      antiguo ID y la hora del borrado. Una tarea en la papelera ya tiene su lápida,
+      con la hora en que se movió a ella, que se conserva cuando la purga la borra.
+      Si la tarea sale de la papelera o la misma clave se vuelve a insertar (la
+      sincronización restaura una tarea) la lápida desaparece.
+    - ``tarea_modificada``: la hora del último cambio de cada tarea que no reescribe
+      su fila: asignarle o quitarle etiquetas, o renombrar su estado, su usuario o
+      una de sus etiquetas (la sincronización las compara por nombre). Los cambios de
+      la propia fila los fecha el ORM en ``tarea.modificado_en`` (``onupdate``); los
+      demás se anotan aparte para no reescribir la tarea, que contaría como un cambio
+      de la fila en los contadores y en el diario.
+
+``sincronizacion_cubo`` y ``sincronizacion_estado`` guardan el hash de cada cubo de
+tareas y la secuencia del diario de cambios hasta la que están al día (véase
+``src.logica.sincronizador``), para no volver a calcularlos en cada sincronización.
+
+Como el diario y los contadores, estas tablas no forman parte de los metadatos del
+modelo: se crean con los triggers al crear ``tarea`` o ``tarea_etiqueta``.
+
+Attributes:
+    TABLA_LAPIDAS (str): Nombre de la tabla de tareas borradas.
+    TABLA_MODIFICADAS (str): Nombre de la tabla con la hora de los cambios indirectos.
+    TABLA_CUBOS (str): Nombre de la tabla de hashes por cubo.
+    TABLA_ESTADO (str): Nombre de la tabla de valores de la sincronización.
+    AHORA_SQL (str): Expresión SQL del momento actual en microsegundos UTC.
+    TABLAS_SINCRONIZADAS (tuple[str]): Tablas con triggers de la sincronización.
+
+Funciones:
+    instalar_sincronizacion(conexion): Crea las tablas y los triggers que falten.
+    nombre_trigger(tabla, nombre): Nombre de uno de los triggers de una tabla.
+"""
+from collections import namedtuple
+
+from sqlalchemy import event
+
+from src.modelo.modelo import Tarea, tarea_etiqueta
+
+TABLA_LAPIDAS = "tarea_borrada"
+TABLA_MODIFICADAS = "tarea_modificada"
+TABLA_CUBOS = "sincronizacion_cubo"
+TABLA_ESTADO = "sincronizacion_estado"
+
+# Misma unidad que FechaEpoch y epoch_actual (julianday tiene precisión de milisegundos).
+AHORA_SQL = "CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER)"
+
+_DDL_TABLAS = (
+    f"""
+    CREATE TABLE IF NOT EXISTS {TABLA_LAPIDAS} (
+        clave TEXT PRIMARY KEY,
+        id_tarea INTEGER,
+        borrado_en INTEGER NOT NULL
+    )
+    """,
+    f"CREATE INDEX IF NOT EXISTS ix_{TABLA_LAPIDAS}_tarea ON {TABLA_LAPIDAS} (id_tarea)",
+    f"""
+    CREATE TABLE IF NOT EXISTS {TABLA_MODIFICADAS} (
+        id_tarea INTEGER PRIMARY KEY,
+        modificado_en INTEGER NOT NULL
+    )
+    """,
+    f"CREATE TABLE IF NOT EXISTS {TABLA_CUBOS} (cubo INTEGER PRIMARY KEY, hash BLOB NOT NULL)",
+    f"CREATE TABLE IF NOT EXISTS {TABLA_ESTADO} (clave TEXT PRIMARY KEY, valor INTEGER)",
+)
+
+
+# Trigger AFTER ``evento`` con su cuerpo y, si la tiene, su condición WHEN.
+_Trigger = namedtuple("_Trigger", ["evento", "cuerpo", "condicion"], defaults=(None,))
+
+
+def _fechar(origen):
+    """Anota la hora actual en las tareas que devuelve ``origen`` (su id_tarea)."""
+    return (
+        f"INSERT OR REPLACE INTO {TABLA_MODIFICADAS} (id_tarea, modificado_en) "
+        f"SELECT id_tarea, {AHORA_SQL} FROM {origen};"
+    )
+
+
+def _renombrar(clave, nombre, origen):
+    """Trigger de una tabla cuyo nombre forma parte del contenido de sus tareas."""
+    return {"renombrar": _Trigger(
+        f"UPDATE OF {nombre}", _fechar(f"{origen} WHERE {clave} = new.{clave}"),
+        f"old.{nombre} IS NOT new.{nombre}"
+    )}
+
+
+_CUERPOS = {
+    "tarea": {
+        "insert": _Trigger("INSERT", f"DELETE FROM {TABLA_LAPIDAS} WHERE clave = new.clave;"),
+        "delete": _Trigger(
+            "DELETE",
+            f"INSERT OR REPLACE INTO {TABLA_LAPIDAS} (clave, id_tarea, borrado_en) "
+            f"VALUES (old.clave, old.id_tarea, coalesce(old.borrado_en, {AHORA_SQL})); "
+            f"DELETE FROM {TABLA_MODIFICADAS} WHERE id_tarea = old.id_tarea;"
+        ),
+        "papelera": _Trigger(
+            "UPDATE OF borrado_en",
+            f"DELETE FROM {TABLA_LAPIDAS} WHERE clave = new.clave AND new.borrado_en IS NULL; "
+            f"INSERT OR REPLACE INTO {TABLA_LAPIDAS} (clave, id_tarea, borrado_en) "
+            "SELECT new.clave, new.id_tarea, new.borrado_en WHERE new.borrado_en IS NOT NULL;",
+            "old.borrado_en IS NOT new.borrado_en"
+        ),
+    },
+    # Una tarea que ya no existe no se anota; al borrarla, su trigger retira la anotación.
+    "tarea_etiqueta": {
+        "insert": _Trigger("INSERT", _fechar("tarea WHERE id_tarea = new.id_tarea")),
+        "delete": _Trigger("DELETE", _fechar("tarea WHERE id_tarea = old.id_tarea")),
+    },
+    "usuario": _renombrar("id_usuario", "nombre_usuario", "tarea"),
+    "estado": _renombrar("id_estado", "nombre_estado", "tarea"),
+    "etiqueta": _renombrar("id_etiqueta", "nombre_etiqueta", "tarea_etiqueta"),
+}
+
+TABLAS_SINCRONIZADAS = tuple(_CUERPOS)
+
+
+def nombre_trigger(tabla, nombre):
+    """
+    Nombre de uno de los triggers de la sincronización.
+
+    Args:
+        tabla (str): Tabla del trigger.
+        nombre (str): Nombre corto del trigger ('insert', 'delete', 'papelera'...).
+
+    Returns:
+        str: Nombre del trigger en la base de datos.
+    """
+    return f"sincronizacion_{tabla}_{nombre}"
+
+
+def _triggers(tabla):
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {nombre_trigger(tabla, nombre)} "
+        f"AFTER {trigger.evento} ON {tabla} "
+        f"{f'WHEN {trigger.condicion} ' if trigger.condicion else ''}"
+        f"BEGIN {trigger.cuerpo} END"
+        for nombre, trigger in _CUERPOS[tabla].items()
+    ]
+
+
+def _instalar_tabla(conexion, tabla):
+    for ddl in _DDL_TABLAS:
+        conexion.exec_driver_sql(ddl)
+    for ddl in _triggers(tabla):
+        conexion.exec_driver_sql(ddl)
+
+
+def instalar_sincronizacion(conexion):
+    """
+    Crea las tablas de la sincronización y los triggers de las tablas vigiladas.
+
+    Se puede ejecutar varias veces: solo crea lo que falta.
+
+    Args:
+        conexion (Connection): Conexión de SQLAlchemy dentro de una transacción.
+
+    Returns:
+        int: Número de tablas con sus triggers instalados.
+    """
+    for tabla in TABLAS_SINCRONIZADAS:
+        _instalar_tabla(conexion, tabla)
+    return len(TABLAS_SINCRONIZADAS)
+
+
+# Los triggers de usuario, estado y etiqueta leen tarea y tarea_etiqueta, así que se
+# instalan al crear la última; si existieran antes que ``tarea``, impedirían
+# reconstruirla (véase ``reconstruir_claves_foraneas``).
+_INSTALAR_AL_CREAR = {
+    Tarea.__table__: ("tarea",),
+    tarea_etiqueta: ("tarea_etiqueta", "usuario", "estado", "etiqueta"),
+}
+
+
+def _al_crear(tabla, conexion, **_kwargs):
+    for nombre in _INSTALAR_AL_CREAR[tabla]:
+        _instalar_tabla(conexion, nombre)
+
+
+for _tabla in _INSTALAR_AL_CREAR:
+    event.listen(_tabla, "after_create", _al_crear)
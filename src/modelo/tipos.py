@@ -0,0 +1,243 @@
+"""
+Tipos de columna propios del modelo de datos del sistema ToDoList.
+
+Clases:
+    TextoComprimido: Texto que se guarda comprimido con zlib a partir de cierto tamaño.
+    FechaEpoch: Fecha y hora que se guarda como entero (microsegundos desde la época UTC).
+
+Funciones:
+    comprimir_texto(texto, umbral): Devuelve el valor a guardar para un texto.
+    descomprimir_texto(valor): Recupera el texto a partir del valor guardado.
+    resumir_texto(valor, largo): Devuelve el comienzo del texto guardado, descomprimiendo
+        solo lo necesario.
+    epoch_actual(): Momento actual en microsegundos desde la época UTC.
+    registrar_funciones(conexion_dbapi): Registra ``descomprimir`` y ``resumir`` en una
+        conexión sqlite3 para poder leer el texto desde SQL (triggers, vistas y
+        proyecciones).
+"""
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from sqlalchemy.types import Integer, Text, TypeDecorator
+
+UMBRAL_COMPRESION = 1024
+NIVEL_COMPRESION = 6
+
+MICROSEGUNDOS = 1_000_000
+
+# Conversión rápida de epoch a hora local: la hora local del inicio de cada tramo de
+# 15 minutos se calcula una vez con la zona horaria del sistema y el resto se suma con
+# intervalos precalculados. Los tramos que contienen un cambio de horario se marcan
+# con None y se convierten valor a valor.
+_TRAMO = 900
+_MAXIMO_TRAMOS = 100_000
+_inicio_tramo = {}
+_SEGUNDOS = tuple(timedelta(seconds=i) for i in range(_TRAMO))
+_MILISEGUNDOS = tuple(timedelta(milliseconds=i) for i in range(1000))
+_MICROSEGUNDOS = tuple(timedelta(microseconds=i) for i in range(1000))
+
+
+def comprimir_texto(texto, umbral=UMBRAL_COMPRESION):
+    """
+    Devuelve el valor a guardar para un texto.
+
+    Los textos cuya codificación UTF-8 alcanza el umbral se guardan como BLOB
+    comprimido con zlib; el resto, y los que no ganan nada al comprimirse, se
+    guardan como texto sin cambios. El tipo de almacenamiento de SQLite (TEXT o
+    BLOB) distingue así un caso del otro sin necesidad de marcas adicionales.
+
+    Args:
+        texto (str): Texto a guardar, o None.
+        umbral (int): Tamaño mínimo en bytes a partir del cual se comprime.
+
+    Returns:
+        str | bytes | None: Texto sin cambios o bytes comprimidos.
+    """
+    if texto is None:
+        return None
+    codificado = texto.encode("utf-8")
+    if len(codificado) < umbral:
+        return texto
+    comprimido = zlib.compress(codificado, NIVEL_COMPRESION)
+    return comprimido if len(comprimido) < len(codificado) else texto
+
+
+def descomprimir_texto(valor):
+    """
+    Recupera el texto a partir del valor guardado por ``comprimir_texto``.
+
+    Args:
+        valor (str | bytes | None): Valor leído de la base de datos.
+
+    Returns:
+        str | None: Texto original.
+    """
+    if isinstance(valor, (bytes, bytearray, memoryview)):
+        return zlib.decompress(valor).decode("utf-8")
+    return valor
+
+
+def resumir_texto(valor, largo):
+    """
+    Devuelve como mucho ``largo`` caracteres del texto guardado.
+
+    Si el texto es más largo, se corta y termina en "…". De un valor comprimido solo
+    se descomprimen los primeros bytes necesarios.
+
+    Args:
+        valor (str | bytes | None): Valor leído de la base de datos.
+        largo (int): Número máximo de caracteres del resultado.
+
+    Returns:
+        str | None: Texto resumido.
+    """
+    if isinstance(valor, (bytes, bytearray, memoryview)):
+        # Un carácter ocupa como mucho 4 bytes en UTF-8: con más de largo * 4 bytes
+        # descomprimidos el texto seguro que supera el largo.
+        limite = largo * 4
+        parcial = zlib.decompressobj().decompress(valor, limite + 1)
+        valor = parcial.decode("utf-8", "ignore")
+        if len(parcial) > limite:
+            return valor[:largo - 1] + "…"
+    if valor is None or len(valor) <= largo:
+        return valor
+    return valor[:largo - 1] + "…"
+
+
+def registrar_funciones(conexion_dbapi):
+    """
+    Registra las funciones SQL ``descomprimir(valor)`` y ``resumir(valor, largo)``
+    en una conexión sqlite3.
+
+    Args:
+        conexion_dbapi (sqlite3.Connection): Conexión recién abierta.
+    """
+    conexion_dbapi.create_function("descomprimir", 1, descomprimir_texto, deterministic=True)
+    conexion_dbapi.create_function("resumir", 2, resumir_texto, deterministic=True)
+
+
+class TextoComprimido(TypeDecorator):  # pylint: disable=too-many-ancestors, abstract-method
+    """
+    Texto que se comprime con zlib de forma transparente a partir de ``umbral`` bytes.
+
+    Args:
+        umbral (int): Tamaño mínimo en bytes a partir del cual se comprime.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def __init__(self, umbral=UMBRAL_COMPRESION, **kwargs):
+        super().__init__(**kwargs)
+        self.umbral = umbral
+
+    def process_bind_param(self, value, dialect):
+        return comprimir_texto(value, self.umbral)
+
+    def process_result_value(self, value, dialect):
+        return descomprimir_texto(value)
+
+
+def fecha_a_epoch(fecha):
+    """
+    Convierte una fecha en microsegundos desde la época UTC.
+
+    Las fechas sin zona horaria se interpretan en la hora local, como las que
+    produce ``datetime.now()`` en la aplicación.
+
+    Args:
+        fecha (datetime | None): Fecha a convertir.
+
+    Returns:
+        int | None: Microsegundos desde 1970-01-01 00:00:00 UTC.
+    """
+    if fecha is None:
+        return None
+    return int(fecha.replace(microsecond=0).timestamp()) * MICROSEGUNDOS + fecha.microsecond
+
+
+def epoch_actual():
+    """
+    Devuelve el momento actual en microsegundos desde la época UTC.
+
+    Returns:
+        int: El mismo valor que ``fecha_a_epoch(datetime.now())``.
+    """
+    return time.time_ns() // 1000
+
+
+def epoch_a_fecha(valor):
+    """
+    Convierte microsegundos desde la época UTC en una fecha local sin zona horaria.
+
+    Args:
+        valor (int | None): Valor guardado por ``fecha_a_epoch``.
+
+    Returns:
+        datetime | None: Fecha en la hora local.
+    """
+    if valor is None:
+        return None
+    segundos = valor // MICROSEGUNDOS
+    microsegundos = valor - segundos * MICROSEGUNDOS
+    tramo = segundos // _TRAMO
+    try:
+        inicio = _inicio_tramo[tramo]
+    except KeyError:
+        inicio = _calcular_inicio_tramo(tramo)
+    if inicio is None:
+        return datetime.fromtimestamp(segundos).replace(microsecond=microsegundos)
+    fecha = inicio + _SEGUNDOS[segundos - tramo * _TRAMO]
+    if microsegundos:
+        fecha = fecha + _MILISEGUNDOS[microsegundos // 1000] + _MICROSEGUNDOS[microsegundos % 1000]
+    return fecha.replace(fold=1) if inicio.fold else fecha
+
+
+def _calcular_inicio_tramo(tramo):
+    """Hora local del inicio del tramo, o None si el tramo contiene un cambio de horario."""
+    if len(_inicio_tramo) >= _MAXIMO_TRAMOS:
+        _inicio_tramo.clear()
+    inicio = datetime.fromtimestamp(tramo * _TRAMO)
+    final = datetime.fromtimestamp(tramo * _TRAMO + _TRAMO - 1)
+    if final - inicio != _SEGUNDOS[_TRAMO - 1] or final.fold != inicio.fold:
+        inicio = None
+    _inicio_tramo[tramo] = inicio
+    return inicio
+
+
+def intervalo_a_epoch(intervalo):
+    """
+    Convierte un intervalo en microsegundos, la unidad de las columnas FechaEpoch.
+
+    Args:
+        intervalo (timedelta): Intervalo a convertir.
+
+    Returns:
+        int: Duración del intervalo en microsegundos.
+    """
+    return intervalo // timedelta(microseconds=1)
+
+
+class FechaEpoch(TypeDecorator):  # pylint: disable=too-many-ancestors, abstract-method
+    """
+    Fecha y hora guardada como entero: microsegundos desde la época UTC.
+
+    En Python se usa como ``DateTime``: recibe y devuelve ``datetime`` en hora local
+    sin zona horaria. En SQLite las comparaciones, ordenaciones y rangos se hacen
+    sobre enteros, sin convertir texto en cada fila.
+    """
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return fecha_a_epoch(value)
+
+    def process_result_value(self, value, dialect):
+        return epoch_a_fecha(value)
+
+    def result_processor(self, dialect, coltype):
+        # Se usa la función de conversión directamente, sin las capas intermedias de
+        # TypeDecorator: la lectura de fechas está en el camino de cada listado.
+        return epoch_a_fecha
@@ -8,6 +8,7 @@ Funciones:
     inicializar_tareas(): Borra registros existentes e inserta tareas predeterminadas.
 """
 from datetime import datetime
+from src.logica.tarea_manager import TareaManager
 from src.modelo.database import Session
 from src.modelo.modelo import Tarea
 
@@ -18,7 +19,7 @@ def inicializar_tareas():
 
     Pasos realizados:
         1. Elimina todos los registros existentes para evitar duplicados.
-        2. Inserta tareas con atributos como título, descripción, fechas,
+        2. Inserta en lote tareas con atributos como título, descripción, fechas,
            estado y usuario asociado.
         3. Confirma los cambios y cierra la sesión de la base de datos.
         4. Imprime un mensaje de confirmación.
@@ -52,11 +53,9 @@ def inicializar_tareas():
         }
     ]
 
-    for tarea_data in tareas_iniciales:
-        tarea = Tarea(**tarea_data)
-        session.add(tarea)
-
-    session.commit()
+    resultado = TareaManager(session).crear_tareas_lote(tareas_iniciales)
+    for error in resultado.errores:
+        print(f"Tarea {error.indice} no insertada: {error.mensaje}")
     print("Tabla tarea inicializada correctamente.")
     session.close()
 
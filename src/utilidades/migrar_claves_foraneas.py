@@ -0,0 +1,45 @@
+"""
+Migración que añade ``ON DELETE CASCADE`` a las claves foráneas de una base existente.
+
+Ejecuta por separado la migración 4 (``reconstruir_claves_foraneas`` de
+``src.modelo.migraciones``), que también se aplica sola al abrir una base de datos
+anterior, seguida de ``completar_indices`` para crear el índice de búsqueda si no
+existía. Las tablas que ya tienen las claves del modelo no se tocan, así que se
+puede repetir sin efecto. Conviene ejecutar antes ``migrar_fechas``, porque la tabla
+reconstruida declara las fechas como INTEGER.
+
+Funciones:
+    migrar_claves_foraneas(motor): Reconstruye las tablas cuyas claves no coinciden.
+
+Ejemplo:
+    python -m src.utilidades.migrar_claves_foraneas
+"""
+from src.modelo.database import crear_motor
+from src.modelo.migraciones import completar_indices, reconstruir_claves_foraneas
+
+
+def migrar_claves_foraneas(motor=None):
+    """
+    Reconstruye ``tarea`` y ``tarea_etiqueta`` si sus claves foráneas no son las del modelo.
+
+    Args:
+        motor (Engine, optional): Motor de base de datos; por defecto uno con la
+            configuración de la aplicación.
+
+    Returns:
+        list[str]: Nombres de las tablas reconstruidas.
+
+    Raises:
+        RuntimeError: Si tras la reconstrucción hay filas que incumplen las claves
+            foráneas; en ese caso no se aplica ningún cambio.
+    """
+    motor = motor or crear_motor()
+    nombres = reconstruir_claves_foraneas(motor)
+    if nombres:
+        completar_indices(motor)
+        print(f"Tablas reconstruidas: {', '.join(nombres)}")
+    return nombres
+
+
+if __name__ == "__main__":
+    migrar_claves_foraneas()
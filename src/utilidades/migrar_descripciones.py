@@ -0,0 +1,40 @@
+"""
+Migración que comprime las descripciones largas guardadas antes de TextoComprimido.
+
+Ejecuta por separado la migración 2 (``comprimir_descripciones`` de
+``src.modelo.migraciones``), que también se aplica sola al abrir una base de datos
+anterior. Cada lote se confirma por separado, así que puede interrumpirse y repetirse.
+
+Funciones:
+    migrar_descripciones(motor, tamano_lote): Comprime las descripciones pendientes.
+
+Ejemplo:
+    python -m src.utilidades.migrar_descripciones
+"""
+from src.modelo.database import crear_motor
+from src.modelo.migraciones import LOTE_DESCRIPCIONES, comprimir_descripciones
+
+TAMANO_LOTE = LOTE_DESCRIPCIONES
+
+
+def migrar_descripciones(motor=None, tamano_lote=TAMANO_LOTE):
+    """
+    Comprime por lotes las descripciones de texto que alcanzan el umbral.
+
+    Args:
+        motor (Engine, optional): Motor de base de datos; por defecto uno con la
+            configuración de la aplicación.
+        tamano_lote (int): Número de tareas reescritas por transacción.
+
+    Returns:
+        int: Número de descripciones reescritas.
+    """
+    return comprimir_descripciones(
+        motor or crear_motor(),
+        lambda total: print(f"Descripciones comprimidas: {total}"),
+        tamano_lote,
+    )
+
+
+if __name__ == "__main__":
+    migrar_descripciones()
@@ -0,0 +1,47 @@
+"""
+Aplica las migraciones pendientes a la base de datos de la aplicación.
+
+La aplicación las aplica sola al arrancar; este script permite hacerlo antes, desde
+la terminal, en bases de datos grandes, viendo el avance de cada lote. Si se
+interrumpe, la siguiente ejecución continúa desde la migración que quedó a medias.
+
+Funciones:
+    migrar_esquema(motor): Aplica las migraciones pendientes e informa del avance.
+
+Ejemplo:
+    python -m src.utilidades.migrar_esquema
+"""
+from src.modelo.database import crear_motor
+from src.modelo.migraciones import VERSION_ESQUEMA, aplicar_migraciones, version_actual
+
+
+def _mostrar_progreso(migracion, procesadas):
+    if procesadas:
+        print(f"  {procesadas} filas procesadas", end="\r", flush=True)
+    else:
+        print(f"Migración {migracion.version}: {migracion.descripcion}")
+
+
+def migrar_esquema(motor=None):
+    """
+    Aplica las migraciones pendientes a la base de datos.
+
+    Args:
+        motor (Engine, optional): Motor de base de datos; por defecto uno con la
+            configuración de la aplicación.
+
+    Returns:
+        list[Migracion]: Migraciones aplicadas.
+    """
+    motor = motor or crear_motor()
+    version = version_actual(motor)
+    if version == VERSION_ESQUEMA:
+        print(f"La base de datos ya está en la versión {VERSION_ESQUEMA}.")
+        return []
+    aplicadas = aplicar_migraciones(motor, _mostrar_progreso)
+    print(f"\nBase de datos actualizada de la versión {version} a la {VERSION_ESQUEMA}.")
+    return aplicadas
+
+
+if __name__ == "__main__":
+    migrar_esquema()
@@ -0,0 +1,41 @@
+"""
+Migración de las fechas de las tareas de texto ISO a enteros (FechaEpoch).
+
+Ejecuta por separado la migración 3 (``convertir_fechas`` de
+``src.modelo.migraciones``), que también se aplica sola al abrir una base de datos
+anterior. Cada lote se confirma por separado y solo se tocan los valores que siguen
+siendo texto, así que la migración puede interrumpirse y repetirse.
+
+Funciones:
+    migrar_fechas(motor, tamano_lote): Convierte las fechas pendientes.
+
+Ejemplo:
+    python -m src.utilidades.migrar_fechas
+"""
+from src.modelo.database import crear_motor
+from src.modelo.migraciones import LOTE_FECHAS, convertir_fechas
+
+TAMANO_LOTE = LOTE_FECHAS
+
+
+def migrar_fechas(motor=None, tamano_lote=TAMANO_LOTE):
+    """
+    Convierte por lotes a FechaEpoch las fechas de las tareas guardadas como texto.
+
+    Args:
+        motor (Engine, optional): Motor de base de datos; por defecto uno con la
+            configuración de la aplicación.
+        tamano_lote (int): Número de tareas convertidas por transacción.
+
+    Returns:
+        int: Número de tareas con alguna fecha convertida.
+    """
+    return convertir_fechas(
+        motor or crear_motor(),
+        lambda total: print(f"Tareas con fechas convertidas: {total}"),
+        tamano_lote,
+    )
+
+
+if __name__ == "__main__":
+    migrar_fechas()
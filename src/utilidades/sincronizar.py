@@ -0,0 +1,108 @@
+"""
+Sincroniza las tareas de dos copias de la base de datos de la aplicación.
+
+Pensado para quien usa la aplicación en dos equipos y lleva ``tasks.db`` de uno a otro:
+en lugar de sobrescribir una copia con la otra, y perder lo que se cambió en ella, se
+reconcilian las dos y ambas quedan con las mismas tareas. Solo trabaja con los dos
+archivos locales. Antes de sincronizar aplica a cada copia sus migraciones pendientes.
+
+Funciones:
+    sincronizar(ruta_a, ruta_b, simular, informe): Sincroniza dos archivos e informa
+        del resultado.
+
+Ejemplo:
+    python -m src.utilidades.sincronizar tasks.db /media/usb/tasks.db --informe conflictos.csv
+"""
+import argparse
+import csv
+import os
+
+from sqlalchemy.orm import sessionmaker
+
+from src.logica.sincronizador import ConflictoSincronizacion, Sincronizador
+from src.modelo.database import crear_motor, preparar_esquema
+from src.modelo.tipos import epoch_a_fecha
+
+
+def _escribir_informe(ruta, conflictos):
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(ConflictoSincronizacion._fields)
+        for conflicto in conflictos:
+            escritor.writerow(conflicto._replace(
+                momento_a=epoch_a_fecha(conflicto.momento_a),
+                momento_b=epoch_a_fecha(conflicto.momento_b),
+            ))
+
+
+def sincronizar(ruta_a, ruta_b, simular=False, informe=None):
+    """
+    Sincroniza las tareas de dos archivos de base de datos.
+
+    Args:
+        ruta_a (str): Ruta de la primera copia.
+        ruta_b (str): Ruta de la segunda copia.
+        simular (bool): Si es True solo informa de lo que haría, sin escribir.
+        informe (str, optional): Ruta de un CSV donde escribir los conflictos.
+
+    Returns:
+        ResultadoSincronizacion: Resultado de la sincronización.
+        None: Si ocurre un error en alguna de las bases de datos.
+
+    Raises:
+        FileNotFoundError: Si alguno de los archivos no existe.
+        ValueError: Si las dos rutas son el mismo archivo.
+    """
+    for ruta in (ruta_a, ruta_b):
+        if not os.path.isfile(ruta):
+            raise FileNotFoundError(f"No existe la base de datos {ruta}.")
+    if os.path.samefile(ruta_a, ruta_b):
+        raise ValueError("Las dos rutas son la misma base de datos.")
+
+    motores = [crear_motor(url=f"sqlite:///{ruta}") for ruta in (ruta_a, ruta_b)]
+    sesiones = []
+    try:
+        for motor in motores:
+            preparar_esquema(motor)
+            sesiones.append(sessionmaker(bind=motor)())
+        resultado = Sincronizador(*sesiones).sincronizar(simular=simular)
+    finally:
+        for session in sesiones:
+            session.close()
+        for motor in motores:
+            motor.dispose()
+    if resultado is None:
+        return None
+
+    accion = "Se escribirían" if simular else "Escritas"
+    print(f"Cubos distintos: {resultado.cubos_distintos}")
+    print(f"{accion} en {ruta_a}: {resultado.hacia_a} tareas")
+    print(f"{accion} en {ruta_b}: {resultado.hacia_b} tareas")
+    print(f"Conflictos: {len(resultado.conflictos)}")
+    for conflicto in resultado.conflictos:
+        ganadora = ruta_a if conflicto.ganadora == "a" else ruta_b
+        print(f"  {conflicto.clave}: {conflicto.titulo_a!r} / {conflicto.titulo_b!r} "
+              f"-> se conserva la de {ganadora}")
+    if informe:
+        _escribir_informe(informe, resultado.conflictos)
+    return resultado
+
+
+def main():
+    """Punto de entrada de la línea de órdenes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("ruta_a", help="primera copia de la base de datos")
+    parser.add_argument("ruta_b", help="segunda copia de la base de datos")
+    parser.add_argument("--simular", action="store_true",
+                        help="informa de lo que haría sin escribir en ninguna copia")
+    parser.add_argument("--informe", metavar="CSV",
+                        help="escribe los conflictos en este archivo CSV")
+    args = parser.parse_args()
+    try:
+        sincronizar(args.ruta_a, args.ruta_b, args.simular, args.informe)
+    except (FileNotFoundError, ValueError) as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Pruebas unitarias para la fachada asyncio de los managers del sistema ToDoList.
+
+Verifica que las versiones asíncronas expongan los mismos métodos que los managers
+síncronos, que las lecturas se ejecuten en paralelo y que las escrituras se serialicen.
+"""
+
+import asyncio
+import inspect
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from src.logica.asincrono import (
+    EjecutorBD, EstadoManagerAsync, EtiquetaManagerAsync,
+    TareaManagerAsync, UsuarioManagerAsync
+)
+from src.logica.estado_manager import EstadoManager
+from src.logica.etiqueta_manager import EtiquetaManager
+from src.logica.tarea_manager import TareaManager
+from src.logica.usuario_manager import UsuarioManager
+from src.modelo.database import Base, engine
+
+
+class TestAsincrono(unittest.TestCase):
+    """
+    Conjunto de pruebas unitarias para EjecutorBD y las fachadas asíncronas.
+    """
+
+    def setUp(self):
+        """Crea un esquema limpio y un ejecutor con varios hilos lectores."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.ejecutor = EjecutorBD(engine, lectores=4)
+        self.tareas = TareaManagerAsync(self.ejecutor)
+        self.usuarios = UsuarioManagerAsync(self.ejecutor)
+        self.estados = EstadoManagerAsync(self.ejecutor)
+        self.etiquetas = EtiquetaManagerAsync(self.ejecutor)
+
+    def tearDown(self):
+        """Libera los hilos del ejecutor."""
+        self.ejecutor.cerrar()
+
+    def test_misma_superficie_de_metodos(self):
+        """Cada método público del manager síncrono existe en su versión asíncrona."""
+        pares = (
+            (TareaManager, TareaManagerAsync), (UsuarioManager, UsuarioManagerAsync),
+            (EtiquetaManager, EtiquetaManagerAsync), (EstadoManager, EstadoManagerAsync),
+        )
+        for sincrona, asincrona in pares:
+            for nombre, miembro in inspect.getmembers(sincrona, inspect.isfunction):
+                if nombre.startswith("_"):
+                    continue
+                with self.subTest(clase=sincrona.__name__, metodo=nombre):
+                    equivalente = getattr(asincrona, nombre)
+                    if inspect.isgeneratorfunction(miembro):
+                        self.assertTrue(inspect.isasyncgenfunction(equivalente))
+                    else:
+                        self.assertTrue(inspect.iscoroutinefunction(equivalente))
+
+    def test_crear_y_leer_tareas(self):
+        """Las tareas creadas desde corrutinas se pueden leer y recorrer después."""
+        async def escenario():
+            usuario = await self.usuarios.crear_usuario("Async", "async@correo.com", "1234")
+            estado = await self.estados.crear_estado("Pendiente")
+            etiqueta = await self.etiquetas.crear_etiqueta("Trabajo", "Azul")
+            ahora = datetime(2030, 1, 1)
+            creadas = await asyncio.gather(*(
+                self.tareas.crear_tarea(
+                    f"Tarea {i}", "", ahora, ahora + timedelta(days=i),
+                    id_usuario=usuario.id_usuario, id_estado=estado.id_estado,
+                    etiquetas=[etiqueta.id_etiqueta]
+                )
+                for i in range(20)
+            ))
+            leida = await self.tareas.obtener_tarea_por_id(creadas[0].id_tarea)
+            recorridas = [t.id_tarea async for t in self.tareas.iterar_tareas(tamano=7)]
+            await self.tareas.eliminar_tarea(leida)
+            restantes = await self.tareas.obtener_tareas()
+            return usuario, creadas, leida, recorridas, restantes
+
+        usuario, creadas, leida, recorridas, restantes = asyncio.run(escenario())
+        self.assertEqual(usuario.nombre_usuario, "Async")
+        self.assertEqual(len({t.id_tarea for t in creadas}), 20)
+        self.assertEqual(leida.titulo, "Tarea 0")
+        self.assertEqual(recorridas, sorted(t.id_tarea for t in creadas))
+        self.assertEqual(len(restantes), 19)
+
+    def test_descripcion_se_lee_fuera_de_la_sesion(self):
+        """La descripción diferida de las tareas devueltas se puede leer sin sesión."""
+        async def escenario():
+            usuario = await self.usuarios.crear_usuario("Async", "async@correo.com", "1234")
+            estado = await self.estados.crear_estado("Pendiente")
+            creada = await self.tareas.crear_tarea(
+                "Con descripción", "Detalle", datetime(2030, 1, 1), None,
+                id_usuario=usuario.id_usuario, id_estado=estado.id_estado
+            )
+            actualizada = await self.tareas.actualizar_tarea(creada.id_tarea, titulo="Otra")
+            return (
+                await self.tareas.obtener_tarea_por_id(creada.id_tarea),
+                await self.tareas.obtener_tareas(),
+                await self.tareas.obtener_tareas_por_usuario(usuario.id_usuario),
+                (await self.tareas.obtener_pagina_tareas(usuario.id_usuario)).tareas,
+                [actualizada],
+            )
+
+        leida, *listas = asyncio.run(escenario())
+        self.assertEqual(leida.descripcion, "Detalle")
+        for tareas in listas:
+            self.assertEqual([t.descripcion for t in tareas], ["Detalle"])
+
+    def test_lecturas_en_paralelo_y_escrituras_serializadas(self):
+        """Las lecturas usan varios hilos a la vez; las escrituras, uno solo cada vez."""
+        activas = {"lectura": 0, "escritura": 0}
+        maximos = {"lectura": 0, "escritura": 0}
+        hilos = {"lectura": set(), "escritura": set()}
+        candado = threading.Lock()
+        barrera = threading.Barrier(3, timeout=5)
+
+        def trabajo(tipo):
+            def funcion(_session):
+                with candado:
+                    activas[tipo] += 1
+                    maximos[tipo] = max(maximos[tipo], activas[tipo])
+                    hilos[tipo].add(threading.get_ident())
+                if tipo == "lectura":
+                    barrera.wait()
+                with candado:
+                    activas[tipo] -= 1
+            return funcion
+
+        async def escenario():
+            await asyncio.gather(
+                *(self.ejecutor.ejecutar(trabajo("lectura")) for _ in range(3)),
+                *(self.ejecutor.ejecutar(trabajo("escritura"), escritura=True)
+                  for _ in range(5)),
+            )
+
+        asyncio.run(escenario())
+        self.assertEqual(maximos["lectura"], 3)
+        self.assertEqual(maximos["escritura"], 1)
+        self.assertEqual(len(hilos["escritura"]), 1)
+
+    def test_metodos_de_clase_se_exponen_sin_sesion(self):
+        """Los métodos de caché de clase siguen siendo síncronos en la fachada."""
+        version = self.etiquetas.version_catalogo()
+        self.etiquetas.invalidar_catalogo()
+        self.assertEqual(self.etiquetas.version_catalogo(), version + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,231 @@
+"""
+Pruebas de la concurrencia optimista y los reintentos de src.logica.concurrencia.
+
+Cada prueba usa una base de datos en un archivo temporal. Dos sesiones sobre el mismo
+archivo hacen de dos instancias de la aplicación; la prueba de contención lanza
+varios procesos que incrementan a la vez un contador guardado en una tarea.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from src.logica.concurrencia import Conflicto, confirmar, es_bloqueo
+from src.logica.etiqueta_manager import EtiquetaManager
+from src.logica.filtros import FiltroTareas
+from src.logica.tarea_manager import TareaManager
+from src.logica.usuario_manager import UsuarioManager
+from src.modelo.database import crear_motor
+from src.modelo.declarative_base import Base
+from src.modelo.modelo import Estado
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cada proceso suma 1 al título de la tarea 1 hasta conseguir ``veces`` incrementos,
+# volviendo a leer la tarea tras cada conflicto. Empiezan todos a la vez en ``inicio``.
+_INCREMENTAR = """
+import sys, time
+from sqlalchemy.orm import sessionmaker
+from src.logica.concurrencia import Conflicto
+from src.logica.tarea_manager import TareaManager
+from src.modelo.database import crear_motor
+url, veces, inicio = sys.argv[1], int(sys.argv[2]), float(sys.argv[3])
+manager = TareaManager(sessionmaker(bind=crear_motor(url=url))())
+exitos = conflictos = 0
+time.sleep(max(0.0, inicio - time.time()))
+comienzo = time.perf_counter()
+while exitos < veces:
+    tarea = manager.obtener_tarea_por_id(1)
+    resultado = manager.actualizar_tarea(
+        1, version=tarea.version, titulo=str(int(tarea.titulo) + 1)
+    )
+    if isinstance(resultado, Conflicto):
+        conflictos += 1
+    elif resultado is None:
+        sys.exit("Error al actualizar la tarea.")
+    else:
+        exitos += 1
+print(exitos, conflictos, time.perf_counter() - comienzo)
+"""
+
+
+class TestConcurrencia(unittest.TestCase):
+    """Pruebas de versiones, conflictos y reintentos entre sesiones de un mismo archivo."""
+
+    def setUp(self):
+        """Crea el esquema en un archivo temporal y dos sesiones independientes."""
+        self.directorio = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{os.path.join(self.directorio.name, 'c.db')}"
+        self.motor = crear_motor(url=self.url)
+        Base.metadata.create_all(self.motor)
+        fabrica = sessionmaker(bind=self.motor)
+        self.session, self.otra = fabrica(), fabrica()
+        self.usuario = UsuarioManager(self.session).crear_usuario("ana", "ana@correo.com", "x")
+        self.session.add(Estado(id_estado=1, nombre_estado="Pendiente"))
+        self.session.commit()
+        self.manager = TareaManager(self.session)
+        self.tarea = self.manager.crear_tarea(
+            "0", "contador", datetime(2025, 1, 1), None,
+            id_estado=1, id_usuario=self.usuario.id_usuario
+        )
+
+    def tearDown(self):
+        """Cierra las sesiones y el motor y elimina el directorio temporal."""
+        self.session.close()
+        self.otra.close()
+        self.motor.dispose()
+        self.directorio.cleanup()
+
+    def test_actualizar_incrementa_la_version(self):
+        """Cada actualización incrementa la versión; cambiar solo las etiquetas no."""
+        self.assertEqual(self.tarea.version, 1)
+        self.manager.actualizar_tarea(self.tarea.id_tarea, titulo="Uno")
+        self.assertEqual(self.tarea.version, 2)
+        etiqueta = EtiquetaManager(self.session).crear_etiqueta("Casa", "Azul")
+        self.manager.actualizar_tarea(self.tarea.id_tarea, etiquetas=[etiqueta.id_etiqueta])
+        self.assertEqual(self.tarea.version, 2)
+
+    def test_version_leida_antigua_es_conflicto(self):
+        """Guardar con una versión que otra instancia ya superó devuelve un Conflicto."""
+        leida = self.tarea.version
+        TareaManager(self.otra).actualizar_tarea(self.tarea.id_tarea, titulo="De la otra")
+
+        resultado = self.manager.actualizar_tarea(
+            self.tarea.id_tarea, version=leida, titulo="Mía"
+        )
+        self.assertIsInstance(resultado, Conflicto)
+        self.assertFalse(resultado)
+        self.assertEqual(resultado, Conflicto("Tarea", self.tarea.id_tarea, 1, 2))
+        self.assertEqual(self.manager.obtener_tarea_por_id(self.tarea.id_tarea).titulo,
+                         "De la otra")
+
+    def test_cambio_entre_lectura_y_escritura_es_conflicto(self):
+        """El UPDATE comprueba la versión: no se pierde un cambio que llega en medio."""
+        tarea = self.manager.obtener_tarea_por_id(self.tarea.id_tarea)
+        self.assertEqual(tarea.version, 1)
+        with self.motor.begin() as conexion:
+            conexion.execute(text(
+                "UPDATE tarea SET titulo = 'Externa', version = version + 1 WHERE id_tarea = 1"
+            ))
+
+        resultado = self.manager.actualizar_tarea(self.tarea.id_tarea, titulo="Mía")
+        self.assertEqual(resultado, Conflicto("Tarea", 1, 1, 2))
+        # Tras el conflicto la sesión vuelve a leer la fila y se puede reintentar.
+        self.assertEqual(self.manager.actualizar_tarea(1, titulo="Mía").version, 3)
+
+    def test_eliminar_con_version_antigua(self):
+        """Borrar una etiqueta que otra sesión modificó es un conflicto; un usuario borrado no."""
+        etiquetas = EtiquetaManager(self.session)
+        etiqueta = etiquetas.crear_etiqueta("Casa", "Azul")
+        EtiquetaManager(self.otra).actualizar_etiqueta(etiqueta.id_etiqueta, color="Rojo")
+        self.assertEqual(etiquetas.eliminar_etiqueta(etiqueta.id_etiqueta, version=1),
+                         Conflicto("Etiqueta", etiqueta.id_etiqueta, 1, 2))
+        self.assertIsNotNone(etiquetas.obtener_etiqueta_por_id(etiqueta.id_etiqueta))
+
+        usuarios = UsuarioManager(self.session)
+        UsuarioManager(self.otra).eliminar_usuario(self.usuario.id_usuario)
+        resultado = usuarios.actualizar_usuario(
+            self.usuario.id_usuario, contrasena="nueva", version=1
+        )
+        # El usuario ya no existe: no hay versión actual.
+        self.assertIsNone(resultado)
+
+    def test_tarea_borrada_por_otra_conexion_es_conflicto(self):
+        """Completar o eliminar una tarea que otra conexión borró devuelve un Conflicto."""
+        id_tarea = self.tarea.id_tarea
+        # Termina la lectura: la tarea queda expirada, como tras cualquier confirmación.
+        self.session.rollback()
+        with self.motor.begin() as conexion:
+            conexion.execute(text("DELETE FROM tarea WHERE id_tarea = :id"), {"id": id_tarea})
+
+        self.assertEqual(self.manager.marcar_completado(self.tarea),
+                         Conflicto("Tarea", id_tarea, None, None))
+        self.assertEqual(self.manager.eliminar_tarea(self.tarea),
+                         Conflicto("Tarea", id_tarea, None, None))
+        self.assertIsNone(self.manager.obtener_tarea_por_id(id_tarea))
+
+    def test_actualizaciones_en_bloque_incrementan_la_version(self):
+        """UPDATE masivo y upsert de etiquetas incrementan la versión de lo que cambian."""
+        leida = self.tarea.version
+        self.manager.actualizar_tareas(FiltroTareas(id_usuario=self.usuario.id_usuario),
+                                       titulo="Masivo")
+        self.assertIsInstance(
+            self.manager.actualizar_tarea(self.tarea.id_tarea, version=leida, titulo="x"),
+            Conflicto
+        )
+
+        etiquetas = EtiquetaManager(self.session)
+        ids = etiquetas.guardar_etiquetas({"Casa": "Azul", "Trabajo": None})
+        etiquetas.guardar_etiquetas({"Casa": "Azul", "Trabajo": "Verde"})
+        versiones = {
+            e.nombre_etiqueta: e.version for e in etiquetas.obtener_etiquetas()
+        }
+        self.assertEqual(versiones, {"Casa": 1, "Trabajo": 2})
+        self.assertEqual(set(ids), {"Casa", "Trabajo"})
+
+    def test_reintenta_mientras_la_base_esta_bloqueada(self):
+        """Un bloqueo pasajero se supera con reintentos; uno permanente se propaga."""
+        # Sin busy_timeout SQLite devuelve el bloqueo al momento: esperan los reintentos.
+        motor = crear_motor(url=self.url, pragmas={"busy_timeout": 0})
+        session = sessionmaker(bind=motor)()
+        bloqueo = self.motor.raw_connection()
+        try:
+            bloqueo.execute("BEGIN IMMEDIATE")
+            threading.Timer(0.2, bloqueo.rollback).start()
+            tarea = TareaManager(session).actualizar_tarea(1, titulo="Tras el bloqueo")
+            self.assertEqual(tarea.titulo, "Tras el bloqueo")
+
+            bloqueo.execute("BEGIN IMMEDIATE")
+            with self.assertRaises(OperationalError) as error:
+                confirmar(session, lambda: session.execute(
+                    text("UPDATE tarea SET titulo = 'x'")
+                ), intentos=2)
+            self.assertTrue(es_bloqueo(error.exception))
+            bloqueo.rollback()
+        finally:
+            session.close()
+            bloqueo.close()
+            motor.dispose()
+
+    def test_contencion_entre_procesos(self):
+        """Varios procesos incrementan el mismo contador sin perder ningún incremento."""
+        procesos, veces = 4, 40
+        inicio = time.time() + 2
+        lanzados = [
+            subprocess.Popen(
+                [sys.executable, "-c", _INCREMENTAR, self.url, str(veces), str(inicio)],
+                cwd=RAIZ, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+            for _ in range(procesos)
+        ]
+        resultados = []
+        for proceso in lanzados:
+            salida, errores = proceso.communicate(timeout=120)
+            self.assertEqual(proceso.returncode, 0, errores)
+            exitos, conflictos, segundos = salida.strip().splitlines()[-1].split()
+            resultados.append((int(exitos), int(conflictos), float(segundos)))
+
+        total = procesos * veces
+        self.session.expire_all()
+        tarea = self.manager.obtener_tarea_por_id(1)
+        self.assertEqual(int(tarea.titulo), total)
+        self.assertEqual(tarea.version, total + 1)
+
+        conflictos = sum(r[1] for r in resultados)
+        por_segundo = total / max(r[2] for r in resultados)
+        tasa = conflictos / (total + conflictos)
+        self.assertGreater(por_segundo, 0)
+        self.assertLess(tasa, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
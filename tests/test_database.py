@@ -0,0 +1,307 @@
+"""
+Pruebas unitarias para la fábrica de motores de src.modelo.database.
+
+Verifica que la configuración se lea de los argumentos y del entorno, y que los
+PRAGMAs del perfil se apliquen en cada conexión nueva.
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from datetime import datetime
+
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import sessionmaker
+
+from src.logica.estado_manager import EstadoManager
+from src.logica.tarea_manager import TareaManager
+from src.logica.usuario_manager import UsuarioManager
+from src.modelo.database import (
+    VERSION_ESQUEMA, Base, cargar_configuracion, crear_motor, preparar_esquema
+)
+from src.modelo.modelo import Estado, Etiqueta, Tarea, Usuario
+from src.utilidades.migrar_descripciones import migrar_descripciones
+from src.utilidades.migrar_claves_foraneas import migrar_claves_foraneas
+from src.utilidades.migrar_fechas import migrar_fechas
+
+
+class TestDatabase(unittest.TestCase):
+    """Pruebas de cargar_configuracion y crear_motor."""
+
+    def setUp(self):
+        """Crea un directorio temporal para las bases de datos de prueba."""
+        self.directorio = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{os.path.join(self.directorio.name, 'prueba.db')}"
+
+    def tearDown(self):
+        """Elimina el directorio temporal."""
+        self.directorio.cleanup()
+
+    def _pragma(self, motor, nombre):
+        with motor.connect() as conexion:
+            return conexion.execute(text(f"PRAGMA {nombre}")).scalar()
+
+    def test_perfil_optimizado_aplica_pragmas(self):
+        """El perfil optimizado activa WAL y los demás PRAGMAs en cada conexión."""
+        motor = crear_motor(url=self.url, perfil="optimizado")
+        self.assertEqual(self._pragma(motor, "journal_mode"), "wal")
+        self.assertEqual(self._pragma(motor, "synchronous"), 1)  # NORMAL
+        self.assertEqual(self._pragma(motor, "busy_timeout"), 5000)
+        self.assertEqual(self._pragma(motor, "cache_size"), -65536)
+        self.assertEqual(self._pragma(motor, "temp_store"), 2)  # MEMORY
+        self.assertEqual(self._pragma(motor, "auto_vacuum"), 2)  # INCREMENTAL
+        motor.dispose()
+
+    def test_perfil_basico_conserva_valores_por_defecto(self):
+        """El perfil básico no modifica el modo de journal por defecto."""
+        motor = crear_motor(url=self.url, perfil="basico")
+        self.assertEqual(self._pragma(motor, "journal_mode"), "delete")
+        # auto_vacuum forma parte del formato del archivo, no del perfil.
+        self.assertEqual(self._pragma(motor, "auto_vacuum"), 2)
+        motor.dispose()
+
+    def test_entorno_sobrescribe_configuracion(self):
+        """Las variables de entorno sobrescriben URL, PRAGMAs y pool."""
+        entorno = {
+            "TODOLIST_DB_URL": self.url,
+            "TODOLIST_DB_BUSY_TIMEOUT": "1234",
+            "TODOLIST_DB_POOL_SIZE": "8",
+        }
+        with patch.dict(os.environ, entorno):
+            configuracion = cargar_configuracion()
+        self.assertEqual(configuracion["url"], self.url)
+        self.assertEqual(configuracion["pragmas"]["busy_timeout"], "1234")
+        self.assertEqual(configuracion["pool"], {"pool_size": 8})
+
+    def test_argumentos_tienen_prioridad(self):
+        """Los argumentos explícitos tienen prioridad sobre el entorno."""
+        with patch.dict(os.environ, {"TODOLIST_DB_BUSY_TIMEOUT": "1234"}):
+            configuracion = cargar_configuracion(pragmas={"busy_timeout": 10})
+        self.assertEqual(configuracion["pragmas"]["busy_timeout"], 10)
+
+    def test_pool_dimensionado(self):
+        """El pool de conexiones respeta el tamaño configurado."""
+        motor = crear_motor(url=self.url, pool={"pool_size": 3, "max_overflow": 0})
+        self.assertEqual(motor.pool.size(), 3)
+        motor.dispose()
+
+    def test_perfil_desconocido(self):
+        """Un perfil inexistente produce ValueError."""
+        with self.assertRaises(ValueError):
+            cargar_configuracion(perfil="turbo")
+
+    def test_migrar_descripciones_comprime_las_largas(self):
+        """La migración comprime por lotes las descripciones largas guardadas como texto."""
+        motor = crear_motor(url=self.url)
+        Base.metadata.create_all(motor)
+        larga = "texto de una nota antigua " * 100
+        with motor.begin() as conexion:
+            conexion.execute(text(
+                "INSERT INTO usuario (id_usuario, nombre_usuario, correo_electronico, contrasena) "
+                "VALUES (1, 'u', 'u@correo.com', 'x')"
+            ))
+            conexion.execute(text("INSERT INTO estado VALUES (1, 'Pendiente', NULL)"))
+            conexion.execute(
+                text("INSERT INTO tarea (titulo, descripcion, id_estado, id_usuario) "
+                     "VALUES ('t', :descripcion, 1, 1)"),
+                [{"descripcion": larga if i % 2 else "corta"} for i in range(7)]
+            )
+
+        self.assertEqual(migrar_descripciones(motor, tamano_lote=2), 3)
+        self.assertEqual(migrar_descripciones(motor, tamano_lote=2), 0)
+        with motor.connect() as conexion:
+            tipos = dict(conexion.execute(text(
+                "SELECT typeof(descripcion), count(*) FROM tarea GROUP BY 1"
+            )).all())
+            self.assertEqual(tipos, {"blob": 3, "text": 4})
+            self.assertEqual(conexion.execute(text(
+                "SELECT DISTINCT descomprimir(descripcion) FROM tarea "
+                "WHERE typeof(descripcion) = 'blob'"
+            )).scalar(), larga)
+        motor.dispose()
+
+    def test_migrar_fechas_de_texto_a_enteros(self):
+        """La migración convierte las fechas ISO en enteros sin perder microsegundos."""
+        motor = crear_motor(url=self.url)
+        Base.metadata.create_all(motor)
+        with motor.begin() as conexion:
+            conexion.execute(text(
+                "INSERT INTO usuario (id_usuario, nombre_usuario, correo_electronico, contrasena) "
+                "VALUES (1, 'u', 'u@correo.com', 'x')"
+            ))
+            conexion.execute(text("INSERT INTO estado VALUES (1, 'Pendiente', NULL)"))
+            conexion.execute(
+                text("INSERT INTO tarea (titulo, fecha_creacion, fecha_vencimiento, "
+                     "id_estado, id_usuario) VALUES ('t', :creacion, :vencimiento, 1, 1)"),
+                [
+                    {"creacion": "2024-12-31 23:59:59.999999",
+                     "vencimiento": "2025-07-01 12:00:00.000000"},
+                    {"creacion": "2025-03-30 02:30:00", "vencimiento": None},
+                ]
+            )
+
+        self.assertEqual(migrar_fechas(motor, tamano_lote=1), 2)
+        self.assertEqual(migrar_fechas(motor), 0)
+        with motor.connect() as conexion:
+            self.assertEqual(conexion.execute(text(
+                "SELECT DISTINCT typeof(fecha_creacion) FROM tarea"
+            )).scalars().all(), ["integer"])
+            fechas = conexion.execute(
+                select(Tarea.fecha_creacion, Tarea.fecha_vencimiento).order_by(Tarea.id_tarea)
+            ).all()
+        self.assertEqual(fechas[0], (
+            datetime(2024, 12, 31, 23, 59, 59, 999999), datetime(2025, 7, 1, 12, 0)
+        ))
+        self.assertEqual(fechas[1][1], None)
+        motor.dispose()
+
+    def test_claves_foraneas_activas_en_cada_conexion(self):
+        """foreign_keys=ON se aplica con cualquier perfil."""
+        for perfil in ("optimizado", "basico"):
+            motor = crear_motor(url=self.url, perfil=perfil)
+            self.assertEqual(self._pragma(motor, "foreign_keys"), 1)
+            motor.dispose()
+
+    def test_migrar_claves_foraneas_reconstruye_tablas(self):
+        """La migración añade ON DELETE CASCADE conservando filas, índices y búsqueda."""
+        motor = crear_motor(url=self.url)
+        Base.metadata.create_all(
+            motor, tables=[Usuario.__table__, Estado.__table__, Etiqueta.__table__]
+        )
+        with motor.begin() as conexion:
+            conexion.execute(text(
+                "CREATE TABLE tarea (id_tarea INTEGER PRIMARY KEY, titulo VARCHAR(150) NOT NULL, "
+                "descripcion TEXT, fecha_creacion DATETIME, fecha_vencimiento DATETIME, "
+                "id_estado INTEGER NOT NULL REFERENCES estado (id_estado), "
+                "id_usuario INTEGER NOT NULL REFERENCES usuario (id_usuario))"
+            ))
+            conexion.execute(text(
+                "CREATE TABLE tarea_etiqueta ("
+                "id_tarea INTEGER REFERENCES tarea (id_tarea), "
+                "id_etiqueta INTEGER REFERENCES etiqueta (id_etiqueta), "
+                "PRIMARY KEY (id_tarea, id_etiqueta))"
+            ))
+            conexion.execute(text(
+                "INSERT INTO usuario (id_usuario, nombre_usuario, correo_electronico, contrasena) "
+                "VALUES (1, 'u', 'u@correo.com', 'x')"
+            ))
+            conexion.execute(text("INSERT INTO estado VALUES (1, 'Pendiente', NULL)"))
+            conexion.execute(text(
+                "INSERT INTO etiqueta (id_etiqueta, nombre_etiqueta, color) VALUES (1, 'Casa', 'Azul')"
+            ))
+            conexion.execute(text(
+                "INSERT INTO tarea VALUES (1, 'Regar plantas', 'jardín', NULL, NULL, 1, 1)"
+            ))
+            conexion.execute(text("INSERT INTO tarea_etiqueta VALUES (1, 1)"))
+
+        self.assertEqual(migrar_claves_foraneas(motor), ["tarea", "tarea_etiqueta"])
+        self.assertEqual(migrar_claves_foraneas(motor), [])
+        with motor.begin() as conexion:
+            reglas = {fila[3]: fila[6] for fila in conexion.execute(
+                text("PRAGMA foreign_key_list(tarea_etiqueta)")
+            )}
+            self.assertEqual(reglas, {"id_tarea": "CASCADE", "id_etiqueta": "CASCADE"})
+            self.assertEqual(conexion.execute(text(
+                "SELECT rowid FROM tarea_fts WHERE tarea_fts MATCH 'plantas'"
+            )).scalar(), 1)
+            self.assertIsNotNone(conexion.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE name = 'ix_tarea_usuario_vencimiento'"
+            )).first())
+            conexion.execute(text("DELETE FROM usuario WHERE id_usuario = 1"))
+            self.assertEqual(conexion.execute(text(
+                "SELECT (SELECT count(*) FROM tarea) + (SELECT count(*) FROM tarea_etiqueta)"
+            )).scalar(), 0)
+        motor.dispose()
+
+    def test_otro_cliente_escribe_tareas_sin_funciones_de_la_aplicacion(self):
+        """Una conexión sin ``descomprimir`` escribe en tarea y la búsqueda sigue al día."""
+        motor = crear_motor(url=self.url)
+        preparar_esquema(motor)
+        larga = "Inventario del almacén " + "revisar estanterías " * 300
+        with sessionmaker(bind=motor)() as session:
+            usuario = UsuarioManager(session).crear_usuario("ana", "ana@correo.com", "x")
+            estado = EstadoManager(session).crear_estado("Pendiente")
+            manager = TareaManager(session)
+            ids = manager.crear_tareas_lote(
+                {"titulo": titulo, "descripcion": descripcion,
+                 "id_usuario": usuario.id_usuario, "id_estado": estado.id_estado}
+                for titulo, descripcion in (("Inventario", larga), ("Regar", "plantas"),
+                                            ("Archivo", larga.replace("almacén", "sótano")))
+            ).ids
+
+        externa = sqlite3.connect(self.url.removeprefix("sqlite:///"))
+        with externa:
+            externa.execute("INSERT INTO tarea (titulo, descripcion, id_estado, id_usuario) "
+                            "VALUES ('Podar setos', 'jardín', 1, 1)")
+            externa.execute("UPDATE tarea SET titulo = 'Inventario anual' WHERE id_tarea = ?",
+                            (ids[0],))
+            externa.execute("DELETE FROM tarea WHERE id_tarea IN (?, ?)", (ids[1], ids[2]))
+        externa.close()
+
+        with sessionmaker(bind=motor)() as session:
+            manager = TareaManager(session)
+            self.assertEqual(manager.indexar_busqueda(), 3)
+            self.assertEqual([r.id_tarea for r in manager.buscar(1, "setos")], [ids[2] + 1])
+            self.assertEqual(manager.buscar(1, "plantas"), [])
+            encontradas = manager.buscar(1, "estanterías")
+            self.assertEqual([(r.id_tarea, r.titulo) for r in encontradas],
+                             [(ids[0], "Inventario anual")])
+            self.assertIn("[estanterías]", encontradas[0].fragmento)
+            self.assertEqual([r.id_tarea for r in manager.buscar(1, "anual almacén")], [ids[0]])
+            for indice in ("tarea_fts", "tarea_fts_comprimida"):
+                session.execute(text(f"INSERT INTO {indice}({indice}) VALUES ('integrity-check')"))
+            self.assertEqual(session.execute(
+                text("SELECT count(*) FROM tarea_fts_pendiente")
+            ).scalar(), 0)
+        motor.dispose()
+
+    def test_preparar_esquema_solo_la_primera_vez(self):
+        """El DDL se ejecuta con la marca desactualizada y después basta con leerla."""
+        motor = crear_motor(url=self.url)
+        self.assertTrue(preparar_esquema(motor))
+        self.assertEqual(self._pragma(motor, "user_version"), VERSION_ESQUEMA)
+        with motor.connect() as conexion:
+            tablas = set(conexion.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )).scalars())
+        self.assertTrue({"usuario", "tarea", "tarea_etiqueta", "tarea_fts"} <= tablas)
+
+        sentencias = []
+
+        def registrar(_conn, _cursor, sentencia, *_args):
+            sentencias.append(sentencia)
+
+        event.listen(motor, "before_cursor_execute", registrar)
+        with patch.object(Base.metadata, "create_all") as create_all:
+            self.assertFalse(preparar_esquema(motor))
+        event.remove(motor, "before_cursor_execute", registrar)
+        create_all.assert_not_called()
+        self.assertEqual([s for s in sentencias if s != "BEGIN"], ["PRAGMA user_version"])
+        motor.dispose()
+
+    def test_importar_no_abre_la_base_de_datos(self):
+        """Importar database no crea el archivo; la primera sesión prepara el esquema."""
+        ruta = os.path.join(self.directorio.name, "perezosa.db")
+        entorno = {**os.environ, "TODOLIST_DB_URL": f"sqlite:///{ruta}"}
+        codigo = (
+            "import os\n"
+            "from src.modelo.database import Session\n"
+            f"assert not os.path.exists({ruta!r})\n"
+            "from sqlalchemy import text\n"
+            "with Session() as sesion:\n"
+            "    print(sesion.execute(text('PRAGMA user_version')).scalar())\n"
+        )
+        salida = subprocess.run(
+            [sys.executable, "-c", codigo], env=entorno, capture_output=True, text=True,
+            check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        self.assertEqual(salida.stdout.strip(), str(VERSION_ESQUEMA))
+
+
+if __name__ == "__main__":
+    unittest.main()
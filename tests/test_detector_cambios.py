@@ -0,0 +1,135 @@
+"""
+Pruebas de los contadores de cambios y de src.logica.detector_cambios.
+
+Cada prueba usa una base de datos en un archivo temporal: el detector tiene su propia
+conexión y las escrituras de la sesión de la prueba le llegan como las de otra
+instancia de la aplicación.
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from src.logica.detector_cambios import Cambios, DetectorCambios
+from src.logica.estado_manager import EstadoManager
+from src.logica.etiqueta_manager import EtiquetaManager
+from src.logica.tarea_manager import TareaManager
+from src.logica.usuario_manager import UsuarioManager
+from src.modelo.contadores import TODOS
+from src.modelo.database import crear_motor, preparar_esquema
+
+
+class TestDetectorCambios(unittest.TestCase):
+    """Pruebas de qué tablas y usuarios informa el detector tras cada escritura."""
+
+    def setUp(self):
+        """Crea el esquema con dos usuarios, un estado y una tarea por usuario."""
+        self.directorio = tempfile.TemporaryDirectory()
+        self.motor = crear_motor(url=f"sqlite:///{os.path.join(self.directorio.name, 'd.db')}")
+        preparar_esquema(self.motor)
+        self.session = sessionmaker(bind=self.motor)()
+        usuarios = UsuarioManager(self.session)
+        self.ana = usuarios.crear_usuario("ana", "ana@correo.com", "x").id_usuario
+        self.luis = usuarios.crear_usuario("luis", "luis@correo.com", "x").id_usuario
+        self.estado = EstadoManager(self.session).crear_estado("Pendiente").id_estado
+        self.manager = TareaManager(self.session)
+        self.tarea_ana, self.tarea_luis = (
+            self.manager.crear_tarea(f"Tarea {id_usuario}", None, datetime(2025, 1, 1), None,
+                                     id_estado=self.estado, id_usuario=id_usuario).id_tarea
+            for id_usuario in (self.ana, self.luis)
+        )
+        self.detector = DetectorCambios(self.motor)
+
+    def tearDown(self):
+        """Cierra el detector, la sesión y el motor y elimina el directorio temporal."""
+        self.detector.cerrar()
+        self.session.close()
+        self.motor.dispose()
+        self.directorio.cleanup()
+
+    def test_sin_cambios_no_consulta_los_contadores(self):
+        """Si nadie escribió, la comprobación solo lee PRAGMA data_version."""
+        sentencias = []
+        # pylint: disable=protected-access
+        self.detector._conexion.driver_connection.set_trace_callback(sentencias.append)
+        self.manager.obtener_tarea_por_id(self.tarea_ana)
+        self.session.commit()
+
+        cambios = self.detector.comprobar()
+        self.assertFalse(cambios)
+        self.assertEqual(cambios, Cambios({}))
+        self.assertEqual(sentencias, ["PRAGMA data_version"])
+
+    def test_cambio_de_una_tarea(self):
+        """Actualizar una tarea informa de la tabla y de su usuario, y solo una vez."""
+        self.manager.actualizar_tarea(self.tarea_ana, titulo="Nuevo título")
+
+        cambios = self.detector.comprobar()
+        self.assertEqual(cambios.por_tabla, {"tarea": frozenset({self.ana})})
+        self.assertTrue(cambios.afecta("tarea", self.ana))
+        self.assertFalse(cambios.afecta("tarea", self.luis))
+        self.assertFalse(cambios.afecta("etiqueta"))
+        self.assertFalse(self.detector.comprobar())
+
+    def test_tarea_que_cambia_de_usuario(self):
+        """Si una tarea pasa a otro usuario, cambia para los dos."""
+        self.manager.actualizar_tarea(self.tarea_ana, id_usuario=self.luis)
+        self.assertEqual(self.detector.comprobar().por_tabla,
+                         {"tarea": frozenset({self.ana, self.luis})})
+
+    def test_etiquetas_y_estados_afectan_a_todos(self):
+        """Etiquetas y estados son comunes; su asignación cuenta para el dueño de la tarea."""
+        etiqueta = EtiquetaManager(self.session).crear_etiqueta("Casa", "Azul").id_etiqueta
+        EstadoManager(self.session).actualizar_estado(self.estado, descripcion="Por hacer")
+        self.manager.asignar_etiquetas([self.tarea_luis], [etiqueta])
+
+        cambios = self.detector.comprobar()
+        self.assertEqual(cambios.por_tabla, {
+            "etiqueta": frozenset({TODOS}),
+            "estado": frozenset({TODOS}),
+            "tarea_etiqueta": frozenset({self.luis}),
+        })
+        self.assertTrue(cambios.afecta("etiqueta", self.ana))
+        self.assertFalse(cambios.afecta("tarea_etiqueta", self.ana))
+
+    def test_borrado_en_cascada(self):
+        """Los borrados en cascada cuentan para el usuario de las filas borradas."""
+        etiquetas = EtiquetaManager(self.session)
+        casa = etiquetas.crear_etiqueta("Casa", "Azul").id_etiqueta
+        self.manager.asignar_etiquetas([self.tarea_ana, self.tarea_luis], [casa])
+        self.detector.sincronizar()
+
+        # Las asignaciones de una etiqueta borrada cuentan para cada dueño.
+        etiquetas.eliminar_etiqueta(casa)
+        self.assertEqual(self.detector.comprobar().por_tabla, {
+            "etiqueta": frozenset({TODOS}),
+            "tarea_etiqueta": frozenset({self.ana, self.luis}),
+        })
+
+        # Las de una tarea borrada ya se cuentan con la propia tarea.
+        trabajo = etiquetas.crear_etiqueta("Trabajo", "Rojo").id_etiqueta
+        self.manager.asignar_etiquetas([self.tarea_ana], [trabajo])
+        self.detector.sincronizar()
+        with self.motor.begin() as conexion:
+            conexion.execute(text("DELETE FROM usuario WHERE id_usuario = :id"),
+                             {"id": self.ana})
+        self.assertEqual(self.detector.comprobar().por_tabla, {
+            "usuario": frozenset({self.ana}),
+            "tarea": frozenset({self.ana}),
+        })
+
+    def test_sincronizar_descarta_los_cambios_vistos(self):
+        """Tras sincronizar solo se informa de lo escrito después."""
+        self.manager.actualizar_tarea(self.tarea_ana, titulo="Uno")
+        self.detector.sincronizar()
+        self.manager.actualizar_tarea(self.tarea_luis, titulo="Dos")
+        self.assertEqual(self.detector.comprobar().tablas, {"tarea"})
+        self.assertEqual(self.detector.comprobar(), Cambios({}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+"""
+Pruebas del diario de cambios (src.modelo.diario) y de DiarioManager.
+
+Cada prueba usa una base de datos en un archivo temporal. Una segunda sesión hace de
+otra instancia de la aplicación que escribe mientras la primera consume el diario.
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from random import Random
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from src.logica.diario_manager import DiarioManager, EntradaDiario
+from src.logica.etiqueta_manager import EtiquetaManager
+from src.logica.filtros import FiltroTareas
+from src.logica.tarea_manager import TareaManager
+from src.logica.usuario_manager import UsuarioManager
+from src.modelo.contadores import TODOS
+from src.modelo.database import crear_motor, preparar_esquema
+from src.modelo.modelo import Estado
+
+
+class TestDiarioManager(unittest.TestCase):
+    """Pruebas de las entradas del diario, la lectura incremental y la compactación."""
+
+    def setUp(self):
+        """Crea el esquema con dos usuarios y un estado, y parte de un diario vacío."""
+        self.directorio = tempfile.TemporaryDirectory()
+        self.motor = crear_motor(url=f"sqlite:///{os.path.join(self.directorio.name, 'd.db')}")
+        preparar_esquema(self.motor)
+        fabrica = sessionmaker(bind=self.motor)
+        self.session, self.otra = fabrica(), fabrica()
+        usuarios = UsuarioManager(self.session)
+        self.ana = usuarios.crear_usuario("ana", "ana@correo.com", "x").id_usuario
+        self.luis = usuarios.crear_usuario("luis", "luis@correo.com", "x").id_usuario
+        self.session.add(Estado(id_estado=1, nombre_estado="Pendiente"))
+        self.session.commit()
+        self.manager = TareaManager(self.session)
+        self.diario = DiarioManager(self.session)
+        self.inicio = self.diario.ultima_secuencia()
+
+    def tearDown(self):
+        """Cierra las sesiones y el motor y elimina el directorio temporal."""
+        self.session.close()
+        self.otra.close()
+        self.motor.dispose()
+        self.directorio.cleanup()
+
+    def _crear(self, titulo, id_usuario, manager=None):
+        return (manager or self.manager).crear_tarea(
+            titulo, None, datetime(2025, 1, 1), None, id_estado=1, id_usuario=id_usuario
+        ).id_tarea
+
+    def test_una_entrada_por_entidad_con_su_ultima_operacion(self):
+        """Varias escrituras de la misma tarea se resumen en la última operación."""
+        primera = self._crear("Uno", self.ana)
+        segunda = self._crear("Dos", self.ana)
+        self.manager.actualizar_tarea(primera, titulo="Uno bis")
+        self.manager.actualizar_tarea(primera, titulo="Uno ter")
+        self.manager.eliminar_tarea(self.manager.obtener_tarea_por_id(segunda))
+
+        entradas = self.diario.cambios_desde(self.inicio)
+        self.assertEqual([(e.entidad, e.id_entidad, e.operacion) for e in entradas],
+                         [("tarea", primera, "U"), ("tarea", segunda, "D")])
+        self.assertEqual(entradas[-1].secuencia, self.diario.ultima_secuencia())
+        self.assertEqual(self.diario.cambios_desde(self.diario.ultima_secuencia()), [])
+
+    def test_cambios_por_usuario(self):
+        """Filtrar por usuario incluye lo común; mover una tarea la borra del anterior."""
+        id_tarea = self._crear("Tarea", self.ana)
+        etiqueta = EtiquetaManager(self.session).crear_etiqueta("Casa", "Azul").id_etiqueta
+        self._crear("De Luis", self.luis)
+        desde = self.diario.ultima_secuencia()
+        self.manager.actualizar_tarea(id_tarea, id_usuario=self.luis)
+
+        self.assertEqual(
+            [(e.id_entidad, e.operacion, e.id_usuario)
+             for e in self.diario.cambios_desde(desde, self.ana)],
+            [(id_tarea, "D", self.ana)]
+        )
+        self.assertEqual(
+            [(e.id_entidad, e.operacion) for e in self.diario.cambios_desde(desde, self.luis)],
+            [(id_tarea, "U")]
+        )
+        # Sin filtrar, la 'D' del usuario anterior va antes que la 'U' del nuevo.
+        self.assertEqual([e.operacion for e in self.diario.cambios_desde(desde)], ["D", "U"])
+        comunes = self.diario.cambios_desde(self.inicio, self.ana)
+        self.assertIn(("etiqueta", etiqueta, "I", TODOS),
+                      [(e.entidad, e.id_entidad, e.operacion, e.id_usuario) for e in comunes])
+
+    def test_etiquetas_y_cascada(self):
+        """Asignar etiquetas es una 'U' de la tarea; borrar el usuario anota la 'D' de sus tareas."""
+        id_tarea = self._crear("Tarea", self.ana)
+        etiqueta = EtiquetaManager(self.session).crear_etiqueta("Casa", "Azul").id_etiqueta
+        desde = self.diario.ultima_secuencia()
+        self.manager.asignar_etiquetas([id_tarea], [etiqueta])
+        self.assertEqual(self.diario.cambios_desde(desde, self.ana), [
+            EntradaDiario(desde + 1, "tarea", id_tarea, "U", self.ana)
+        ])
+
+        desde = self.diario.ultima_secuencia()
+        UsuarioManager(self.session).eliminar_usuario(self.ana)
+        self.assertEqual(
+            {(e.entidad, e.id_entidad, e.operacion) for e in self.diario.cambios_desde(desde)},
+            {("tarea", id_tarea, "D"), ("usuario", self.ana, "D")}
+        )
+
+    def test_refresco_incremental_equivale_a_recargar(self):
+        """Aplicar los cambios del diario a una copia da lo mismo que leerlo todo."""
+        otro = TareaManager(self.otra)
+        etiqueta = EtiquetaManager(self.session).crear_etiqueta("Casa", "Azul").id_etiqueta
+        aleatorio = Random(7)
+        ids = [self._crear(f"Tarea {i}", aleatorio.choice((self.ana, self.luis)))
+               for i in range(60)]
+        copia = {f.id_tarea: f for f in self.manager.obtener_filas_por_usuario(self.ana)}
+        secuencia = self.diario.ultima_secuencia()
+        self.session.commit()
+
+        for paso in range(40):
+            id_tarea = aleatorio.choice(ids)
+            accion = aleatorio.randrange(4)
+            if accion == 0:
+                otro.actualizar_tarea(id_tarea, titulo=f"Cambio {paso}")
+            elif accion == 1:
+                otro.actualizar_tarea(id_tarea,
+                                      id_usuario=aleatorio.choice((self.ana, self.luis)))
+            elif accion == 2:
+                otro.asignar_etiquetas([id_tarea], [etiqueta])
+            else:
+                ids.append(self._crear(f"Nueva {paso}", self.ana, otro))
+        otro.eliminar_tareas(FiltroTareas(ids=ids[::5]))
+
+        entradas = self.diario.cambios_desde(secuencia, self.ana)
+        cambiadas = {e.id_entidad for e in entradas if e.entidad == "tarea"}
+        self.assertLess(len(cambiadas), len(ids))
+        for id_tarea in cambiadas:
+            copia.pop(id_tarea, None)
+        copia.update((f.id_tarea, f) for f in self.manager.obtener_filas_por_usuario(
+            self.ana, ids=cambiadas
+        ))
+        self.assertEqual(sorted(copia.values()),
+                         self.manager.obtener_filas_por_usuario(self.ana))
+
+    def test_compactar_acota_el_diario(self):
+        """Compactar conserva las entradas recientes y no reutiliza las secuencias."""
+        for i in range(30):
+            self._crear(f"Tarea {i}", self.ana)
+        ultima = self.diario.ultima_secuencia()
+
+        self.assertEqual(self.diario.compactar(maximo=10, tamano_lote=7), ultima - 10)
+        self.session.commit()
+        total = self.session.scalar(text("SELECT count(*) FROM diario_cambios"))
+        self.assertEqual(total, 10)
+        self.assertEqual(self.diario.compactar(maximo=10), 0)
+
+        # Lo anterior al corte ya no está: hay que recargar; lo posterior sí.
+        self.assertIsNone(self.diario.cambios_desde(self.inicio))
+        self.assertEqual(len(self.diario.cambios_desde(ultima - 10)), 10)
+        self.assertIsNone(self.diario.cambios_desde(ultima + 1))
+
+        self.session.execute(text("DELETE FROM diario_cambios"))
+        self.session.commit()
+        self._crear("Después", self.ana)
+        self.assertEqual(self.diario.ultima_secuencia(), ultima + 1)
+        with self.assertRaises(ValueError):
+            self.diario.compactar(maximo=0)
+
+    def test_filas_por_ids_en_lotes(self):
+        """obtener_filas_por_usuario con ids lee solo esas tareas del usuario."""
+        ids = [self._crear(f"Tarea {i}", self.ana) for i in range(1200)]
+        de_luis = self._crear("De Luis", self.luis)
+        pedidas = set(ids[::2]) | {de_luis, 99999}
+        filas = self.manager.obtener_filas_por_usuario(self.ana, ids=pedidas)
+        self.assertEqual([f.id_tarea for f in filas], ids[::2])
+        self.assertEqual(self.manager.obtener_filas_por_usuario(self.ana, ids=[]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
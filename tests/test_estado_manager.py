@@ -7,6 +7,9 @@ de estados, validando tanto casos válidos como inválidos.
 
 import unittest
 from unittest.mock import patch
+
+from sqlalchemy import event
+
 from src.logica.estado_manager import EstadoManager
 from src.modelo.database import Session, Base, engine
 
@@ -156,6 +159,41 @@ class TestEstadoManager(unittest.TestCase):
             self.manager.eliminar_estado(9999)
             mocked_print.assert_called_with("Estado no encontrado para eliminar.")
 
+    def test_cache_resuelve_sin_consultas(self):
+        """Tras la primera carga, resolver nombres e IDs no consulta la base de datos."""
+        pendiente = self.manager.crear_estado("Pendiente")
+        completado = self.manager.crear_estado("Completado")
+        id_pendiente, id_completado = pendiente.id_estado, completado.id_estado
+        self.assertEqual(self.manager.obtener_id_por_nombre("Pendiente"), id_pendiente)
+
+        consultas = []
+
+        def registrar(_conn, _cursor, sentencia, *_args):
+            consultas.append(sentencia)
+
+        otra_sesion = Session()
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            otro_manager = EstadoManager(otra_sesion)
+            self.assertEqual(otro_manager.obtener_id_por_nombre("Completado"), id_completado)
+            self.assertEqual(otro_manager.obtener_nombre_por_id(id_pendiente), "Pendiente")
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+            otra_sesion.close()
+        self.assertEqual(consultas, [])
+
+    def test_cache_se_invalida_al_modificar(self):
+        """Crear, actualizar y eliminar estados invalidan la caché."""
+        self.assertIsNone(self.manager.obtener_id_por_nombre("Completado"))
+        estado = self.manager.crear_estado("Completado")
+        self.assertEqual(self.manager.obtener_id_por_nombre("Completado"), estado.id_estado)
+
+        self.manager.actualizar_estado(estado.id_estado, nombre_estado="Pendiente")
+        self.assertEqual(self.manager.obtener_nombre_por_id(estado.id_estado), "Pendiente")
+
+        self.manager.eliminar_estado(estado.id_estado)
+        self.assertIsNone(self.manager.obtener_id_por_nombre("Pendiente"))
+
 
 if __name__ == "__main__":
     unittest.main()
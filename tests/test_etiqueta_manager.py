@@ -8,10 +8,12 @@ el manejo de errores esperados (como duplicados) e inesperados (errores de base
 
 import unittest
 from unittest.mock import patch
+from sqlalchemy import event
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from src.logica.etiqueta_manager import EtiquetaManager
 from src.modelo.database import Session, Base, engine
+from src.modelo.modelo import Estado, Tarea, Usuario, tarea_etiqueta
 
 ETIQUETAS_INICIALES = [
     {"nombre_etiqueta": "Personal", "color": "Verde"},
@@ -120,6 +122,107 @@ class TestEtiquetaManager(unittest.TestCase):
             resultado = self.manager.eliminar_etiqueta(etiqueta.id_etiqueta)
             self.assertIsNone(resultado)
 
+    def test_catalogo_contenido(self):
+        """El catálogo contiene todas las etiquetas y los nombres ordenados."""
+        catalogo = self.manager.obtener_catalogo()
+        nombres = sorted(e["nombre_etiqueta"] for e in ETIQUETAS_INICIALES)
+        self.assertEqual(catalogo.nombres, nombres)
+        self.assertIn(("Urgente", "Rojo"), catalogo.por_id.values())
+
+    def test_catalogo_reutiliza_instantanea(self):
+        """Mientras la versión no cambia, el catálogo no consulta la base de datos."""
+        self.manager.obtener_catalogo()
+        consultas = []
+
+        def registrar(_conn, _cursor, sentencia, *_args):
+            consultas.append(sentencia)
+
+        otra_sesion = Session()
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            catalogo = EtiquetaManager(otra_sesion).obtener_catalogo()
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+            otra_sesion.close()
+        self.assertEqual(consultas, [])
+        self.assertEqual(len(catalogo.por_id), len(ETIQUETAS_INICIALES))
+
+    def test_catalogo_version_cambia_al_modificar(self):
+        """Crear, actualizar y eliminar etiquetas incrementan la versión del catálogo."""
+        versiones = [self.manager.obtener_catalogo().version]
+        etiqueta = self.manager.crear_etiqueta("Nueva", "Lila")
+        versiones.append(self.manager.version_catalogo())
+        self.manager.actualizar_etiqueta(etiqueta.id_etiqueta, nombre_etiqueta="Renombrada")
+        versiones.append(self.manager.version_catalogo())
+        self.assertIn("Renombrada", self.manager.obtener_catalogo().nombres)
+        self.manager.eliminar_etiqueta(etiqueta.id_etiqueta)
+        versiones.append(self.manager.version_catalogo())
+        self.assertNotIn("Renombrada", self.manager.obtener_catalogo().nombres)
+        self.assertEqual(versiones, sorted(set(versiones)))
+
+    def test_eliminar_etiqueta_solo_quita_asociaciones(self):
+        """
+        Prueba que eliminar una etiqueta borra sus asociaciones pero no las tareas.
+        """
+        etiqueta = self.manager.obtener_etiquetas()[0]
+        self.session.add_all([
+            Estado(id_estado=1, nombre_estado="Pendiente"),
+            Usuario(id_usuario=1, nombre_usuario="u", correo_electronico="u@correo.com",
+                    contrasena="x"),
+            Tarea(titulo="Comprar pan", id_estado=1, id_usuario=1, etiquetas=[etiqueta]),
+        ])
+        self.session.commit()
+
+        self.assertIsNotNone(self.manager.eliminar_etiqueta(etiqueta.id_etiqueta))
+        self.assertEqual(self.session.query(tarea_etiqueta).count(), 0)
+        tarea = self.session.query(Tarea).one()
+        self.assertEqual(tarea.etiquetas, [])
+
+    def test_guardar_etiquetas_en_bloque(self):
+        """
+        Prueba que el guardado masivo crea las nuevas, conserva los IDs existentes y
+        solo cambia el color cuando se indica.
+        """
+        existentes = {e.nombre_etiqueta: e for e in self.manager.obtener_etiquetas()}
+        version = self.manager.version_catalogo()
+
+        ids = self.manager.guardar_etiquetas(
+            {"Urgente": "Naranja", "Casa": None, "Trabajo": "Gris", "Ocio": None}
+        )
+        self.assertEqual(ids["Urgente"], existentes["Urgente"].id_etiqueta)
+        self.assertEqual(ids["Casa"], existentes["Casa"].id_etiqueta)
+        self.assertEqual(set(ids), {"Urgente", "Casa", "Trabajo", "Ocio"})
+        self.assertEqual(existentes["Urgente"].color, "Naranja")
+        self.assertEqual(existentes["Casa"].color, "Azul")
+        self.assertGreater(self.manager.version_catalogo(), version)
+        self.assertEqual(len(self.manager.obtener_etiquetas()), 6)
+        self.assertEqual(self.manager.guardar_etiquetas(["Ocio", "Ocio"]), {"Ocio": ids["Ocio"]})
+        self.assertEqual(self.manager.guardar_etiquetas([]), {})
+
+    def test_fusionar_etiquetas(self):
+        """
+        Prueba que la fusión traslada las tareas al destino sin duplicar asociaciones
+        y elimina la etiqueta de origen.
+        """
+        origen, destino = self.manager.obtener_etiquetas()[:2]
+        self.session.add_all([
+            Estado(id_estado=1, nombre_estado="Pendiente"),
+            Usuario(id_usuario=1, nombre_usuario="u", correo_electronico="u@correo.com",
+                    contrasena="x"),
+            Tarea(titulo="Solo origen", id_estado=1, id_usuario=1, etiquetas=[origen]),
+            Tarea(titulo="Ambas", id_estado=1, id_usuario=1, etiquetas=[origen, destino]),
+            Tarea(titulo="Solo destino", id_estado=1, id_usuario=1, etiquetas=[destino]),
+        ])
+        self.session.commit()
+        id_origen, id_destino = origen.id_etiqueta, destino.id_etiqueta
+
+        self.assertEqual(self.manager.fusionar_etiquetas(id_origen, id_destino), 1)
+        self.assertIsNone(self.manager.obtener_etiqueta_por_id(id_origen))
+        for tarea in self.session.query(Tarea):
+            self.assertEqual([e.id_etiqueta for e in tarea.etiquetas], [id_destino])
+        self.assertEqual(self.session.query(tarea_etiqueta).count(), 3)
+        self.assertIsNone(self.manager.fusionar_etiquetas(id_destino, id_destino))
+        self.assertIsNone(self.manager.fusionar_etiquetas(id_origen, id_destino))
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,302 @@
+"""
+Pruebas de las migraciones versionadas de src.modelo.migraciones.
+
+Cada prueba crea en un archivo temporal una base de datos con el esquema de la primera
+versión de la aplicación (fechas como texto ISO, descripciones sin comprimir y claves
+foráneas sin borrado en cascada) y la lleva hasta ``VERSION_ESQUEMA``. La prueba con un
+millón de tareas usa ``TODOLIST_FILAS_MIGRACION`` para cambiar su tamaño.
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from sqlalchemy import select, text
+
+from src.modelo.busqueda import desinstalar_busqueda
+from src.modelo.database import crear_motor, preparar_esquema
+from src.modelo.migraciones import (
+    MIGRACIONES, VERSION_ESQUEMA, aplicar_migraciones, version_actual
+)
+from src.modelo.modelo import Tarea
+from src.modelo.tipos import UMBRAL_COMPRESION
+
+FILAS_GRANDE = int(os.environ.get("TODOLIST_FILAS_MIGRACION", "1000000"))
+
+# Esquema tal como lo creaba la primera versión del modelo.
+ESQUEMA_ANTIGUO = (
+    "CREATE TABLE usuario (id_usuario INTEGER NOT NULL, nombre_usuario VARCHAR(100) NOT NULL, "
+    "correo_electronico VARCHAR(150) NOT NULL, contrasena VARCHAR(255) NOT NULL, "
+    "PRIMARY KEY (id_usuario), UNIQUE (nombre_usuario))",
+    "CREATE UNIQUE INDEX ix_usuario_correo_electronico ON usuario (correo_electronico)",
+    "CREATE TABLE estado (id_estado INTEGER NOT NULL, nombre_estado VARCHAR(50) NOT NULL, "
+    "descripcion VARCHAR(150), PRIMARY KEY (id_estado))",
+    "CREATE TABLE etiqueta (id_etiqueta INTEGER NOT NULL, nombre_etiqueta VARCHAR(50) NOT NULL, "
+    "color VARCHAR(20), PRIMARY KEY (id_etiqueta), UNIQUE (nombre_etiqueta))",
+    "CREATE TABLE tarea (id_tarea INTEGER NOT NULL, titulo VARCHAR(150) NOT NULL, "
+    "descripcion TEXT, fecha_creacion DATETIME, fecha_vencimiento DATETIME, "
+    "id_estado INTEGER NOT NULL, id_usuario INTEGER NOT NULL, PRIMARY KEY (id_tarea), "
+    "FOREIGN KEY(id_estado) REFERENCES estado (id_estado), "
+    "FOREIGN KEY(id_usuario) REFERENCES usuario (id_usuario))",
+    "CREATE INDEX ix_tarea_id_estado ON tarea (id_estado)",
+    "CREATE INDEX ix_tarea_id_usuario ON tarea (id_usuario)",
+    "CREATE TABLE tarea_etiqueta (id_tarea INTEGER NOT NULL, id_etiqueta INTEGER NOT NULL, "
+    "PRIMARY KEY (id_tarea, id_etiqueta), "
+    "FOREIGN KEY(id_tarea) REFERENCES tarea (id_tarea), "
+    "FOREIGN KEY(id_etiqueta) REFERENCES etiqueta (id_etiqueta))",
+)
+
+# Una de cada mil tareas tiene una descripción por encima del umbral de compresión.
+_TAREAS_ANTIGUAS = text("""
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :filas)
+    INSERT INTO tarea (id_tarea, titulo, descripcion, fecha_creacion, fecha_vencimiento,
+                       id_estado, id_usuario)
+    SELECT i, 'Tarea ' || i,
+           CASE WHEN i % 1000 = 0 THEN printf('%.*c', :largo, 'x') ELSE 'nota ' || i END,
+           strftime('%Y-%m-%d %H:%M:%S', 1735732800 + i * 60, 'unixepoch')
+               || printf('.%06d', i % 1000000),
+           CASE WHEN i % 3 = 0 THEN NULL
+                ELSE strftime('%Y-%m-%d %H:%M:%S', 1735732800 + i * 3600, 'unixepoch') END,
+           1 + i % 2, 1 + i % 10
+    FROM n
+""")
+
+# Índice de búsqueda de la versión 10, que descomprimía la descripción en los triggers.
+BUSQUEDA_ANTERIOR = (
+    "CREATE VIEW tarea_fts_contenido AS SELECT id_tarea, titulo, "
+    "descomprimir(descripcion) AS descripcion, id_usuario FROM tarea",
+    "CREATE VIRTUAL TABLE tarea_fts USING fts5(titulo, descripcion, id_usuario, "
+    "content='tarea_fts_contenido', content_rowid='id_tarea', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER tarea_fts_ai AFTER INSERT ON tarea BEGIN "
+    "INSERT INTO tarea_fts(rowid, titulo, descripcion, id_usuario) VALUES "
+    "(new.id_tarea, new.titulo, descomprimir(new.descripcion), new.id_usuario); END",
+)
+
+
+def crear_base_antigua(motor, filas):
+    """Crea el esquema de la primera versión con ``filas`` tareas etiquetadas y sin auto_vacuum."""
+    with motor.begin() as conexion:
+        for ddl in ESQUEMA_ANTIGUO:
+            conexion.exec_driver_sql(ddl)
+        conexion.execute(text(
+            "INSERT INTO usuario SELECT value, 'u' || value, 'u' || value || '@correo.com', 'x' "
+            "FROM json_each('[1,2,3,4,5,6,7,8,9,10]')"
+        ))
+        conexion.execute(text(
+            "INSERT INTO estado VALUES (1, 'Pendiente', NULL), (2, 'Completado', NULL)"
+        ))
+        conexion.execute(text(
+            "INSERT INTO etiqueta VALUES (1, 'Casa', 'Azul'), (2, 'Urgente', 'Rojo')"
+        ))
+        conexion.execute(_TAREAS_ANTIGUAS, {"filas": filas, "largo": UMBRAL_COMPRESION + 500})
+        conexion.execute(text(
+            "INSERT INTO tarea_etiqueta SELECT id_tarea, 1 + id_tarea % 2 FROM tarea"
+        ))
+    # La primera versión no activaba auto_vacuum; VACUUM no se puede ejecutar dentro
+    # de una transacción.
+    conexion = motor.raw_connection()
+    try:
+        conexion.driver_connection.execute("PRAGMA auto_vacuum = NONE")
+        conexion.driver_connection.execute("VACUUM")
+    finally:
+        conexion.close()
+
+
+class _Interrupcion(Exception):
+    """Simula que el usuario cierra la aplicación a mitad de una migración."""
+
+
+class TestMigraciones(unittest.TestCase):
+    """Pruebas de aplicar_migraciones sobre bases de datos de versiones anteriores."""
+
+    def setUp(self):
+        """Crea un motor sobre un archivo temporal."""
+        self.directorio = tempfile.TemporaryDirectory()
+        self.motor = crear_motor(url=f"sqlite:///{os.path.join(self.directorio.name, 'm.db')}")
+
+    def tearDown(self):
+        """Cierra el motor y elimina el directorio temporal."""
+        self.motor.dispose()
+        self.directorio.cleanup()
+
+    def _consulta(self, sql):
+        with self.motor.connect() as conexion:
+            return conexion.execute(text(sql)).all()
+
+    def _comprobar_migrada(self, filas):
+        """Verifica el estado final de una base antigua con ``filas`` tareas."""
+        self.assertEqual(version_actual(self.motor), VERSION_ESQUEMA)
+        self.assertEqual(self._consulta("SELECT count(*) FROM tarea")[0][0], filas)
+        self.assertEqual(self._consulta("SELECT count(*) FROM tarea_etiqueta")[0][0], filas)
+        tipos = dict(self._consulta(
+            "SELECT typeof(fecha_creacion) || '/' || typeof(descripcion), count(*) "
+            "FROM tarea GROUP BY 1"
+        ))
+        self.assertEqual(tipos, {"integer/text": filas - filas // 1000,
+                                 "integer/blob": filas // 1000})
+        for tabla in ("usuario", "etiqueta", "tarea"):
+            self.assertEqual(self._consulta(f"SELECT DISTINCT version FROM {tabla}"), [(1,)])
+        reglas = {fila[3]: fila[6] for fila in self._consulta("PRAGMA foreign_key_list(tarea)")}
+        self.assertEqual(reglas, {"id_usuario": "CASCADE", "id_estado": "NO ACTION"})
+        self.assertEqual(self._consulta("PRAGMA foreign_key_check"), [])
+        self.assertTrue(self._consulta(
+            "SELECT 1 FROM sqlite_master WHERE name = 'ix_tarea_etiqueta_etiqueta_tarea'"
+        ))
+        with self.motor.connect() as conexion:
+            fechas = conexion.execute(
+                select(Tarea.fecha_creacion, Tarea.fecha_vencimiento)
+                .where(Tarea.id_tarea.in_([1, 3]))
+                .order_by(Tarea.id_tarea)
+            ).all()
+        # El texto se interpretaba en hora local: se recupera el mismo valor.
+        self.assertEqual(fechas, [
+            (datetime(2025, 1, 1, 12, 1, 0, 1), datetime(2025, 1, 1, 13, 0)),
+            (datetime(2025, 1, 1, 12, 3, 0, 3), None),
+        ])
+        self.assertEqual(self._consulta(
+            "SELECT rowid FROM tarea_fts WHERE tarea_fts MATCH 'titulo:\"Tarea 3\"' "
+            "AND rowid = 3"
+        ), [(3,)])
+        # Las descripciones comprimidas tienen su propio índice y ningún trigger llama a
+        # funciones de la aplicación.
+        self.assertEqual(self._consulta(
+            "SELECT count(*) FROM tarea_fts_comprimida "
+            "WHERE tarea_fts_comprimida MATCH 'descripcion: x*'"
+        ), [(filas // 1000,)])
+        self.assertEqual(self._consulta(
+            "SELECT name FROM sqlite_master WHERE type IN ('trigger', 'view') "
+            "AND sql LIKE '%descomprimir%'"
+        ), [("tarea_fts_comprimida_contenido",)])
+        # Los triggers de los contadores y del diario quedan instalados tras reconstruir
+        # las tablas.
+        with self.motor.begin() as conexion:
+            conexion.execute(text("UPDATE tarea SET titulo = 'x' WHERE id_tarea = 1"))
+        self.assertEqual(self._consulta(
+            "SELECT tabla, contador FROM contador_cambios"
+        ), [("tarea", 1)])
+        self.assertEqual(self._consulta(
+            "SELECT entidad, id_entidad, operacion FROM diario_cambios"
+        ), [("tarea", 1, "U")])
+        # Las tareas antiguas no tienen uid: su clave única se deriva del ID.
+        self.assertEqual(self._consulta(
+            "SELECT count(DISTINCT clave), count(uid), count(modificado_en) FROM tarea"
+        ), [(filas, 0, 0)])
+        self.assertTrue(self._consulta(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sincronizacion_tarea_delete'"
+        ))
+        # Papelera: columna, índices parciales, triggers que la tienen en cuenta y
+        # archivo convertido a auto_vacuum incremental.
+        columnas = [fila[1] for fila in self._consulta("PRAGMA table_info(tarea)")]
+        self.assertIn("borrado_en", columnas)
+        parciales = {fila[1]: fila[4] for fila in self._consulta("PRAGMA index_list(tarea)")}
+        self.assertEqual(parciales["ix_tarea_usuario_vencimiento"], 1)
+        self.assertEqual(parciales["ix_tarea_usuario_creacion"], 0)
+        self.assertEqual(parciales["ix_tarea_papelera"], 1)
+        self.assertEqual(self._consulta("PRAGMA auto_vacuum"), [(2,)])
+        self.assertTrue(self._consulta(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sincronizacion_tarea_papelera'"
+        ))
+        with self.motor.begin() as conexion:
+            conexion.execute(text("UPDATE tarea SET borrado_en = 1 WHERE id_tarea = 2"))
+        self.assertEqual(self._consulta(
+            "SELECT operacion FROM diario_cambios WHERE id_entidad = 2"
+        ), [("D",)])
+        self.assertEqual(self._consulta("SELECT id_tarea, borrado_en FROM tarea_borrada"),
+                         [(2, 1)])
+
+    def test_base_nueva_se_crea_en_la_ultima_version(self):
+        """Una base vacía se crea con el esquema actual sin pasar por las migraciones."""
+        llamadas = []
+        self.assertEqual(aplicar_migraciones(self.motor, lambda *a: llamadas.append(a)), [])
+        self.assertEqual(llamadas, [])
+        self.assertEqual(version_actual(self.motor), VERSION_ESQUEMA)
+        self.assertEqual(aplicar_migraciones(self.motor), [])
+
+    def test_migrar_base_antigua(self):
+        """Una base de la primera versión pasa por todas las migraciones en orden."""
+        crear_base_antigua(self.motor, 5000)
+        avance = []
+        aplicadas = aplicar_migraciones(
+            self.motor, lambda migracion, total: avance.append((migracion.version, total))
+        )
+        self.assertEqual(aplicadas, list(MIGRACIONES))
+        # Cada migración avisa de su inicio con un avance 0 antes de trabajar.
+        primeros = {}
+        for version, total in avance:
+            primeros.setdefault(version, total)
+        self.assertEqual(primeros, {m.version: 0 for m in MIGRACIONES})
+        self.assertIn((3, 5000), avance)
+        self._comprobar_migrada(5000)
+        self.assertEqual(aplicar_migraciones(self.motor), [])
+
+        self.motor.dispose()
+        self.assertFalse(preparar_esquema(self.motor))
+
+    def test_busqueda_con_descomprimir_en_los_triggers(self):
+        """La última migración sustituye los triggers de búsqueda que descomprimían."""
+        preparar_esquema(self.motor)
+        with self.motor.begin() as conexion:
+            desinstalar_busqueda(conexion)
+            for ddl in BUSQUEDA_ANTERIOR:
+                conexion.exec_driver_sql(ddl)
+            conexion.exec_driver_sql(f"PRAGMA user_version = {VERSION_ESQUEMA - 1}")
+        self.assertEqual(aplicar_migraciones(self.motor), [MIGRACIONES[-1]])
+        self.assertEqual(self._consulta(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND sql LIKE '%descomprimir%'"
+        ), [])
+        self.assertTrue(self._consulta(
+            "SELECT 1 FROM sqlite_master WHERE name = 'tarea_fts_comprimida'"
+        ))
+
+    def test_migracion_interrumpida_continua(self):
+        """Si una migración se interrumpe, la siguiente ejecución sigue donde se quedó."""
+        crear_base_antigua(self.motor, 12000)
+
+        def interrumpir(migracion, total):
+            if migracion.version == 3 and total >= 5000:
+                raise _Interrupcion()
+
+        with self.assertRaises(_Interrupcion):
+            aplicar_migraciones(self.motor, interrumpir)
+        self.assertEqual(version_actual(self.motor), 2)
+        self.assertEqual(self._consulta(
+            "SELECT count(*) FROM tarea WHERE typeof(fecha_creacion) = 'integer'"
+        )[0][0], 5000)
+
+        avance = []
+        aplicadas = aplicar_migraciones(
+            self.motor, lambda migracion, total: avance.append((migracion.version, total))
+        )
+        self.assertEqual(aplicadas, [m for m in MIGRACIONES if m.version >= 3])
+        # Solo quedaban 7000 tareas por convertir.
+        self.assertEqual(max(total for version, total in avance if version == 3), 7000)
+        self._comprobar_migrada(12000)
+
+    def test_migrar_millon_de_filas(self):
+        """Una base antigua grande se migra por lotes y queda utilizable."""
+        crear_base_antigua(self.motor, FILAS_GRANDE)
+        lotes = []
+        aplicar_migraciones(
+            self.motor, lambda migracion, total: lotes.append((migracion.version, total))
+        )
+        self._comprobar_migrada(FILAS_GRANDE)
+        # Las fechas se convirtieron en lotes acotados, con avance tras cada uno.
+        self.assertGreaterEqual(len([1 for version, _ in lotes if version == 3]),
+                                FILAS_GRANDE // 5000)
+
+        self.motor.dispose()
+        with self.motor.connect() as conexion:
+            conexion.execute(text("DELETE FROM usuario WHERE id_usuario = 1"))
+            conexion.commit()
+        self.assertEqual(
+            self._consulta("SELECT count(*) FROM tarea")[0][0], FILAS_GRANDE - FILAS_GRANDE // 10
+        )
+        self.assertEqual(self._consulta("SELECT count(*) FROM tarea_etiqueta")[0][0],
+                         FILAS_GRANDE - FILAS_GRANDE // 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
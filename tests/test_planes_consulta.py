@@ -0,0 +1,166 @@
+"""
+Pruebas de regresión de los planes de consulta de los managers del sistema ToDoList.
+
+Cada prueba ejecuta una consulta de un manager, captura las sentencias SELECT que
+emite y las vuelve a ejecutar con ``EXPLAIN QUERY PLAN``. La prueba falla si alguna
+de ellas recorre completa una de las tablas grandes (tarea, tarea_etiqueta, usuario)
+en lugar de usar un índice. Los métodos que listan una tabla entera a propósito
+(obtener_tareas, obtener_usuarios, obtener_etiquetas, obtener_estados) no se revisan.
+"""
+
+import re
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from src.logica.estado_manager import EstadoManager
+from src.logica.etiqueta_manager import EtiquetaManager
+from src.logica.tarea_manager import TareaManager
+from src.logica.usuario_manager import UsuarioManager
+from src.modelo.database import Session, Base, engine
+
+TABLAS_VIGILADAS = ("tarea", "tarea_etiqueta", "usuario")
+PATRON_RECORRIDO = re.compile(r"^SCAN (\w+)(?! USING)")
+
+
+class TestPlanesConsulta(unittest.TestCase):
+    """Verifica que las consultas de los managers usen índices."""
+
+    def setUp(self):
+        """Crea un esquema limpio con un usuario, un estado, etiquetas y tareas."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.session = Session()
+        self.tareas = TareaManager(self.session)
+        self.usuarios = UsuarioManager(self.session)
+        self.estados = EstadoManager(self.session)
+        self.etiquetas = EtiquetaManager(self.session)
+
+        self.usuario = self.usuarios.crear_usuario("Planes", "planes@correo.com", "x")
+        self.estado = self.estados.crear_estado("Pendiente")
+        self.etiqueta = self.etiquetas.crear_etiqueta("Urgente", "Rojo")
+        base = datetime(2030, 1, 1)
+        self.ids = self.tareas.crear_tareas_lote(
+            {
+                "titulo": f"Tarea {i}", "fecha_creacion": base,
+                "fecha_vencimiento": base + timedelta(days=i),
+                "id_usuario": self.usuario.id_usuario, "id_estado": self.estado.id_estado,
+                "etiquetas": [self.etiqueta.id_etiqueta],
+            }
+            for i in range(5)
+        ).ids
+        self.session.expire_all()
+
+    def tearDown(self):
+        """Revierte y cierra la sesión."""
+        self.session.rollback()
+        self.session.close()
+
+    def _capturar_consultas(self, funcion):
+        """Ejecuta la función y devuelve las sentencias SELECT emitidas con sus parámetros."""
+        capturadas = []
+
+        def registrar(_conn, _cursor, sentencia, parametros, _contexto, _varios):
+            if sentencia.lstrip().upper().startswith("SELECT"):
+                capturadas.append((sentencia, parametros))
+
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            funcion()
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+        return capturadas
+
+    def assertSinRecorridoCompleto(self, funcion):  # pylint: disable=invalid-name
+        """Falla si alguna consulta emitida por la función recorre una tabla vigilada."""
+        consultas = self._capturar_consultas(funcion)
+        self.assertTrue(consultas, "La función no emitió ninguna consulta.")
+        with engine.connect() as conexion:
+            for sentencia, parametros in consultas:
+                plan = conexion.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {sentencia}", parametros
+                ).all()
+                for fila in plan:
+                    detalle = fila[-1]
+                    coincidencia = PATRON_RECORRIDO.match(detalle)
+                    if coincidencia and coincidencia.group(1) in TABLAS_VIGILADAS:
+                        self.fail(f"Recorrido completo '{detalle}' en:\n{sentencia}")
+
+    def test_tarea_por_id(self):
+        """obtener_tarea_por_id busca por clave primaria."""
+        self.assertSinRecorridoCompleto(lambda: self.tareas.obtener_tarea_por_id(self.ids[0]))
+
+    def test_tareas_por_usuario(self):
+        """obtener_tareas_por_usuario usa el índice por usuario."""
+        id_usuario = self.usuario.id_usuario
+        self.assertSinRecorridoCompleto(
+            lambda: self.tareas.obtener_tareas_por_usuario(id_usuario)
+        )
+
+    def test_filas_por_usuario(self):
+        """La proyección de la tabla principal usa índices en tarea y tarea_etiqueta."""
+        id_usuario = self.usuario.id_usuario
+        self.assertSinRecorridoCompleto(
+            lambda: self.tareas.obtener_filas_por_usuario(id_usuario)
+        )
+
+    def test_paginas_por_usuario(self):
+        """Todas las claves de orden de la paginación usan índices, con y sin token."""
+        id_usuario = self.usuario.id_usuario
+        for orden in ("id", "vencimiento", "creacion"):
+            primera = self.tareas.obtener_pagina_tareas(id_usuario, tamano=2, orden=orden)
+            self.assertSinRecorridoCompleto(
+                lambda o=orden: self.tareas.obtener_pagina_tareas(id_usuario, 2, o)
+            )
+            self.assertSinRecorridoCompleto(
+                lambda o=orden, t=primera.token_siguiente:
+                self.tareas.obtener_pagina_tareas(id_usuario, 2, o, t)
+            )
+
+    def test_papelera_y_purga(self):
+        """La papelera, su restauración y la purga de las tareas caducadas usan índices."""
+        id_usuario = self.usuario.id_usuario
+        for id_tarea in self.ids[:3]:
+            self.tareas.eliminar_tarea(self.tareas.obtener_tarea_por_id(id_tarea))
+        self.assertSinRecorridoCompleto(lambda: self.tareas.obtener_papelera(id_usuario))
+        self.assertSinRecorridoCompleto(lambda: self.tareas.restaurar_tarea(self.ids[0]))
+        self.assertSinRecorridoCompleto(
+            lambda: self.tareas.purgar_papelera(antiguedad=timedelta(0))
+        )
+
+    def test_tareas_por_etiqueta(self):
+        """Cargar las tareas de una etiqueta usa el índice inverso de tarea_etiqueta."""
+        etiqueta = self.etiquetas.obtener_etiqueta_por_id(self.etiqueta.id_etiqueta)
+        self.assertSinRecorridoCompleto(lambda: list(etiqueta.tareas))
+
+    def test_tareas_por_expresion_de_etiquetas(self):
+        """Las combinaciones de etiquetas se resuelven con índices, también las negaciones."""
+        self.etiquetas.crear_etiqueta("Casa", "Azul")
+        id_usuario = self.usuario.id_usuario
+        for expresion in ("Urgente AND Casa", "Urgente OR Casa", "Urgente AND NOT Casa",
+                          "NOT Casa", "NOT (Urgente OR Casa)"):
+            with self.subTest(expresion=expresion):
+                self.assertSinRecorridoCompleto(
+                    lambda e=expresion: self.tareas.obtener_tareas_por_etiquetas(e, id_usuario)
+                )
+
+    def test_usuario_por_id_y_nombre(self):
+        """Las búsquedas de usuario por ID y por nombre usan índices."""
+        id_usuario = self.usuario.id_usuario
+        self.assertSinRecorridoCompleto(lambda: self.usuarios.obtener_usuario_por_id(id_usuario))
+        self.session.expunge_all()
+        self.assertSinRecorridoCompleto(lambda: self.usuarios.obtener_por_nombre("Planes"))
+
+    def test_estado_y_etiqueta_por_id(self):
+        """Las búsquedas de estado y etiqueta por ID usan la clave primaria."""
+        id_estado = self.estado.id_estado
+        id_etiqueta = self.etiqueta.id_etiqueta
+        self.assertSinRecorridoCompleto(lambda: self.estados.obtener_estado_por_id(id_estado))
+        self.assertSinRecorridoCompleto(
+            lambda: self.etiquetas.obtener_etiqueta_por_id(id_etiqueta)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
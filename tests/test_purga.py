@@ -0,0 +1,93 @@
+"""
+Pruebas de la purga periódica de la papelera (src.logica.purga).
+
+Usan una base de datos en un archivo temporal para comprobar que, además de borrar
+las tareas caducadas, la purga devuelve al sistema las páginas que ocupaban.
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from src.logica.estado_manager import EstadoManager
+from src.logica.purga import PurgaPeriodica
+from src.logica.tarea_manager import TareaManager
+from src.logica.usuario_manager import UsuarioManager
+from src.modelo.database import crear_motor, preparar_esquema
+
+
+class TestPurga(unittest.TestCase):
+    """Pruebas del hilo de purga de la papelera."""
+
+    def setUp(self):
+        """Crea una base en un archivo temporal con 500 tareas en la papelera."""
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, "purga.db")
+        self.motor = crear_motor(url=f"sqlite:///{self.ruta}")
+        preparar_esquema(self.motor)
+        with sessionmaker(bind=self.motor)() as session:
+            usuario = UsuarioManager(session).crear_usuario("ana", "ana@correo.com", "x")
+            estado = EstadoManager(session).crear_estado("Pendiente")
+            manager = TareaManager(session)
+            ids = manager.crear_tareas_lote(
+                {"titulo": f"Tarea {i}", "descripcion": f"nota {i} " * 200,
+                 "id_usuario": usuario.id_usuario, "id_estado": estado.id_estado}
+                for i in range(500)
+            ).ids
+            self.restante = ids[-1]
+            for id_tarea in ids[:-1]:
+                manager.eliminar_tarea(manager.obtener_tarea_por_id(id_tarea))
+
+    def tearDown(self):
+        """Cierra el motor y elimina el directorio temporal."""
+        self.motor.dispose()
+        self.directorio.cleanup()
+
+    def _paginas(self):
+        """Páginas del archivo, tras llevar a él con un checkpoint lo anotado en el WAL."""
+        with self.motor.connect() as conexion:
+            conexion.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            paginas = conexion.exec_driver_sql("PRAGMA page_count").scalar()
+            tamano = conexion.exec_driver_sql("PRAGMA page_size").scalar()
+        self.assertEqual(os.path.getsize(self.ruta), paginas * tamano)
+        return paginas
+
+    def test_purga_caducadas_y_reduce_el_archivo(self):
+        """La primera pasada borra las tareas caducadas y trunca el archivo."""
+        antes = self._paginas()
+        purga = PurgaPeriodica(self.motor, antiguedad=timedelta(0), tamano_lote=100,
+                               paginas_por_lote=50)
+        purga.start()
+        try:
+            self.assertTrue(purga.esperar_pasada(30))
+        finally:
+            purga.detener(30)
+        self.assertFalse(purga.is_alive())
+        self.assertEqual(purga.ultimo_resultado.tareas, 499)
+        self.assertGreater(purga.ultimo_resultado.paginas, 0)
+
+        with sessionmaker(bind=self.motor)() as session:
+            self.assertEqual(
+                [t.id_tarea for t in TareaManager(session).obtener_tareas()], [self.restante]
+            )
+        # El índice de búsqueda anota los borrados durante la purga, así que el archivo
+        # encoge algo menos que las páginas liberadas; pero no queda ninguna libre.
+        self.assertLess(self._paginas(), antes)
+        with self.motor.connect() as conexion:
+            self.assertEqual(conexion.exec_driver_sql("PRAGMA freelist_count").scalar(), 0)
+
+    def test_detener_antes_de_caducar(self):
+        """Sin tareas caducadas la pasada no borra nada y el hilo termina al detenerlo."""
+        purga = PurgaPeriodica(self.motor, intervalo=3600)
+        purga.start()
+        self.assertTrue(purga.esperar_pasada(30))
+        purga.detener(30)
+        self.assertFalse(purga.is_alive())
+        self.assertEqual(purga.ultimo_resultado.tareas, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
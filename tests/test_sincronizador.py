@@ -0,0 +1,289 @@
+"""
+Pruebas de la sincronización de dos copias de la base de datos (src.logica.sincronizador).
+
+Cada prueba crea una base de datos en un archivo temporal, la copia a otro archivo
+como haría quien lleva ``tasks.db`` de un equipo a otro y cambia las dos copias por
+separado antes de sincronizarlas.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from src.logica.etiqueta_manager import EtiquetaManager
+from src.logica.sincronizador import Sincronizador
+from src.logica.tarea_manager import TareaManager
+from src.logica.usuario_manager import UsuarioManager
+from src.modelo.database import crear_motor, preparar_esquema
+from src.modelo.modelo import Estado
+from src.utilidades.sincronizar import sincronizar
+
+# Contenido comparable de las tareas activas de una copia, sin los IDs locales.
+_SQL_TAREAS = text("""
+    SELECT t.clave, t.titulo, t.descripcion, t.fecha_vencimiento, e.nombre_estado,
+           u.nombre_usuario,
+           (SELECT group_concat(nombre_etiqueta) FROM
+               (SELECT g.nombre_etiqueta FROM tarea_etiqueta te
+                JOIN etiqueta g ON g.id_etiqueta = te.id_etiqueta
+                WHERE te.id_tarea = t.id_tarea ORDER BY 1))
+    FROM tarea t JOIN estado e USING (id_estado) JOIN usuario u USING (id_usuario)
+    WHERE t.borrado_en IS NULL
+    ORDER BY t.clave
+""")
+
+
+class TestSincronizador(unittest.TestCase):
+    """Pruebas de la reconciliación, los conflictos y las lápidas entre dos copias."""
+
+    def setUp(self):
+        """Crea la copia A con un usuario, dos estados y diez tareas, y la copia B."""
+        self.directorio = tempfile.TemporaryDirectory()
+        self.rutas = [os.path.join(self.directorio.name, nombre) for nombre in ("a.db", "b.db")]
+        motor = crear_motor(url=f"sqlite:///{self.rutas[0]}")
+        preparar_esquema(motor)
+        with sessionmaker(bind=motor)() as session:
+            self.ana = UsuarioManager(session).crear_usuario(
+                "ana", "ana@correo.com", "x"
+            ).id_usuario
+            session.add_all([Estado(id_estado=1, nombre_estado="Pendiente"),
+                             Estado(id_estado=2, nombre_estado="Completado")])
+            session.commit()
+            manager = TareaManager(session)
+            self.ids = [self._crear(manager, f"Tarea {i}") for i in range(10)]
+        motor.dispose()
+        shutil.copy(*self.rutas)
+        self.motores = [crear_motor(url=f"sqlite:///{ruta}") for ruta in self.rutas]
+        self.sesiones = [sessionmaker(bind=motor)() for motor in self.motores]
+        self.a, self.b = (TareaManager(session) for session in self.sesiones)
+
+    def tearDown(self):
+        """Cierra las sesiones y los motores y elimina el directorio temporal."""
+        for session in self.sesiones:
+            session.close()
+        for motor in self.motores:
+            motor.dispose()
+        self.directorio.cleanup()
+
+    def _crear(self, manager, titulo, id_usuario=None):
+        return manager.crear_tarea(
+            titulo, None, datetime(2025, 1, 1), None, id_estado=1,
+            id_usuario=id_usuario or self.ana
+        ).id_tarea
+
+    def _sincronizar(self, simular=False):
+        return Sincronizador(*self.sesiones).sincronizar(simular=simular)
+
+    def _tareas(self, indice):
+        filas = self.sesiones[indice].execute(_SQL_TAREAS).all()
+        self.sesiones[indice].commit()
+        return filas
+
+    def _titulos(self, indice):
+        return sorted(fila[1] for fila in self._tareas(indice))
+
+    def test_copias_iguales_no_tienen_diferencias(self):
+        """Dos copias del mismo archivo tienen el mismo árbol."""
+        resultado = self._sincronizar()
+        self.assertEqual(resultado.cubos_distintos, 0)
+        self.assertEqual((resultado.hacia_a, resultado.hacia_b), (0, 0))
+
+    def test_cambios_en_las_dos_copias_convergen(self):
+        """Ediciones, etiquetas, borrados y tareas nuevas de cada copia llegan a la otra."""
+        self.a.actualizar_tarea(self.ids[0], titulo="Editada en A", descripcion="x" * 3000)
+        self.b.actualizar_tarea(self.ids[1], id_estado=2)
+        casa = EtiquetaManager(self.sesiones[1]).crear_etiqueta("Casa", "Azul").id_etiqueta
+        self.b.asignar_etiquetas([self.ids[2]], [casa])
+        self.a.eliminar_tarea(self.a.obtener_tarea_por_id(self.ids[3]))
+        # Las dos copias dan el mismo ID local a su tarea nueva; la clave las distingue.
+        nueva_a = self._crear(self.a, "Nueva en A")
+        nueva_b = self._crear(self.b, "Nueva en B")
+        self.assertEqual(nueva_a, nueva_b)
+
+        resultado = self._sincronizar()
+        self.assertEqual((resultado.hacia_a, resultado.hacia_b), (3, 3))
+        self.assertEqual(resultado.conflictos, [])
+        self.assertEqual(self._tareas(0), self._tareas(1))
+        self.assertEqual(len(self._tareas(0)), 11)
+        self.assertIn("Editada en A", self._titulos(1))
+        self.assertEqual(self._sincronizar().cubos_distintos, 0)
+
+        # Lo escrito por la sincronización conserva la hora de la copia original: no
+        # vuelve como un cambio nuevo en la siguiente.
+        self.b.actualizar_tarea(self.ids[4], titulo="Otra edición en B")
+        resultado = self._sincronizar()
+        self.assertEqual((resultado.hacia_a, resultado.hacia_b), (1, 0))
+        self.assertEqual(self._tareas(0), self._tareas(1))
+
+    def test_gana_la_ultima_escritura_e_informa_el_conflicto(self):
+        """Una tarea cambiada en las dos copias queda con la última versión."""
+        self._sincronizar()
+        self.a.actualizar_tarea(self.ids[0], titulo="Primero en A")
+        self.b.actualizar_tarea(self.ids[0], titulo="Después en B")
+        self.b.actualizar_tarea(self.ids[1], titulo="Primero en B")
+        self.a.actualizar_tarea(self.ids[1], titulo="Después en A")
+
+        resultado = self._sincronizar()
+        self.assertEqual(
+            sorted((c.titulo_a, c.titulo_b, c.ganadora) for c in resultado.conflictos),
+            [("Después en A", "Primero en B", "a"), ("Primero en A", "Después en B", "b")]
+        )
+        self.assertEqual(self._tareas(0), self._tareas(1))
+        self.assertIn("Después en A", self._titulos(0))
+        self.assertIn("Después en B", self._titulos(0))
+
+        # Tras sincronizar, un cambio en una sola copia ya no es un conflicto.
+        self.a.actualizar_tarea(self.ids[0], titulo="Solo en A")
+        self.assertEqual(self._sincronizar().conflictos, [])
+
+    def test_borrados_se_propagan_con_lapidas(self):
+        """Un borrado gana a una edición anterior y pierde ante una posterior."""
+        self._sincronizar()
+        self.b.actualizar_tarea(self.ids[0], titulo="Editada antes de borrarla")
+        self.a.eliminar_tarea(self.a.obtener_tarea_por_id(self.ids[0]))
+        self.a.eliminar_tarea(self.a.obtener_tarea_por_id(self.ids[1]))
+        self.b.actualizar_tarea(self.ids[1], titulo="Editada después del borrado")
+
+        resultado = self._sincronizar()
+        self.assertEqual(len(resultado.conflictos), 2)
+        titulos = self._titulos(1)
+        self.assertNotIn("Editada antes de borrarla", titulos)
+        self.assertIn("Editada después del borrado", titulos)
+        self.assertEqual(self._tareas(0), self._tareas(1))
+        # La tarea restaurada en A ya no tiene lápida; la borrada sí, en las dos copias.
+        for session in self.sesiones:
+            self.assertEqual(session.scalar(text("SELECT count(*) FROM tarea_borrada")), 1)
+            session.commit()
+        self.assertEqual(self._sincronizar().cubos_distintos, 0)
+
+    def test_papelera_se_propaga_y_se_restaura(self):
+        """Una tarea eliminada pasa a la papelera de la otra copia y se puede restaurar."""
+        self._sincronizar()
+        self.a.eliminar_tarea(self.a.obtener_tarea_por_id(self.ids[0]))
+        self.assertEqual(self._sincronizar().hacia_b, 1)
+        ana_b = self.b.obtener_tarea_por_id(self.ids[1]).id_usuario
+        self.assertEqual([t.id_tarea for t in self.b.obtener_papelera(ana_b)], [self.ids[0]])
+        self.assertEqual(self._tareas(0), self._tareas(1))
+
+        # Restaurarla en B la devuelve también a A.
+        self.assertIsNotNone(self.b.restaurar_tarea(self.ids[0]))
+        self.assertEqual(self._sincronizar().hacia_a, 1)
+        self.assertIsNotNone(self.a.obtener_tarea_por_id(self.ids[0]))
+        self.assertEqual(len(self._tareas(0)), 10)
+        for session in self.sesiones:
+            self.assertEqual(session.scalar(text("SELECT count(*) FROM tarea_borrada")), 0)
+            session.commit()
+
+        # La purga no cambia el árbol: la lápida conserva la hora del borrado.
+        self.a.eliminar_tarea(self.a.obtener_tarea_por_id(self.ids[2]))
+        self._sincronizar()
+        self.assertEqual(self.a.purgar_papelera(antiguedad=timedelta(0)).tareas, 1)
+        self.assertEqual(self._sincronizar().cubos_distintos, 0)
+
+    def test_usuarios_y_etiquetas_se_copian_por_nombre(self):
+        """Los usuarios, estados y etiquetas que faltan se crean en la otra copia."""
+        session_b = self.sesiones[1]
+        luis = UsuarioManager(session_b).crear_usuario("luis", "luis@correo.com", "y")
+        session_b.add(Estado(nombre_estado="Archivada"))
+        session_b.commit()
+        urgente = EtiquetaManager(session_b).crear_etiqueta("Urgente", "Rojo").id_etiqueta
+        id_tarea = self._crear(self.b, "De Luis", luis.id_usuario)
+        self.b.actualizar_tarea(id_tarea, id_estado=3)
+        self.b.asignar_etiquetas([id_tarea], [urgente])
+
+        self._sincronizar()
+        self.assertEqual(self._tareas(0), self._tareas(1))
+        session_a = self.sesiones[0]
+        self.assertEqual(session_a.execute(text(
+            "SELECT correo_electronico, contrasena FROM usuario WHERE nombre_usuario = 'luis'"
+        )).all(), [("luis@correo.com", "y")])
+        self.assertEqual(session_a.scalar(text(
+            "SELECT color FROM etiqueta WHERE nombre_etiqueta = 'Urgente'"
+        )), "Rojo")
+
+    def test_usuario_renombrado_en_una_copia(self):
+        """Un usuario renombrado se empareja por su correo y conserva el nombre nuevo."""
+        UsuarioManager(self.sesiones[1]).actualizar_usuario(self.ana, nombre_usuario="ana.b")
+        self.b.actualizar_tarea(self.ids[1], titulo="Editada en B")
+        self.a.actualizar_tarea(self.ids[0], titulo="Editada en A")
+
+        for _ in range(2):
+            resultado = self._sincronizar()
+            self.assertIsNotNone(resultado)
+            self.assertEqual(resultado.conflictos, [])
+        self.assertEqual(resultado.cubos_distintos, 0)
+        for session in self.sesiones:
+            self.assertEqual(session.execute(text(
+                "SELECT nombre_usuario, correo_electronico FROM usuario"
+            )).all(), [("ana.b", "ana@correo.com")])
+            session.commit()
+        # Renombrar en A no hizo ganar a su versión antigua de la tarea editada en B.
+        self.assertEqual(self._tareas(0), self._tareas(1))
+        self.assertIn("Editada en A", self._titulos(0))
+        self.assertIn("Editada en B", self._titulos(0))
+
+    def test_cambiar_un_nombre_comun_recalcula_todos_los_cubos(self):
+        """Renombrar una etiqueta cambia el hash de sus tareas aunque no se toquen."""
+        casa = EtiquetaManager(self.sesiones[0]).crear_etiqueta("Casa", "Azul").id_etiqueta
+        self.a.asignar_etiquetas(self.ids, [casa])
+        self._sincronizar()
+        EtiquetaManager(self.sesiones[1]).actualizar_etiqueta(
+            self.sesiones[1].execute(text("SELECT id_etiqueta FROM etiqueta")).scalar(),
+            nombre_etiqueta="Hogar"
+        )
+        resultado = self._sincronizar()
+        self.assertEqual(resultado.hacia_a, len(self.ids))
+        self.assertEqual(self._tareas(0), self._tareas(1))
+
+    def test_tareas_anteriores_a_la_clave_se_alinean_por_id(self):
+        """Las tareas sin uid de las dos copias se reconocen por su clave derivada."""
+        for session in self.sesiones:
+            session.execute(text("UPDATE tarea SET uid = NULL, modificado_en = NULL"))
+            session.commit()
+        self.b.actualizar_tarea(self.ids[5], titulo="Editada en B")
+
+        resultado = self._sincronizar()
+        self.assertEqual((resultado.hacia_a, resultado.hacia_b), (1, 0))
+        self.assertIn("Editada en B", self._titulos(0))
+        self.assertEqual(self._tareas(0), self._tareas(1))
+
+    def test_simular_no_escribe(self):
+        """Con simular se informa de los cambios sin tocar ninguna de las copias."""
+        self.a.actualizar_tarea(self.ids[0], titulo="Editada en A")
+        antes = [self._tareas(0), self._tareas(1)]
+
+        resultado = self._sincronizar(simular=True)
+        self.assertEqual((resultado.cubos_distintos, resultado.hacia_b), (1, 1))
+        self.assertEqual([self._tareas(0), self._tareas(1)], antes)
+        for session in self.sesiones:
+            self.assertEqual(session.scalar(text("SELECT count(*) FROM sincronizacion_cubo")), 0)
+            session.commit()
+
+    def test_linea_de_ordenes(self):
+        """La utilidad sincroniza dos archivos y escribe el informe de conflictos."""
+        self._sincronizar()
+        self.a.actualizar_tarea(self.ids[0], titulo="En A")
+        self.b.actualizar_tarea(self.ids[0], titulo="En B")
+        for session in self.sesiones:
+            session.close()
+        informe = os.path.join(self.directorio.name, "conflictos.csv")
+
+        resultado = sincronizar(*self.rutas, informe=informe)
+        self.assertEqual(len(resultado.conflictos), 1)
+        with open(informe, encoding="utf-8") as archivo:
+            lineas = archivo.read().splitlines()
+        self.assertEqual(len(lineas), 2)
+        self.assertIn("En B", lineas[1])
+        self.assertEqual(self._tareas(0), self._tareas(1))
+        with self.assertRaises(ValueError):
+            sincronizar(self.rutas[0], self.rutas[0])
+        with self.assertRaises(FileNotFoundError):
+            sincronizar(self.rutas[0], os.path.join(self.directorio.name, "no.db"))
+
+
+if __name__ == "__main__":
+    unittest.main()
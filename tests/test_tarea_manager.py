@@ -7,11 +7,15 @@ de tareas dentro del sistema.
 
 import unittest
 from datetime import datetime, timedelta
+
+from sqlalchemy import event, text
 from src.logica.tarea_manager import TareaManager
 from src.modelo.database import Session, Base, engine
 from src.logica.usuario_manager import UsuarioManager
 from src.logica.estado_manager import EstadoManager
-from src.modelo.modelo import Estado
+from src.logica.etiqueta_manager import EtiquetaManager
+from src.logica.filtros import ConEtiqueta, FiltroTareas, interpretar_etiquetas
+from src.modelo.modelo import Estado, tarea_etiqueta
 
 
 class TestTareaManager(unittest.TestCase):
@@ -94,6 +98,77 @@ class TestTareaManager(unittest.TestCase):
         self.tarea_manager.eliminar_tarea(tarea)
         self.assertIsNone(self.tarea_manager.obtener_tarea_por_id(tarea.id_tarea))
 
+    def test_papelera_oculta_y_restaura(self):
+        """Una tarea eliminada desaparece de las consultas y se puede restaurar."""
+        id_usuario = self.usuario.id_usuario
+        ids = self.tarea_manager.crear_tareas_lote(
+            {"titulo": f"Papelera {i}", "id_usuario": id_usuario,
+             "id_estado": self.estado.id_estado}
+            for i in range(3)
+        ).ids
+        eliminada = self.tarea_manager.obtener_tarea_por_id(ids[1])
+        self.tarea_manager.eliminar_tarea(eliminada)
+        self.assertIsNotNone(eliminada.borrado_en)
+
+        activas = [ids[0], ids[2]]
+        self.assertEqual([t.id_tarea for t in self.tarea_manager.obtener_tareas()], activas)
+        self.assertEqual(
+            [t.id_tarea for t in self.tarea_manager.obtener_tareas_por_usuario(id_usuario)],
+            activas
+        )
+        self.assertEqual(
+            [f.id_tarea for f in self.tarea_manager.obtener_filas_por_usuario(id_usuario)],
+            activas
+        )
+        self.assertEqual(len(self.tarea_manager.buscar(id_usuario, "Papelera")), 2)
+        self.assertEqual(len(self.usuario.tareas), 2)
+        self.assertEqual([t.id_tarea for t in self.tarea_manager.obtener_papelera(id_usuario)],
+                         [ids[1]])
+        # Una actualización no alcanza a las tareas de la papelera.
+        self.assertIsNone(self.tarea_manager.actualizar_tarea(ids[1], titulo="Oculta"))
+
+        restaurada = self.tarea_manager.restaurar_tarea(ids[1])
+        self.assertIsNone(restaurada.borrado_en)
+        self.assertEqual(self.tarea_manager.obtener_tarea_por_id(ids[1]).titulo, "Papelera 1")
+        self.assertEqual(self.tarea_manager.obtener_papelera(id_usuario), [])
+        self.assertIsNone(self.tarea_manager.restaurar_tarea(ids[1]))
+
+    def test_purgar_papelera_por_lotes(self):
+        """La purga borra por lotes solo las tareas caducadas, con sus etiquetas."""
+        etiqueta = EtiquetaManager(self.session).crear_etiqueta("Vieja", "Gris")
+        ids = self.tarea_manager.crear_tareas_lote(
+            {"titulo": f"T{i}", "id_usuario": self.usuario.id_usuario,
+             "id_estado": self.estado.id_estado, "etiquetas": [etiqueta.id_etiqueta]}
+            for i in range(6)
+        ).ids
+        for id_tarea in ids[:5]:
+            self.tarea_manager.eliminar_tarea(self.tarea_manager.obtener_tarea_por_id(id_tarea))
+
+        # Ninguna lleva 30 días en la papelera.
+        self.assertEqual(self.tarea_manager.purgar_papelera().tareas, 0)
+
+        lotes = []
+        event.listen(self.session, "after_commit", lambda _s: lotes.append(1))
+        resultado = self.tarea_manager.purgar_papelera(antiguedad=timedelta(0), tamano_lote=2)
+        self.assertEqual(resultado.tareas, 5)
+        self.assertGreaterEqual(len(lotes), 3)
+        self.assertEqual(self.tarea_manager.obtener_papelera(self.usuario.id_usuario), [])
+        self.assertEqual(
+            self.session.execute(text("SELECT id_tarea FROM tarea")).scalars().all(), ids[5:]
+        )
+        self.assertEqual(self.session.query(tarea_etiqueta).count(), 1)
+
+        # La purga se detiene en cuanto ``continuar`` devuelve False.
+        self.tarea_manager.eliminar_tarea(self.tarea_manager.obtener_tarea_por_id(ids[5]))
+        detenida = self.tarea_manager.purgar_papelera(
+            antiguedad=timedelta(0), continuar=lambda: False
+        )
+        self.assertEqual(detenida, (0, 0))
+        with self.assertRaises(ValueError):
+            self.tarea_manager.purgar_papelera(antiguedad=timedelta(days=-1))
+        with self.assertRaises(ValueError):
+            self.tarea_manager.purgar_papelera(tamano_lote=0)
+
     def test_obtener_tareas(self):
         """Prueba obtener todas las tareas existentes."""
         self.tarea_manager.crear_tarea(
@@ -212,6 +287,478 @@ class TestTareaManager(unittest.TestCase):
         except Exception as e:
             self.assertIsInstance(e, Exception)
 
+    def _crear_tareas_paginacion(self, cantidad):
+        """Crea tareas con fechas de vencimiento repetidas para probar el desempate."""
+        base = datetime(2030, 1, 1)
+        return [
+            self.tarea_manager.crear_tarea(
+                f"Tarea {i}", "Desc", base, base + timedelta(days=i % 3),
+                id_usuario=self.usuario.id_usuario,
+                id_estado=self.estado.id_estado
+            )
+            for i in range(cantidad)
+        ]
+
+    def test_paginacion_por_id(self):
+        """Las páginas por ID recorren todas las tareas sin repetir ninguna."""
+        creadas = self._crear_tareas_paginacion(7)
+        pagina = self.tarea_manager.obtener_pagina_tareas(self.usuario.id_usuario, tamano=3)
+        self.assertEqual(len(pagina.tareas), 3)
+        self.assertIsNotNone(pagina.token_siguiente)
+
+        ids = [t.id_tarea for t in pagina.tareas]
+        while pagina.token_siguiente:
+            pagina = self.tarea_manager.obtener_pagina_tareas(
+                self.usuario.id_usuario, tamano=3, token=pagina.token_siguiente)
+            ids.extend(t.id_tarea for t in pagina.tareas)
+        self.assertEqual(ids, [t.id_tarea for t in creadas])
+
+    def test_paginacion_por_vencimiento_con_nulos(self):
+        """El orden por vencimiento desempata por ID y deja las fechas nulas al final."""
+        self._crear_tareas_paginacion(6)
+        sin_fecha = self.tarea_manager.crear_tarea(
+            "Sin fecha", "Desc", datetime(2030, 1, 1), None,
+            id_usuario=self.usuario.id_usuario,
+            id_estado=self.estado.id_estado
+        )
+        tareas = list(self.tarea_manager.iterar_tareas(
+            self.usuario.id_usuario, tamano=2, orden="vencimiento"))
+        self.assertEqual(len(tareas), 7)
+        self.assertEqual(tareas[-1].id_tarea, sin_fecha.id_tarea)
+        claves = [(t.fecha_vencimiento, t.id_tarea) for t in tareas[:-1]]
+        self.assertEqual(claves, sorted(claves))
+
+    def test_paginacion_token_invalido(self):
+        """Un token corrupto o de otro orden produce ValueError."""
+        self._crear_tareas_paginacion(3)
+        pagina = self.tarea_manager.obtener_pagina_tareas(tamano=1, orden="creacion")
+        with self.assertRaises(ValueError):
+            self.tarea_manager.obtener_pagina_tareas(tamano=1, token=pagina.token_siguiente)
+        with self.assertRaises(ValueError):
+            self.tarea_manager.obtener_pagina_tareas(tamano=1, token="no-es-un-token")
+
+    def _contar_consultas(self, funcion):
+        """Ejecuta la función y devuelve (resultado, número de consultas SELECT)."""
+        sentencias = []
+
+        def registrar(_conn, _cursor, sentencia, *_args):
+            if sentencia.lstrip().upper().startswith("SELECT"):
+                sentencias.append(sentencia)
+
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            resultado = funcion()
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+        return resultado, len(sentencias)
+
+    def test_filas_por_usuario_numero_constante_de_consultas(self):
+        """La proyección usa una sola consulta sin importar cuántas tareas haya."""
+        etiquetas = EtiquetaManager(self.session)
+        urgente = etiquetas.crear_etiqueta("Urgente", "Rojo")
+        casa = etiquetas.crear_etiqueta("Casa", "Azul")
+        id_usuario = self.usuario.id_usuario
+        consultas_por_tamano = []
+        for cantidad in (1, 25):
+            for i in range(cantidad):
+                self.tarea_manager.crear_tarea(
+                    f"Tarea {i}", "x" * 200, datetime.now(), datetime.now(),
+                    id_usuario=id_usuario,
+                    id_estado=self.estado.id_estado,
+                    etiquetas=[urgente, casa] if i % 2 else []
+                )
+            self.session.expire_all()
+            filas, consultas = self._contar_consultas(
+                lambda: self.tarea_manager.obtener_filas_por_usuario(id_usuario)
+            )
+            consultas_por_tamano.append(consultas)
+        self.assertEqual(consultas_por_tamano, [1, 1])
+
+        self.assertEqual(len(filas), 26)
+        self.assertEqual(filas[0].nombre_estado, "Pendiente")
+        self.assertIsNone(filas[1].etiquetas)
+        self.assertEqual(sorted(filas[2].etiquetas.split(", ")), ["Casa", "Urgente"])
+        self.assertEqual(len(filas[0].descripcion), 80)
+        self.assertTrue(filas[0].descripcion.endswith("…"))
+
+    def test_crear_tareas_lote(self):
+        """Crea varias tareas en bloques y escribe sus etiquetas en una sola inserción."""
+        etiqueta = EtiquetaManager(self.session).crear_etiqueta("Lote", "Gris")
+        datos = [
+            {
+                "titulo": f"Lote {i}", "descripcion": "Desc",
+                "fecha_creacion": datetime.now(), "fecha_vencimiento": datetime.now(),
+                "id_usuario": self.usuario.id_usuario, "id_estado": self.estado.id_estado,
+                "etiquetas": [etiqueta.id_etiqueta] if i % 2 else []
+            }
+            for i in range(7)
+        ]
+        resultado = self.tarea_manager.crear_tareas_lote(datos, tamano_lote=3)
+        self.assertEqual(resultado.errores, [])
+        self.assertEqual(len(resultado.ids), 7)
+        self.assertEqual(resultado.ids, sorted(resultado.ids))
+
+        tarea = self.tarea_manager.obtener_tarea_por_id(resultado.ids[1])
+        self.assertEqual(tarea.titulo, "Lote 1")
+        self.assertEqual([e.nombre_etiqueta for e in tarea.etiquetas], ["Lote"])
+        self.assertEqual(len(self.tarea_manager.obtener_tareas()), 7)
+
+    def test_crear_tareas_lote_errores_por_fila(self):
+        """Las filas inválidas se informan por índice sin descartar las válidas."""
+        id_usuario = self.usuario.id_usuario
+        id_estado = self.estado.id_estado
+        datos = [
+            {"titulo": "Válida", "id_usuario": id_usuario, "id_estado": id_estado},
+            {"titulo": None, "id_usuario": id_usuario, "id_estado": id_estado},
+            {"titulo": "Duplicada", "id_usuario": id_usuario, "id_estado": id_estado},
+            {"titulo": "Campo raro", "prioridad": 1,
+             "id_usuario": id_usuario, "id_estado": id_estado},
+        ]
+        existente = self.tarea_manager.crear_tareas_lote(datos[:1]).ids[0]
+        datos[2]["id_tarea"] = existente  # Provoca un conflicto de clave primaria
+        datos[0]["titulo"] = "Otra válida"
+        resultado = self.tarea_manager.crear_tareas_lote(datos, tamano_lote=10)
+        self.assertIsNotNone(resultado.ids[0])
+        self.assertEqual(resultado.ids[1:], [None, None, None])
+        self.assertEqual(sorted(error.indice for error in resultado.errores), [1, 2, 3])
+        self.assertEqual(len(self.tarea_manager.obtener_tareas()), 2)
+
+    def test_marcar_completado_un_solo_update(self):
+        """Con la caché de estados cargada, completar una tarea es un solo UPDATE."""
+        completado = self.estado_manager.crear_estado("Completado")
+        tarea = self.tarea_manager.crear_tarea(
+            "Completar rápido", "Desc", datetime.now(), datetime.now(),
+            id_usuario=self.usuario.id_usuario,
+            id_estado=self.estado.id_estado
+        )
+        self.estado_manager.obtener_id_por_nombre("Completado")
+        tarea = self.tarea_manager.obtener_tarea_por_id(tarea.id_tarea)
+
+        sentencias = []
+
+        def registrar(_conn, _cursor, sentencia, *_args):
+            if not sentencia.startswith("BEGIN"):
+                sentencias.append(sentencia.split()[0])
+
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            self.tarea_manager.marcar_completado(tarea)
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+        self.assertEqual(sentencias, ["UPDATE"])
+        self.assertEqual(tarea.id_estado, completado.id_estado)
+
+    def test_crear_y_actualizar_tarea_con_ids_de_etiqueta(self):
+        """crear_tarea y actualizar_tarea aceptan las etiquetas como IDs."""
+        etiquetas = EtiquetaManager(self.session)
+        casa = etiquetas.crear_etiqueta("Casa", "Azul").id_etiqueta
+        ocio = etiquetas.crear_etiqueta("Ocio", "Verde").id_etiqueta
+        tarea = self.tarea_manager.crear_tarea(
+            "Con IDs", "Desc", datetime.now(), datetime.now(),
+            id_usuario=self.usuario.id_usuario,
+            id_estado=self.estado.id_estado,
+            etiquetas=[casa]
+        )
+        self.assertEqual([e.id_etiqueta for e in tarea.etiquetas], [casa])
+        tarea = self.tarea_manager.actualizar_tarea(tarea.id_tarea, etiquetas=[ocio, 9999])
+        self.assertEqual([e.id_etiqueta for e in tarea.etiquetas], [ocio])
+
+    def test_buscar_texto_completo(self):
+        """La búsqueda encuentra por título y descripción, ordena por relevancia y se
+        mantiene sincronizada con las actualizaciones y eliminaciones."""
+        def crear(titulo, descripcion, id_usuario=None):
+            return self.tarea_manager.crear_tarea(
+                titulo, descripcion, datetime.now(), datetime.now(),
+                id_usuario=id_usuario or self.usuario.id_usuario,
+                id_estado=self.estado.id_estado
+            )
+
+        otro = self.usuario_manager.crear_usuario("Otro", "otro@correo.com", "x")
+        en_titulo = crear("Comprar canción", "Para la fiesta")
+        en_descripcion = crear("Regalo", "Buscar una canción bonita")
+        crear("Sin relación", "Nada que ver")
+        crear("Canción ajena", "De otro usuario", otro.id_usuario)
+
+        resultados = self.tarea_manager.buscar(self.usuario.id_usuario, "cancion")
+        self.assertEqual(
+            [r.id_tarea for r in resultados], [en_titulo.id_tarea, en_descripcion.id_tarea]
+        )
+        self.assertIn("[canción]", resultados[1].fragmento)
+
+        self.assertEqual(self.tarea_manager.buscar(self.usuario.id_usuario, "fies"), [])
+        prefijo = self.tarea_manager.buscar(self.usuario.id_usuario, "fies", prefijo=True)
+        self.assertEqual([r.id_tarea for r in prefijo], [en_titulo.id_tarea])
+
+        self.tarea_manager.actualizar_tarea(en_titulo.id_tarea, titulo="Comprar pan")
+        self.tarea_manager.eliminar_tarea(en_descripcion)
+        self.assertEqual(
+            [r.titulo for r in self.tarea_manager.buscar(self.usuario.id_usuario, "pan")],
+            ["Comprar pan"]
+        )
+        self.assertEqual(self.tarea_manager.buscar(self.usuario.id_usuario, "cancion"), [])
+
+    def test_buscar_descripciones_comprimidas_sin_escribir(self):
+        """Las escrituras indexan las descripciones comprimidas; la búsqueda solo lee."""
+        larga = "Revisar el inventario del almacén. " * 60
+        tarea = self.tarea_manager.crear_tarea(
+            "Almacén", larga, datetime.now(), datetime.now(),
+            id_usuario=self.usuario.id_usuario, id_estado=self.estado.id_estado
+        )
+        otra = self.tarea_manager.crear_tarea(
+            "Taller", larga.replace("inventario", "recuento"), datetime.now(), datetime.now(),
+            id_usuario=self.usuario.id_usuario, id_estado=self.estado.id_estado
+        )
+        self.tarea_manager.actualizar_tarea(otra.id_tarea, descripcion=larga * 2)
+        pendientes = text("SELECT count(*) FROM tarea_fts_pendiente")
+        self.assertEqual(self.session.execute(pendientes).scalar(), 0)
+
+        sentencias = []
+
+        def registrar(_conn, _cursor, sentencia, *_):
+            sentencias.append(sentencia)
+
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            resultados = self.tarea_manager.buscar(self.usuario.id_usuario, "inventario")
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+        self.assertEqual(
+            sorted(r.id_tarea for r in resultados), sorted([tarea.id_tarea, otra.id_tarea])
+        )
+        self.assertFalse([s for s in sentencias if not s.lstrip().upper().startswith("SELECT")])
+
+    def test_buscar_texto_sin_palabras_o_con_sintaxis(self):
+        """Los textos vacíos o con operadores FTS5 no producen errores."""
+        self.assertEqual(self.tarea_manager.buscar(self.usuario.id_usuario, "  "), [])
+        self.assertEqual(
+            self.tarea_manager.buscar(self.usuario.id_usuario, 'AND "( OR NEAR*'), []
+        )
+
+    def test_actualizar_tareas_en_bloque(self):
+        """Un único UPDATE cambia el estado de las tareas filtradas por etiqueta."""
+        etiqueta = EtiquetaManager(self.session).crear_etiqueta("Masiva", "Rojo")
+        ids = self.tarea_manager.crear_tareas_lote(
+            {"titulo": f"T{i}", "id_usuario": self.usuario.id_usuario,
+             "id_estado": self.estado.id_estado,
+             "etiquetas": [etiqueta.id_etiqueta] if i < 3 else []}
+            for i in range(5)
+        ).ids
+        cargada = self.tarea_manager.obtener_tarea_por_id(ids[0])
+
+        afectadas = self.tarea_manager.marcar_completadas(
+            FiltroTareas(id_usuario=self.usuario.id_usuario, id_etiqueta=etiqueta.id_etiqueta)
+        )
+        self.assertEqual(afectadas, 3)
+        completado = self.estado_manager.obtener_id_por_nombre("Completado")
+        self.assertEqual(cargada.id_estado, completado)
+        estados = [self.tarea_manager.obtener_tarea_por_id(i).id_estado for i in ids]
+        self.assertEqual(estados.count(completado), 3)
+
+    def test_desplazar_vencimiento_en_bloque(self):
+        """Desplazar el vencimiento suma el intervalo solo a las tareas vencidas."""
+        hoy = datetime(2030, 6, 15, 10, 30, 0, 250)
+        ids = self.tarea_manager.crear_tareas_lote(
+            {"titulo": f"T{i}", "fecha_vencimiento": hoy + timedelta(days=i - 2),
+             "id_usuario": self.usuario.id_usuario, "id_estado": self.estado.id_estado}
+            for i in range(4)
+        ).ids
+        afectadas = self.tarea_manager.actualizar_tareas(
+            FiltroTareas(id_usuario=self.usuario.id_usuario, vencimiento_hasta=hoy),
+            desplazar_vencimiento=timedelta(weeks=1)
+        )
+        self.assertEqual(afectadas, 2)
+        vencimientos = [self.tarea_manager.obtener_tarea_por_id(i).fecha_vencimiento for i in ids]
+        self.assertEqual(vencimientos, [
+            hoy + timedelta(days=5), hoy + timedelta(days=6), hoy, hoy + timedelta(days=1)
+        ])
+
+    def test_actualizar_tareas_validaciones(self):
+        """Se rechazan filtros vacíos, columnas no permitidas y actualizaciones vacías."""
+        with self.assertRaises(ValueError):
+            self.tarea_manager.actualizar_tareas(FiltroTareas(), titulo="Todo")
+        with self.assertRaises(ValueError):
+            self.tarea_manager.actualizar_tareas(FiltroTareas(ids=[1]), id_tarea=5)
+        with self.assertRaises(ValueError):
+            self.tarea_manager.actualizar_tareas(FiltroTareas(ids=[1]))
+        self.assertEqual(
+            self.tarea_manager.actualizar_tareas(FiltroTareas(todas=True), titulo="Todo"), 0
+        )
+
+    def test_eliminar_tareas_en_bloque(self):
+        """El borrado masivo respeta el filtro, trabaja por lotes y cuenta lo eliminado."""
+        etiqueta = EtiquetaManager(self.session).crear_etiqueta("Vieja", "Gris")
+        ids = self.tarea_manager.crear_tareas_lote(
+            {"titulo": f"T{i}", "id_usuario": self.usuario.id_usuario,
+             "id_estado": self.estado.id_estado,
+             "etiquetas": [etiqueta.id_etiqueta] if i % 2 == 0 else []}
+            for i in range(7)
+        ).ids
+        cargada = self.tarea_manager.obtener_tarea_por_id(ids[0])
+
+        resultado = self.tarea_manager.eliminar_tareas(
+            FiltroTareas(id_etiqueta=etiqueta.id_etiqueta), tamano_lote=2
+        )
+        self.assertEqual(resultado, (4, 4))
+        self.assertNotIn(cargada, self.session)
+        restantes = [t.id_tarea for t in self.tarea_manager.obtener_tareas()]
+        self.assertEqual(restantes, ids[1::2])
+        self.assertEqual(self.session.query(tarea_etiqueta).count(), 0)
+        self.assertEqual(
+            self.tarea_manager.eliminar_tareas(FiltroTareas(ids=ids[:1])), (0, 0)
+        )
+        with self.assertRaises(ValueError):
+            self.tarea_manager.eliminar_tareas(FiltroTareas())
+
+    def test_tareas_por_expresion_de_etiquetas(self):
+        """Las combinaciones AND/OR/NOT de etiquetas se resuelven en SQL."""
+        etiquetas = EtiquetaManager(self.session)
+        urgente = etiquetas.crear_etiqueta("Urgente", "Rojo").id_etiqueta
+        universidad = etiquetas.crear_etiqueta("Universidad", "Amarillo").id_etiqueta
+        casa = etiquetas.crear_etiqueta("Casa nueva", "Azul").id_etiqueta
+        combinaciones = [[urgente, universidad], [urgente, universidad, casa], [urgente],
+                         [universidad, casa], []]
+        ids = self.tarea_manager.crear_tareas_lote(
+            {"titulo": f"T{i}", "id_usuario": self.usuario.id_usuario,
+             "id_estado": self.estado.id_estado, "etiquetas": combinacion}
+            for i, combinacion in enumerate(combinaciones)
+        ).ids
+
+        casos = {
+            'Urgente AND Universidad AND NOT "Casa nueva"': [ids[0]],
+            "urgente or universidad": [],
+            'Urgente OR Universidad': ids[:4],
+            'NOT (Urgente OR "Casa nueva")': ids[4:],
+            'Universidad and ("Casa nueva" OR NOT Urgente)': ids[1:2] + ids[3:4],
+            ConEtiqueta(urgente) & ~ConEtiqueta(universidad): ids[2:3],
+            ~ConEtiqueta(casa) & ~ConEtiqueta(urgente): ids[4:],
+        }
+        for expresion, esperados in casos.items():
+            with self.subTest(expresion=expresion):
+                tareas = self.tarea_manager.obtener_tareas_por_etiquetas(
+                    expresion, self.usuario.id_usuario
+                )
+                self.assertEqual([t.id_tarea for t in tareas], esperados)
+
+        for texto in ("", "Urgente AND", "(Urgente", "Urgente Casa", "AND Urgente"):
+            with self.subTest(texto=texto), self.assertRaises(ValueError):
+                interpretar_etiquetas(texto)
+
+    def test_asignar_y_quitar_etiquetas_en_bloque(self):
+        """Las etiquetas se añaden y quitan con una sentencia, sin duplicar asociaciones."""
+        etiquetas = EtiquetaManager(self.session)
+        roja = etiquetas.crear_etiqueta("Roja", "Rojo").id_etiqueta
+        azul = etiquetas.crear_etiqueta("Azul", "Azul").id_etiqueta
+        ids = self.tarea_manager.crear_tareas_lote(
+            {"titulo": f"T{i}", "id_usuario": self.usuario.id_usuario,
+             "id_estado": self.estado.id_estado, "etiquetas": [roja] if i == 0 else []}
+            for i in range(4)
+        ).ids
+        cargada = self.tarea_manager.obtener_tarea_por_id(ids[0])
+        self.assertEqual([e.id_etiqueta for e in cargada.etiquetas], [roja])
+
+        sentencias = []
+
+        def registrar(_conn, _cursor, sentencia, *_args):
+            sentencias.append(sentencia.strip())
+
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            asignadas = self.tarea_manager.asignar_etiquetas(ids + [999], [roja, azul, 999])
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+        self.assertEqual(asignadas, 7)
+        self.assertEqual(len([s for s in sentencias if s.startswith("INSERT")]), 1)
+        self.assertEqual({e.id_etiqueta for e in cargada.etiquetas}, {roja, azul})
+
+        self.assertEqual(self.tarea_manager.quitar_etiquetas(ids[:3], [roja]), 3)
+        self.assertEqual({e.id_etiqueta for e in cargada.etiquetas}, {azul})
+        self.assertEqual(self.tarea_manager.asignar_etiquetas([], [roja]), 0)
+        self.assertEqual(self.session.query(tarea_etiqueta).count(), 5)
+
+    def test_etiquetas_en_bloque_ignoran_la_papelera(self):
+        """Asignar y quitar etiquetas en bloque no modifica las tareas de la papelera."""
+        etiquetas = EtiquetaManager(self.session)
+        roja = etiquetas.crear_etiqueta("Roja", "Rojo").id_etiqueta
+        azul = etiquetas.crear_etiqueta("Azul", "Azul").id_etiqueta
+        ids = self.tarea_manager.crear_tareas_lote(
+            {"titulo": f"T{i}", "id_usuario": self.usuario.id_usuario,
+             "id_estado": self.estado.id_estado, "etiquetas": [roja]}
+            for i in range(2)
+        ).ids
+        self.tarea_manager.eliminar_tarea(self.tarea_manager.obtener_tarea_por_id(ids[0]))
+
+        self.assertEqual(self.tarea_manager.asignar_etiquetas(ids, [azul]), 1)
+        self.assertEqual(self.tarea_manager.quitar_etiquetas(ids, [roja]), 1)
+        restaurada = self.tarea_manager.restaurar_tarea(ids[0])
+        self.assertEqual([e.id_etiqueta for e in restaurada.etiquetas], [roja])
+        activa = self.tarea_manager.obtener_tarea_por_id(ids[1])
+        self.assertEqual([e.id_etiqueta for e in activa.etiquetas], [azul])
+
+    def test_paginacion_con_filtro(self):
+        """La paginación acepta el mismo filtro que las operaciones masivas."""
+        creadas = self._crear_tareas_paginacion(5)
+        tareas = list(self.tarea_manager.iterar_tareas(
+            tamano=2, filtro=FiltroTareas(ids=[creadas[1].id_tarea, creadas[3].id_tarea])
+        ))
+        self.assertEqual([t.titulo for t in tareas], ["Tarea 1", "Tarea 3"])
+
+    def test_descripcion_larga_se_comprime_y_difiere(self):
+        """Las descripciones largas se guardan comprimidas y no se cargan en los listados."""
+        larga = "Notas de la reunión con el cliente. " * 200
+        tarea = self.tarea_manager.crear_tarea(
+            "Reunión", larga, datetime.now(), datetime.now(),
+            id_usuario=self.usuario.id_usuario, id_estado=self.estado.id_estado
+        )
+        id_tarea = tarea.id_tarea
+        almacenado = self.session.execute(
+            text("SELECT typeof(descripcion), length(descripcion) FROM tarea "
+                 "WHERE id_tarea = :id"), {"id": id_tarea}
+        ).one()
+        self.assertEqual(almacenado[0], "blob")
+        self.assertLess(almacenado[1], len(larga) // 10)
+
+        self.session.expunge_all()
+        listada = self.tarea_manager.obtener_tareas()[0]
+        self.assertNotIn("descripcion", listada.__dict__)
+        self.assertEqual(listada.descripcion, larga)
+
+        self.session.expunge_all()
+        completa = self.tarea_manager.obtener_tarea_por_id(id_tarea, con_descripcion=True)
+        self.assertEqual(completa.__dict__["descripcion"], larga)
+
+    def test_descripcion_comprimida_en_filas_y_busqueda(self):
+        """La tabla principal y la búsqueda leen el texto de descripciones comprimidas."""
+        larga = "Inventario del almacén " + "revisar estanterías " * 300
+        self.tarea_manager.crear_tarea(
+            "Inventario", larga, datetime.now(), datetime.now(),
+            id_usuario=self.usuario.id_usuario, id_estado=self.estado.id_estado
+        )
+        fila = self.tarea_manager.obtener_filas_por_usuario(self.usuario.id_usuario, 20)[0]
+        self.assertEqual(fila.descripcion, larga[:19] + "…")
+        resultados = self.tarea_manager.buscar(self.usuario.id_usuario, "estanterías")
+        self.assertEqual(len(resultados), 1)
+        self.assertIn("[estanterías]", resultados[0].fragmento)
+
+    def test_fechas_se_guardan_como_enteros(self):
+        """Las fechas se guardan como enteros UTC y se comparan como enteros en los filtros."""
+        base = datetime(2030, 3, 1, 8, 15, 30, 123456)
+        ids = self.tarea_manager.crear_tareas_lote(
+            {"titulo": f"T{i}", "fecha_creacion": base,
+             "fecha_vencimiento": base + timedelta(days=i),
+             "id_usuario": self.usuario.id_usuario, "id_estado": self.estado.id_estado}
+            for i in range(5)
+        ).ids
+        almacenados = self.session.execute(
+            text("SELECT DISTINCT typeof(fecha_creacion), typeof(fecha_vencimiento) FROM tarea")
+        ).all()
+        self.assertEqual(almacenados, [("integer", "integer")])
+        self.assertEqual(self.tarea_manager.obtener_tarea_por_id(ids[2]).fecha_vencimiento,
+                         base + timedelta(days=2))
+        semana = self.tarea_manager.obtener_pagina_tareas(filtro=FiltroTareas(
+            vencimiento_desde=base + timedelta(days=1), vencimiento_hasta=base + timedelta(days=3)
+        ))
+        self.assertEqual([t.id_tarea for t in semana.tareas], ids[1:3])
+
 
 if __name__ == "__main__":
     unittest.main()
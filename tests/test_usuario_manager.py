@@ -4,9 +4,12 @@ Pruebas unitarias para la clase UsuarioManager.
 Verifica las operaciones CRUD relacionadas con usuarios en la base de datos.
 """
 
+import re
 import unittest
+from sqlalchemy import event, func, select
 from src.logica.usuario_manager import UsuarioManager
 from src.modelo.database import Session, Base, engine
+from src.modelo.modelo import Estado, Etiqueta, Tarea, tarea_etiqueta
 
 class TestUsuarioManager(unittest.TestCase):
     """
@@ -148,6 +151,39 @@ class TestUsuarioManager(unittest.TestCase):
         )
         self.assertIsNone(resultado)
 
+    def test_eliminar_usuario_borra_en_cascada(self):
+        """
+        Prueba que al eliminar un usuario la base de datos borra sus tareas y sus
+        asociaciones con etiquetas, sin que la sesión cargue las tareas.
+        """
+        usuario = self.manager.crear_usuario("Luis", "luis@gmail.com", "clave")
+        etiqueta = Etiqueta(nombre_etiqueta="Casa", color="Azul")
+        self.session.add_all([Estado(id_estado=1, nombre_estado="Pendiente"), etiqueta])
+        self.session.add_all([
+            Tarea(titulo=f"Tarea {i}", id_estado=1, id_usuario=usuario.id_usuario,
+                  etiquetas=[etiqueta])
+            for i in range(3)
+        ])
+        self.session.commit()
+        self.session.expire_all()
+
+        sentencias = []
+
+        def registrar(_conn, _cursor, sentencia, *_args):
+            sentencias.append(sentencia)
+
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            self.assertIsNotNone(self.manager.eliminar_usuario(usuario.id_usuario))
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+
+        self.assertFalse([s for s in sentencias if re.search(r"FROM tarea\b", s)])
+        self.assertEqual(self.session.scalar(select(func.count()).select_from(Tarea)), 0)
+        self.assertEqual(
+            self.session.scalar(select(func.count()).select_from(tarea_etiqueta)), 0
+        )
+        self.assertEqual(self.session.scalar(select(func.count()).select_from(Etiqueta)), 1)
 
 if __name__ == "__main__":
     unittest.main()